@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Compare wall time for analyze_constraints with numpy vs optional torch accelerator.
+Compare wall time for analyze_constraints with numpy vs optional numba / jax / torch accelerators.
 
 Usage:
   python3 scripts/benchmark_kst_accelerator.py [--repeats N]
@@ -50,6 +50,26 @@ def main() -> int:
 
     t_np = bench("numpy", None)
     print(f"accelerator=numpy: {t_np*1000:.2f} ms/run ({args.repeats} repeats)")
+    try:
+        import numba  # noqa: F401
+
+        bench("numba", None)  # compile (or load the on-disk cache) outside the timing
+        t_nb = bench("numba", None)
+        print(f"accelerator=numba: {t_nb*1000:.2f} ms/run")
+        if t_nb > 0:
+            print(f"ratio numba/numpy: {t_nb/t_np:.2f}x")
+    except ImportError:
+        print("numba not installed; pip install numba for the compiled CPU kernels")
+    try:
+        import jax  # noqa: F401
+
+        bench("jax", None)  # jit compile outside the timing
+        t_jx = bench("jax", None)
+        print(f"accelerator=jax: {t_jx*1000:.2f} ms/run")
+        if t_jx > 0:
+            print(f"ratio jax/numpy: {t_jx/t_np:.2f}x")
+    except ImportError:
+        print("jax not installed; pip install jax for the jit + vmap kernels")
     try:
         import torch
         from kst_rating_tool.numeric_backend import is_rocm_pytorch
@@ -241,9 +241,12 @@ def main(argv: list[str] | None = None) -> int:
     )
     parser.add_argument(
         "--accelerator",
-        choices=("numpy", "torch", "auto"),
+        choices=("numpy", "tune", "torch", "numba", "jax", "auto"),
         default="numpy",
-        help="NumPy CPU (default), PyTorch tensor path, or auto-detect device.",
+        help=(
+            "NumPy CPU (default), tune (benchmark the backends per problem size, cached per user), "
+            "PyTorch tensor path, Numba-compiled CPU kernels, JAX jit+vmap, or auto-detect device."
+        ),
     )
     parser.add_argument(
         "--device",
@@ -12,7 +12,10 @@ from .constraints import (  # noqa: F401
     LineConstraint,
     PlaneConstraint,
     ConstraintSet,
+    ConstraintArrays,
 )
+from .analysis_cache import AnalysisCache, analysis_cache  # noqa: F401
+from .executor import AnalysisExecutor, shutdown_executors  # noqa: F401
 from .pipeline import (  # noqa: F401
     DetailedAnalysisResult,
     SpecmotResult,
@@ -20,6 +23,7 @@ from .pipeline import (  # noqa: F401
     analyze_constraints_detailed,
     analyze_constraints_gpu,
     analyze_specified_motions,
+    extend_detailed,
 )
 from .optimization import (  # noqa: F401
     RevisionConfig,
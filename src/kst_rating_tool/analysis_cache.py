@@ -0,0 +1,176 @@
+"""Opt-in LRU memoization of :func:`analyze_constraints` / :func:`analyze_constraints_detailed`.
+
+Optimizers often analyse the same constraint set more than once: the greedy
+searches re-run the chosen set at the end, ``optimize_modification`` re-analyses
+``best_x``, and differential evolution with ``polish=True`` and the surrogate
+samplers revisit points. Inside ``with analysis_cache(): ...`` both pipeline
+entry points look up a content-addressed key first:
+
+- the exact float64 bytes of the constraint arrays (:func:`constraint_key`,
+  memoized per :attr:`ConstraintSet.version`), and
+- the result kind plus ``accelerator``, ``device`` and ``enumeration``.
+
+``n_workers`` is not part of the key: the parallel path returns the sequential
+result. Entries are evicted least-recently-used once ``max_entries`` or
+``max_bytes`` (NumPy payload) is exceeded. Hits return a copy, so callers may
+edit the arrays; a detailed result's ``constraints`` is the caller's set.
+
+The key is not quantized: the pipeline's 1e-4 rounding applies to motions only,
+and nearby geometries still differ in their wrenches, points and ``max_d``.
+The active cache is held in a :class:`contextvars.ContextVar`, so a ``with``
+block applies to its own thread (or asyncio task) only.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import copy
+import dataclasses
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Tuple, TypeVar
+
+import numpy as np
+
+from .constraints import ConstraintArrays, ConstraintSet
+
+T = TypeVar("T")
+
+CacheKey = Tuple[str, Tuple[Any, ...]]  # (constraint content hash, settings)
+
+
+def _content_hash(arrays: ConstraintArrays) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays.as_tuple():
+        q = np.asarray(a, dtype=np.float64) + 0.0  # + 0.0 folds -0.0 into 0.0
+        h.update(repr(q.shape).encode())
+        h.update(np.ascontiguousarray(q).tobytes())
+    return h.hexdigest()
+
+
+def constraint_key(constraints: ConstraintSet) -> str:
+    """Hash of the exact float64 constraint arrays (cached until the set changes)."""
+    return constraints.arrays.derived("content_key", _content_hash)
+
+
+def _nbytes(obj: Any) -> int:
+    """NumPy payload held by a result (arrays in dataclass fields, lists and tuples)."""
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (list, tuple)):
+        return sum(_nbytes(x) for x in obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, (type, ConstraintSet)):
+        return sum(_nbytes(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    return 0
+
+
+@dataclass
+class CacheStats:
+    """Counters of an :class:`AnalysisCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class AnalysisCache:
+    """Thread-safe LRU of analysis results bounded by entry count and NumPy bytes.
+
+    A result larger than ``max_bytes`` on its own is returned but not stored.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 2**20) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, Tuple[Any, ConstraintSet, int]] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._nbytes)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def get_or_compute(
+        self, constraints: ConstraintSet, settings: Tuple[Any, ...], compute: Callable[[], T]
+    ) -> T:
+        """Cached result for ``(constraints, settings)``, running ``compute()`` on a miss."""
+        key = (constraint_key(constraints), settings)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        if entry is not None:
+            result, owner, _ = entry
+            return copy.deepcopy(result, {id(owner): constraints})
+
+        result = compute()
+        size = _nbytes(result)
+        if size > self.max_bytes:
+            return result
+        stored = copy.deepcopy(result, {id(constraints): constraints})
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[2]
+            self._entries[key] = (stored, constraints, size)
+            self._nbytes += size
+            while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+                _, (_, _, freed) = self._entries.popitem(last=False)
+                self._nbytes -= freed
+                self._evictions += 1
+        return result
+
+
+_ACTIVE: contextvars.ContextVar[AnalysisCache | None] = contextvars.ContextVar("kst_analysis_cache", default=None)
+
+
+def active_analysis_cache() -> AnalysisCache | None:
+    """The cache consulted by the pipeline, or ``None`` outside :func:`analysis_cache`."""
+    return _ACTIVE.get()
+
+
+@contextmanager
+def analysis_cache(
+    cache: AnalysisCache | None = None, max_entries: int = 256, max_bytes: int = 256 * 2**20
+) -> Iterator[AnalysisCache]:
+    """Memoize pipeline analyses inside the ``with`` block (e.g. one optimization run).
+
+    Yields the active :class:`AnalysisCache` (a new one unless ``cache`` is given) so
+    callers can read :attr:`AnalysisCache.stats`. Blocks nest; the outer cache is
+    restored on exit. Other threads do not see the block; pass the yielded cache to
+    their own ``analysis_cache(cache)`` to share it (it is thread-safe).
+    """
+    active = cache if cache is not None else AnalysisCache(max_entries, max_bytes)
+    token = _ACTIVE.set(active)
+    try:
+        yield active
+    finally:
+        _ACTIVE.reset(token)
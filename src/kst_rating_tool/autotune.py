@@ -0,0 +1,286 @@
+"""Backend autotuning for ``accelerator="tune"``.
+
+The fastest backend depends on the machine and on the problem: NumPy wins on
+small sets, the worker pool on large ones, and compiled kernels or a torch
+device somewhere in between. ``accelerator="tune"`` buckets the constraint set
+by size and type mix (:func:`problem_bucket`). Analyses of a new bucket race
+the candidates (:func:`tune_candidates`) on the problem itself, each call
+spending at most about :data:`TUNE_BUDGET_S` beyond its first run. Timings
+accumulate in ``backend_tune.json`` under :func:`user_cache_dir`; once every
+candidate has been timed the fastest is stored and later calls in the same
+bucket read the choice from the cache.
+
+JAX is not a candidate: its first call per bucket is dominated by compilation,
+which a short benchmark cannot amortize.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+from .constraints import ConstraintSet
+from .executor import CHUNKS_PER_WORKER, shared_executor
+from .numeric_backend import _numba_available, _torch_available
+
+T = TypeVar("T")
+
+TUNE_CACHE_VERSION = 1
+TUNE_CACHE_FILE = "backend_tune.json"
+# Candidates are timed twice (best of two) unless the first run takes longer than this.
+TUNE_REPEAT_BELOW_S = 1.0
+# Benchmark time one call may spend beyond its first candidate; the rest of the race
+# continues on later calls in the same bucket.
+TUNE_BUDGET_S = 20.0
+MAX_TUNE_WORKERS = 8
+TUNE_CHUNKS_PER_WORKER = (4, CHUNKS_PER_WORKER, 16)
+
+
+@dataclass(frozen=True)
+class TuneChoice:
+    """One backend configuration: accelerator, device and worker-pool layout."""
+
+    accelerator: str = "numpy"
+    device: str | None = None
+    n_workers: int = 1
+    chunks_per_worker: int = CHUNKS_PER_WORKER
+
+    @property
+    def label(self) -> str:
+        if self.n_workers > 1:
+            return f"workers{self.n_workers}x{self.chunks_per_worker}"
+        return self.accelerator if self.device is None else f"{self.accelerator}-{self.device}"
+
+    def available(self) -> bool:
+        """False when the accelerator's optional package is no longer installed."""
+        if self.accelerator == "torch":
+            return _torch_available()
+        if self.accelerator == "numba":
+            return _numba_available()
+        return True
+
+    def apply(self) -> None:
+        """Configure the shared worker pool for this choice (no-op when sequential)."""
+        if self.n_workers > 1:
+            shared_executor(self.n_workers).chunks_per_worker = self.chunks_per_worker
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache directory for kst_rating_tool (``KST_CACHE_DIR`` overrides)."""
+    override = os.environ.get("KST_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "kst_rating_tool"
+
+
+def problem_bucket(constraints: ConstraintSet) -> str:
+    """Cache key: total constraint count rounded up to 4, 6, 8, 12, 16, 24, ..., plus the type mix.
+
+    Combo counts grow like ``C(total_cp, 5)``, so sizes 9 and 12 share a bucket but
+    12 and 13 do not; sets with the same constraint types (and plane kinds) behave alike.
+    """
+    counts = {
+        "cp": len(constraints.points),
+        "cpin": len(constraints.pins),
+        "clin": len(constraints.lines),
+        "cpln": len(constraints.planes),
+    }
+    total = sum(counts.values())
+    size = 4
+    while size < total:
+        size = size * 3 // 2 if size & (size - 1) == 0 else size * 4 // 3
+    mix = [name for name, n in counts.items() if n]
+    kinds = sorted({"rect" if p.type == 1 else "circ" for p in constraints.planes})
+    return f"n{size}:" + "+".join(mix + kinds)
+
+
+def tune_candidates() -> List[TuneChoice]:
+    """Configurations raced for a new bucket: NumPy, installed CPU accelerators, worker pools."""
+    choices = [TuneChoice("numpy")]
+    if _numba_available():
+        choices.append(TuneChoice("numba"))
+    if _torch_available():
+        choices.append(TuneChoice("torch", "cpu"))
+        import torch
+
+        if torch.cuda.is_available():
+            choices.append(TuneChoice("torch", "cuda"))
+    n_workers = min(os.cpu_count() or 1, MAX_TUNE_WORKERS)
+    if n_workers > 1:
+        choices.extend(TuneChoice("numpy", None, n_workers, c) for c in TUNE_CHUNKS_PER_WORKER)
+    return choices
+
+
+def _choice_from_dict(raw: Any) -> TuneChoice | None:
+    try:
+        choice = TuneChoice(
+            accelerator=str(raw["accelerator"]),
+            device=None if raw.get("device") is None else str(raw["device"]),
+            n_workers=max(1, int(raw["n_workers"])),
+            chunks_per_worker=max(1, int(raw["chunks_per_worker"])),
+        )
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    return choice if choice.available() else None
+
+
+class BackendTuner:
+    """Benchmarks candidates per :func:`problem_bucket` and persists the winners as JSON.
+
+    Each bucket stores the overall winner and the fastest sequential choice; the
+    latter is used from threads other than the main thread, where the shared
+    worker pool must not be driven concurrently. Such threads only time the
+    sequential candidates, so the overall winner is stored once a main-thread
+    call has timed the worker pools as well.
+    """
+
+    def __init__(self, path: Path | None = None, budget_s: float = TUNE_BUDGET_S) -> None:
+        self._path = path
+        self._budget_s = budget_s
+        self._lock = threading.RLock()
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else user_cache_dir() / TUNE_CACHE_FILE
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != TUNE_CACHE_VERSION
+            or data.get("cpu_count") != os.cpu_count()
+            or not isinstance(data.get("buckets"), dict)
+        ):
+            return {}
+        return data["buckets"]
+
+    def _save(self, buckets: Dict[str, Any]) -> None:
+        """Write atomically; an unwritable cache only costs a re-tune next time."""
+        path = self.path
+        payload = {"version": TUNE_CACHE_VERSION, "cpu_count": os.cpu_count(), "buckets": buckets}
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def lookup(self, bucket: str, sequential: bool = False) -> TuneChoice | None:
+        """Cached choice for ``bucket``, or ``None`` if not tuned (or no longer installed)."""
+        with self._lock:
+            entry = self._load().get(bucket)
+        if not isinstance(entry, dict):
+            return None
+        return _choice_from_dict(entry.get("sequential" if sequential else "best"))
+
+    def clear(self) -> None:
+        """Forget every tuned bucket."""
+        with self._lock:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def tune(
+        self,
+        constraints: ConstraintSet,
+        run: Callable[[TuneChoice], T],
+        candidates: List[TuneChoice] | None = None,
+    ) -> Tuple[TuneChoice, T | None]:
+        """Choice for ``constraints``' bucket and, if it had to be benchmarked, the result of that run.
+
+        On a cache hit ``run`` is not called and the result is ``None``. Otherwise the
+        candidates not timed yet run the real problem through ``run`` (twice when a run
+        takes under :data:`TUNE_REPEAT_BELOW_S`) until the call has spent the tuner's
+        budget; the first one always runs, so the call's own result is never wasted.
+        The returned choice is the fastest one this call ran. Timings are saved after
+        every call and the winner once all candidates are timed.
+        """
+        bucket = problem_bucket(constraints)
+        sequential = threading.current_thread() is not threading.main_thread()
+        with self._lock:
+            cached = self.lookup(bucket, sequential)
+            if cached is not None:
+                cached.apply()
+                return cached, None
+
+            full = candidates if candidates is not None else tune_candidates()
+            pool = [c for c in full if c.n_workers == 1] if sequential else full
+            buckets = self._load()
+            old = buckets.get(bucket)
+            entry: Dict[str, Any] = old if isinstance(old, dict) else {}
+            labels = {c.label for c in full}
+            old_timings = entry.get("timings")
+            timings: Dict[str, float] = {
+                k: float(v)
+                for k, v in (old_timings.items() if isinstance(old_timings, dict) else ())
+                if k in labels and isinstance(v, (int, float))
+            }
+            pending = [c for c in pool if c.label not in timings]
+            if not pending:  # raced before, but the stored winner is no longer usable
+                for c in pool:
+                    del timings[c.label]
+                pending = pool
+
+            start = time.perf_counter()
+            ran, result, ran_best = pending[0], None, float("inf")
+            for choice in pending:
+                if choice is not pending[0] and time.perf_counter() - start + min(timings.values()) > self._budget_s:
+                    break
+                best = float("inf")
+                for _ in range(2):
+                    choice.apply()
+                    t0 = time.perf_counter()
+                    out = run(choice)
+                    elapsed = time.perf_counter() - t0
+                    if elapsed < best:
+                        best, best_out = elapsed, out
+                    if best > TUNE_REPEAT_BELOW_S:
+                        break
+                timings[choice.label] = best
+                if best <= ran_best:
+                    ran, result, ran_best = choice, best_out, best
+
+            entry["timings"] = timings
+            seq_pool = [c for c in full if c.n_workers == 1]
+            if seq_pool and all(c.label in timings for c in seq_pool):
+                entry["sequential"] = asdict(min(seq_pool, key=lambda c: timings[c.label]))
+            # "best" only once the worker pools have been timed too (from the main thread).
+            if all(c.label in timings for c in full):
+                entry["best"] = asdict(min(full, key=lambda c: timings[c.label]))
+            buckets[bucket] = entry
+            self._save(buckets)
+            ran.apply()
+            return ran, result
+
+
+_DEFAULT_TUNER = BackendTuner()
+
+
+def tuned(constraints: ConstraintSet, run: Callable[[TuneChoice], T]) -> Tuple[TuneChoice, T | None]:
+    """:meth:`BackendTuner.tune` on the process-wide tuner (cache under :func:`user_cache_dir`)."""
+    return _DEFAULT_TUNER.tune(constraints, run)
+
+
+def clear_tune_cache() -> None:
+    """Delete the tuning cache so the next ``accelerator="tune"`` call re-benchmarks."""
+    _DEFAULT_TUNER.clear()
@@ -1,12 +1,204 @@
 from __future__ import annotations
 
-import itertools
-from typing import List, Sequence, Tuple
+from dataclasses import dataclass
+from math import comb
+from typing import Iterator, Sequence, Tuple
 
 import numpy as np
+from numpy.typing import NDArray
 
 from .constraints import ConstraintSet
 
+# Default rows per block yielded by ComboStream.
+COMBO_CHUNK = 65536
+
+
+def combo_group_sizes(constraints: ConstraintSet) -> Tuple[int, ...]:
+    """Subset sizes `combo_preproc.m` enumerates, in stacking order.
+
+    Planes contribute up to 3 wrench rows, so 2..5-subsets can reach rank 5;
+    pins/lines contribute 2, so 3..5-subsets; points alone need 5-subsets.
+    """
+    if len(constraints.planes) > 0:
+        return (2, 3, 4, 5)
+    if len(constraints.pins) > 0 or len(constraints.lines) > 0:
+        return (3, 4, 5)
+    return (5,)
+
+
+def constraint_row_counts(constraints: ConstraintSet) -> Tuple[int, ...]:
+    """Wrench rows each constraint contributes, in ``total_cp`` order (cp, cpin, clin, cpln).
+
+    Points give 1 row, pins and lines 2, planes 3 (see ``cp_to_wrench``).
+    """
+    return (
+        (1,) * len(constraints.points)
+        + (2,) * (len(constraints.pins) + len(constraints.lines))
+        + (3,) * len(constraints.planes)
+    )
+
+
+def viable_combo_indices(combo: NDArray[np.integer], row_counts: Sequence[int]) -> NDArray[np.intp]:
+    """Indices (ascending) of combo rows whose stacked wrench rows number at least 5.
+
+    Fewer than five rows can never give a rank-5 pivot matrix, so such combos
+    are dropped before any linear algebra. ``row_counts[c]`` is the row count
+    of constraint ``c + 1``; padding zeros and out-of-range indices count 0.
+    """
+    combo = np.atleast_2d(np.asarray(combo, dtype=np.intp))
+    counts = np.concatenate([[0], np.asarray(row_counts, dtype=np.intp)])
+    idx = np.where((combo > 0) & (combo < counts.size), combo, 0)
+    return np.flatnonzero(counts[idx].sum(axis=1) >= 5)
+
+
+def _unrank_combinations(n: int, r: int, ranks: NDArray[np.int64]) -> NDArray[np.intp]:
+    """1-based r-subsets of 1..n at lexicographic positions ``ranks`` (nchoosek row order).
+
+    Vectorized combinatorial unranking: position ``j`` takes the smallest value
+    ``v`` for which the subsets starting ``..., v`` cover the remaining rank,
+    located with ``searchsorted`` on the table ``C(m, r - j)`` (hockey-stick sums).
+    """
+    out = np.empty((ranks.size, r), dtype=np.intp)
+    rem = np.asarray(ranks, dtype=np.int64).copy()
+    prev = np.zeros(ranks.size, dtype=np.int64)
+    for j in range(r):
+        table = np.array([comb(m, r - j) for m in range(n + 1)], dtype=np.int64)
+        start = table[n - prev]
+        m = np.searchsorted(table, start - rem, side="left") - 1
+        v = n - m
+        rem -= start - table[n - v + 1]
+        out[:, j] = v
+        prev = v
+    return out
+
+
+def _rank_combinations(n: int, r: int, combos: NDArray[np.integer]) -> NDArray[np.int64]:
+    """Lexicographic positions of 1-based r-subsets of 1..n; inverse of `_unrank_combinations`."""
+    c = np.asarray(combos, dtype=np.int64).reshape(-1, r)
+    rank = np.full(c.shape[0], comb(n, r) - 1, dtype=np.int64)
+    for j in range(r):
+        table = np.array([comb(m, r - j) for m in range(n + 1)], dtype=np.int64)
+        rank -= table[n - c[:, j]]
+    return rank
+
+
+@dataclass(frozen=True)
+class ComboStream:
+    """Lazy view of the `combo_preproc` rows, generated block by block.
+
+    Rows follow MATLAB's stacking ([combo2; combo3; combo4; combo5], each group
+    in nchoosek order) and are zero padded to 5 columns. Blocks use the smallest
+    unsigned dtype that holds ``total_cp``. Any row range can be generated on
+    its own, so parallel workers only need this (small, picklable) object and
+    a ``(start, stop)`` pair instead of a pickled combo array.
+
+    With ``row_counts`` (see :func:`constraint_row_counts`), :meth:`viable`
+    drops combos with fewer than five stacked wrench rows and
+    :attr:`n_skipped` counts them without enumerating.
+    """
+
+    total_cp: int
+    sizes: Tuple[int, ...]
+    chunk_size: int = COMBO_CHUNK
+    row_counts: Tuple[int, ...] = ()
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.min_scalar_type(self.total_cp)
+
+    @property
+    def group_counts(self) -> Tuple[int, ...]:
+        return tuple(comb(self.total_cp, r) for r in self.sizes)
+
+    def __len__(self) -> int:
+        return sum(self.group_counts)
+
+    @property
+    def n_chunks(self) -> int:
+        return -(-len(self) // self.chunk_size)
+
+    def rows(self, start: int, stop: int) -> NDArray[np.unsignedinteger]:
+        """Rows ``start:stop`` of the combo table, shape (stop - start, 5)."""
+        stop = min(stop, len(self))
+        start = min(max(start, 0), stop)
+        out = np.zeros((stop - start, 5), dtype=self.dtype)
+        offset = 0
+        for r, count in zip(self.sizes, self.group_counts):
+            lo, hi = max(start, offset), min(stop, offset + count)
+            if lo < hi:
+                ranks = np.arange(lo - offset, hi - offset, dtype=np.int64)
+                out[lo - start : hi - start, :r] = _unrank_combinations(self.total_cp, r, ranks)
+            offset += count
+        return out
+
+    def index_of(self, combos: NDArray[np.integer]) -> NDArray[np.int64]:
+        """Row indices of ``combos`` (zero-padded, as produced by :meth:`rows`) in the table."""
+        combos = np.atleast_2d(np.asarray(combos, dtype=np.int64))
+        width = np.count_nonzero(combos, axis=1)
+        out = np.full(combos.shape[0], -1, dtype=np.int64)
+        offset = 0
+        for r, count in zip(self.sizes, self.group_counts):
+            sel = width == r
+            if np.any(sel):
+                out[sel] = offset + _rank_combinations(self.total_cp, r, combos[sel, :r])
+            offset += count
+        if np.any(out < 0):
+            raise ValueError("index_of: combo size not enumerated by this stream")
+        return out
+
+    def viable(self, start: int, stop: int) -> Tuple[NDArray[np.unsignedinteger], NDArray[np.int64]]:
+        """Rows ``start:stop`` that can reach rank 5, with their absolute row indices.
+
+        MATLAB order is kept; the indices address the full (unpruned) table.
+        Without ``row_counts`` nothing is dropped.
+        """
+        rows = self.rows(start, stop)
+        if not self.row_counts:
+            return rows, np.arange(rows.shape[0], dtype=np.int64) + max(start, 0)
+        keep = viable_combo_indices(rows, self.row_counts)
+        return rows[keep], keep.astype(np.int64) + max(start, 0)
+
+    @property
+    def n_skipped(self) -> int:
+        """Number of combos in the table with fewer than five stacked wrench rows."""
+        by_rows = [self.row_counts.count(k) for k in (1, 2, 3)]
+        skipped = 0
+        for r in self.sizes:
+            # r-subsets with a points, b two-row and c three-row constraints, a + 2b + 3c < 5
+            for b in range(r + 1):
+                for c in range(r + 1 - b):
+                    a = r - b - c
+                    if a + 2 * b + 3 * c < 5:
+                        skipped += comb(by_rows[0], a) * comb(by_rows[1], b) * comb(by_rows[2], c)
+        return skipped
+
+    def chunk(self, i: int) -> NDArray[np.unsignedinteger]:
+        """Block ``i`` (0-based); the last block may be short."""
+        if not 0 <= i < self.n_chunks:
+            raise IndexError(f"chunk index {i} out of range for {self.n_chunks} chunks")
+        return self.rows(i * self.chunk_size, (i + 1) * self.chunk_size)
+
+    def __iter__(self) -> Iterator[NDArray[np.unsignedinteger]]:
+        for i in range(self.n_chunks):
+            yield self.chunk(i)
+
+    def iter_viable(self) -> Iterator[Tuple[NDArray[np.unsignedinteger], NDArray[np.int64]]]:
+        """Blocks of :meth:`viable` rows (with absolute indices), one per chunk."""
+        for i in range(self.n_chunks):
+            yield self.viable(i * self.chunk_size, (i + 1) * self.chunk_size)
+
+
+def combo_stream(constraints: ConstraintSet, chunk_size: int = COMBO_CHUNK) -> ComboStream:
+    """Chunked, memory-compact counterpart of :func:`combo_preproc`."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    return ComboStream(
+        constraints.total_cp,
+        combo_group_sizes(constraints),
+        chunk_size,
+        constraint_row_counts(constraints),
+    )
+
 
 def combo_preproc(constraints: ConstraintSet) -> np.ndarray:
     """Python equivalent of `combo_preproc.m`.
@@ -23,58 +215,10 @@ def combo_preproc(constraints: ConstraintSet) -> np.ndarray:
         padded with zeros where fewer than 5 constraints are used.
     """
 
-    total_cp = constraints.total_cp
-
-    has_plane = len(constraints.planes) > 0
-    has_pin_or_line = len(constraints.pins) > 0 or len(constraints.lines) > 0
-
-    indices = list(range(1, total_cp + 1))
-
-    def _nchoosek(n: int) -> np.ndarray:
-        if n > total_cp:
-            return np.empty((0, n), dtype=int)
-        combos = list(itertools.combinations(indices, n))
-        if not combos:
-            return np.empty((0, n), dtype=int)
-        return np.asarray(combos, dtype=int)
-
-    combo2 = np.empty((0, 5), dtype=int)
-    combo3 = np.empty((0, 5), dtype=int)
-    combo4 = np.empty((0, 5), dtype=int)
-
-    if has_plane:
-        c2 = _nchoosek(2)
-        c3 = _nchoosek(3)
-        c4 = _nchoosek(4)
-        c5 = _nchoosek(5)
-        if c2.size:
-            combo2 = np.hstack([c2, np.zeros((c2.shape[0], 3), dtype=int)])
-        if c3.size:
-            combo3 = np.hstack([c3, np.zeros((c3.shape[0], 2), dtype=int)])
-        if c4.size:
-            combo4 = np.hstack([c4, np.zeros((c4.shape[0], 1), dtype=int)])
-    elif has_pin_or_line:
-        c3 = _nchoosek(3)
-        c4 = _nchoosek(4)
-        c5 = _nchoosek(5)
-        if c3.size:
-            combo3 = np.hstack([c3, np.zeros((c3.shape[0], 2), dtype=int)])
-        if c4.size:
-            combo4 = np.hstack([c4, np.zeros((c4.shape[0], 1), dtype=int)])
-    else:
-        c5 = _nchoosek(5)
-
-    if 'c5' not in locals():
-        c5 = np.empty((0, 5), dtype=int)
-
     # Stack groups in MATLAB order: [combo2; combo3; combo4; combo5]
     # Do NOT re-sort: MATLAB's nchoosek already produces lexicographic order
     # within each group, and the groups are stacked sequentially.
     # Sorting globally would interleave groups, changing which combo "wins"
     # the duplicate-motion detection race in the main loop.
-    combo = np.vstack([combo2, combo3, combo4, c5]) if any(
-        x.size for x in (combo2, combo3, combo4, c5)
-    ) else np.empty((0, 5), dtype=int)
-
-    return combo
-
+    stream = combo_stream(constraints)
+    return stream.rows(0, len(stream)).astype(int)
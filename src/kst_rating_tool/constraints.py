@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Sequence
+from typing import Any, Callable, Iterable, List, Sequence
 
 import numpy as np
 
@@ -67,14 +67,113 @@ class PlaneConstraint:
     prop: np.ndarray  # property row from cpln_prop
 
 
+_LIST_FIELDS = ("points", "pins", "lines", "planes")
+
+
+class _TrackedList(list):
+    """List that reports in-place mutation (append, item assignment, ...) to its owner."""
+
+    __slots__ = ("_on_change",)
+
+    def __init__(self, items: Iterable[Any], on_change: Callable[[], None]) -> None:
+        super().__init__(items)
+        self._on_change = on_change
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (list, (list(self),))
+
+
+def _tracked(name: str) -> Callable[..., Any]:
+    base = getattr(list, name)
+
+    def method(self: _TrackedList, *args: Any, **kwargs: Any) -> Any:
+        result = base(self, *args, **kwargs)
+        self._on_change()
+        return result
+
+    method.__name__ = name
+    return method
+
+
+for _name in (
+    "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse",
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+):
+    setattr(_TrackedList, _name, _tracked(_name))
+
+
+def _read_only(a: np.ndarray) -> np.ndarray:
+    a = np.ascontiguousarray(a, dtype=float)
+    a.setflags(write=False)
+    return a
+
+
+@dataclass(frozen=True)
+class ConstraintArrays:
+    """Struct-of-arrays view of a :class:`ConstraintSet` (MATLAB-style cp/cpin/clin/cpln/cpln_prop).
+
+    Arrays are contiguous and read-only; ``version`` is the owning set's
+    version when they were built. Obtain via ``ConstraintSet.arrays``.
+    """
+
+    cp: np.ndarray  # (n_cp, 6)
+    cpin: np.ndarray  # (n_cpin, 6)
+    clin: np.ndarray  # (n_clin, 10)
+    cpln: np.ndarray  # (n_cpln, 7)
+    cpln_prop: np.ndarray  # (n_cpln, prop_len)
+    version: int = 0
+    _derived: dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def counts(self) -> tuple[int, int, int, int]:
+        """(no_cp, no_cpin, no_clin, no_cpln)."""
+        return self.cp.shape[0], self.cpin.shape[0], self.clin.shape[0], self.cpln.shape[0]
+
+    def as_tuple(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self.cp, self.cpin, self.clin, self.cpln, self.cpln_prop
+
+    def derived(self, key: str, build: Callable[[ConstraintArrays], Any]) -> Any:
+        """Memoize ``build(self)`` under ``key`` for as long as these arrays are current."""
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+
 @dataclass
 class ConstraintSet:
-    """Container grouping all constraint types."""
+    """Container grouping all constraint types.
+
+    The MATLAB-style arrays are built once and cached (:attr:`arrays`).
+    Replacing or mutating the ``points/pins/lines/planes`` lists bumps
+    :attr:`version` and drops the cache; after editing a constraint's vectors
+    in place (e.g. ``cs.points[0].position[2] = 1.0``) call :meth:`invalidate`.
+    """
 
     points: List[PointConstraint] = field(default_factory=list)
     pins: List[PinConstraint] = field(default_factory=list)
     lines: List[LineConstraint] = field(default_factory=list)
     planes: List[PlaneConstraint] = field(default_factory=list)
+    version: int = field(default=0, init=False, repr=False, compare=False)
+    _arrays: ConstraintArrays | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _LIST_FIELDS:
+            super().__setattr__(name, _TrackedList(value, self.invalidate))
+            self.invalidate()
+            return
+        super().__setattr__(name, value)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        for name in _LIST_FIELDS:
+            super().__setattr__(name, _TrackedList(state[name], self.invalidate))
+        super().__setattr__("_arrays", None)
+
+    def invalidate(self) -> None:
+        """Mark the constraints as changed: bump :attr:`version` and drop cached arrays."""
+        d = self.__dict__
+        d["version"] = d.get("version", 0) + 1
+        d["_arrays"] = None
 
     @property
     def total_cp(self) -> int:
@@ -82,13 +181,28 @@ class ConstraintSet:
 
         return len(self.points) + len(self.pins) + len(self.lines) + len(self.planes)
 
+    @property
+    def arrays(self) -> ConstraintArrays:
+        """Cached :class:`ConstraintArrays` for the current :attr:`version`."""
+        cached = self._arrays
+        if cached is None or cached.version != self.version:
+            cp, cpin, clin, cpln, cpln_prop = (_read_only(a) for a in self._build_matlab_style_arrays())
+            cached = ConstraintArrays(cp, cpin, clin, cpln, cpln_prop, version=self.version)
+            self.__dict__["_arrays"] = cached
+        return cached
+
     def to_matlab_style_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """Export to MATLAB-style arrays (cp, cpin, clin, cpln, cpln_prop).
 
         This mirrors the input format of `cp_to_wrench.m` for easier
-        comparison with the reference implementation.
+        comparison with the reference implementation. Each call builds fresh,
+        writable arrays from the current constraint objects; use :attr:`arrays`
+        for the cached read-only views.
         """
 
+        return self._build_matlab_style_arrays()
+
+    def _build_matlab_style_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         if self.points:
             cp = np.array([np.concatenate((p.position, p.normal)) for p in self.points], dtype=float)
         else:
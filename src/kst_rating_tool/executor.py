@@ -0,0 +1,249 @@
+"""Long-lived worker pool for the parallel combo loop.
+
+``analyze_constraints(..., n_workers=k)`` used to start a fresh ``multiprocessing.Pool``
+per call and pickle ``wr_all``, ``pts`` and the whole ConstraintSet into every chunk.
+:class:`AnalysisExecutor` keeps its workers alive between calls, publishes the
+MATLAB-style constraint arrays once through ``multiprocessing.shared_memory`` (workers
+rebuild the ConstraintSet and ``cp_to_wrench`` output once per published set) and hands
+out many small ``(start, stop)`` combo ranges through ``imap_unordered`` so idle workers
+pick up the next range. Callers merge the returned rows by combo index.
+
+Other parallel loops (the revision grid) run on the same pool:
+:meth:`AnalysisExecutor.publish_object` pickles their shared inputs into shared memory
+once, keyed by the pickle's hash, and workers unpickle them once per key
+(:func:`published_object`).
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import pickle
+from dataclasses import dataclass
+from multiprocessing import Pool, shared_memory
+from multiprocessing.pool import Pool as PoolType
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .combination import ComboStream
+from .constraints import ConstraintArrays, ConstraintSet
+
+# Combo ranges handed out per worker and call; more ranges balance uneven rank-5 density.
+CHUNKS_PER_WORKER = 8
+
+ComboResult = Tuple[int, NDArray[np.float64], NDArray[np.float64]]  # (combo_i, mot_row, R_two_rows)
+
+
+@dataclass(frozen=True)
+class _Published:
+    """Handle to constraint arrays in shared memory: block name and (shape, offset) per array."""
+
+    name: str
+    layout: Tuple[Tuple[Tuple[int, ...], int], ...]
+
+
+@dataclass(frozen=True)
+class _PublishedObject:
+    """Handle to a pickled object in shared memory: block name, content key and pickle size."""
+
+    name: str
+    key: str
+    size: int
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the parent process.
+
+    Pool workers share the parent's resource tracker, so the registration made
+    by attaching before Python 3.13 is a no-op; the parent unlinks the block.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+# Per-worker state for the last published constraint set.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _worker_inputs(pub: _Published) -> Tuple[Any, ...]:
+    if _WORKER_STATE.get("name") != pub.name:
+        from .wrench import cp_to_wrench
+
+        shm = _attach(pub.name)
+        try:
+            arrays = [
+                np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset).copy()
+                for shape, offset in pub.layout
+            ]
+        finally:
+            shm.close()
+        constraints = ConstraintSet.from_matlab_style_arrays(*arrays)
+        wr_all_sys, pts, max_d = cp_to_wrench(constraints)
+        _WORKER_STATE.clear()
+        _WORKER_STATE.update(
+            name=pub.name,
+            inputs=([w.as_array() for w in wr_all_sys], pts, max_d, constraints),
+        )
+    return _WORKER_STATE["inputs"]
+
+
+_WORKER_OBJECT: Dict[str, Any] = {}
+
+
+def published_object(pub: _PublishedObject) -> Any:
+    """Worker side of :meth:`AnalysisExecutor.publish_object`: unpickled once per key."""
+    if _WORKER_OBJECT.get("key") != pub.key:
+        shm = _attach(pub.name)
+        try:
+            obj = pickle.loads(np.ndarray((pub.size,), dtype=np.uint8, buffer=shm.buf).tobytes())
+        finally:
+            shm.close()
+        _WORKER_OBJECT.clear()
+        _WORKER_OBJECT.update(key=pub.key, obj=obj)
+    return _WORKER_OBJECT["obj"]
+
+
+def _run_range(task: Tuple[_Published, ComboStream, int, int]) -> List[ComboResult]:
+    from .pipeline import _process_combo_chunk
+
+    pub, combos, start, stop = task
+    wr_all, pts, max_d, constraints = _worker_inputs(pub)
+    return _process_combo_chunk((combos, start, stop, wr_all, pts, max_d, constraints))
+
+
+class AnalysisExecutor:
+    """Reusable process pool for the parallel analysis loop.
+
+    The pool starts on first use and stays up until :meth:`close` (or the end of a
+    ``with`` block). Constraint arrays are republished only when a different
+    constraint set, or a new :attr:`ConstraintSet.version`, is analysed.
+    """
+
+    def __init__(self, n_workers: int, chunks_per_worker: int = CHUNKS_PER_WORKER) -> None:
+        if n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        self.n_workers = n_workers
+        self.chunks_per_worker = max(1, chunks_per_worker)
+        self._pool: PoolType | None = None
+        self._shm: shared_memory.SharedMemory | None = None
+        self._published: _Published | None = None
+        self._published_arrays: ConstraintArrays | None = None
+        self._obj_shm: shared_memory.SharedMemory | None = None
+        self._published_obj: _PublishedObject | None = None
+        self._published_ref: Any = None
+
+    def __enter__(self) -> AnalysisExecutor:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def pool(self) -> PoolType:
+        if self._pool is None:
+            self._pool = Pool(processes=self.n_workers)
+        return self._pool
+
+    def publish(self, constraints: ConstraintSet) -> _Published:
+        """Copy the constraint arrays into shared memory (skipped if already published)."""
+        current = constraints.arrays
+        if self._published is not None and current is self._published_arrays:
+            return self._published
+        self._release_shm()
+        arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in current.as_tuple()]
+        shm = shared_memory.SharedMemory(create=True, size=max(1, sum(a.nbytes for a in arrays)))
+        layout = []
+        offset = 0
+        for a in arrays:
+            np.ndarray(a.shape, dtype=np.float64, buffer=shm.buf, offset=offset)[...] = a
+            layout.append((a.shape, offset))
+            offset += a.nbytes
+        self._shm = shm
+        self._published = _Published(shm.name, tuple(layout))
+        self._published_arrays = current
+        return self._published
+
+    def publish_object(self, obj: Any) -> _PublishedObject:
+        """Pickle ``obj`` into shared memory for :func:`published_object`.
+
+        The block is kept while equal objects (same pickle bytes) are published, so
+        workers keep their unpickled copy across calls; a different object replaces it.
+        Publishing the same object again returns the handle without re-pickling, so
+        callers must not modify a published object in place.
+        """
+        if self._published_obj is not None and obj is self._published_ref:
+            return self._published_obj
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if self._published_obj is not None and self._published_obj.key == key:
+            self._published_ref = obj
+            return self._published_obj
+        self._release_obj()
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        view = np.ndarray((len(data),), dtype=np.uint8, buffer=shm.buf)
+        view[...] = np.frombuffer(data, dtype=np.uint8)
+        self._obj_shm = shm
+        self._published_obj = _PublishedObject(shm.name, key, len(data))
+        self._published_ref = obj
+        return self._published_obj
+
+    def run(self, constraints: ConstraintSet, combos: ComboStream) -> List[ComboResult]:
+        """Rate every rank-5 combo of ``combos``; rows come back in completion order."""
+        n_combo = len(combos)
+        if n_combo == 0:
+            return []
+        pub = self.publish(constraints)
+        n_tasks = self.n_workers * self.chunks_per_worker
+        step = max(1, -(-n_combo // n_tasks))
+        tasks = [(pub, combos, s, min(s + step, n_combo)) for s in range(0, n_combo, step)]
+        results: List[ComboResult] = []
+        for part in self.pool.imap_unordered(_run_range, tasks):
+            results.extend(part)
+        return results
+
+    def _release_shm(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+        self._shm = None
+        self._published = None
+        self._published_arrays = None
+
+    def _release_obj(self) -> None:
+        if self._obj_shm is not None:
+            self._obj_shm.close()
+            self._obj_shm.unlink()
+        self._obj_shm = None
+        self._published_obj = None
+        self._published_ref = None
+
+    def close(self) -> None:
+        """Stop the workers and free the shared memory blocks."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._release_shm()
+        self._release_obj()
+
+
+_SHARED: Dict[int, AnalysisExecutor] = {}
+
+
+def shared_executor(n_workers: int) -> AnalysisExecutor:
+    """Process-wide executor for ``n_workers`` (kept alive across analysis calls)."""
+    executor = _SHARED.get(n_workers)
+    if executor is None:
+        executor = _SHARED[n_workers] = AnalysisExecutor(n_workers)
+    return executor
+
+
+@atexit.register
+def shutdown_executors() -> None:
+    """Close every executor created by :func:`shared_executor`."""
+    while _SHARED:
+        _SHARED.popitem()[1].close()
@@ -0,0 +1,416 @@
+"""JAX analysis engine (``accelerator="jax"``).
+
+The per-combo work is written for a single combo and ``jax.vmap``-ed over
+padded batches of the combo table, then ``jax.jit``-compiled so XLA can fuse
+it:
+
+1. for each viable combo, gather its wrench rows, take the SVD, test rank 5
+   and recover the reciprocal motion (``rec_mot``);
+2. duplicate motions are dropped on the host with :class:`MotionKeyIndex`,
+   exactly as in the NumPy pipeline (first combo wins);
+3. for each new motion, compose the input wrench (``calc_d`` +
+   ``input_wr_compose``) and the pivot wrenches, build the candidate wrench of
+   every constraint, rate it with the rank-one kernel of ``rating_batched`` and
+   combine the coefficients into the forward and reverse R rows.
+
+Rating only runs on new motions, which is why steps 1 and 3 are two compiled
+functions rather than one. Pivots that are not exactly rank 5 (rare) are re-rated
+with the per-candidate MATLAB rank + mldivide port in :mod:`linalg_jax`.
+
+Batches are padded to powers of two so each wrench row count compiles a few
+shapes only. Results agree with NumPy to rounding. This module imports ``jax``
+and enables ``jax_enable_x64`` at load time, so callers import it lazily once
+the JAX accelerator has been resolved.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+from numpy.typing import NDArray
+
+from . import linalg_jax
+from .combination import ComboStream
+from .constraints import ConstraintSet
+from .motion import MotionKeyIndex
+from .numeric_backend import BackendState
+from .rating_batched import _row_norm
+from .wrench import combo_row_indices, cp_to_wrench, wrench_templates
+
+jax.config.update("jax_enable_x64", True)
+
+Array = Any  # jax.Array
+
+# Largest padded batch handed to one compiled call.
+JAX_BATCH = 4096
+_MIN_BATCH = 256
+
+JaxHostResult = Tuple[
+    NDArray[np.intp], NDArray[np.float64], NDArray[np.intp], NDArray[np.bool_], NDArray[np.float64] | None
+]
+
+
+def _padded_size(n: int) -> int:
+    return min(JAX_BATCH, max(_MIN_BATCH, 1 << (n - 1).bit_length()))
+
+
+def _round(x: Array, scale: float = 1e4) -> Array:
+    """``np.round(x * scale) / scale`` (both round half to even)."""
+    return jnp.round(x * scale) / scale
+
+
+def _norm(v: Array) -> Array:
+    return jnp.sqrt(jnp.sum(v * v, axis=-1))
+
+
+def _point_wrenches(points: Array, normals: Array, rho: Array) -> Array:
+    """Unit-force wrench rows ``[n, (p - rho) x n]``; arguments broadcast over leading axes."""
+    arm = points - rho
+    normals = jnp.broadcast_to(normals, arm.shape)
+    return jnp.concatenate([normals, jnp.cross(arm, normals)], axis=-1)
+
+
+def _rec_mot(x: Array) -> Array:
+    """``motion.rec_mot_batched`` for one null vector (6,) -> rounded motion row (10,)."""
+    lead = x[jnp.argmax(jnp.abs(x))]
+    x = _round(jnp.where(lead < 0, -x, x))
+    mu, om = x[0:3], x[3:6]
+    om_sq = jnp.sum(om * om)
+    trans = jnp.sqrt(om_sq) == 0.0
+    safe_sq = jnp.where(trans, 1.0, om_sq)
+    mot = jnp.concatenate(
+        [
+            jnp.where(trans, om, om / jnp.sqrt(safe_sq)),
+            jnp.where(trans, mu / _norm(mu), mu),
+            jnp.where(trans, 0.0, jnp.cross(om, mu) / safe_sq),
+            jnp.where(trans, jnp.inf, jnp.sum(mu * om) / safe_sq)[None],
+        ]
+    )
+    return _round(mot)
+
+
+def _input_wrench(mot: Array, pts: Array, max_d: float) -> Array:
+    """``input_wr.input_wr_compose`` (with ``calc_d``) for one motion row (10,)."""
+    omu, mu, rho, h = mot[0:3], mot[3:6], mot[6:9], mot[9]
+    finite_h = jnp.isfinite(h)
+    if pts.shape[0]:
+        d = jnp.minimum(jnp.max(_norm(jnp.cross(omu, pts - rho))), max_d)
+    else:
+        d = jnp.zeros_like(h)
+    d = jnp.where(finite_h, d, jnp.inf)
+    hw = jnp.where(h != 0.0, 1.0 / jnp.where(h != 0.0, h, 1.0), jnp.inf)
+    rot = ~jnp.isfinite(hw) | (jnp.abs(hw) >= d)
+    fi = jnp.where(finite_h, jnp.where(rot, (h * d) * omu, omu), mu)
+    ti = jnp.where(finite_h, jnp.where(rot, d * omu, hw * omu), 0.0)
+    return -jnp.concatenate([fi, ti])
+
+
+def _cpin_wrenches(mot: Array, cpin: Array) -> Tuple[Array, Array]:
+    """``rating_batched._cpin_wrenches`` for one motion: (n_cpin, 6) wrenches and ``has_dir``."""
+    omu, muu, rho, h = mot[0:3], mot[3:6], mot[6:9], mot[9]
+    ctr, normal = cpin[:, 0:3], cpin[:, 3:6]
+    mom_arm = ctr - rho
+    line_action = h * omu + jnp.cross(omu, mom_arm)
+    line_action = jnp.where((_norm(mom_arm) > 0)[:, None], line_action, 0.0)
+    line_action = jnp.where(jnp.isfinite(h), line_action, muu)
+    const_dir = jnp.cross(normal, jnp.cross(line_action, normal))
+    const_dir = jnp.round(const_dir * 1e5) * 1e-5
+    norm = _norm(const_dir)
+    has_dir = norm > 0
+    const_dir = jnp.where(has_dir[:, None], const_dir / jnp.where(has_dir, norm, 1.0)[:, None], const_dir)
+    return _point_wrenches(ctr, const_dir, rho), has_dir
+
+
+def _cpln2_edge_wrenches(mot: Array, circ: Array, radius: Array) -> Array:
+    """``rating_batched._cpln2_edge_wrenches`` for one motion: (n_circ, 2, 6)."""
+    omu, rho, h = mot[0:3], mot[6:9], mot[9]
+    ctr, normal = circ[:, 0:3], circ[:, 3:6]
+    mom_arm = ctr - rho
+    proj = jnp.cross(normal, jnp.cross(mom_arm, normal))
+    proj = jnp.where((_norm(mom_arm) > 0)[:, None], proj, jnp.cross(omu, normal))
+    norm = _norm(proj)
+    has_len = norm > 0
+    proj = jnp.where(has_len[:, None], proj / jnp.where(has_len, norm, 1.0)[:, None], proj)
+    offset = proj * radius[:, None]
+    finite_h = jnp.isfinite(h)
+    edges = jnp.stack([jnp.where(finite_h, ctr + offset, ctr), jnp.where(finite_h, ctr - offset, ctr)], axis=1)
+    return _point_wrenches(edges, normal[:, None, :], rho)
+
+
+def _combine_endpoint_coeffs(coeff: Array, scale: float = 1.0) -> Tuple[Array, Array]:
+    """``rating_batched._combine_endpoint_coeffs``."""
+    coeff = jnp.where(jnp.abs(coeff) < 0.0001, 0.0, coeff)
+    out = []
+    for Md in (jnp.where(coeff > 0, coeff, jnp.inf), jnp.where(coeff < 0, -coeff, jnp.inf)):
+        inv = 1.0 / Md
+        acc = inv[..., 0]
+        for c in range(1, inv.shape[-1]):
+            acc = acc + inv[..., c]
+        R = 1.0 / (scale * acc) if scale != 1.0 else 1.0 / acc
+        out.append(jnp.where(jnp.isfinite(R), R, jnp.inf))
+    return out[0], out[1]
+
+
+def _last_coeff_rank1(pivots: Array, b: Array, wr: Array) -> Tuple[Array, Array, Array]:
+    """Rank-one kernel of ``rating_batched`` for one motion: ``(val, ok, valid)``.
+
+    ``valid`` is False when the pivot rows are not exactly rank 5; ``val`` / ``ok``
+    are then meaningless and the motion goes through :func:`_last_coeff_exact`.
+    """
+    k = pivots.shape[0]
+    _, s, vh = jnp.linalg.svd(pivots, full_matrices=True)
+    finite = jnp.all(jnp.isfinite(pivots)) & jnp.all(jnp.isfinite(b))
+    valid = finite & (jnp.sum(s > max(k, 6) * linalg_jax._spacing_jax(s[0])) == 5)
+    null_vec, s_max, s_min = vh[5], s[0], s[4]
+    denom = wr @ null_vec
+    w_norm = _norm(wr)
+    tol = max(k + 1, 6) * linalg_jax._spacing_jax(jnp.hypot(s_max, w_norm))
+    ok = jnp.isfinite(denom) & (jnp.abs(denom) * (s_min / (s_min + w_norm)) > tol)
+    val = jnp.where(ok, jnp.dot(null_vec, b) / jnp.where(ok, denom, 1.0), jnp.nan)
+    return val, ok & jnp.isfinite(val), valid
+
+
+def _last_coeff_exact(
+    pivots: Array, b: Array, wr: Array, require_finite_sol: NDArray[np.bool_]
+) -> Tuple[Array, Array]:
+    """Per-candidate MATLAB ``rank(...)==6`` + ``react_wr \\ input_wr`` for M motions (M, C)."""
+    M, C, k = wr.shape[0], wr.shape[1], pivots.shape[1]
+    if M * C == 0 or k + 1 < 6:
+        return jnp.full((M, C), jnp.nan), jnp.zeros((M, C), dtype=bool)
+    stacked = jnp.concatenate(
+        [jnp.broadcast_to(pivots[:, None], (M, C, k, 6)), wr[:, :, None, :]], axis=2
+    ).reshape(M * C, k + 1, 6)
+    bb = jnp.broadcast_to(b[:, None, :], (M, C, 6)).reshape(M * C, 6)
+    finite = jnp.all(jnp.isfinite(stacked), axis=(1, 2)) & jnp.all(jnp.isfinite(bb), axis=1)
+    good = finite & (linalg_jax.matlab_rank_batched_jax(jnp.where(finite[:, None, None], stacked, 0.0)) == 6)
+    sol = linalg_jax.matlab_mldivide_batched_jax(jnp.swapaxes(jnp.where(good[:, None, None], stacked, 0.0), 1, 2), bb)
+    need_all = jnp.asarray(np.broadcast_to(require_finite_sol, (M, C)).reshape(-1))
+    ok = good & jnp.isfinite(sol[:, -1]) & (~need_all | jnp.all(jnp.isfinite(sol), axis=1))
+    val = jnp.where(ok, sol[:, -1], jnp.nan)
+    return val.reshape(M, C), ok.reshape(M, C)
+
+
+def _grouped_rows(
+    counts: NDArray[np.intp], combos: NDArray[np.int_]
+) -> List[Tuple[NDArray[np.intp], NDArray[np.intp]]]:
+    """``(positions, flat template rows)`` per stacked row count k >= 5 of ``combos`` (N, m)."""
+    if combos.shape[0] == 0:
+        return []
+    valid = (combos > 0) & (combos <= counts.size)
+    n_rows = np.where(valid, counts[np.where(valid, combos - 1, 0)], 0).sum(axis=1)
+    out = []
+    for k in np.unique(n_rows):
+        if k < 5:
+            continue
+        sel = np.flatnonzero(n_rows == k)
+        out.append((sel, combo_row_indices(counts, combos[sel])))
+    return out
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Static (hashable) shape information of one constraint set for the compiled kernels."""
+
+    bounds: Tuple[int, ...]  # candidate block edges: points, pins, line ends, corners, rim points
+    rect_idx: Tuple[int, ...]  # plane indices rated by rate_cpln1
+    circ_idx: Tuple[int, ...]  # plane indices rated by rate_cpln2
+    n_cpln: int
+    max_d: float
+
+
+def _combo_motion(om: Array, mu: Array, rows: Array) -> Tuple[Array, Array]:
+    """Rank-5 flag and reciprocal motion of one combo (flat template rows (k,))."""
+    W = jnp.concatenate([om[rows], mu[rows]], axis=-1)
+    _, s, vh = jnp.linalg.svd(W, full_matrices=True)
+    rank = jnp.sum(s > max(rows.shape[0], 6) * linalg_jax._spacing_jax(s[0]))
+    return rank == 5, _rec_mot(vh[5])
+
+
+def _motion_system(
+    consts: Dict[str, Array], mot_raw: Array, rows: Array, layout: _Layout
+) -> Tuple[Array, Array, Array, Array]:
+    """Pivot wrenches, input wrench, candidate wrenches and pin flags of one motion.
+
+    As in the NumPy pipeline, pivots and input wrench use the motion as recovered
+    and the candidates its 1e-4 rounded row.
+    """
+    mot = _round(mot_raw)
+    om_r = consts["om"][rows]
+    moment = jnp.cross(consts["anchor"][rows] - mot_raw[6:9], om_r)
+    pivots = jnp.concatenate([om_r, jnp.where(consts["anchored"][rows][:, None], moment, consts["mu"][rows])], axis=-1)
+    b = _input_wrench(mot_raw, consts["pts"], layout.max_d)
+    rho = mot[6:9]
+    cp = consts["cp"]
+    wr_pin, pin_has_dir = _cpin_wrenches(mot, consts["cpin"])
+    wr = jnp.concatenate(
+        [
+            _point_wrenches(cp[:, 0:3], cp[:, 3:6], rho),
+            wr_pin,
+            _point_wrenches(consts["clin_ends"], consts["clin_normal"][:, None, :], rho).reshape(-1, 6),
+            _point_wrenches(consts["rect_corners"], consts["rect_normal"][:, None, :], rho).reshape(-1, 6),
+            _cpln2_edge_wrenches(mot, consts["circ"], consts["circ_radius"]).reshape(-1, 6),
+        ]
+    )
+    return pivots, b, wr, pin_has_dir
+
+
+def _ratings(val: Array, ok: Array, pin_has_dir: Array, layout: _Layout) -> Tuple[Array, Array]:
+    """Forward and reverse R rows (total_cp,) of one motion from its candidate coefficients."""
+    bounds = layout.bounds
+    rect_idx, circ_idx = np.array(layout.rect_idx, dtype=np.intp), np.array(layout.circ_idx, dtype=np.intp)
+    coeff = jnp.where(ok, val, jnp.inf)
+    c_cp = coeff[bounds[0] : bounds[1]]
+    Rcpin = jnp.where(pin_has_dir, jnp.abs(coeff[bounds[1] : bounds[2]]), jnp.inf)
+    lin_p, lin_n = _combine_endpoint_coeffs(coeff[bounds[2] : bounds[3]].reshape(-1, 2))
+    rect_p, rect_n = _combine_endpoint_coeffs(coeff[bounds[3] : bounds[4]].reshape(-1, 4))
+    circ_p, circ_n = _combine_endpoint_coeffs(coeff[bounds[4] : bounds[5]].reshape(-1, 2), scale=2.0)
+    pln_p = jnp.full(layout.n_cpln, jnp.inf).at[rect_idx].set(rect_p).at[circ_idx].set(circ_p)
+    pln_n = jnp.full(layout.n_cpln, jnp.inf).at[rect_idx].set(rect_n).at[circ_idx].set(circ_n)
+    fwd = jnp.concatenate([jnp.where(c_cp >= 0, c_cp, jnp.inf), Rcpin, lin_p, pln_p])
+    rev = jnp.concatenate([jnp.where(c_cp < 0, -c_cp, jnp.inf), Rcpin, lin_n, pln_n])
+    return fwd, rev
+
+
+def _rate_motion(consts: Dict[str, Array], mot_raw: Array, rows: Array, layout: _Layout) -> Tuple[Array, Array, Array]:
+    """Forward and reverse R rows of one motion plus the rank-5 pivot flag."""
+    pivots, b, wr, pin_has_dir = _motion_system(consts, mot_raw, rows, layout)
+    val, ok, valid = _last_coeff_rank1(pivots, b, wr)
+    fwd, rev = _ratings(val, ok, pin_has_dir, layout)
+    return fwd, rev, valid
+
+
+# Compiled, vmapped kernels; jit caches them per (batch, k, constraint count) shape.
+_combo_motions = jax.jit(jax.vmap(_combo_motion, in_axes=(None, None, 0)))
+_rate_motions = jax.jit(jax.vmap(_rate_motion, in_axes=(None, 0, 0, None)), static_argnums=3)
+_motion_systems = jax.jit(jax.vmap(_motion_system, in_axes=(None, 0, 0, None)), static_argnums=3)
+_ratings_batched = jax.jit(jax.vmap(_ratings, in_axes=(0, 0, 0, None)), static_argnums=3)
+
+
+class JaxEngine:
+    """Whole-pipeline analysis of one ConstraintSet with the jitted, vmapped kernels above."""
+
+    def __init__(self, constraints: ConstraintSet, state: BackendState) -> None:
+        if state.kind != "jax":
+            raise ValueError("JaxEngine needs a jax BackendState")
+        platform = str(state.device or "cpu").split(":")[0]
+        self.device = jax.devices(platform)[0]
+        tpl = wrench_templates(constraints)
+        _, pts, max_d = cp_to_wrench(constraints)
+        cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
+        self.counts = tpl.counts
+        self.total_cp = constraints.total_cp
+
+        # Static candidate points (line ends, rectangle corners), as in rating_batched.
+        n_cp, n_cpin, n_clin, n_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
+        ends = np.zeros((n_clin, 2, 3))
+        if n_clin:
+            line_dir = clin[:, 3:6] / _row_norm(clin[:, 3:6])[:, None]
+            offset = (clin[:, 9] / 2.0)[:, None] * line_dir
+            ends = np.stack([clin[:, 0:3] + offset, clin[:, 0:3] - offset], axis=1)
+        ptype = cpln[:, 6].astype(int) if cpln.shape[1] >= 7 else np.ones(n_cpln, dtype=int)
+        rect_idx, circ_idx = np.flatnonzero(ptype != 2), np.flatnonzero(ptype == 2)
+        corners = np.zeros((rect_idx.size, 4, 3))
+        if rect_idx.size:
+            ctr, prop = cpln[rect_idx, 0:3], cpln_prop[rect_idx]
+            w = (prop[:, 3] / 2.0)[:, None] * prop[:, 0:3]
+            hgt = (prop[:, 7] / 2.0)[:, None] * prop[:, 4:7]
+            corners = np.stack([ctr + w + hgt, ctr + w - hgt, ctr - w + hgt, ctr - w - hgt], axis=1)
+
+        def arr(a: NDArray[Any], shape: Tuple[int, ...]) -> Array:
+            return jax.device_put(np.array(a, dtype=np.float64).reshape(shape), self.device)
+
+        self.consts: Dict[str, Array] = {
+            "om": arr(tpl.om, (-1, 3)),
+            "mu": arr(tpl.mu, (-1, 3)),
+            "anchor": arr(tpl.anchor, (-1, 3)),
+            "anchored": jax.device_put(np.asarray(tpl.anchored, dtype=bool), self.device),
+            "pts": arr(pts, (-1, 3)),
+            "cp": arr(cp, (-1, 6)),
+            "cpin": arr(cpin, (-1, 6)),
+            "clin_ends": arr(ends, (-1, 2, 3)),
+            "clin_normal": arr(clin[:, 6:9], (-1, 3)),
+            "rect_corners": arr(corners, (-1, 4, 3)),
+            "rect_normal": arr(cpln[rect_idx, 3:6], (-1, 3)),
+            "circ": arr(cpln[circ_idx, 0:6], (-1, 6)),
+            "circ_radius": arr(cpln_prop[circ_idx, 0] if circ_idx.size else np.zeros(0), (-1,)),
+        }
+        n_cand = (n_cp, n_cpin, 2 * n_clin, 4 * rect_idx.size, 2 * circ_idx.size)
+        bounds = tuple(int(b) for b in np.cumsum((0,) + n_cand))
+        self.layout = _Layout(bounds, tuple(rect_idx.tolist()), tuple(circ_idx.tolist()), n_cpln, float(max_d))
+        self.require_finite_sol = np.zeros(bounds[-1], dtype=bool)
+        self.require_finite_sol[: bounds[1]] = True  # rate_cp checks the whole solution
+
+    def _batches(self, n: int) -> List[Tuple[slice, int]]:
+        """``(rows, padded size)`` per compiled call over ``n`` items."""
+        return [
+            (slice(s, min(s + JAX_BATCH, n)), _padded_size(min(JAX_BATCH, n - s))) for s in range(0, n, JAX_BATCH)
+        ]
+
+    def _put(self, a: NDArray[Any], size: int) -> Array:
+        """``a`` padded to ``size`` rows by repeating its first row, on the device."""
+        return jax.device_put(np.concatenate([a, np.repeat(a[:1], size - a.shape[0], axis=0)]), self.device)
+
+    def rank5_motions(self, combos: ComboStream) -> Tuple[NDArray[np.intp], NDArray[np.int_], NDArray[np.float64]]:
+        """Rank-5 combos of the stream in table order: (full-table index, combo rows, motion rows)."""
+        idx_parts: List[NDArray[np.intp]] = []
+        row_parts: List[NDArray[np.int_]] = []
+        mot_parts: List[NDArray[np.float64]] = []
+        om, mu = self.consts["om"], self.consts["mu"]
+        for rows_np, abs_np in combos.iter_viable():
+            rows = rows_np.astype(np.int_)
+            for sel, flat in _grouped_rows(self.counts, rows):
+                rank5 = np.zeros(sel.size, dtype=bool)
+                mot = np.empty((sel.size, 10))
+                for part, size in self._batches(sel.size):
+                    r5, m = _combo_motions(om, mu, self._put(flat[part], size))
+                    n = part.stop - part.start
+                    rank5[part] = np.asarray(r5)[:n]
+                    mot[part] = np.asarray(m)[:n]
+                idx_parts.append(abs_np[sel][rank5].astype(np.intp))
+                row_parts.append(rows[sel][rank5])
+                mot_parts.append(mot[rank5])
+        if not idx_parts:
+            return np.empty(0, dtype=np.intp), np.empty((0, 5), dtype=np.int_), np.empty((0, 10))
+        idx = np.concatenate(idx_parts)
+        order = np.argsort(idx, kind="stable")
+        return idx[order], np.concatenate(row_parts)[order], np.concatenate(mot_parts)[order]
+
+    def rate(self, mot_raw: NDArray[np.float64], rows: NDArray[np.int_]) -> NDArray[np.float64]:
+        """R (2 M, total_cp) for motions ``mot_raw`` of combos ``rows``: forward rows then reverse rows."""
+        M = mot_raw.shape[0]
+        R = np.full((2 * M, self.total_cp), np.inf)
+        mot_raw = np.asarray(mot_raw, dtype=np.float64)
+        for sel, flat in _grouped_rows(self.counts, rows):
+            valid = np.zeros(sel.size, dtype=bool)
+            for part, size in self._batches(sel.size):
+                n = part.stop - part.start
+                fwd, rev, ok = _rate_motions(
+                    self.consts, self._put(mot_raw[sel[part]], size), self._put(flat[part], size), self.layout
+                )
+                R[sel[part]] = np.asarray(fwd)[:n]
+                R[M + sel[part]] = np.asarray(rev)[:n]
+                valid[part] = np.asarray(ok)[:n]
+            if not valid.all():
+                ex = np.flatnonzero(~valid)
+                pivots, b, wr, pin_has_dir = _motion_systems(
+                    self.consts, jax.device_put(mot_raw[sel[ex]]), jax.device_put(flat[ex]), self.layout
+                )
+                val, ok_ex = _last_coeff_exact(pivots, b, wr, self.require_finite_sol)
+                fwd, rev = _ratings_batched(val, ok_ex, pin_has_dir, self.layout)
+                R[sel[ex]] = np.asarray(fwd)
+                R[M + sel[ex]] = np.asarray(rev)
+        return R
+
+    def analyze(self, combos: ComboStream) -> JaxHostResult:
+        """``(combo_idx, mot, ids, is_new, R)`` as host arrays, like ``TorchAnalysis.to_host``."""
+        with jax.default_device(self.device):
+            combo_idx, rows, mot_raw = self.rank5_motions(combos)
+            mot = np.round(mot_raw * 1e4) / 1e4
+            ids, is_new = MotionKeyIndex().insert(mot)
+            if not is_new.any():
+                return combo_idx, mot, ids, is_new, None
+            return combo_idx, mot, ids, is_new, self.rate(mot_raw[is_new], rows[is_new])
@@ -0,0 +1,67 @@
+"""JAX linear algebra matching MATLAB-style rank and mldivide used in rating.
+
+Port of :mod:`kst_rating_tool.linalg_torch` for ``accelerator="jax"``. The
+functions are traceable (no Python branching on array values), so they can be
+used inside ``jax.jit`` / ``jax.vmap``. Requires ``jax`` with 64-bit floats
+enabled (:mod:`kst_rating_tool.jax_engine` turns ``jax_enable_x64`` on).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def _spacing_jax(x: Any) -> Any:
+    """``np.spacing(x)`` equivalent for JAX arrays."""
+    import jax.numpy as jnp
+
+    x = jnp.abs(x)
+    return jnp.nextafter(x, jnp.full_like(x, jnp.inf)) - x
+
+
+def matlab_rank_batched_jax(A: Any) -> Any:
+    """Batched MATLAB rank; A shape (N, m, n) returns (N,) int counts."""
+    import jax.numpy as jnp
+
+    if A.ndim == 2:
+        A = A[None]
+    m, n = A.shape[-2], A.shape[-1]
+    if min(m, n) == 0:
+        return jnp.zeros(A.shape[0], dtype=jnp.int64)
+    s = jnp.linalg.svd(A, compute_uv=False)
+    tol = float(max(m, n)) * _spacing_jax(s[:, 0])
+    return jnp.sum(s > tol[:, None], axis=-1)
+
+
+def matlab_rank_jax(A: Any) -> Any:
+    """MATLAB ``rank(A)`` for a single matrix (0-dim array)."""
+    if A.ndim != 2:
+        raise ValueError("matlab_rank_jax expects a 2D array")
+    return matlab_rank_batched_jax(A[None])[0]
+
+
+def matlab_mldivide_jax(A: Any, b: Any) -> Any:
+    """Replicate ``rating._matlab_mldivide`` for JAX arrays.
+
+    Square systems use an LU solve; a singular square system (non-finite
+    solution, where NumPy/torch would raise) and non-square systems use the
+    least-squares solution.
+    """
+    import jax.numpy as jnp
+
+    b = b.reshape(-1)
+    m, n = A.shape
+    lstsq = jnp.linalg.lstsq(A, b, rcond=None)[0]
+    if m != n:
+        return lstsq
+    sol = jnp.linalg.solve(A, b)
+    return jnp.where(jnp.all(jnp.isfinite(sol)), sol, lstsq)
+
+
+def matlab_mldivide_batched_jax(A: Any, b: Any) -> Any:
+    """Batched solve A[i] @ x[i] = b[i]; A (N, m, n), b (N, m)."""
+    import jax
+
+    if A.ndim == 2:
+        return matlab_mldivide_jax(A, b)
+    return jax.vmap(matlab_mldivide_jax)(A, b.reshape(A.shape[0], -1))
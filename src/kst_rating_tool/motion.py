@@ -4,7 +4,7 @@ from dataclasses import dataclass
 
 import numpy as np
 from numpy.typing import NDArray
-from .utils import matlab_null
+from .utils import matlab_null, rowwise_dot
 
 
 @dataclass
@@ -91,6 +91,74 @@ def rec_mot(wrench: NDArray[np.float64]) -> ScrewMotion:
     )
 
 
+def rec_mot_batched(wrench: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Batched `rec_mot.m` for a stack of pivot wrench matrices.
+
+    Parameters
+    ----------
+    wrench : (N, k, 6) ndarray
+        Pivot wrench matrices sharing the same row count ``k`` (a single
+        ``(k, 6)`` matrix is treated as ``N = 1``).
+
+    Returns
+    -------
+    (N, 10) ndarray
+        Rows ``[omu(3), mu(3), rho(3), h]``, identical to
+        ``rec_mot(wrench[i]).as_array()``: same null-space column, MATLAB sign
+        convention and 1e-4 rounding, from one stacked SVD.
+    """
+    W = np.asarray(wrench, dtype=float)
+    if W.ndim == 2:
+        W = W[np.newaxis, ...]
+    N, m, n = W.shape
+    if N == 0:
+        return np.empty((0, 10), dtype=float)
+
+    # Same SVD call and rank tolerance as matlab_null's general path.
+    _, S, Vh = np.linalg.svd(W, full_matrices=True)
+    if S.shape[1] > 0:
+        tol = max(m, n) * np.spacing(S[:, 0])
+        r = np.sum(S > tol[:, np.newaxis], axis=1)
+    else:
+        r = np.zeros(N, dtype=np.intp)
+    if np.any(r >= n):
+        raise ValueError("Wrench matrix has no non-trivial null space; cannot compute reciprocal motion.")
+
+    rows = np.arange(N)
+    x = Vh[rows, r, :]
+    # MATLAB sign convention: largest absolute value in the column positive.
+    lead = x[rows, np.argmax(np.abs(x), axis=1)]
+    x = np.where((lead < 0)[:, np.newaxis], -x, x)
+    x = np.round(x * 1e4) / 1e4
+
+    mu = x[:, 0:3]
+    om = x[:, 3:6]
+    om_sq = rowwise_dot(om, om)
+    om_norm = np.sqrt(om_sq)
+    trans = om_norm == 0.0
+
+    mot_arr = np.empty((N, 10), dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Pure translation (h = inf): [om, mu/|mu|, 0, inf]
+        mu_norm = np.sqrt(rowwise_dot(mu, mu))
+        mot_arr[:, 0:3] = np.where(trans[:, np.newaxis], om, om / om_norm[:, np.newaxis])
+        mot_arr[:, 3:6] = np.where(trans[:, np.newaxis], mu / mu_norm[:, np.newaxis], mu)
+        mot_arr[:, 6:9] = np.where(trans[:, np.newaxis], 0.0, np.cross(om, mu) / om_sq[:, np.newaxis])
+        mot_arr[:, 9] = np.where(trans, np.inf, rowwise_dot(mu, om) / om_sq)
+
+    return np.round(mot_arr * 1e4) / 1e4
+
+
+def screw_from_array(mot_arr: NDArray[np.float64]) -> ScrewMotion:
+    """Wrap one ``[omu, mu, rho, h]`` row (e.g. from :func:`rec_mot_batched`) as a ScrewMotion."""
+    return ScrewMotion(
+        omu=mot_arr[0:3],
+        mu=mot_arr[3:6],
+        rho=mot_arr[6:9],
+        h=float(mot_arr[9]),
+    )
+
+
 def calc_d(omu: NDArray[np.float64], rho: NDArray[np.float64], pts: NDArray[np.float64], max_d: float) -> float:
     """Python port of `calc_d.m`."""
 
@@ -104,3 +172,189 @@ def calc_d(omu: NDArray[np.float64], rho: NDArray[np.float64], pts: NDArray[np.f
         d = float(max_d)
     return d
 
+
+
+# Motions are compared on MATLAB's 1e-4 grid (round(mot * 1e4) / 1e4).
+MOTION_KEY_SCALE = 1e4
+# Keys for h = +/-inf; finite grid values stay far below these.
+_KEY_POS_INF = 2**62
+_KEY_NEG_INF = -_KEY_POS_INF
+
+
+def _quantize(mot: NDArray[np.float64]) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """``rint(mot * 1e4)`` as floats, plus a per-row flag for rows containing NaN."""
+    q = np.rint(np.asarray(mot, dtype=float) * MOTION_KEY_SCALE)
+    has_nan: NDArray[np.bool_] = np.asarray(np.isnan(q).any(axis=1))
+    return q, has_nan
+
+
+def _to_int_keys(q: NDArray[np.float64]) -> NDArray[np.int64]:
+    """int64 keys from quantized floats; +/-inf to the int64 extremes, NaN to 0."""
+    return np.nan_to_num(q, nan=0.0, posinf=_KEY_POS_INF, neginf=_KEY_NEG_INF).astype(np.int64)
+
+
+def motion_keys(mot: NDArray[np.float64]) -> NDArray[np.int64]:
+    """Canonical integer keys of motion rows: (N, 10) ``int64`` of ``round(mot * 1e4)``.
+
+    Rows rounded to the 1e-4 grid map one to one onto keys, and key order matches the
+    numeric row order (``-0.0`` and ``0.0`` share a key, as they compare equal). ``+inf``
+    and ``-inf`` map to the int64 extremes; NaN entries map to 0 (see
+    :class:`MotionKeyIndex` for how NaN rows are kept distinct).
+    """
+    q, _ = _quantize(np.atleast_2d(mot))
+    return _to_int_keys(q)
+
+
+def _key_bytes(keys: NDArray[np.int64]) -> NDArray[np.void]:
+    """Fixed-width bytes view of key rows, one scalar per row."""
+    keys = np.ascontiguousarray(keys)
+    return keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+
+
+def _key_hash(keys: NDArray[np.int64]) -> NDArray[np.uint64]:
+    """64-bit FNV-style hash of each key row (wrapping uint64 arithmetic)."""
+    words = np.ascontiguousarray(keys).view(np.uint64)
+    h = np.full(words.shape[0], 0xCBF29CE484222325, dtype=np.uint64)
+    for j in range(words.shape[1]):
+        h = (h ^ words[:, j]) * np.uint64(0x100000001B3)
+        h ^= h >> np.uint64(29)
+    return h
+
+
+def _first_occurrence(
+    keys: NDArray[np.int64], h: NDArray[np.uint64]
+) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Group equal key rows: (first row of each group, group id per row), groups in first-row order.
+
+    Groups by a stable sort on the row hash; if two different keys ever share a hash, the
+    exact (slower) bytes-based ``np.unique`` grouping is used instead.
+    """
+    order = np.argsort(h, kind="stable")
+    hs, ks = h[order], keys[order]
+    start = np.ones(order.size, dtype=bool)
+    start[1:] = hs[1:] != hs[:-1]
+    if np.any(np.any(ks[1:] != ks[:-1], axis=1) & ~start[1:]):  # hash collision
+        _, first_sorted, gid = np.unique(_key_bytes(keys), return_index=True, return_inverse=True)
+        gid = gid.ravel()
+    else:
+        first_sorted = order[start]
+        gid = np.empty(order.size, dtype=np.intp)
+        gid[order] = np.cumsum(start) - 1
+    rank = np.argsort(first_sorted, kind="stable")
+    relabel = np.empty(rank.size, dtype=np.intp)
+    relabel[rank] = np.arange(rank.size)
+    return first_sorted[rank], relabel[gid]
+
+
+class MotionKeyIndex:
+    """First-occurrence index of motions keyed by :func:`motion_keys`.
+
+    Replaces the ``tuple(mot_arr)`` set/dict of main_loop's duplicate-motion check.
+    :meth:`insert` takes a batch of motion rows and returns, per row, the id of the
+    first row (in insertion order) with the same key plus a flag for rows that
+    introduced a new key. Rows containing NaN never match anything, as with tuples.
+    Stored keys are kept sorted by hash, so each batch is one vectorized lookup.
+    """
+
+    def __init__(self) -> None:
+        self._hash = np.empty(0, dtype=np.uint64)
+        self._keys = np.empty((0, 10), dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.intp)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _lookup(self, keys: NDArray[np.int64], h: NDArray[np.uint64]) -> NDArray[np.intp]:
+        """Stored id of each key row, or -1."""
+        found = np.full(h.size, -1, dtype=np.intp)
+        pos = np.searchsorted(self._hash, h)
+        # Walk runs of equal hashes (longer than one only on a collision).
+        live = np.flatnonzero(pos < self._hash.size)
+        while live.size:
+            p = pos[live]
+            live = live[self._hash[p] == h[live]]
+            p = pos[live]
+            hit = np.all(self._keys[p] == keys[live], axis=1)
+            found[live[hit]] = self._ids[p[hit]]
+            live = live[~hit]
+            pos[live] += 1
+            live = live[pos[live] < self._hash.size]
+        return found
+
+    def insert(self, mot: NDArray[np.float64]) -> tuple[NDArray[np.intp], NDArray[np.bool_]]:
+        mot = np.asarray(mot, dtype=float).reshape(-1, 10)
+        n = mot.shape[0]
+        ids = np.empty(n, dtype=np.intp)
+        is_new = np.zeros(n, dtype=bool)
+        if n == 0:
+            return ids, is_new
+        _, has_nan = _quantize(mot)
+        ok = np.flatnonzero(~has_nan)
+        keys = motion_keys(mot[ok])
+        h = _key_hash(keys)
+        first, group = _first_occurrence(keys, h)
+        group_ids = self._lookup(keys[first], h[first])
+
+        # New groups and NaN rows take ids in row order.
+        new_groups = np.flatnonzero(group_ids < 0)
+        new_rows = np.concatenate([ok[first[new_groups]], np.flatnonzero(has_nan)])
+        order = np.argsort(new_rows, kind="stable")
+        new_ids = np.empty(new_rows.size, dtype=np.intp)
+        new_ids[order] = self.size + np.arange(new_rows.size)
+        group_ids[new_groups] = new_ids[: new_groups.size]
+        ids[ok] = group_ids[group]
+        ids[has_nan] = new_ids[new_groups.size :]
+        is_new[new_rows] = True
+        self.size += new_rows.size
+
+        if new_groups.size:
+            add = first[new_groups]
+            h_all = np.concatenate([self._hash, h[add]])
+            srt = np.argsort(h_all, kind="stable")
+            self._hash = h_all[srt]
+            self._keys = np.concatenate([self._keys, keys[add]])[srt]
+            self._ids = np.concatenate([self._ids, group_ids[new_groups]])[srt]
+        return ids, is_new
+
+
+def _lex_order(keys: NDArray[np.int64]) -> tuple[NDArray[np.intp], NDArray[np.bool_]]:
+    """Stable lexicographic row order of ``keys``, plus ``tie[i]``: sorted rows i and i+1 equal.
+
+    Sorts on the first column, then re-sorts only runs still tied on the columns so far;
+    most motion rows are told apart by their first one or two keys, so this beats a full
+    ``lexsort`` over every column.
+    """
+    order = np.argsort(keys[:, 0], kind="stable")
+    col = keys[order, 0]
+    tie = col[1:] == col[:-1]
+    for j in range(1, keys.shape[1]):
+        if not tie.any():
+            break
+        in_run = np.zeros(order.size, dtype=bool)
+        in_run[:-1] |= tie
+        in_run[1:] |= tie
+        sub = np.flatnonzero(in_run)
+        run = np.cumsum(np.concatenate([[True], ~tie]))[sub]
+        perm = np.lexsort((keys[order[sub], j], run))
+        order[sub] = order[sub][perm]
+        col = keys[order, j]
+        tie &= col[1:] == col[:-1]
+    return order, tie
+
+
+def unique_motion_rows(mot: NDArray[np.float64]) -> NDArray[np.intp]:
+    """Same as ``np.unique(mot, axis=0, return_index=True)[1]``, via integer motion keys.
+
+    Indices of the first occurrence of each distinct row, in sorted row order. Rows on
+    the 1e-4 grid are sorted as int64 keys; anything else (unrounded rows or NaN) falls
+    back to ``np.unique`` so the result never changes.
+    """
+    mot = np.asarray(mot, dtype=float)
+    if mot.shape[0] == 0:
+        return np.empty(0, dtype=np.intp)
+    q, has_nan = _quantize(mot)
+    if has_nan.any() or not np.array_equal(q / MOTION_KEY_SCALE, mot):
+        return np.unique(mot, axis=0, return_index=True)[1]
+    order, tie = _lex_order(_to_int_keys(q))
+    return order[np.concatenate([[True], ~tie])]
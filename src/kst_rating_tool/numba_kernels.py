@@ -0,0 +1,305 @@
+"""Numba-compiled kernels for the per-motion loops of the NumPy pipeline.
+
+``accelerator="numba"`` keeps the NumPy pipeline (combo enumeration, duplicate
+detection, candidate wrench stacks) and swaps in nopython kernels where the
+work is a short loop per motion or per candidate:
+
+* :func:`input_wrenches` fuses ``calc_d`` and ``input_wr_compose`` over all motions;
+* :func:`compose_pivot_wrenches` re-references the wrench templates of each combo
+  to its screw axis point (``react_wr_5_compose``);
+* :func:`last_coeff_batched` rates every candidate wrench: the rank-one kernel
+  for rank-5 pivots and, for the rest, a fixed-size 6×6 SVD rank test plus an
+  LU solve with partial pivoting.
+
+The ``rate_cpln1`` corner loop has no kernel of its own: the corner wrenches
+are built for all motions at once (``_cpln1_corner_wrenches``) and rated by
+:func:`last_coeff_batched` with the other candidates. Neither has
+``rate_motset``'s ``_row_range_for_constraint_in_combo`` loop: it is vectorized
+in NumPy (``_motset_pivot_rows``), and its only caller, the revision optimizer,
+rates in parity mode, which this module hands back to NumPy anyway.
+
+Kernels are compiled with ``cache=True``: the machine code is written next to
+this module (or under ``NUMBA_CACHE_DIR``) and later processes load it instead
+of compiling again. Importing this module requires numba; callers import it
+lazily and fall back to NumPy when it is missing.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+import numpy as np
+from numba import njit
+from numpy.typing import NDArray
+
+from .constraints import ConstraintSet
+from .rating_batched import (
+    RATE_MOTION_CHUNK,
+    _factor_pivot_batched,
+    _last_coeff_exact_batched,
+    _rate_motions_grouped,
+    _RatingBlocks,
+)
+from .wrench import combo_row_indices, wrench_templates
+
+
+@njit(cache=True)
+def _input_wrenches_kernel(mot: NDArray[np.float64], pts: NDArray[np.float64], max_d: float) -> NDArray[np.float64]:
+    n = mot.shape[0]
+    out = np.empty((n, 6))
+    for i in range(n):
+        o0, o1, o2 = mot[i, 0], mot[i, 1], mot[i, 2]
+        h = mot[i, 9]
+        if not np.isfinite(h):
+            out[i, 0] = -mot[i, 3]
+            out[i, 1] = -mot[i, 4]
+            out[i, 2] = -mot[i, 5]
+            out[i, 3] = -0.0
+            out[i, 4] = -0.0
+            out[i, 5] = -0.0
+            continue
+        # calc_d: largest |omu x (p - rho)| over the points, capped at max_d
+        d = 0.0
+        if pts.shape[0]:
+            d = -np.inf
+            for p in range(pts.shape[0]):
+                a0 = pts[p, 0] - mot[i, 6]
+                a1 = pts[p, 1] - mot[i, 7]
+                a2 = pts[p, 2] - mot[i, 8]
+                c0 = o1 * a2 - o2 * a1
+                c1 = o2 * a0 - o0 * a2
+                c2 = o0 * a1 - o1 * a0
+                dist = math.sqrt(c0 * c0 + c1 * c1 + c2 * c2)
+                if np.isnan(dist):
+                    d = dist  # NumPy's max propagates NaN
+                    break
+                if dist > d:
+                    d = dist
+            if d > max_d:
+                d = max_d
+        hw = 1.0 / h if h != 0.0 else np.inf
+        if not np.isfinite(hw) or abs(hw) >= d:
+            f = h * d
+            out[i, 0] = -(f * o0)
+            out[i, 1] = -(f * o1)
+            out[i, 2] = -(f * o2)
+            out[i, 3] = -(d * o0)
+            out[i, 4] = -(d * o1)
+            out[i, 5] = -(d * o2)
+        else:
+            out[i, 0] = -o0
+            out[i, 1] = -o1
+            out[i, 2] = -o2
+            out[i, 3] = -(hw * o0)
+            out[i, 4] = -(hw * o1)
+            out[i, 5] = -(hw * o2)
+    return out
+
+
+@njit(cache=True)
+def _compose_pivots_kernel(
+    om: NDArray[np.float64],
+    mu: NDArray[np.float64],
+    anchor: NDArray[np.float64],
+    anchored: NDArray[np.bool_],
+    rows: NDArray[np.intp],
+    rho: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    n, k = rows.shape
+    out = np.empty((n, k, 6))
+    for i in range(n):
+        for j in range(k):
+            r = rows[i, j]
+            o0, o1, o2 = om[r, 0], om[r, 1], om[r, 2]
+            out[i, j, 0] = o0
+            out[i, j, 1] = o1
+            out[i, j, 2] = o2
+            if anchored[r]:
+                a0 = anchor[r, 0] - rho[i, 0]
+                a1 = anchor[r, 1] - rho[i, 1]
+                a2 = anchor[r, 2] - rho[i, 2]
+                out[i, j, 3] = a1 * o2 - a2 * o1
+                out[i, j, 4] = a2 * o0 - a0 * o2
+                out[i, j, 5] = a0 * o1 - a1 * o0
+            else:
+                out[i, j, 3] = mu[r, 0]
+                out[i, j, 4] = mu[r, 1]
+                out[i, j, 5] = mu[r, 2]
+    return out
+
+
+@njit(cache=True)
+def _last_coeff_rank1_kernel(
+    null_vec: NDArray[np.float64],
+    s_max: NDArray[np.float64],
+    s_min: NDArray[np.float64],
+    n_rows: int,
+    proj_input: NDArray[np.float64],
+    wr: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    M, C = wr.shape[0], wr.shape[1]
+    val = np.full((M, C), np.nan)
+    ok = np.zeros((M, C), dtype=np.bool_)
+    scale = max(n_rows + 1, 6)
+    for m in range(M):
+        for c in range(C):
+            denom = 0.0
+            w2 = 0.0
+            for j in range(6):
+                denom += wr[m, c, j] * null_vec[m, j]
+                w2 += wr[m, c, j] * wr[m, c, j]
+            if not np.isfinite(denom):
+                continue
+            w_norm = math.sqrt(w2)
+            tol = scale * np.spacing(math.hypot(s_max[m], w_norm))
+            if abs(denom) * (s_min[m] / (s_min[m] + w_norm)) > tol:
+                v = proj_input[m] / denom
+                if np.isfinite(v):
+                    val[m, c] = v
+                    ok[m, c] = True
+    return val, ok
+
+
+@njit(cache=True)
+def _solve6(A: NDArray[np.float64], b: NDArray[np.float64]) -> NDArray[np.float64]:
+    """``A \\ b`` for a 6×6 system by LU with partial pivoting; NaN on a zero pivot."""
+    a = A.copy()
+    x = b.copy()
+    for col in range(6):
+        piv = col
+        for r in range(col + 1, 6):
+            if abs(a[r, col]) > abs(a[piv, col]):
+                piv = r
+        if a[piv, col] == 0.0:
+            x[:] = np.nan
+            return x
+        if piv != col:
+            for j in range(6):
+                a[col, j], a[piv, j] = a[piv, j], a[col, j]
+            x[col], x[piv] = x[piv], x[col]
+        for r in range(col + 1, 6):
+            f = a[r, col] / a[col, col]
+            for j in range(col + 1, 6):
+                a[r, j] -= f * a[col, j]
+            x[r] -= f * x[col]
+    for r in range(5, -1, -1):
+        s = x[r]
+        for j in range(r + 1, 6):
+            s -= a[r, j] * x[j]
+        x[r] = s / a[r, r]
+    return x
+
+
+@njit(cache=True)
+def _last_coeff_exact6_kernel(
+    react_wr_5: NDArray[np.float64],
+    input_wr: NDArray[np.float64],
+    wr: NDArray[np.float64],
+    need_all: NDArray[np.bool_],
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    M, C = wr.shape[0], wr.shape[1]
+    val = np.full((M, C), np.nan)
+    ok = np.zeros((M, C), dtype=np.bool_)
+    stacked = np.empty((6, 6))
+    for m in range(M):
+        if not np.all(np.isfinite(react_wr_5[m])) or not np.all(np.isfinite(input_wr[m])):
+            continue
+        stacked[:5] = react_wr_5[m]
+        for c in range(C):
+            if not np.all(np.isfinite(wr[m, c])):
+                continue
+            stacked[5] = wr[m, c]
+            s = np.linalg.svd(stacked)[1]
+            if not s[5] > 6 * np.spacing(s[0]):
+                continue
+            sol = _solve6(stacked.T.copy(), input_wr[m])
+            if not np.isfinite(sol[5]):
+                continue
+            if need_all[c] and not np.all(np.isfinite(sol)):
+                continue
+            val[m, c] = sol[5]
+            ok[m, c] = True
+    return val, ok
+
+
+def input_wrenches(mot: NDArray[np.float64], pts: NDArray[np.float64], max_d: float) -> NDArray[np.float64]:
+    """``input_wr_compose`` for every motion row of ``mot`` (M, 10) -> (M, 6)."""
+    mot = np.ascontiguousarray(mot, dtype=np.float64).reshape(-1, 10)
+    pts = np.ascontiguousarray(pts, dtype=np.float64).reshape(-1, 3)
+    return _input_wrenches_kernel(mot, pts, float(max_d))
+
+
+def compose_pivot_wrenches(
+    constraints: ConstraintSet, combos: NDArray[np.int_], rho: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Compiled :func:`~kst_rating_tool.react_wr.react_wr_5_compose_batched` (same arguments and shape)."""
+    combos = np.atleast_2d(np.asarray(combos, dtype=np.intp))
+    rho = np.ascontiguousarray(rho, dtype=np.float64).reshape(-1, 3)
+    if rho.shape[0] != combos.shape[0]:
+        raise ValueError("compose_pivot_wrenches: combos and rho differ in length")
+    if combos.shape[0] == 0:
+        return np.empty((0, 0, 6), dtype=float)
+    t = wrench_templates(constraints)
+    rows = np.ascontiguousarray(combo_row_indices(t.counts, combos))
+    return _compose_pivots_kernel(
+        np.ascontiguousarray(t.om), np.ascontiguousarray(t.mu), np.ascontiguousarray(t.anchor),
+        np.ascontiguousarray(t.anchored), rows, rho,
+    )
+
+
+def last_coeff_batched(
+    react_wr_5: NDArray[np.float64],
+    input_wr: NDArray[np.float64],
+    wr: NDArray[np.float64],
+    parity: bool = False,
+    require_finite_sol: bool | NDArray[np.bool_] = True,
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Compiled :func:`~kst_rating_tool.rating_batched._last_coeff_batched`.
+
+    The pivot factorization stays one batched NumPy SVD; the per-candidate
+    loops run compiled. ``parity=True`` is delegated to the NumPy path, and so
+    are non-rank-5 pivots whose candidate systems are not 6×6.
+    """
+    if parity:
+        return _last_coeff_exact_batched(react_wr_5, input_wr, wr, require_finite_sol)
+    M, C = wr.shape[0], wr.shape[1]
+    k = int(react_wr_5.shape[1])
+    val = np.full((M, C), np.nan, dtype=np.float64)
+    ok = np.zeros((M, C), dtype=bool)
+    wr = np.ascontiguousarray(wr, dtype=np.float64)
+    null_vec, s_max, s_min, proj, valid = _factor_pivot_batched(react_wr_5, input_wr)
+    if np.any(valid):
+        val[valid], ok[valid] = _last_coeff_rank1_kernel(
+            np.ascontiguousarray(null_vec[valid]), s_max[valid], s_min[valid], k, proj[valid], wr[valid]
+        )
+    exact = ~valid
+    if np.any(exact):
+        if k == 5:
+            need_all = np.ascontiguousarray(np.broadcast_to(np.asarray(require_finite_sol, dtype=bool), (C,)))
+            val[exact], ok[exact] = _last_coeff_exact6_kernel(
+                np.ascontiguousarray(react_wr_5[exact]), np.ascontiguousarray(input_wr[exact]), wr[exact], need_all
+            )
+        else:
+            val[exact], ok[exact] = _last_coeff_exact_batched(
+                react_wr_5[exact], input_wr[exact], wr[exact], require_finite_sol
+            )
+    return val, ok
+
+
+def rate_motions_batched_numba(
+    mot_arr: NDArray[np.float64],
+    react_wr_5: NDArray[np.float64] | Sequence[NDArray[np.float64]],
+    input_wr: NDArray[np.float64],
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    chunk_size: int = RATE_MOTION_CHUNK,
+) -> _RatingBlocks:
+    """:func:`~kst_rating_tool.rating_batched.rate_motions_batched_numpy` with the compiled rating kernels."""
+    return _rate_motions_grouped(
+        mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop,
+        parity=False, chunk_size=chunk_size, last_coeff=last_coeff_batched,
+    )
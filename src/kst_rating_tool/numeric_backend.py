@@ -1,7 +1,8 @@
-"""Pluggable linear-algebra backend: NumPy (CPU) or PyTorch (CPU/CUDA/HIP/DirectML).
+"""Pluggable linear-algebra backend: NumPy (CPU), Numba (compiled CPU kernels), JAX
+(jit + vmap) or PyTorch (CPU/CUDA/HIP/DirectML).
 
-Used by batched rating and optional GPU analysis. PyTorch is optional; import fails
-fall back to NumPy-only paths.
+Used by batched rating and optional GPU analysis. PyTorch, Numba and JAX are optional;
+import fails fall back to NumPy-only paths.
 
 **ROCm / AMD (Linux):** Official PyTorch ROCm wheels use ``torch.cuda`` for HIP;
 ``device="cuda"`` when ``torch.cuda.is_available()``. Aliases ``hip`` / ``rocm``
@@ -30,7 +31,10 @@ from . import linalg_torch
 class AcceleratorKind(str, Enum):
     NUMPY = "numpy"
     TORCH = "torch"
+    NUMBA = "numba"
+    JAX = "jax"
     AUTO = "auto"
+    TUNE = "tune"
 
 
 @dataclass(frozen=True)
@@ -38,10 +42,11 @@ class BackendState:
     """Resolved accelerator after AUTO and availability checks.
 
     ``device`` is either a string (``cpu``, ``cuda``, ``mps``) or a ``torch.device``
-    (e.g. DirectML ``privateuseone``).
+    (e.g. DirectML ``privateuseone``); Numba always runs on ``cpu``, JAX on a
+    platform name (``cpu``, ``gpu``).
     """
 
-    kind: Literal["numpy", "torch"]
+    kind: Literal["numpy", "torch", "numba", "jax"]
     device: str | Any  # torch.device when using DirectML
     torch_module: Any | None = None
 
@@ -55,6 +60,24 @@ def _torch_available() -> bool:
         return False
 
 
+def _numba_available() -> bool:
+    try:
+        import numba  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+def _jax_available() -> bool:
+    try:
+        import jax  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
 def _directml_available() -> bool:
     try:
         import torch_directml  # noqa: F401
@@ -111,7 +134,12 @@ def resolve_accelerator(
     accelerator: str | AcceleratorKind = "numpy",
     device: str | None = None,
 ) -> BackendState:
-    """Choose NumPy or PyTorch device. AUTO order: CUDA > MPS > DirectML > CPU."""
+    """Choose NumPy, Numba or a PyTorch device. AUTO order: CUDA > MPS > DirectML > CPU.
+
+    ``numba`` and ``jax`` are never picked by AUTO; they raise ImportError when the
+    package is not installed (the analysis pipeline then falls back to NumPy). JAX
+    runs on ``device`` as a platform name (default ``cpu``).
+    """
     acc = accelerator if isinstance(accelerator, AcceleratorKind) else AcceleratorKind(str(accelerator).lower())
     if acc == AcceleratorKind.AUTO:
         if _torch_available():
@@ -132,6 +160,16 @@ def resolve_accelerator(
     if acc == AcceleratorKind.NUMPY:
         return BackendState("numpy", "cpu", None)
 
+    if acc == AcceleratorKind.NUMBA:
+        if not _numba_available():
+            raise ImportError("accelerator='numba' requires Numba: pip install numba")
+        return BackendState("numba", "cpu", None)
+
+    if acc == AcceleratorKind.JAX:
+        if not _jax_available():
+            raise ImportError("accelerator='jax' requires JAX: pip install jax")
+        return BackendState("jax", str(device or "cpu").lower(), None)
+
     if acc == AcceleratorKind.TORCH:
         if not _torch_available():
             raise ImportError("accelerator='torch' requires PyTorch: pip install torch")
@@ -143,6 +181,9 @@ def resolve_accelerator(
             dev = normalize_pytorch_device(device, torch)
         return BackendState("torch", dev, torch)
 
+    if acc == AcceleratorKind.TUNE:
+        raise ValueError("accelerator='tune' is resolved by the analysis pipeline (see kst_rating_tool.autotune)")
+
     raise ValueError(f"Unknown accelerator: {accelerator}")
 
 
@@ -151,7 +192,7 @@ def matlab_rank_for_backend(
     state: BackendState,
 ) -> int | Any:
     """Single-matrix rank; returns int (NumPy) or 0-dim torch tensor (torch)."""
-    if state.kind == "numpy":
+    if state.kind != "torch":
         from .utils import matlab_rank
 
         return matlab_rank(A)
@@ -167,7 +208,7 @@ def matlab_rank_batched_for_backend(
     state: BackendState,
 ) -> NDArray[np.int_] | Any:
     """Batched rank; shape (N, m, n) -> (N,) counts."""
-    if state.kind == "numpy":
+    if state.kind != "torch":
         from .utils import matlab_rank_batched
 
         return matlab_rank_batched(A)
@@ -184,7 +225,7 @@ def mldivide_for_backend(
     state: BackendState,
 ) -> NDArray[np.float64] | Any:
     """MATLAB ``A \\ b`` semantics (mirrors ``rating._matlab_mldivide`` for NumPy)."""
-    if state.kind == "numpy":
+    if state.kind != "torch":
         from .rating import _matlab_mldivide  # local import avoids import cycle
 
         return _matlab_mldivide(A, b)
@@ -13,11 +13,20 @@ from .parameterizations import (
 )
 from .reduction import (
     ReductionResult,
+    RemovalEvaluator,
     constraint_set_without,
     optim_main_red,
     optimize_reduction,
 )
-from .revision import RevisionConfig, optim_main_rev, optim_rev
+from .reduction_search import ReductionSearchResult, search_reduction
+from .revision import (
+    AdaptiveRevisionResult,
+    RevisionConfig,
+    RevisionContext,
+    optim_main_rev,
+    optim_main_rev_adaptive,
+    optim_rev,
+)
 from .postproc import optim_postproc, optim_postproc_plot
 from .sensitivity import sens_analysis_pos, sens_analysis_orient
 from .specmot_optim import main_specmot_optim, rate_specmot
@@ -39,7 +48,10 @@ __all__ = [
     "optim_main_add",
     "optimize_addition",
     "RevisionConfig",
+    "RevisionContext",
     "optim_main_rev",
+    "optim_main_rev_adaptive",
+    "AdaptiveRevisionResult",
     "optim_rev",
     "optim_main_red",
     "optim_postproc",
@@ -60,6 +72,9 @@ __all__ = [
     "constraint_set_without",
     "optimize_reduction",
     "ReductionResult",
+    "RemovalEvaluator",
+    "search_reduction",
+    "ReductionSearchResult",
     "optimize_modification",
     "ModificationResult",
     "PointOnLineParameterization",
@@ -21,7 +21,13 @@ from ..constraints import (
     PlaneConstraint,
     PointConstraint,
 )
-from ..pipeline import analyze_constraints
+from ..pipeline import (
+    AnyConstraint,
+    DetailedAnalysisResult,
+    analyze_constraints,
+    analyze_constraints_detailed,
+    extend_detailed,
+)
 from ..rating import RatingResults
 
 
@@ -93,6 +99,35 @@ def constraint_set_with(
     )
 
 
+def _pool_constraint(pool: ConstraintSet, index: int) -> AnyConstraint:
+    """Copy of the constraint at global 0-based *index* of *pool* (points -> pins -> lines -> planes)."""
+    for items in (pool.points, pool.pins, pool.lines, pool.planes):
+        if index < len(items):
+            c = items[index]
+            if isinstance(c, PointConstraint):
+                return PointConstraint(c.position.copy(), c.normal.copy())
+            if isinstance(c, PinConstraint):
+                return PinConstraint(c.center.copy(), c.axis.copy())
+            if isinstance(c, LineConstraint):
+                return LineConstraint(c.midpoint.copy(), c.line_dir.copy(), c.constraint_dir.copy(), c.length)
+            return PlaneConstraint(c.midpoint.copy(), c.normal.copy(), c.type, c.prop.copy())
+        index -= len(items)
+    raise IndexError("pool index out of range")
+
+
+def _extended(
+    base: DetailedAnalysisResult, pool: ConstraintSet, indices: Sequence[int]
+) -> DetailedAnalysisResult:
+    """``analyze_constraints_detailed(constraint_set_with(base.constraints, pool, indices))``, incrementally.
+
+    Pool constraints are added in global order with :func:`extend_detailed`, which only
+    analyses the combos containing each new constraint.
+    """
+    for i in sorted(indices):
+        base = extend_detailed(base, _pool_constraint(pool, i))
+    return base
+
+
 def _objective_value(results: RatingResults, objective: str) -> float:
     """Extract scalar to maximize from RatingResults."""
     if objective == "TOR":
@@ -167,7 +202,7 @@ def _optimize_addition_greedy(
     n_add: int,
     objective: str,
 ) -> AdditionResult:
-    current = baseline
+    current = analyze_constraints_detailed(baseline)
     added: list[int] = []
     history: list[tuple[list[int], RatingResults]] = []
     remaining = list(range(pool.total_cp))
@@ -176,18 +211,20 @@ def _optimize_addition_greedy(
         best_metric = float("-inf")
         best_idx: Optional[int] = None
         best_rating: Optional[RatingResults] = None
+        best_detail: Optional[DetailedAnalysisResult] = None
         for idx in remaining:
-            augmented = constraint_set_with(current, pool, [idx])
-            rating = analyze_constraints(augmented)
+            detail = _extended(current, pool, [idx])
+            rating = detail.rating
             val = _objective_value(rating, objective)
             if val > best_metric:
                 best_metric = val
                 best_idx = idx
                 best_rating = rating
-        if best_idx is None or best_rating is None:
+                best_detail = detail
+        if best_idx is None or best_rating is None or best_detail is None:
             break
-        # Commit: build the new baseline including this best pick
-        current = constraint_set_with(current, pool, [best_idx])
+        # Commit: the best pick's analysis is the next step's baseline
+        current = best_detail
         added.append(best_idx)
         remaining.remove(best_idx)
         history.append((list(added), best_rating))
@@ -213,11 +250,11 @@ def _optimize_addition_full(
     best_added: list[int] = []
     best_rating: Optional[RatingResults] = None
     history: list[tuple[list[int], RatingResults]] = []
+    base = analyze_constraints_detailed(baseline)
 
     for combo in itertools.combinations(range(pool_size), n_add):
         indices = list(combo)
-        augmented = constraint_set_with(baseline, pool, indices)
-        rating = analyze_constraints(augmented)
+        rating = _extended(base, pool, indices).rating
         history.append((indices, rating))
         val = _objective_value(rating, objective)
         if val > best_metric:
@@ -274,7 +311,8 @@ def optim_main_add(
     TOR_optim_chg : (n_combos,)
     """
     pool_size = candidate_pool.total_cp
-    baseline_rating = analyze_constraints(baseline_cs)
+    base = analyze_constraints_detailed(baseline_cs)
+    baseline_rating = base.rating
     Rating_org = np.array([
         baseline_rating.WTR, baseline_rating.MRR,
         baseline_rating.MTR, baseline_rating.TOR,
@@ -303,8 +341,7 @@ def optim_main_add(
     for a, indices in enumerate(combos):
         if progress_callback:
             progress_callback(a + 1, n_combos)
-        augmented = constraint_set_with(baseline_cs, candidate_pool, list(indices))
-        rating = analyze_constraints(augmented)
+        rating = _extended(base, candidate_pool, indices).rating
         WTR_list.append(rating.WTR)
         MRR_list.append(rating.MRR)
         MTR_list.append(rating.MTR)
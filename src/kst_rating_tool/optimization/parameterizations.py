@@ -304,7 +304,7 @@ class RevisionParameterization:
     def __call__(self, x: np.ndarray) -> ConstraintSet:
         from .revision import _apply_search
 
-        cp, cpin, clin, cpln, cpln_prop = self.base.to_matlab_style_arrays()
+        cp, cpin, clin, cpln, cpln_prop = self.base.arrays.as_tuple()
         cp = cp.copy()
         cpin = cpin.copy()
         clin = clin.copy()
@@ -1,14 +1,14 @@
 """
 Constraint reduction optimization (optim_main_red).
 Ported from optim_main_red.m.
-Adds constraint_set_without, optimize_reduction (greedy/full).
+Adds constraint_set_without, RemovalEvaluator, optimize_reduction (greedy/full/beam).
 """
 
 from __future__ import annotations
 
 import itertools
 from dataclasses import dataclass, field
-from typing import Callable, List, Literal, Optional, Sequence
+from typing import Callable, Literal, Optional, Sequence
 
 import numpy as np
 from numpy.typing import NDArray
@@ -20,8 +20,15 @@ from ..constraints import (
     PlaneConstraint,
     PointConstraint,
 )
-from ..pipeline import DetailedAnalysisResult, analyze_constraints, analyze_constraints_detailed
+from ..motion import unique_motion_rows
+from ..pipeline import (
+    DetailedAnalysisResult,
+    analyze_constraints,
+    analyze_constraints_detailed,
+    rate_rank5_combos,
+)
 from ..rating import RatingResults, aggregate_ratings
+from ..wrench import cp_to_wrench
 
 
 def constraint_set_without(
@@ -90,6 +97,83 @@ def constraint_set_without(
     return ConstraintSet(points=points, pins=pins, lines=lines, planes=planes)
 
 
+def _moment_arms(mot: NDArray[np.float64], pts: NDArray[np.float64], max_d: float) -> NDArray[np.float64]:
+    """``calc_d`` for every motion row (M, 10): farthest moment arm to ``pts``, capped at ``max_d``."""
+    if pts.size == 0:
+        return np.zeros(mot.shape[0], dtype=float)
+    arm = pts[None, :, :] - mot[:, None, 6:9]
+    dist = np.linalg.norm(np.cross(mot[:, None, 0:3], arm), axis=2).max(axis=1)
+    return np.minimum(dist, max_d)
+
+
+class RemovalEvaluator:
+    """Rates removal sets from one ``analyze_constraints_detailed`` baseline, without re-analysis.
+
+    Removing constraints only deletes combos: the surviving rank-5 combos and their
+    motions are read from ``combo_proc`` / ``combo_dup_idx``, each motion is won by its
+    first surviving combo (as the reduced pipeline's duplicate race would pick it), and
+    its R row is sliced from ``baseline.R``. The one thing a removal can change for a
+    surviving motion is its input wrench, through the moment arm ``d`` to the remaining
+    contact points; motions whose ``d`` moves are re-rated with ``rate_rank5_combos``
+    on the reduced set. ``rating(removed)`` equals
+    ``analyze_constraints(constraint_set_without(constraints, removed))``.
+    """
+
+    def __init__(self, baseline: DetailedAnalysisResult) -> None:
+        self.baseline = baseline
+        self.total_cp = baseline.constraints.total_cp
+        dup = np.flatnonzero(baseline.combo_dup_idx)
+        combo_idx = np.concatenate([baseline.combo_proc[:, 0] - 1, dup])
+        motion = np.concatenate([np.arange(baseline.no_mot_half), baseline.combo_dup_idx[dup] - 1])
+        order = np.argsort(combo_idx, kind="stable")
+        # Every rank-5 combo (1-based rows) in table order, with its mot_half row.
+        self._combo_rows = baseline.combo[combo_idx[order]]
+        self._motion = motion[order]
+        self._d = _moment_arms(baseline.mot_half, baseline.pts, baseline.max_d)
+
+    @classmethod
+    def from_constraints(cls, constraints: ConstraintSet) -> "RemovalEvaluator":
+        return cls(analyze_constraints_detailed(constraints))
+
+    def rating(self, removed: Sequence[int]) -> RatingResults:
+        """Ratings with the constraints at 0-based global indices ``removed`` taken out."""
+        rem = np.unique(np.asarray(list(removed), dtype=np.intp))
+        if rem.size and (rem[0] < 0 or rem[-1] >= self.total_cp):
+            raise IndexError("removal index out of range")
+        base = self.baseline
+        if rem.size == 0:
+            return base.rating
+        n_left = self.total_cp - rem.size
+
+        alive = np.flatnonzero(~np.isin(self._combo_rows, rem + 1).any(axis=1))
+        _, first = np.unique(self._motion[alive], return_index=True)
+        winners = alive[np.sort(first)]  # first surviving combo of each motion, in table order
+        motions = self._motion[winners]
+        if motions.size == 0:
+            return aggregate_ratings(np.full((1, max(1, n_left)), np.inf, dtype=float))
+
+        M, M0 = motions.size, base.no_mot_half
+        cols = np.delete(np.arange(self.total_cp), rem)
+        R = np.vstack([base.R[motions][:, cols], base.R[M0 + motions][:, cols]])
+        mot_half = base.mot_half[motions]
+
+        reduced = constraint_set_without(base.constraints, rem.tolist())
+        _, pts, max_d = cp_to_wrench(reduced)
+        moved = np.flatnonzero(
+            np.isfinite(mot_half[:, 9]) & (_moment_arms(mot_half, pts, max_d) != self._d[motions])
+        )
+        if moved.size:
+            rows = self._combo_rows[winners[moved]]
+            rows = np.where(rows > 0, rows - np.searchsorted(rem + 1, rows), 0)  # reduced numbering
+            _, R_moved = rate_rank5_combos(reduced, rows)
+            R[moved] = R_moved[: moved.size]
+            R[M + moved] = R_moved[moved.size :]
+
+        mot_all = np.vstack([mot_half, np.hstack([-mot_half[:, :6], mot_half[:, 6:]])])
+        mot_all = np.round(mot_all * 1e4) / 1e4
+        return aggregate_ratings(R[unique_motion_rows(mot_all), :])
+
+
 def _objective_value(results: RatingResults, objective: str) -> float:
     """Extract scalar to maximize from RatingResults."""
     if objective == "TOR":
@@ -116,8 +200,11 @@ class ReductionResult:
 def optimize_reduction(
     constraints: ConstraintSet,
     n_remove: int,
-    method: Literal["greedy", "full"] = "greedy",
+    method: Literal["greedy", "full", "beam"] = "greedy",
     objective: str = "TOR",
+    beam_width: int = 16,
+    exact: bool = False,
+    top_k: int = 1,
 ) -> ReductionResult:
     """Find which constraints to remove to maximize the chosen rating metric.
 
@@ -131,8 +218,12 @@ def optimize_reduction(
         'greedy': remove one at a time, each step choosing the removal that
         gives the best metric (O(n_remove * total_cp) evaluations).
         'full': enumerate all combinations (only for small total_cp and n_remove).
+        'beam': beam search via ``search_reduction`` (see reduction_search).
     objective
         Metric to maximize: 'TOR', 'WTR', 'MRR', or 'MTR'.
+    beam_width, exact, top_k
+        Passed to ``search_reduction`` for method 'beam'; ``exact=True`` runs its
+        certified branch-and-bound instead of the beam.
 
     Returns
     -------
@@ -152,6 +243,19 @@ def optimize_reduction(
 
     if method == "full":
         return _optimize_reduction_full(constraints, n_remove, objective)
+    if method == "beam":
+        from .reduction_search import search_reduction
+
+        found = search_reduction(
+            constraints, n_remove, objective=objective, top_k=top_k, beam_width=beam_width, exact=exact
+        )
+        best_removed, best_rating = found.best[0]
+        return ReductionResult(
+            best_constraints=constraint_set_without(constraints, best_removed),
+            best_rating=best_rating,
+            indices_removed=best_removed,
+            history=found.history,
+        )
     return _optimize_reduction_greedy(constraints, n_remove, objective)
 
 
@@ -160,7 +264,7 @@ def _optimize_reduction_greedy(
     n_remove: int,
     objective: str,
 ) -> ReductionResult:
-    current = constraints
+    evaluator = RemovalEvaluator.from_constraints(constraints)
     removed: list[int] = []
     history: list[tuple[list[int], RatingResults]] = []
     total_cp = constraints.total_cp
@@ -171,9 +275,7 @@ def _optimize_reduction_greedy(
         best_idx: Optional[int] = None
         best_rating: Optional[RatingResults] = None
         for idx in remaining_indices:
-            candidate_removed = removed + [idx]
-            reduced = constraint_set_without(constraints, candidate_removed)
-            rating = analyze_constraints(reduced)
+            rating = evaluator.rating(removed + [idx])
             val = _objective_value(rating, objective)
             if val > best_metric:
                 best_metric = val
@@ -205,11 +307,11 @@ def _optimize_reduction_full(
     best_removed: list[int] = []
     best_rating: Optional[RatingResults] = None
     history: list[tuple[list[int], RatingResults]] = []
+    evaluator = RemovalEvaluator.from_constraints(constraints)
 
     for combo in itertools.combinations(range(total_cp), n_remove):
         removed = list(combo)
-        reduced = constraint_set_without(constraints, removed)
-        rating = analyze_constraints(reduced)
+        rating = evaluator.rating(removed)
         history.append((removed, rating))
         val = _objective_value(rating, objective)
         if val > best_metric:
@@ -226,6 +328,27 @@ def _optimize_reduction_full(
     )
 
 
+# Removal sets per vectorized block in optim_main_red; also bounded by the gathered Ri stack.
+REDUCTION_BLOCK = 256
+_REDUCTION_BLOCK_BYTES = 64 * 2**20
+
+
+def _constraint_bits(rows: NDArray[np.int_], total_cp: int) -> NDArray[np.uint64]:
+    """Bitset (N, W) of the 1-based constraint indices in each zero-padded row, W = ceil(total_cp / 64)."""
+    rows = np.atleast_2d(np.asarray(rows, dtype=np.int64))
+    bits = np.zeros((rows.shape[0], max(1, -(-total_cp // 64))), dtype=np.uint64)
+    for col in rows.T:
+        live = np.flatnonzero(col > 0)
+        c = col[live] - 1
+        np.bitwise_or.at(bits, (live, c // 64), np.left_shift(np.uint64(1), (c % 64).astype(np.uint64)))
+    return bits
+
+
+def _bits_hit(bits: NDArray[np.uint64], removed_bits: NDArray[np.uint64]) -> NDArray[np.bool_]:
+    """(S, N): row ``n`` of ``bits`` shares a constraint with removal set ``s``."""
+    return np.any((bits[None, :, :] & removed_bits[:, None, :]) != 0, axis=2)
+
+
 def optim_main_red(
     baseline: DetailedAnalysisResult,
     no_red: int,
@@ -233,12 +356,17 @@ def optim_main_red(
 ) -> tuple[NDArray[np.float64], NDArray[np.int_], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
     """Try removing no_red constraints at a time; return WTR/MRR/MTR/TOR per removal combination and % change.
 
+    Blocks of removal sets are evaluated at once from bitsets of the constraints in each
+    duplicate combo and each ``combo_proc`` row: a motion is dropped when its processed
+    combo loses a constraint and no surviving duplicate combo points at it; the remaining
+    rows are deduplicated through precomputed ``mot_all`` groups and gathered from ``Ri``.
+    Results are identical to the per-set loop of optim_main_red.m.
+
     Returns:
         WTR_optim_all: (n_combos,) WTR after removal
         cp_del_comb: (n_combos, no_red) constraint indices removed per combo
         WTR_optim_chg, MRR_optim_chg, MTR_optim_chg, TOR_optim_chg: percent change vs baseline
     """
-    import itertools
     total_cp = baseline.constraints.total_cp
     if no_red > total_cp or no_red < 1:
         return (
@@ -254,7 +382,6 @@ def optim_main_red(
     combo_proc = baseline.combo_proc
     combo_dup_idx = baseline.combo_dup_idx
     no_mot_half = baseline.no_mot_half
-    mot_half = baseline.mot_half
     mot_all = baseline.mot_all
     Ri = baseline.Ri
 
@@ -264,49 +391,75 @@ def optim_main_red(
 
     cp_del_comb = np.array(list(itertools.combinations(range(1, total_cp + 1), no_red)), dtype=np.int_)
     n_combos = cp_del_comb.shape[0]
-
-    WTR_list: List[float] = []
-    MRR_list: List[float] = []
-    MTR_list: List[float] = []
-
-    for a in range(n_combos):
+    n_keep = total_cp - no_red
+
+    # Duplicate combos grouped by the (1-based) motion id they repeat, and processed combos.
+    dup_rows = np.flatnonzero(combo_dup_idx)
+    dup_rows = dup_rows[np.argsort(combo_dup_idx[dup_rows], kind="stable")]
+    dup_ids, dup_starts = np.unique(combo_dup_idx[dup_rows], return_index=True)
+    dup_bits = _constraint_bits(combo[dup_rows], total_cp)
+    proc_bits = _constraint_bits(combo_proc[:, 1:6], total_cp)
+
+    # unique_motion_rows keeps the first row of each distinct motion, in sorted motion order.
+    if mot_all.shape[0]:
+        _, group = np.unique(mot_all, axis=0, return_inverse=True)
+        group = group.reshape(-1)
+    else:
+        group = np.empty(0, dtype=np.intp)
+    by_group = np.lexsort((np.arange(group.size), group))
+    group_starts = np.flatnonzero(np.r_[True, np.diff(group[by_group]) != 0]) if group.size else group
+    n_groups = group_starts.size
+
+    # Elementwise part of aggregate_ratings(1 / max(Ri, 1e-12)), done once.
+    Ri_q = 1.0 / (1.0 / np.maximum(Ri, 1e-12))
+    Ri_q[np.isinf(Ri_q)] = 0.0
+    Ri_q[np.isnan(Ri_q)] = 0.0
+    Ri_q = np.round(Ri_q * 1e4) * 1e-4
+
+    WTR_optim_all = np.zeros(n_combos)
+    MRR_optim_all = np.zeros(n_combos)
+    MTR_optim_all = np.zeros(n_combos)
+
+    # Bytes per removal set: the (groups, n_keep) float64 block and the (rows, W) uint64
+    # intermediates of _bits_hit over the duplicate and processed combos.
+    per_set = 8 * (n_groups * n_keep + (dup_rows.size + proc_bits.shape[0]) * proc_bits.shape[1])
+    step = max(1, min(REDUCTION_BLOCK, _REDUCTION_BLOCK_BYTES // max(1, per_set)))
+    for start in range(0, n_combos, step):
+        cp_del = cp_del_comb[start : start + step]
+        S = cp_del.shape[0]
+        if n_groups and n_keep:
+            removed_bits = _constraint_bits(cp_del, total_cp)
+            has_dup = np.zeros((S, no_mot_half + 1), dtype=bool)
+            if dup_rows.size:
+                has_dup[:, dup_ids] = np.logical_or.reduceat(~_bits_hit(dup_bits, removed_bits), dup_starts, axis=1)
+            # As in the loop port, the 1-based ids of dup_idx are matched against 0-based combo_proc rows.
+            gone = _bits_hit(proc_bits, removed_bits) & ~has_dup[:, :no_mot_half]
+            remain = np.hstack([~gone, ~gone])  # forward rows, then reverse rows
+
+            first = np.minimum.reduceat(np.where(remain[:, by_group], by_group, group.size), group_starts, axis=1)
+            live = first < group.size
+            count = live.sum(axis=1)
+            rows = np.take_along_axis(first, np.argsort(~live, axis=1, kind="stable"), axis=1)
+            rows[np.arange(n_groups)[None, :] >= count[:, None]] = 0
+
+            col_mask = np.ones((S, total_cp), dtype=bool)
+            col_mask[np.arange(S)[:, None], cp_del - 1] = False
+            cols = np.nonzero(col_mask)[1].reshape(S, n_keep)
+            block = Ri_q[rows[:, :, None], cols[:, None, :]]  # (S, groups, n_keep), rows compacted first
+            rowsum = block.sum(axis=2)
+            max_of_row = np.maximum(block.max(axis=2), 1e-12)
+
+            for j in range(S):
+                rs = rowsum[j, : count[j]]
+                if rs.size == 0 or rs.min() == 0:
+                    continue  # free motion (or nothing left): all three ratings stay 0
+                WTR_optim_all[start + j] = float(rs.min())
+                MRR_optim_all[start + j] = float(np.mean(rs / max_of_row[j, : count[j]]))
+                MTR_optim_all[start + j] = float(np.mean(rs))
         if progress_callback:
-            progress_callback(a + 1, n_combos)
-        cp_del_idx = cp_del_comb[a, :]
-
-        del_idx = set()
-        for c in cp_del_idx.flat:
-            del_idx.update(np.where(combo == c)[0].tolist())
-        del_idx = np.array(sorted(del_idx), dtype=np.int_)
-        combo_red_idx = np.setdiff1d(np.arange(combo.shape[0]), del_idx)
-        dup_idx = np.unique(combo_dup_idx[combo_red_idx])
-        if dup_idx.size and dup_idx.flat[0] == 0:
-            dup_idx = dup_idx[1:]
-        del_idx_all = set()
-        for c in cp_del_idx.flat:
-            rows = np.where(combo_proc[:, 1:6] == c)[0]
-            del_idx_all.update(rows.tolist())
-        del_idx_all = np.array(sorted(del_idx_all), dtype=np.int_)
-        del_idx_nondup = np.setdiff1d(del_idx_all, dup_idx)
-        remain_idx = np.setdiff1d(np.arange(no_mot_half), del_idx_nondup)
-        remain_idx_full = np.concatenate([remain_idx, remain_idx + no_mot_half])
-
-        combo_proc_red = combo_proc[remain_idx, 1:6]
-        Ri_red = Ri[remain_idx_full, :]
-        Ri_red = np.delete(Ri_red, np.array(cp_del_idx) - 1, axis=1)
-        mot_all_red = mot_all[remain_idx_full]
-
-        mot_all_red_uniq, uniq_idx = np.unique(mot_all_red, axis=0, return_index=True)
-        Ri_red_uniq = Ri_red[uniq_idx, :]
-
-        rating_res = aggregate_ratings(1.0 / np.maximum(Ri_red_uniq, 1e-12))
-        WTR_list.append(rating_res.WTR)
-        MRR_list.append(rating_res.MRR)
-        MTR_list.append(rating_res.MTR)
-
-    WTR_optim_all = np.array(WTR_list)
-    MRR_optim_all = np.array(MRR_list)
-    MTR_optim_all = np.array(MTR_list)
+            for a in range(start, start + S):
+                progress_callback(a + 1, n_combos)
+
     TOR_optim_all = np.where(MRR_optim_all != 0, MTR_optim_all / MRR_optim_all, np.nan)
 
     WTR_optim_chg = np.where(Rating_org[0] != 0, (WTR_optim_all - Rating_org[0]) / Rating_org[0] * 100, 0)
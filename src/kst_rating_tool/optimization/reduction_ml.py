@@ -12,7 +12,7 @@ from ..constraints import ConstraintSet
 from ..pipeline import analyze_constraints
 from ..rating import RatingResults
 
-from .reduction import constraint_set_without, optimize_reduction
+from .reduction import RemovalEvaluator, constraint_set_without, optimize_reduction
 
 try:
     from sklearn.ensemble import RandomForestRegressor
@@ -77,16 +77,16 @@ def _collect_training_data(
 ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
     """Run greedy 1-at-a-time removals and record (features, delta objective) per removal.
 
+    Removals are rated by a :class:`RemovalEvaluator` on one detailed baseline analysis.
     Returns X (n_removals * total_cp, n_features), y (delta objective when that constraint removed).
     """
     total_cp = constraints.total_cp
-    baseline = analyze_constraints(constraints)
-    base_val = _objective_value(baseline, objective)
+    evaluator = RemovalEvaluator.from_constraints(constraints)
+    base_val = _objective_value(evaluator.baseline.rating, objective)
     X_list: list[NDArray[np.float64]] = []
     y_list: list[float] = []
     for idx in range(total_cp):
-        reduced = constraint_set_without(constraints, [idx])
-        res = analyze_constraints(reduced)
+        res = evaluator.rating([idx])
         val = _objective_value(res, objective)
         delta = val - base_val
         feat = _constraint_features(constraints, idx)
@@ -0,0 +1,347 @@
+"""Top-k constraint reduction search: beam search with optional exact branch-and-bound.
+
+For "remove k of n" questions where enumerating all C(n, k) removal sets
+(``optimize_reduction(method="full")``, ``optim_main_red``) is infeasible.
+Every set is rated exactly through :class:`RemovalEvaluator`.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from math import comb
+from typing import Callable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..constraints import ConstraintSet
+from ..rating import RatingResults
+from ..wrench import cp_to_wrench
+from .reduction import (
+    RemovalEvaluator,
+    _constraint_bits,
+    _moment_arms,
+    _objective_value,
+    constraint_set_without,
+)
+
+# Slack on the bounds: relative for re-rated R values, absolute for Ri rounded to 1e-4.
+_BOUND_RTOL = 1e-9
+_RI_ROUND = 5e-5
+
+
+@dataclass
+class ReductionSearchResult:
+    """Result of :func:`search_reduction`.
+
+    ``best`` holds up to ``top_k`` (indices_removed, rating) pairs, best first.
+    ``certified`` is True when no removal set outside ``best`` can score strictly
+    above the last entry (the search space was exhausted or pruned by exact bounds).
+    ``n_evaluated`` counts the rated removal sets of size ``n_remove`` (listed in
+    ``history`` in rating order) and ``n_prefix_evaluated`` the smaller beam
+    prefixes rated on the way.
+    """
+
+    best: list[tuple[list[int], RatingResults]]
+    objective: str
+    n_evaluated: int
+    n_candidates: int
+    certified: bool
+    values: list[float] = field(default_factory=list)
+    n_prefix_evaluated: int = 0
+    history: list[tuple[list[int], RatingResults]] = field(default_factory=list)
+
+
+class _BudgetExhausted(Exception):
+    """Raised by the search's rating function once ``max_evals`` ratings are spent."""
+
+
+class _RemovalBounds:
+    """Upper bounds on the objective over every removal set extending a prefix.
+
+    For the prefix ``removed`` (sorted, last index ``l``) the sets below it also
+    remove ``r`` more constraints from those after ``l``; the rest (``fixed``) is
+    kept. Removal only deletes combos, so surviving motions keep their R row except
+    for the input wrench scale ``|twist . b| = (1 + h^2) min(d, 1/|h|)``, which falls
+    with the moment arm ``d``. ``d`` is at least its value over the fixed contact
+    points, which bounds how far each Ri entry can grow; a screw with h < 0 whose
+    input can cross from force to rotation flips the sign of ``b`` and swaps its
+    forward and reverse rows, so both rows are bounded by their element-wise max.
+
+    Since ``d`` only falls, each surviving row is its baseline row (or its swapped
+    partner) restricted to the kept columns and scaled by ``s >= 1``; MRR's
+    ``rowsum / rowmax`` does not depend on ``s`` beyond the 1e-4 rounding, and the
+    always-kept (fixed) columns bound ``rowmax`` from below.
+    """
+
+    def __init__(self, evaluator: RemovalEvaluator) -> None:
+        base = evaluator.baseline
+        n = evaluator.total_cp
+        M = base.no_mot_half
+        self.n = n
+        self.M = M
+        self.motion = evaluator._motion
+        self.bits = _constraint_bits(evaluator._combo_rows, n)
+        self.d_base = evaluator._d
+
+        h = base.mot_half[:, 9] if M else np.empty(0)
+        self.finite_h = np.isfinite(h)
+        with np.errstate(divide="ignore"):
+            self.cap = np.where(self.finite_h, 1.0 / np.abs(h), np.inf)
+        self.neg_h = self.finite_h & (h < 0)
+
+        with np.errstate(divide="ignore"):
+            Ri = 1.0 / base.R
+        Ri[~np.isfinite(Ri)] = 0.0
+        self.Ri = Ri
+        swap = np.maximum(Ri[:M], Ri[M:])
+        self.Ri_swap = np.vstack([swap, swap])
+
+        # Moment arm of each motion to each constraint's points, and the largest
+        # point distance within / between constraints (max_d over any kept subset).
+        pts = [cp_to_wrench(constraint_set_without(base.constraints, [j for j in range(n) if j != c]))[1]
+               for c in range(n)]
+        self.arm = np.zeros((M, n), dtype=float)
+        for c, p in enumerate(pts):
+            if p.size and M:
+                self.arm[:, c] = _moment_arms(base.mot_half, p, np.inf)
+        self.pair_d = np.zeros((n, n), dtype=float)
+        for a in range(n):
+            for b in range(a, n):
+                if pts[a].size and pts[b].size:
+                    diff = pts[a][:, None, :] - pts[b][None, :, :]
+                    self.pair_d[a, b] = self.pair_d[b, a] = float(np.linalg.norm(diff, axis=2).max())
+
+        mot_all = np.vstack([base.mot_half, np.hstack([-base.mot_half[:, :6], base.mot_half[:, 6:]])])
+        mot_all = np.round(mot_all * 1e4) / 1e4
+        if mot_all.shape[0]:
+            _, group = np.unique(mot_all, axis=0, return_inverse=True)
+            self.group = np.asarray(group).reshape(-1)
+        else:
+            self.group = np.empty(0, dtype=np.intp)
+
+    def _hits(self, mask: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        sel = _constraint_bits(np.flatnonzero(mask)[None, :] + 1, self.n)[0]
+        return np.any((self.bits & sel) != 0, axis=1)
+
+    def _ratio_bound(self, kept: NDArray[np.bool_], fixed: NDArray[np.bool_], n_kept: int) -> NDArray[np.float64]:
+        """Largest ``rowsum / rowmax`` of each (unswapped) row over the completions."""
+        x = self.Ri[:, kept]
+        count = np.minimum((x > 0).sum(axis=1), n_kept).astype(float)  # zero entries stay zero
+        s = 1.0 - _BOUND_RTOL
+        if not fixed.any():
+            return count
+        # The ratio falls with the scale s, so s = 1 maximizes it; rounding moves each entry by <= _RI_ROUND.
+        max_lo = s * self.Ri[:, fixed].max(axis=1) - _RI_ROUND
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(max_lo > 0, (s * x.sum(axis=1) + _RI_ROUND * count) / max_lo, np.inf)
+        return np.minimum(count, frac * (1.0 + _BOUND_RTOL))
+
+    def upper_bound(self, removed: tuple[int, ...], n_remove: int, objective: str) -> float:
+        n, M = self.n, self.M
+        n_kept = n - n_remove
+        if M == 0:
+            return 0.0
+        in_prefix = np.zeros(n, dtype=bool)
+        in_prefix[list(removed)] = True
+        fixed = ~in_prefix
+        if len(removed) < n_remove:
+            fixed[removed[-1] + 1 :] = False
+
+        alive = np.zeros(M, dtype=bool)
+        alive[self.motion[~self._hits(in_prefix)]] = True
+        safe = np.zeros(M, dtype=bool)
+        safe[self.motion[~self._hits(~fixed)]] = True
+
+        if fixed.any():
+            d_lo = np.minimum(self.arm[:, fixed].max(axis=1), self.pair_d[np.ix_(fixed, fixed)].max())
+        else:
+            d_lo = np.zeros(M, dtype=float)
+        num = np.minimum(self.d_base, self.cap)
+        den = np.minimum(d_lo, self.cap)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = np.where(num > 0, num / den, 1.0)
+        factor = np.where(self.finite_h, factor, 1.0) * (1.0 + _BOUND_RTOL)
+        switch = self.neg_h & (d_lo <= self.cap * (1.0 + _BOUND_RTOL)) & (self.cap < self.d_base * (1.0 + _BOUND_RTOL))
+
+        # MRR is a mean of the row ratios. TOR = sum(rowsum) / sum(rowsum / rowmax)
+        # is a weighted mean of the row maxima, so it is bounded by the largest one;
+        # the others by row sums.
+        kept = ~in_prefix
+        if objective == "MRR":
+            ratio = self._ratio_bound(kept, fixed, n_kept)
+            ub_row = np.where(np.tile(switch, 2), np.maximum(ratio, np.roll(ratio, M)), ratio)
+        elif objective == "TOR":
+            row = np.where(np.tile(switch, 2), self.Ri_swap[:, kept].max(axis=1), self.Ri[:, kept].max(axis=1))
+            slack = _RI_ROUND
+        else:
+            row = np.where(np.tile(switch, 2), self.Ri_swap[:, kept].sum(axis=1), self.Ri[:, kept].sum(axis=1))
+            slack = _RI_ROUND * n_kept
+        if objective != "MRR":
+            with np.errstate(invalid="ignore"):
+                ub_row = np.where(row > 0, row * np.tile(factor, 2), 0.0) + slack
+
+        live = np.tile(alive, 2)
+        if not live.any():
+            return 0.0
+        ub = float(ub_row[live].max())
+        if objective == "WTR":
+            group_max = np.full(int(self.group.max()) + 1, -np.inf)
+            np.maximum.at(group_max, self.group[live], ub_row[live])
+            sure = np.unique(self.group[np.tile(safe, 2)])
+            if sure.size:
+                ub = min(ub, float(group_max[sure].min()))
+        return ub
+
+
+def search_reduction(
+    constraints: ConstraintSet,
+    n_remove: int,
+    objective: str = "TOR",
+    top_k: int = 1,
+    beam_width: int = 16,
+    exact: bool = False,
+    max_evals: Optional[int] = None,
+    evaluator: Optional[RemovalEvaluator] = None,
+) -> ReductionSearchResult:
+    """Find the ``top_k`` removal sets of size ``n_remove`` that maximize ``objective``.
+
+    Beam search grows removal sets one constraint at a time, keeping the
+    ``beam_width`` best at each size; when the beam would rate at least
+    C(n, n_remove) sets (prefixes included) every set is enumerated instead,
+    which is cheaper and certified. ``exact=True`` replaces the beam with a
+    depth-first branch-and-bound over all C(n, n_remove) sets that visits
+    subtrees best bound first and skips every subtree whose upper bound
+    (per-motion row sums of the baseline Ri, scaled by the largest input-wrench
+    change the subtree allows) cannot beat the current k-th best. It rates no
+    prefixes, so it never rates more sets than enumeration, and finishing it
+    certifies the result.
+
+    Parameters
+    ----------
+    constraints
+        Full constraint set.
+    n_remove
+        Number of constraints to remove.
+    objective
+        Metric to maximize: 'TOR', 'WTR', 'MRR', or 'MTR'. WTR (a minimum over
+        motions) gets tight bounds and MRR a per-row ``rowsum / rowmax`` bound;
+        TOR / MTR are bounded by the largest row max / row sum, so their exact
+        search prunes less.
+    top_k
+        Number of best removal sets to return.
+    beam_width
+        Sets kept per size during beam search (at least ``top_k``).
+    exact
+        Run the exact branch-and-bound instead of the beam search.
+    max_evals
+        Cap on all ratings (beam prefixes, beam sets and branch-and-bound leaves);
+        hitting it stops the search and leaves the result uncertified.
+    evaluator
+        Reuse an existing :class:`RemovalEvaluator` built for ``constraints``.
+
+    Returns
+    -------
+    ReductionSearchResult
+        Top-k sets (best first), their objective values, the number of sets of
+        size ``n_remove`` rated and of beam prefixes rated, C(total_cp, n_remove),
+        every rated set of size ``n_remove``, and whether optimality is certified.
+    """
+    total_cp = constraints.total_cp
+    if n_remove >= total_cp:
+        raise ValueError("n_remove must be less than total number of constraints")
+    if top_k < 1 or beam_width < 1:
+        raise ValueError("top_k and beam_width must be positive")
+    if objective not in ("TOR", "WTR", "MRR", "MTR"):
+        raise ValueError(f"Unknown objective: {objective}")
+    beam_width = max(beam_width, top_k)
+    if evaluator is None:
+        evaluator = RemovalEvaluator.from_constraints(constraints)
+    n_remove = max(n_remove, 0)
+    n_candidates = comb(total_cp, n_remove)
+
+    rated: dict[tuple[int, ...], tuple[float, RatingResults]] = {}
+
+    def score(s: tuple[int, ...]) -> float:
+        if s not in rated:
+            if max_evals is not None and len(rated) >= max_evals:
+                raise _BudgetExhausted
+            rating = evaluator.rating(list(s))
+            rated[s] = (_objective_value(rating, objective), rating)
+        return rated[s][0]
+
+    def rank(sets: list[tuple[int, ...]]) -> list[tuple[int, ...]]:
+        return sorted(sets, key=lambda s: (-score(s), s))
+
+    # Sets the beam would rate (prefixes included); at C(n, n_remove) or more,
+    # plain enumeration is cheaper and exact.
+    beam_cost = sum(min(comb(total_cp, s), beam_width * (total_cp - s + 1)) for s in range(1, n_remove + 1))
+    certified = False
+    try:
+        if exact and n_remove > 0:
+            certified = _branch_and_bound(total_cp, n_remove, top_k, objective, evaluator, score, rank)
+        elif n_remove == 0 or beam_cost >= n_candidates:
+            for s in itertools.combinations(range(total_cp), n_remove):
+                score(s)
+            certified = True
+        else:
+            beam: list[tuple[int, ...]] = [()]
+            for _ in range(n_remove):
+                children = {tuple(sorted(s + (j,))) for s in beam for j in range(total_cp) if j not in s}
+                beam = rank(list(children))[:beam_width]
+    except _BudgetExhausted:
+        certified = False
+
+    full = [s for s in rated if len(s) == n_remove]
+    top = rank(full)[:top_k]
+    return ReductionSearchResult(
+        best=[(list(s), rated[s][1]) for s in top],
+        objective=objective,
+        n_evaluated=len(full),
+        n_candidates=n_candidates,
+        certified=certified,
+        values=[rated[s][0] for s in top],
+        n_prefix_evaluated=len(rated) - len(full),
+        history=[(list(s), rated[s][1]) for s in full],
+    )
+
+
+def _branch_and_bound(
+    total_cp: int,
+    n_remove: int,
+    top_k: int,
+    objective: str,
+    evaluator: RemovalEvaluator,
+    score: Callable[[tuple[int, ...]], float],
+    rank: Callable[[list[tuple[int, ...]]], list[tuple[int, ...]]],
+) -> bool:
+    """Depth-first search over every removal set, children in descending bound order; True when finished.
+
+    Visiting the most promising subtree first raises the k-th best early, so no
+    beam prefixes are needed to seed the threshold and at most C(n, n_remove)
+    sets are rated.
+    """
+    bounds = _RemovalBounds(evaluator)
+    top: list[tuple[int, ...]] = []
+
+    def threshold() -> float:
+        return score(top[-1]) if len(top) == top_k else float("-inf")
+
+    def visit(prefix: tuple[int, ...], start: int) -> None:
+        r = n_remove - len(prefix)
+        children = [prefix + (j,) for j in range(start, total_cp - r + 1)]
+        ubs = [bounds.upper_bound(node, n_remove, objective) for node in children]
+        for ub, node in sorted(zip(ubs, children), key=lambda t: -t[0]):
+            if ub <= threshold():
+                break  # the rest bound no higher
+            if r > 1:
+                visit(node, node[-1] + 1)
+                continue
+            score(node)
+            if node not in top:
+                top.append(node)
+                top[:] = rank(top)[:top_k]
+
+    visit((), 0)
+    return True
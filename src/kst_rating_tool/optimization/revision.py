@@ -5,17 +5,26 @@ Ported from optim_main_rev.m and optim_rev.m.
 
 from __future__ import annotations
 
-import itertools
 from dataclasses import dataclass
 from typing import Any, Callable, List, Optional
 
 import numpy as np
 from numpy.typing import NDArray
 
-from ..constraints import ConstraintSet
+from ..constraints import ConstraintArrays, ConstraintSet
+from ..executor import _PublishedObject, published_object, shared_executor
+from ..motion import unique_motion_rows
 from ..pipeline import DetailedAnalysisResult, run_main_loop, analyze_constraints_detailed
-from ..rating import aggregate_ratings, rate_motset
-from ..wrench import cp_to_wrench
+from ..rating import aggregate_ratings
+from ..rating_batched import rate_motset_batched
+from ..wrench import (
+    WrenchTemplates,
+    _build_wrench_templates,
+    _max_pair_distance,
+    constraint_points,
+    cp_to_wrench,
+    wrench_templates,
+)
 from .search_space import (
     move_lin_srch,
     move_pln_srch,
@@ -91,6 +100,81 @@ def _apply_search(
             resize_circpln_srch(x_grp, cp_rev_in_group, srch, cpln_prop, no_cp, no_cpin, no_clin, no_cpln)
 
 
+class RevisionContext:
+    """Baseline wrench templates, points and point-distance extrema for repeated ``optim_rev`` calls.
+
+    Only the constraints in ``cp_rev_all`` (1-based) move between evaluations.
+    :meth:`revise` rebuilds just their template rows and points into copies of
+    the baseline ones, and takes ``max_d`` as the larger of the largest distance
+    among the fixed points (computed once here) and the distances from the moved
+    points to all points. The outputs equal ``cp_to_wrench`` on the revised set.
+    """
+
+    def __init__(self, constraints: ConstraintSet, cp_rev_all: NDArray[np.int_]) -> None:
+        counts = constraints.arrays.counts
+        rev = np.unique(np.asarray(cp_rev_all, dtype=np.intp).ravel())
+        self.rev = rev[(rev > 0) & (rev <= sum(counts))] - 1
+        self.bounds = np.cumsum((0,) + counts)
+        self.templates = wrench_templates(constraints)
+        self.rows = np.concatenate(
+            [np.arange(self.templates.offsets[c], self.templates.offsets[c] + self.templates.counts[c]) for c in self.rev]
+            + [np.empty(0, dtype=np.intp)]
+        ).astype(np.intp)
+        self.wr_all = [self.templates.system(i) for i in range(self.templates.counts.size)]
+
+        per_constraint = constraint_points(constraints.arrays)
+        sizes = np.array([p.shape[0] for p in per_constraint], dtype=np.intp)
+        self.pts = np.vstack(per_constraint + [np.empty((0, 3))]).astype(float)
+        moved = np.isin(np.repeat(np.arange(sizes.size), sizes), self.rev)
+        self.moved = np.flatnonzero(moved)
+        self.max_d_fixed = _max_pair_distance(self.pts[~moved])
+
+    def _revised_arrays(self, arrays: ConstraintArrays) -> ConstraintArrays:
+        """The rows of the revised constraints only, per constraint type."""
+        parts = []
+        for t, a in enumerate(arrays.as_tuple()[:4]):
+            parts.append(a[self.rev[(self.rev >= self.bounds[t]) & (self.rev < self.bounds[t + 1])] - self.bounds[t]])
+        pln = self.rev[self.rev >= self.bounds[3]] - self.bounds[3]
+        prop = arrays.cpln_prop[pln] if arrays.cpln_prop.size else arrays.cpln_prop
+        return ConstraintArrays(*parts, prop)
+
+    def revise(
+        self,
+        cp: NDArray[np.float64],
+        cpin: NDArray[np.float64],
+        clin: NDArray[np.float64],
+        cpln: NDArray[np.float64],
+        cpln_prop: NDArray[np.float64],
+    ) -> tuple[ConstraintSet, List[NDArray[np.float64]], NDArray[np.float64], float]:
+        """Revised ConstraintSet with its ``cp_to_wrench`` outputs (wrench arrays, pts, max_d)."""
+        revised = ConstraintSet.from_matlab_style_arrays(cp, cpin, clin, cpln, cpln_prop)
+        sub_arrays = self._revised_arrays(revised.arrays)
+        sub_pts = constraint_points(sub_arrays)
+        if sum(p.shape[0] for p in sub_pts) != self.moved.size:
+            wr_all_sys, pts, max_d = cp_to_wrench(revised)  # a plane's point count changed
+            return revised, [w.as_array() for w in wr_all_sys], pts, max_d
+
+        sub = _build_wrench_templates(sub_arrays)
+        base = self.templates
+        om, mu, anchor = base.om.copy(), base.mu.copy(), base.anchor.copy()
+        anchored = base.anchored.copy()
+        om[self.rows], mu[self.rows], anchor[self.rows], anchored[self.rows] = sub.om, sub.mu, sub.anchor, sub.anchored
+        templates = WrenchTemplates(om, mu, anchor, anchored, base.counts, base.offsets)
+        revised.arrays.derived("wrench_templates", lambda _: templates)
+        wr_all = list(self.wr_all)
+        for k, c in enumerate(self.rev):
+            wr_all[c] = sub.system(k)
+
+        pts = self.pts.copy()
+        max_d = self.max_d_fixed
+        if self.moved.size:
+            pts[self.moved] = np.vstack(sub_pts)
+            if pts.shape[0] >= 2:
+                dists = np.linalg.norm(pts[self.moved][:, None, :] - pts[None, :, :], axis=2)
+                max_d = max(max_d, float(dists.max()))
+        return revised, wr_all, pts, max_d
+
+
 def optim_rev(
     x: NDArray[np.float64],
     x_map: NDArray[np.int_],
@@ -102,11 +186,14 @@ def optim_rev(
     Ri_optimbase: NDArray[np.float64],
     mot_all_optimbase: NDArray[np.float64],
     mot_half_optimbase: NDArray[np.float64],
+    context: Optional[RevisionContext] = None,
 ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
     """Single revision evaluation: apply x, re-rate revised columns, run main_loop on combo_new, merge and rate.
     Returns (Rating_all_rev, Ri_new_uniq, mot_all_new_uniq).
+    ``context`` (a :class:`RevisionContext` for ``baseline.constraints`` and ``cp_rev_all``)
+    updates the wrenches and points of the revised constraints only.
     """
-    cp, cpin, clin, cpln, cpln_prop = baseline.constraints.to_matlab_style_arrays()
+    cp, cpin, clin, cpln, cpln_prop = baseline.constraints.arrays.as_tuple()
     no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
     cp = cp.copy()
     cpin = cpin.copy()
@@ -119,17 +206,21 @@ def optim_rev(
         cp, cpin, clin, cpln, cpln_prop,
         no_cp, no_cpin, no_clin, no_cpln,
     )
-    revised = ConstraintSet.from_matlab_style_arrays(cp, cpin, clin, cpln, cpln_prop)
-    wr_all_new, pts_rev, max_d_rev = cp_to_wrench(revised)
-    wr_all_new_list = [w.as_array() for w in wr_all_new]
+    if context is not None:
+        revised, wr_all_new_list, pts_rev, max_d_rev = context.revise(cp, cpin, clin, cpln, cpln_prop)
+    else:
+        revised = ConstraintSet.from_matlab_style_arrays(cp, cpin, clin, cpln, cpln_prop)
+        wr_all_new, pts_rev, max_d_rev = cp_to_wrench(revised)
+        wr_all_new_list = [w.as_array() for w in wr_all_new]
 
-    R_recalc = rate_motset(
+    R_recalc = rate_motset_batched(
         combo_proc_optimbase,
         mot_half_optimbase,
         cp_rev_all,
         revised,
         pts_rev,
         max_d_rev,
+        parity=True,
     )
     Ri_recalc = np.where(np.isfinite(R_recalc) & (R_recalc > 0), 1.0 / R_recalc, 0.0)
     Ri_optimbase_recalc = Ri_optimbase.copy()
@@ -150,7 +241,7 @@ def optim_rev(
         mot_all_add = np.vstack([mot_half_add, mot_all_add_rev])
         Ri_new = np.vstack([Ri_optimbase_recalc, Ri_add])
         mot_all_new = np.vstack([mot_all_optimbase, mot_all_add])
-    _, uniq_idx = np.unique(mot_all_new, axis=0, return_index=True)
+    uniq_idx = unique_motion_rows(mot_all_new)
     Ri_new_uniq = Ri_new[uniq_idx, :]
     mot_all_new_uniq = mot_all_new[uniq_idx, :]
     rating_res = aggregate_ratings(1.0 / np.maximum(Ri_new_uniq, 1e-12))
@@ -160,23 +251,36 @@ def optim_rev(
     return Rating_all_rev, Ri_new_uniq, mot_all_new_uniq
 
 
-def optim_main_rev(
-    baseline: DetailedAnalysisResult,
-    config: RevisionConfig,
-    no_step: int,
-    progress_callback: Optional[Callable[[int, int], None]] = None,
-) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.int_]]:
-    """Factorial search over normalized x in [-1,1]^no_dim. Returns WTR_optim_all, MRR_optim_all, MTR_optim_all, TOR_optim_all, and x_map (for postproc)."""
+# Per-worker optim_rev arguments for the grid being evaluated (set by the pool initializer).
+def _rev_grid_ratings(grid: tuple[Any, ...], flats: NDArray[np.intp]) -> NDArray[np.float64]:
+    """[WTR, MRR, MTR] of the grid points with C-order flat indices ``flats``."""
+    a_vals, shape, *rev_args = grid
+    out = np.empty((len(flats), 3), dtype=float)
+    for k, flat in enumerate(flats):
+        x = np.asarray(a_vals[np.array(np.unravel_index(flat, shape))], dtype=float)
+        Rating_all_rev, _, _ = optim_rev(x, *rev_args)
+        out[k] = Rating_all_rev[:3]
+    return out
+
+
+def _rev_grid_task(task: tuple[_PublishedObject, int, NDArray[np.intp]]) -> tuple[int, NDArray[np.float64]]:
+    pub, pos, flats = task
+    return pos, _rev_grid_ratings(published_object(pub), flats)
+
+
+def _revision_grid(
+    baseline: DetailedAnalysisResult, config: RevisionConfig, no_step: int
+) -> Optional[tuple[tuple[Any, ...], NDArray[np.int_], int]]:
+    """``(grid, x_map, no_dim)`` for rating points of the revision grid, or None if nothing is revised.
+
+    ``grid`` bundles the grid values and shape with the ``optim_rev`` arguments:
+    the baseline slices without the revised constraints' motions, the combos to
+    re-run and a :class:`RevisionContext`.
+    """
     cp_rev_all = np.unique(np.concatenate([g.ravel() for g in config.grp_members]))
     cp_rev_all = cp_rev_all[cp_rev_all != 0]
     if cp_rev_all.size == 0:
-        return (
-            np.array([baseline.rating.WTR]),
-            np.array([baseline.rating.MRR]),
-            np.array([baseline.rating.MTR]),
-            np.array([baseline.rating.TOR]),
-            np.zeros((0, 2), dtype=np.int_),
-        )
+        return None
 
     combo = baseline.combo
     combo_proc = baseline.combo_proc
@@ -222,87 +326,237 @@ def optim_main_rev(
     no_dim = row - 1
 
     n_inc = no_step + 1
-    a_vals = np.linspace(-1, 1, n_inc)
-    tot_it = n_inc ** no_dim
-
-    Rating_org = np.array([
-        baseline.rating.WTR, baseline.rating.MRR, baseline.rating.MTR, baseline.rating.TOR
-    ])
-
-    if no_dim == 1:
-        WTR_list: List[float] = []
-        MRR_list: List[float] = []
-        MTR_list: List[float] = []
-        for ai in range(n_inc):
+    grid = (
+        np.linspace(-1, 1, n_inc), (n_inc,) * no_dim, x_map, baseline, config, cp_rev_all,
+        combo_proc_optimbase, combo_new,
+        Ri_optimbase, mot_all_optimbase, mot_half_optimbase,
+        RevisionContext(baseline.constraints, cp_rev_all),
+    )
+    return grid, x_map, no_dim
+
+
+def _rate_grid_points(
+    grid: tuple[Any, ...],
+    flats: NDArray[np.intp],
+    n_workers: int,
+    progress_callback: Optional[Callable[[int, int], None]],
+    done: int,
+    total: int,
+) -> NDArray[np.float64]:
+    """[WTR, MRR, MTR] rows for ``flats``, sequentially or on the shared worker pool.
+
+    With ``n_workers > 1`` the points are split into ``n_workers * chunks_per_worker``
+    chunks and rated by :func:`~kst_rating_tool.executor.shared_executor`'s
+    persistent pool. ``grid`` is published to shared memory keyed by its content,
+    so each worker unpickles it once and keeps it across calls with the same grid.
+    Chunks are placed by position, so the rows equal the sequential ones.
+    ``progress_callback`` sees ``done + 1 .. done + len(flats)`` in order (out of ``total``).
+    """
+    ratings = np.empty((len(flats), 3), dtype=float)
+    if n_workers > 1 and len(flats) > 1:
+        executor = shared_executor(n_workers)
+        pub = executor.publish_object(grid)
+        n_tasks = n_workers * executor.chunks_per_worker
+        step = max(1, -(-len(flats) // n_tasks))
+        tasks = [(pub, s, flats[s : s + step]) for s in range(0, len(flats), step)]
+        for pos, part in executor.pool.imap_unordered(_rev_grid_task, tasks):
+            ratings[pos : pos + part.shape[0]] = part
             if progress_callback:
-                progress_callback(ai + 1, tot_it)
-            x = np.array([a_vals[ai]], dtype=float)
-            Rating_all_rev, _, _ = optim_rev(
-                x, x_map, baseline, config, cp_rev_all,
-                combo_proc_optimbase, combo_new,
-                Ri_optimbase, mot_all_optimbase, mot_half_optimbase,
-            )
-            WTR_list.append(Rating_all_rev[0])
-            MRR_list.append(Rating_all_rev[1])
-            MTR_list.append(Rating_all_rev[2])
-        WTR_optim_all = np.array(WTR_list)
-        MRR_optim_all = np.array(MRR_list)
-        MTR_optim_all = np.array(MTR_list)
-    elif no_dim == 2:
-        WTR_optim_all = np.zeros((n_inc, n_inc), dtype=float)
-        MRR_optim_all = np.zeros((n_inc, n_inc), dtype=float)
-        MTR_optim_all = np.zeros((n_inc, n_inc), dtype=float)
-        count = 0
-        for ai in range(n_inc):
-            for bi in range(n_inc):
-                if progress_callback:
-                    progress_callback(count + 1, tot_it)
-                count += 1
-                x = np.array([a_vals[ai], a_vals[bi]], dtype=float)
-                Rating_all_rev, _, _ = optim_rev(
-                    x, x_map, baseline, config, cp_rev_all,
-                    combo_proc_optimbase, combo_new,
-                    Ri_optimbase, mot_all_optimbase, mot_half_optimbase,
-                )
-                WTR_optim_all[ai, bi] = Rating_all_rev[0]
-                MRR_optim_all[ai, bi] = Rating_all_rev[1]
-                MTR_optim_all[ai, bi] = Rating_all_rev[2]
-    elif no_dim == 3:
-        WTR_optim_all = np.zeros((n_inc, n_inc, n_inc), dtype=float)
-        MRR_optim_all = np.zeros((n_inc, n_inc, n_inc), dtype=float)
-        MTR_optim_all = np.zeros((n_inc, n_inc, n_inc), dtype=float)
-        count = 0
-        for ai in range(n_inc):
-            for bi in range(n_inc):
-                for ci in range(n_inc):
-                    if progress_callback:
-                        progress_callback(count + 1, tot_it)
-                    count += 1
-                    x = np.array([a_vals[ai], a_vals[bi], a_vals[ci]], dtype=float)
-                    Rating_all_rev, _, _ = optim_rev(
-                        x, x_map, baseline, config, cp_rev_all,
-                        combo_proc_optimbase, combo_new,
-                        Ri_optimbase, mot_all_optimbase, mot_half_optimbase,
-                    )
-                    WTR_optim_all[ai, bi, ci] = Rating_all_rev[0]
-                    MRR_optim_all[ai, bi, ci] = Rating_all_rev[1]
-                    MTR_optim_all[ai, bi, ci] = Rating_all_rev[2]
+                for count in range(done, done + part.shape[0]):
+                    progress_callback(count + 1, total)
+            done += part.shape[0]
     else:
-        WTR_optim_all = np.full((n_inc,) * no_dim, np.nan, dtype=float)
-        MRR_optim_all = np.full((n_inc,) * no_dim, np.nan, dtype=float)
-        MTR_optim_all = np.full((n_inc,) * no_dim, np.nan, dtype=float)
-        for count, indices in enumerate(itertools.product(range(n_inc), repeat=no_dim)):
+        for k in range(len(flats)):
             if progress_callback:
-                progress_callback(count + 1, tot_it)
-            x = np.array([a_vals[i] for i in indices], dtype=float)
-            Rating_all_rev, _, _ = optim_rev(
-                x, x_map, baseline, config, cp_rev_all,
-                combo_proc_optimbase, combo_new,
-                Ri_optimbase, mot_all_optimbase, mot_half_optimbase,
-            )
-            WTR_optim_all[indices] = Rating_all_rev[0]
-            MRR_optim_all[indices] = Rating_all_rev[1]
-            MTR_optim_all[indices] = Rating_all_rev[2]
+                progress_callback(done + k + 1, total)
+            ratings[k] = _rev_grid_ratings(grid, flats[k : k + 1])[0]
+    return ratings
+
+
+def optim_main_rev(
+    baseline: DetailedAnalysisResult,
+    config: RevisionConfig,
+    no_step: int,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    n_workers: int = 1,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.int_]]:
+    """Factorial search over normalized x in [-1,1]^no_dim. Returns WTR_optim_all, MRR_optim_all, MTR_optim_all, TOR_optim_all, and x_map (for postproc).
+
+    With ``n_workers > 1`` the grid points are split into chunks of C-order flat
+    indices and rated on the persistent shared worker pool; the baseline slices
+    reach each worker once and stay cached there across calls with the same
+    inputs (see :func:`_rate_grid_points`). Results are placed by index, so the grids
+    equal the sequential ones. ``progress_callback`` still sees 1..tot_it in order,
+    advancing as chunks complete. For large no_dim see :func:`optim_main_rev_adaptive`.
+    """
+    setup = _revision_grid(baseline, config, no_step)
+    if setup is None:
+        return (
+            np.array([baseline.rating.WTR]),
+            np.array([baseline.rating.MRR]),
+            np.array([baseline.rating.MTR]),
+            np.array([baseline.rating.TOR]),
+            np.zeros((0, 2), dtype=np.int_),
+        )
+    grid, x_map, no_dim = setup
+
+    shape = grid[1]
+    tot_it = (no_step + 1) ** no_dim
+    ratings = _rate_grid_points(grid, np.arange(tot_it), n_workers, progress_callback, 0, tot_it)
+    WTR_optim_all = ratings[:, 0].reshape(shape)
+    MRR_optim_all = ratings[:, 1].reshape(shape)
+    MTR_optim_all = ratings[:, 2].reshape(shape)
 
     TOR_optim_all = np.where(MRR_optim_all != 0, MTR_optim_all / MRR_optim_all, np.nan)
     return WTR_optim_all, MRR_optim_all, MTR_optim_all, TOR_optim_all, x_map
+
+
+@dataclass
+class AdaptiveRevisionResult:
+    """Sparse result of :func:`optim_main_rev_adaptive`: the grid points actually rated.
+
+    ``indices`` (K, no_dim) are positions on the factorial grid
+    ``x_inc = linspace(-1, 1, no_step + 1)`` in C order, so ``x = x_inc[indices]``;
+    the metric arrays are aligned with them (TOR = MTR / MRR as in ``optim_main_rev``).
+    """
+
+    indices: NDArray[np.int_]
+    WTR: NDArray[np.float64]
+    MRR: NDArray[np.float64]
+    MTR: NDArray[np.float64]
+    TOR: NDArray[np.float64]
+    x_map: NDArray[np.int_]
+    no_step: int
+
+    @property
+    def x_inc(self) -> NDArray[np.float64]:
+        return np.linspace(-1, 1, self.no_step + 1)
+
+    @property
+    def x(self) -> NDArray[np.float64]:
+        return self.x_inc[self.indices]
+
+    @property
+    def n_evaluated(self) -> int:
+        return int(self.indices.shape[0])
+
+    def to_grids(self) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """Dense WTR, MRR, MTR, TOR grids with NaN at unrated points (for ``optim_postproc`` / plots)."""
+        shape = (self.no_step + 1,) * self.indices.shape[1]
+        grids = []
+        for vals in (self.WTR, self.MRR, self.MTR, self.TOR):
+            g = np.full(shape, np.nan, dtype=float)
+            g[tuple(self.indices.T)] = vals
+            grids.append(g)
+        return grids[0], grids[1], grids[2], grids[3]
+
+    def postproc(self) -> dict:
+        """``optim_postproc``'s optimum indices and ``x_inc`` from the rated points, plus ``*_max_x``.
+
+        Ties go to the first point in C order, as in ``optim_postproc``.
+        """
+        out: dict = {"x_inc": self.x_inc}
+        for name, vals in (("WTR", self.WTR), ("MRR", self.MRR), ("MTR", self.MTR), ("TOR", self.TOR)):
+            out[f"{name}_max_idx"] = None
+            out[f"{name}_max_x"] = None
+            finite = np.isfinite(vals)
+            if not np.any(finite):
+                continue
+            best = np.nanmax(np.where(finite, vals, -np.inf))
+            k = int(np.flatnonzero(np.abs(vals - best) < 1e-12)[0])
+            idx = tuple(int(i) for i in self.indices[k])
+            out[f"{name}_max_idx"] = idx[0] if len(idx) == 1 else idx
+            out[f"{name}_max_x"] = self.x[k]
+        return out
+
+
+def _neighbours(point: NDArray[np.int_], h: int, no_step: int) -> NDArray[np.int_]:
+    """Grid points ``point + {-h, 0, h}^no_dim`` clipped to the grid, in C order."""
+    offsets = np.array(np.meshgrid(*([(-h, 0, h)] * point.size), indexing="ij")).reshape(point.size, -1).T
+    return np.clip(point + offsets, 0, no_step)
+
+
+def optim_main_rev_adaptive(
+    baseline: DetailedAnalysisResult,
+    config: RevisionConfig,
+    no_step: int,
+    budget: int = 2000,
+    n_coarse: int = 3,
+    top_k: int = 2,
+    objectives: tuple[str, ...] = ("WTR", "MRR", "MTR", "TOR"),
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    n_workers: int = 1,
+) -> AdaptiveRevisionResult:
+    """Coarse-to-fine search on ``optim_main_rev``'s grid, for no_dim too large to enumerate.
+
+    Rates a coarse grid of ``n_coarse`` values per dimension, then repeatedly rates
+    the ``{-h, 0, h}^no_dim`` neighbourhoods of the ``top_k`` points of each metric
+    in ``objectives``, halving the step ``h`` down to one grid increment and
+    continuing at that step until no new neighbours appear. Stops after ``budget``
+    optim_rev calls. Points lie on the factorial grid (``x_inc`` of ``no_step``),
+    so optimum indices mean the same as in ``optim_postproc``. With ``n_workers > 1``
+    every round is rated on the same shared worker pool, and the grid inputs are
+    published to it once per call.
+
+    Returns
+    -------
+    AdaptiveRevisionResult
+        The rated points and their metrics; ``postproc()`` gives the optimum
+        indices / x values, ``to_grids()`` NaN-filled dense grids.
+    """
+    setup = _revision_grid(baseline, config, no_step)
+    if setup is None:
+        rating = baseline.rating
+        return AdaptiveRevisionResult(
+            indices=np.zeros((1, 0), dtype=np.int_),
+            WTR=np.array([rating.WTR]),
+            MRR=np.array([rating.MRR]),
+            MTR=np.array([rating.MTR]),
+            TOR=np.array([rating.TOR]),
+            x_map=np.zeros((0, 2), dtype=np.int_),
+            no_step=no_step,
+        )
+    grid, x_map, no_dim = setup
+    shape = grid[1]
+    total = min(budget, (no_step + 1) ** no_dim)
+    metric_col = {"WTR": 0, "MRR": 1, "MTR": 2, "TOR": 3}
+
+    coarse = np.unique(np.round(np.linspace(0, no_step, max(1, min(n_coarse, no_step + 1)))).astype(np.int_))
+    h = int(-(-np.diff(coarse).max() // 2)) if coarse.size > 1 else 0
+    cand = np.ravel_multi_index(tuple(np.array(np.meshgrid(*([coarse] * no_dim), indexing="ij")).reshape(no_dim, -1)), shape)
+    flats = np.empty(0, dtype=np.intp)
+    rows = np.empty((0, 4), dtype=float)
+    h_cand = 0  # step that produced ``cand`` (0: coarse grid)
+    while True:
+        new = cand[~np.isin(cand, flats)]
+        _, first = np.unique(new, return_index=True)
+        new = new[np.sort(first)][: total - flats.size]
+        if new.size:
+            part = _rate_grid_points(grid, new, n_workers, progress_callback, flats.size, total)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                tor = np.where(part[:, 1] != 0, part[:, 2] / part[:, 1], np.nan)
+            flats = np.concatenate([flats, new])
+            rows = np.vstack([rows, np.column_stack([part, tor])])
+        if h < 1 or flats.size >= total or (h_cand == 1 and not new.size):
+            break
+        order = np.argsort(flats, kind="stable")
+        tops = []
+        for obj in objectives:
+            vals = np.where(np.isfinite(rows[order, metric_col[obj]]), rows[order, metric_col[obj]], -np.inf)
+            tops.append(order[np.argsort(-vals, kind="stable")[:top_k]])
+        seeds = [t[r] for r in range(top_k) for t in tops if r < t.size]
+        points = np.array(np.unravel_index(flats[seeds], shape)).T
+        cand = np.concatenate([np.ravel_multi_index(tuple(_neighbours(p, h, no_step).T), shape) for p in points])
+        h_cand, h = h, (h + 1) // 2
+
+    order = np.argsort(flats)
+    rows = rows[order]
+    return AdaptiveRevisionResult(
+        indices=np.array(np.unravel_index(flats[order], shape), dtype=np.int_).T,
+        WTR=rows[:, 0],
+        MRR=rows[:, 1],
+        MTR=rows[:, 2],
+        TOR=rows[:, 3],
+        x_map=x_map,
+        no_step=no_step,
+    )
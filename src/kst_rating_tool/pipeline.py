@@ -1,64 +1,277 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from multiprocessing import Pool
-from typing import Dict, List, Set, Tuple
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple, Union
 
 import numpy as np
 from numpy.typing import NDArray
 from scipy.linalg import null_space
 
-from .combination import combo_preproc
-from .constraints import ConstraintSet
+from .analysis_cache import active_analysis_cache
+from .autotune import tuned
+from .combination import (
+    ComboStream,
+    combo_preproc,
+    combo_stream,
+    constraint_row_counts,
+    viable_combo_indices,
+)
+from .constraints import (
+    ConstraintSet,
+    LineConstraint,
+    PinConstraint,
+    PlaneConstraint,
+    PointConstraint,
+)
+from .executor import ComboResult, shared_executor
 from .input_wr import input_wr_compose
-from .motion import ScrewMotion, rec_mot, specmot_row_to_screw
+from .motion import (
+    MotionKeyIndex,
+    ScrewMotion,
+    rec_mot_batched,
+    screw_from_array,
+    specmot_row_to_screw,
+    unique_motion_rows,
+)
 from .numeric_backend import BackendState, resolve_accelerator, should_fallback_torch_to_numpy
 from .rating import RatingResults, aggregate_ratings
 from .rating_batched import (
+    RATE_MOTION_CHUNK,
     rate_motion_all_constraints_batched_numpy,
     rate_motion_all_constraints_batched_torch,
+    rate_motions_batched_numpy,
 )
-from .react_wr import form_combo_wrench, react_wr_5_compose
-from .utils import matlab_rank
-from .wrench import WrenchSystem, cp_to_wrench
+from .react_wr import (
+    combo_wrench_row_counts,
+    form_combo_wrench_batched,
+    react_wr_5_compose_batched,
+)
+from .utils import matlab_rank, matlab_rank_batched
+from .wrench import WrenchSystem, cp_to_wrench, wrench_templates
+
+if TYPE_CHECKING:
+    from .torch_engine import TorchAnalysis
+
+# Combos per stacked SVD call in the rank-5 prefilter; bounds the (N, k, 6) stack memory.
+RANK_PREFILTER_CHUNK = 65536
+
+
+def _rank5_combo_indices(
+    combo: NDArray[np.int_],
+    wr_all: List[NDArray[np.float64]],
+    chunk_size: int = RANK_PREFILTER_CHUNK,
+) -> NDArray[np.intp]:
+    """Indices (ascending, 0-based) of combo rows whose pivot wrench matrix has rank 5.
+
+    Batched replacement for the per-row ``form_combo_wrench`` + ``matlab_rank`` test in
+    main_loop.m. Combos are grouped by stacked row count (so MATLAB's ``max(size(A))``
+    tolerance is unchanged) and ranked with one ``matlab_rank_batched`` call per chunk.
+    Ascending order keeps the first-wins duplicate-motion detection identical.
+    """
+    n_combo = combo.shape[0]
+    if n_combo == 0 or not wr_all:
+        return np.empty(0, dtype=np.intp)
+    n_rows = combo_wrench_row_counts(wr_all, combo)
+    keep = np.zeros(n_combo, dtype=bool)
+    for k in np.unique(n_rows):
+        if k < 5:
+            continue  # rank <= k < 5, no SVD needed
+        group = np.flatnonzero(n_rows == k)
+        for s in range(0, group.size, chunk_size):
+            idx = group[s : s + chunk_size]
+            W = form_combo_wrench_batched(wr_all, combo[idx])
+            keep[idx] = matlab_rank_batched(W) == 5
+    return np.flatnonzero(keep)
+
+
+# Relative residual below which incremental Gram-Schmidt flags a wrench row as dependent.
+_GS_DEPENDENT_TOL = 1e-9
+
+
+def _extend_basis(
+    Q: NDArray[np.float64], rows: NDArray[np.float64]
+) -> Tuple[NDArray[np.float64], int]:
+    """Append ``rows`` to the orthonormal row basis ``Q`` (q, 6); return (Q', new directions).
+
+    Classical Gram-Schmidt with one re-orthogonalization pass (CGS2); a row whose
+    residual is below ``_GS_DEPENDENT_TOL`` of its norm adds no direction.
+    """
+    added = 0
+    for w in rows:
+        v = w - (Q @ w) @ Q
+        v = v - (Q @ v) @ Q
+        norm = float(np.sqrt(v @ v))
+        if norm > _GS_DEPENDENT_TOL * float(np.sqrt(w @ w)) and Q.shape[0] < 6:
+            Q = np.concatenate([Q, (v / norm)[None, :]])
+            added += 1
+    return Q, added
+
+
+def _rank5_combo_indices_dfs(
+    combos: ComboStream,
+    wr_all: List[NDArray[np.float64]],
+    chunk_size: int = RANK_PREFILTER_CHUNK,
+) -> NDArray[np.intp]:
+    """Full-table indices of :func:`_rank5_combo_rows_dfs`."""
+    return _rank5_combo_rows_dfs(combos, wr_all, chunk_size)[0]
+
+
+def _rank5_combo_rows_dfs(
+    combos: ComboStream,
+    wr_all: List[NDArray[np.float64]],
+    chunk_size: int = RANK_PREFILTER_CHUNK,
+) -> Tuple[NDArray[np.intp], NDArray[np.int_]]:
+    """Same result as ``_rank5_combo_indices(combo_preproc(...), wr_all)``, by prefix-tree search.
+
+    Each subset size in ``combos.sizes`` is walked depth-first in nchoosek order while an
+    incremental Gram-Schmidt basis of the prefix's wrench rows is carried down the tree.
+    A subtree is cut when no extension can reach five rows, or when the prefix is rank
+    deficient (confirmed with ``matlab_rank``) and its rank plus the most rows the
+    remaining picks can add is below 5: by interlacing, appending rows raises MATLAB's
+    rank by at most the number of rows appended. Surviving leaves go through the same
+    batched ``matlab_rank`` test, so the returned full-table indices match exactly.
+    Returns those indices (ascending) and the matching zero-padded combo rows.
+    """
+    none = (np.empty(0, dtype=np.intp), np.empty((0, 5), dtype=np.int_))
+    n = len(wr_all)
+    if n == 0 or len(combos) == 0:
+        return none
+    blocks = [np.asarray(w, dtype=float).reshape(-1, 6) for w in wr_all]
+    counts = [b.shape[0] for b in blocks]
+    # tail[c][m]: most rows m picks from constraints after position c can add
+    tail = [[sum(sorted(counts[c + 1 :], reverse=True)[:m]) for m in range(6)] for c in range(n)]
+    leaves: List[List[int]] = []
+
+    def walk(prefix: List[int], Q: NDArray[np.float64], n_rows: int, rank: int, r: int) -> None:
+        m = r - len(prefix) - 1  # picks left after the next one
+        start = prefix[-1] if prefix else 0  # prefix holds 1-based indices
+        for c in range(start, n - m):
+            rows_c = n_rows + counts[c]
+            if rows_c + tail[c][m] < 5:
+                continue
+            if m == 0:
+                leaves.append(prefix + [c + 1])
+                continue
+            Q_c, added = _extend_basis(Q, blocks[c])
+            rank_c = rank + added
+            if rank_c < rows_c:
+                exact = matlab_rank(np.vstack([blocks[i - 1] for i in prefix] + [blocks[c]]))
+                if exact + tail[c][m] < 5:
+                    continue
+            walk(prefix + [c + 1], Q_c, rows_c, rank_c, r)
+
+    for r in combos.sizes:
+        if r <= n:
+            walk([], np.empty((0, 6), dtype=float), 0, 0, r)
+    if not leaves:
+        return none
+    leaf_rows = np.zeros((len(leaves), 5), dtype=np.int_)
+    for i, leaf in enumerate(leaves):
+        leaf_rows[i, : len(leaf)] = leaf
+    rows = leaf_rows[_rank5_combo_indices(leaf_rows, wr_all, chunk_size)]
+    return combos.index_of(rows).astype(np.intp), rows
+
+
+def _stream_rank5(
+    combos: ComboStream, wr_all: List[NDArray[np.float64]]
+) -> Tuple[NDArray[np.intp], NDArray[np.int_]]:
+    """Full-table indices (ascending) and rows of the rank-5 combos, one ``iter_viable`` block at a time.
+
+    Only one block of the combo table is alive at once; the result holds just the
+    rank-5 rows, so memory no longer scales with the full ``combo_preproc`` table.
+    """
+    idx_parts: List[NDArray[np.intp]] = [np.empty(0, dtype=np.intp)]
+    row_parts: List[NDArray[np.int_]] = [np.empty((0, 5), dtype=np.int_)]
+    for rows, idx in combos.iter_viable():
+        block = rows.astype(np.int_)
+        keep = _rank5_combo_indices(block, wr_all)
+        idx_parts.append(idx[keep].astype(np.intp))
+        row_parts.append(block[keep])
+    return np.concatenate(idx_parts), np.concatenate(row_parts)
+
+
+_ENUMERATIONS = ("batched", "dfs")
+
+
+def _check_enumeration(enumeration: str) -> None:
+    if enumeration not in _ENUMERATIONS:
+        raise ValueError(f"enumeration must be one of {_ENUMERATIONS}, got {enumeration!r}")
+
+
+def _sequential_rank5(
+    constraints: ConstraintSet,
+    combo: NDArray[np.int_],
+    wr_all: List[NDArray[np.float64]],
+    enumeration: str,
+) -> NDArray[np.intp]:
+    """Ascending indices into ``combo`` (the full combo_preproc table) of rank-5 combos."""
+    if enumeration == "dfs":
+        return _rank5_combo_indices_dfs(combo_stream(constraints), wr_all)
+    viable = viable_combo_indices(combo, constraint_row_counts(constraints))
+    return viable[_rank5_combo_indices(combo[viable], wr_all)]
+
+
+def _combo_motions(
+    combo: NDArray[np.int_],
+    combo_idx: NDArray[np.intp],
+    wr_all: List[NDArray[np.float64]],
+) -> NDArray[np.float64]:
+    """Reciprocal motions (rec_mot.m rows) for ``combo[combo_idx]``, shape (len(combo_idx), 10).
+
+    One ``rec_mot_batched`` call per stacked row count instead of one SVD per combo.
+    """
+    mot = np.empty((combo_idx.size, 10), dtype=float)
+    if combo_idx.size == 0:
+        return mot
+    rows = combo[combo_idx]
+    n_rows = combo_wrench_row_counts(wr_all, rows)
+    for k in np.unique(n_rows):
+        sel = n_rows == k
+        mot[sel] = rec_mot_batched(form_combo_wrench_batched(wr_all, rows[sel]))
+    return mot
 
 
 def _process_combo_chunk(
     args: Tuple[
-        List[int],
-        NDArray[np.int_],
+        ComboStream,
+        int,
+        int,
         List[NDArray[np.float64]],
         NDArray[np.float64],
         float,
         ConstraintSet,
     ],
 ) -> List[Tuple[int, NDArray[np.float64], NDArray[np.float64]]]:  # R_two_rows (2, total_cp)
-    """Process a chunk of combo rows; return (combo_i, mot_row, R_row) for rank-5 combos.
-    Used by parallel analysis; no duplicate detection (done in main process).
+    """Process combo rows ``start:stop``; return (combo_i, mot_row, R_row) for rank-5 combos.
+    Used by parallel analysis; the worker generates its own (viable) rows from the stream.
+    No duplicate detection (done in main process).
     """
-    combo_indices, combo_chunk, wr_all_list, pts, max_d, constraints = args
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
-    total_cp = constraints.total_cp
-    out: List[Tuple[int, NDArray[np.float64], NDArray[np.float64]]] = []
-    for idx, combo_row in zip(combo_indices, combo_chunk):
-        W = form_combo_wrench(wr_all_list, combo_row)
-        if W.size == 0:
-            continue
-        if matlab_rank(W) != 5:
-            continue
-        mot = rec_mot(W)
-        mot_arr = mot.as_array().ravel()
-        mot_arr = np.round(mot_arr * 1e4) / 1e4
-        input_wr, _ = input_wr_compose(mot, pts, max_d)
-        react_wr_5 = react_wr_5_compose(constraints, combo_row, mot.rho)
-        rcp_pos, rcp_neg, rcpin, rclin_pos, rclin_neg, rcpln_pos, rcpln_neg = _rate_motion_all_constraints(
-            mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
-        )
-        row_forward = np.hstack([rcp_pos, rcpin, rclin_pos, rcpln_pos])
-        row_reverse = np.hstack([rcp_neg, rcpin, rclin_neg, rcpln_neg])
-        R_two_rows = np.vstack([row_forward, row_reverse])
-        out.append((idx, mot_arr, R_two_rows))
-    return out
+    combos, start, stop, wr_all_list, pts, max_d, constraints = args
+    viable_rows, combo_indices = combos.viable(start, stop)
+    combo_chunk: NDArray[np.int_] = viable_rows.astype(np.int_)
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
+    rank5 = _rank5_combo_indices(combo_chunk, wr_all_list)
+    mot_rows = _combo_motions(combo_chunk, rank5, wr_all_list)
+    mot_arr = np.round(mot_rows * 1e4) / 1e4
+    react_wr_5, input_wr = _compose_motion_inputs(mot_rows, combo_chunk[rank5], constraints, pts, max_d)
+    R = _R_from_blocks(
+        _rate_motions_all_constraints(mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop)
+    )
+    n = rank5.size
+    return [(int(combo_indices[j]), mot_arr[i], R[[i, n + i]]) for i, j in enumerate(rank5)]
+
+
+def _parallel_combo_results(
+    constraints: ConstraintSet, combos: ComboStream, n_workers: int
+) -> List[ComboResult]:
+    """Rank-5 combo results from the shared worker pool, merged in combo order.
+
+    Workers return ranges in completion order; sorting by combo index makes the
+    merge (and the duplicate-motion race after it) identical to the sequential loop.
+    """
+    results = shared_executor(n_workers).run(constraints, combos)
+    results.sort(key=lambda x: x[0])
+    return results
 
 
 @dataclass
@@ -81,6 +294,7 @@ class DetailedAnalysisResult:
     max_d: float
     constraints: ConstraintSet
     combo: NDArray[np.int_]
+    combo_skipped: int = 0  # combos with < 5 wrench rows, never rated
 
 
 def _rate_motion_all_constraints(
@@ -93,160 +307,283 @@ def _rate_motion_all_constraints(
     cpln: NDArray[np.float64],
     cpln_prop: NDArray[np.float64],
     backend_state: BackendState | None = None,
+    parity: bool = False,
 ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
-    """Build one motion's Rcp_pos, Rcp_neg, Rcpin, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg (match main_loop.m)."""
+    """Build one motion's Rcp_pos, Rcp_neg, Rcpin, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg (match main_loop.m).
+
+    ``parity=True`` rates with the per-candidate MATLAB rank + mldivide path
+    (bit-identical to ``rating.rate_*``) instead of the rank-one kernel.
+    """
     if backend_state is not None and backend_state.kind == "torch":
         return rate_motion_all_constraints_batched_torch(
             mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, backend_state
         )
     return rate_motion_all_constraints_batched_numpy(
-        mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
+        mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, parity=parity
     )
 
 
+def _compose_motion_inputs(
+    mot_rows: NDArray[np.float64],
+    combo_rows: NDArray[np.int_],
+    constraints: ConstraintSet,
+    pts: NDArray[np.float64],
+    max_d: float,
+    backend_state: BackendState | None = None,
+) -> tuple[List[NDArray[np.float64]], NDArray[np.float64]]:
+    """Per-motion ``react_wr_5`` (list; row counts differ) and stacked ``input_wr`` (M, 6).
+
+    Pivot wrenches are composed per row-count group with one
+    :func:`react_wr_5_compose_batched` call each. The numba backend runs both
+    steps through the compiled kernels of :mod:`kst_rating_tool.numba_kernels`.
+    """
+    n = mot_rows.shape[0]
+    compose = react_wr_5_compose_batched
+    if backend_state is not None and backend_state.kind == "numba":
+        from .numba_kernels import compose_pivot_wrenches, input_wrenches
+
+        input_wr = input_wrenches(mot_rows, pts, max_d)
+        compose = compose_pivot_wrenches
+    else:
+        input_wr = np.empty((n, 6), dtype=float)
+        for i, mot_row in enumerate(mot_rows):
+            wr_in, _ = input_wr_compose(screw_from_array(mot_row), pts, max_d)
+            input_wr[i] = np.asarray(wr_in, dtype=float).reshape(6)
+    react_wr_5: List[NDArray[np.float64]] = [np.empty((0, 6), dtype=float)] * n
+    if n:
+        n_rows = wrench_templates(constraints).combo_row_counts(combo_rows)
+        for k in np.unique(n_rows):
+            idx = np.flatnonzero(n_rows == k)
+            stacked = compose(constraints, combo_rows[idx], mot_rows[idx, 6:9])
+            for j, m in enumerate(idx.tolist()):
+                react_wr_5[m] = stacked[j]
+    return react_wr_5, input_wr
+
+
+def _rate_motions_all_constraints(
+    mot_arr: NDArray[np.float64],
+    react_wr_5: List[NDArray[np.float64]],
+    input_wr: NDArray[np.float64],
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    backend_state: BackendState | None = None,
+    parity: bool = False,
+    chunk_size: int = RATE_MOTION_CHUNK,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Rate all M motions at once; each returned block has shape (M, n_type).
+
+    NumPy rates everything with :func:`rate_motions_batched_numpy` (chunked over
+    motions); the torch backend rates the same stacks on its device and the numba
+    backend with compiled per-candidate kernels, except in ``parity`` mode, which
+    is NumPy-only.
+    """
+    if backend_state is not None and backend_state.kind == "numba" and not parity:
+        from .numba_kernels import rate_motions_batched_numba
+
+        return rate_motions_batched_numba(
+            mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, chunk_size
+        )
+    if backend_state is not None and backend_state.kind == "torch" and not parity:
+        from .torch_engine import rate_motions_batched_torch
+
+        try:
+            return rate_motions_batched_torch(
+                mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, backend_state, chunk_size
+            )
+        except RuntimeError:
+            pass  # device without float64 linalg: NumPy below
+    return rate_motions_batched_numpy(
+        mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, parity=parity, chunk_size=chunk_size
+    )
+
+
+def _resolve_backend(
+    constraints: ConstraintSet, n_workers: int, accelerator: str, device: str | None
+) -> BackendState | None:
+    """Accelerator for the sequential loop; ``None`` means plain NumPy.
+
+    Workers (``n_workers > 1``) always use NumPy. A missing optional package
+    (PyTorch, Numba) or a problem too small for the GPU also falls back to NumPy.
+    """
+    if n_workers is not None and n_workers > 1:
+        return None
+    try:
+        st = resolve_accelerator(accelerator, device)
+    except ImportError:
+        return None
+    if st.kind == "numpy" or should_fallback_torch_to_numpy(st, (max(1, constraints.total_cp), 6, 6)):
+        return None
+    return st
+
+
+def _torch_analysis(constraints: ConstraintSet, backend_state: BackendState) -> TorchAnalysis | None:
+    """Whole-pipeline run on the torch device; ``None`` if the device lacks the float64 ops it needs."""
+    from .torch_engine import TorchEngine
+
+    try:
+        return TorchEngine(constraints, backend_state).analyze(combo_stream(constraints))
+    except RuntimeError:
+        return None
+
+
+def _jax_analysis(
+    constraints: ConstraintSet, backend_state: BackendState
+) -> tuple[NDArray[np.intp], NDArray[np.float64], NDArray[np.intp], NDArray[np.bool_], NDArray[np.float64] | None] | None:
+    """Jitted JAX run: ``(combo_idx, mot, ids, is_new, R)`` on the host; ``None`` if the platform is unusable."""
+    from .jax_engine import JaxEngine
+
+    try:
+        return JaxEngine(constraints, backend_state).analyze(combo_stream(constraints))
+    except RuntimeError:
+        return None
+
+
+def _R_from_blocks(
+    blocks: tuple[NDArray[np.float64], ...],
+) -> NDArray[np.float64]:
+    """R = [Rcp Rcpin Rclin Rcpln] with forward (pos) rows over reverse (neg) rows, as in main_loop.m."""
+    Rcp_pos, Rcp_neg, Rcpin, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg = blocks
+    forward = np.hstack([Rcp_pos, Rcpin, Rclin_pos, Rcpln_pos])
+    reverse = np.hstack([Rcp_neg, Rcpin, Rclin_neg, Rcpln_neg])
+    return np.vstack([forward, reverse])
+
+
 def analyze_constraints(
     constraints: ConstraintSet,
     n_workers: int = 1,
     accelerator: str = "numpy",
     device: str | None = None,
+    enumeration: str = "batched",
 ) -> RatingResults:
     """High-level analysis pipeline for a fixed configuration.
 
     Mirrors main_loop.m and main.m: rates all constraint types (cp, cpin, clin, cpln),
     builds R = [Rcp Rcpin Rclin Rcpln], merges forward/reverse, unique motions, aggregate.
 
+    Inside ``with analysis_cache():`` results are memoized by constraint content and
+    accelerator settings (see :mod:`kst_rating_tool.analysis_cache`).
+
     Parameters
     ----------
     constraints
         Constraint set describing the assembly.
     n_workers
-        Number of parallel workers for the combo loop (1 = sequential). Uses process-based
-        parallelism; results are merged in combo order so output matches sequential run.
+        Number of parallel workers for the combo loop (1 = sequential). Uses a process pool
+        that stays alive across calls (see :mod:`kst_rating_tool.executor`); results are
+        merged in combo order so output matches sequential run.
     accelerator
-        ``numpy`` (default, batched CPU), ``torch`` (optional PyTorch on ``device``), or
-        ``auto`` (prefers CUDA/MPS if available). Multiprocessing workers always use NumPy.
+        ``numpy`` (default, batched CPU), ``torch`` (optional PyTorch on ``device``),
+        ``numba`` (optional compiled CPU kernels for the per-motion loops, see
+        :mod:`kst_rating_tool.numba_kernels`), ``jax`` (optional jitted, vmapped per-combo
+        kernels on the JAX platform ``device``, see :mod:`kst_rating_tool.jax_engine`), or
+        ``auto`` (prefers CUDA/MPS if available). With torch the whole sequential loop runs
+        on the device (see :mod:`kst_rating_tool.torch_engine`); torch and jax ignore
+        ``enumeration``. Multiprocessing workers always use NumPy. ``tune`` benchmarks the
+        installed backends and worker-pool layouts on the first problem of each size/type
+        bucket, caches the winner per user (see :mod:`kst_rating_tool.autotune`) and then
+        chooses ``accelerator``, ``device`` and ``n_workers`` itself.
     device
-        PyTorch device string when ``accelerator`` is ``torch`` (e.g. ``cuda``, ``cpu``).
+        PyTorch device string when ``accelerator`` is ``torch`` (e.g. ``cuda``, ``cpu``), or
+        JAX platform name when it is ``jax`` (default ``cpu``).
+    enumeration
+        How rank-5 combos are found in the sequential loop: ``batched`` (default; stacked
+        SVD over the whole combo table) or ``dfs`` (prefix-tree walk with an incremental
+        Gram-Schmidt basis that cuts rank-deficient subtrees). Both give the same combos;
+        parallel workers always use ``batched``.
     """
+    _check_enumeration(enumeration)
+    cache = active_analysis_cache()
+    if cache is not None:
+        return cache.get_or_compute(
+            constraints,
+            ("rating", str(accelerator).lower(), device, enumeration),
+            lambda: _analyze_constraints(constraints, n_workers, accelerator, device, enumeration),
+        )
+    return _analyze_constraints(constraints, n_workers, accelerator, device, enumeration)
 
-    backend_state: BackendState | None = None
-    if n_workers is None or n_workers <= 1:
-        try:
-            st = resolve_accelerator(accelerator, device)
-            if st.kind == "torch" and should_fallback_torch_to_numpy(
-                st, (max(1, constraints.total_cp), 6, 6)
-            ):
-                backend_state = None
-            else:
-                backend_state = st if st.kind == "torch" else None
-        except ImportError:
-            backend_state = None
+
+def _analyze_constraints(
+    constraints: ConstraintSet,
+    n_workers: int,
+    accelerator: str,
+    device: str | None,
+    enumeration: str,
+) -> RatingResults:
+    if str(accelerator).lower() == "tune":
+        choice, tuned_res = tuned(
+            constraints,
+            lambda c: _analyze_constraints(constraints, c.n_workers, c.accelerator, c.device, enumeration),
+        )
+        if tuned_res is not None:
+            return tuned_res
+        n_workers, accelerator, device = choice.n_workers, choice.accelerator, choice.device
+
+    backend_state = _resolve_backend(constraints, n_workers, accelerator, device)
+    if backend_state is not None and backend_state.kind == "torch":
+        analysis = _torch_analysis(constraints, backend_state)
+        if analysis is not None:
+            R_torch = analysis.unique_R()
+            if R_torch is None:
+                R_torch = np.full((1, max(1, constraints.total_cp)), np.inf, dtype=float)
+            return aggregate_ratings(R_torch)
 
     wr_all_sys, pts, max_d = cp_to_wrench(constraints)
     wr_all: List[NDArray[np.float64]] = [w.as_array() for w in wr_all_sys]
 
-    combo = combo_preproc(constraints)
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
     no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
     total_cp = no_cp + no_cpin + no_clin + no_cpln
 
-    mot_hold: List[NDArray[np.float64]] = []
-    mot_seen = set()  # set of tuple(mot_arr) for O(1) duplicate checks
-    Rcp_pos_rows: List[NDArray[np.float64]] = []
-    Rcp_neg_rows: List[NDArray[np.float64]] = []
-    Rcpin_rows: List[NDArray[np.float64]] = []
-    Rclin_pos_rows: List[NDArray[np.float64]] = []
-    Rclin_neg_rows: List[NDArray[np.float64]] = []
-    Rcpln_pos_rows: List[NDArray[np.float64]] = []
-    Rcpln_neg_rows: List[NDArray[np.float64]] = []
+    mot_half = np.empty((0, 10), dtype=float)
+    R: NDArray[np.float64] | None = None
 
     if n_workers is not None and n_workers > 1:
-        n_combo = combo.shape[0]
-        chunk_size = max(1, (n_combo + n_workers - 1) // n_workers)
-        chunks: List[Tuple[List[int], NDArray[np.int_]]] = []
-        for s in range(0, n_combo, chunk_size):
-            e = min(s + chunk_size, n_combo)
-            chunks.append((list(range(s, e)), combo[s:e]))
-        pool_args = [
-            (indices, combo_chunk, wr_all, pts, max_d, constraints)
-            for indices, combo_chunk in chunks
-        ]
-        with Pool(processes=n_workers) as pool:
-            chunk_results = pool.map(_process_combo_chunk, pool_args)
-        all_results: List[Tuple[int, NDArray[np.float64], NDArray[np.float64]]] = []
-        for lst in chunk_results:
-            all_results.extend(lst)
-        all_results.sort(key=lambda x: x[0])
-        for combo_i, mot_arr, R_two_rows in all_results:
-            mot_row = mot_arr.reshape(1, -1)
-            mot_tuple = tuple(mot_arr)
-            if mot_tuple in mot_seen:
-                continue
-            mot_seen.add(mot_tuple)
-            mot_hold.append(mot_row.ravel().copy())
-            Rcp_pos_rows.append(R_two_rows[0, :no_cp])
-            Rcp_neg_rows.append(R_two_rows[1, :no_cp])
-            Rcpin_rows.append(R_two_rows[0, no_cp : no_cp + no_cpin])
-            Rclin_pos_rows.append(R_two_rows[0, no_cp + no_cpin : no_cp + no_cpin + no_clin])
-            Rclin_neg_rows.append(R_two_rows[1, no_cp + no_cpin : no_cp + no_cpin + no_clin])
-            Rcpln_pos_rows.append(R_two_rows[0, no_cp + no_cpin + no_clin : total_cp])
-            Rcpln_neg_rows.append(R_two_rows[1, no_cp + no_cpin + no_clin : total_cp])
+        all_results = _parallel_combo_results(constraints, combo_stream(constraints), n_workers)
+        if all_results:
+            mot_rows = np.vstack([mot_arr for _, mot_arr, _ in all_results])
+            _, is_new = MotionKeyIndex().insert(mot_rows)
+            mot_half = mot_rows[is_new]
+            R_two = np.stack([R_two_rows for _, _, R_two_rows in all_results])[is_new]
+            R = np.vstack([R_two[:, 0], R_two[:, 1]])
+    elif backend_state is not None and backend_state.kind == "jax" and (
+        jax_res := _jax_analysis(constraints, backend_state)
+    ) is not None:
+        _, mot_arr, _, is_new, R = jax_res
+        mot_half = mot_arr[is_new]
     else:
-        for combo_row in combo:
-            W = form_combo_wrench(wr_all, combo_row)
-            if W.size == 0:
-                continue
-            if matlab_rank(W) != 5:
-                continue
-
-            mot = rec_mot(W)
-            mot_arr = mot.as_array().ravel()
-            mot_arr = np.round(mot_arr * 1e4) / 1e4
-            mot_row = mot_arr.reshape(1, -1)
-            mot_tuple = tuple(mot_arr)
-            if mot_tuple in mot_seen:
-                continue
-            mot_seen.add(mot_tuple)
-            mot_hold.append(mot_row.ravel().copy())
-
-            input_wr, _ = input_wr_compose(mot, pts, max_d)
-            react_wr_5 = react_wr_5_compose(constraints, combo_row, mot.rho)
-            rcp_pos, rcp_neg, rcpin, rclin_pos, rclin_neg, rcpln_pos, rcpln_neg = _rate_motion_all_constraints(
-                mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, backend_state
+        combos = combo_stream(constraints)
+        if enumeration == "dfs":
+            _, rank5_rows = _rank5_combo_rows_dfs(combos, wr_all)
+        else:
+            _, rank5_rows = _stream_rank5(combos, wr_all)
+        mot_rows = _combo_motions(rank5_rows, np.arange(rank5_rows.shape[0]), wr_all)
+        mot_arr = np.round(mot_rows * 1e4) / 1e4
+        _, is_new = MotionKeyIndex().insert(mot_arr)
+        uniq_rows = np.flatnonzero(is_new)
+        mot_half = mot_arr[uniq_rows]
+        if uniq_rows.size:
+            react_wr_5, input_wr = _compose_motion_inputs(
+                mot_rows[uniq_rows], rank5_rows[uniq_rows], constraints, pts, max_d, backend_state
+            )
+            R = _R_from_blocks(
+                _rate_motions_all_constraints(
+                    mot_half, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, backend_state
+                )
             )
-            Rcp_pos_rows.append(rcp_pos)
-            Rcp_neg_rows.append(rcp_neg)
-            Rcpin_rows.append(rcpin)
-            Rclin_pos_rows.append(rclin_pos)
-            Rclin_neg_rows.append(rclin_neg)
-            Rcpln_pos_rows.append(rcpln_pos)
-            Rcpln_neg_rows.append(rcpln_neg)
-
-    if not mot_hold:
+
+    if R is None:
         R = np.full((1, max(1, total_cp)), np.inf, dtype=float)
         return aggregate_ratings(R)
 
-    Rcp_pos = np.vstack(Rcp_pos_rows)
-    Rcp_neg = np.vstack(Rcp_neg_rows)
-    Rcpin_half = np.vstack(Rcpin_rows)
-    Rclin_pos = np.vstack(Rclin_pos_rows)
-    Rclin_neg = np.vstack(Rclin_neg_rows)
-    Rcpln_pos = np.vstack(Rcpln_pos_rows)
-    Rcpln_neg = np.vstack(Rcpln_neg_rows)
-    Rcp = np.vstack([Rcp_pos, Rcp_neg])
-    Rcpin = np.vstack([Rcpin_half, Rcpin_half])
-    Rclin = np.vstack([Rclin_pos, Rclin_neg])
-    Rcpln = np.vstack([Rcpln_pos, Rcpln_neg])
-    R = np.hstack([Rcp, Rcpin, Rclin, Rcpln])
-
-    mot_half = np.vstack(mot_hold)
     mot_half_rev = np.hstack([-mot_half[:, :6], mot_half[:, 6:]])
     mot_all = np.vstack([mot_half, mot_half_rev])
     mot_all = np.round(mot_all * 1e4) / 1e4
 
     # Match MATLAB unique(mot_all_org, 'rows'): keep first occurrence of each unique motion
-    _, uniq_idx = np.unique(mot_all, axis=0, return_index=True)
-    R_uniq = R[uniq_idx, :]
+    R_uniq = R[unique_motion_rows(mot_all), :]
     return aggregate_ratings(R_uniq)
 
 
@@ -264,131 +601,133 @@ def analyze_constraints_detailed(
     n_workers: int = 1,
     accelerator: str = "numpy",
     device: str | None = None,
+    enumeration: str = "batched",
 ) -> DetailedAnalysisResult:
     """Full analysis returning R, mot_half, combo_proc, combo_dup_idx for optimizers.
 
     Same as analyze_constraints but also returns intermediate structures; rates all constraint types.
+    Memoized inside ``with analysis_cache():`` like ``analyze_constraints``.
 
     Parameters
     ----------
     constraints
         Constraint set describing the assembly.
     n_workers
-        Number of parallel workers for the combo loop (1 = sequential). Uses process-based
-        parallelism; results are merged in combo order so output matches sequential run.
+        Number of parallel workers for the combo loop (1 = sequential). Uses a process pool
+        that stays alive across calls (see :mod:`kst_rating_tool.executor`); results are
+        merged in combo order so output matches sequential run.
     accelerator
         Same as ``analyze_constraints``.
     device
         Same as ``analyze_constraints``.
+    enumeration
+        Same as ``analyze_constraints``.
     """
-    backend_state: BackendState | None = None
-    if n_workers is None or n_workers <= 1:
-        try:
-            st = resolve_accelerator(accelerator, device)
-            if st.kind == "torch" and should_fallback_torch_to_numpy(
-                st, (max(1, constraints.total_cp), 6, 6)
-            ):
-                backend_state = None
-            else:
-                backend_state = st if st.kind == "torch" else None
-        except ImportError:
-            backend_state = None
+    _check_enumeration(enumeration)
+    cache = active_analysis_cache()
+    if cache is not None:
+        return cache.get_or_compute(
+            constraints,
+            ("detailed", str(accelerator).lower(), device, enumeration),
+            lambda: _analyze_constraints_detailed(constraints, n_workers, accelerator, device, enumeration),
+        )
+    return _analyze_constraints_detailed(constraints, n_workers, accelerator, device, enumeration)
+
+
+def _analyze_constraints_detailed(
+    constraints: ConstraintSet,
+    n_workers: int,
+    accelerator: str,
+    device: str | None,
+    enumeration: str,
+) -> DetailedAnalysisResult:
+    if str(accelerator).lower() == "tune":
+        choice, tuned_res = tuned(
+            constraints,
+            lambda c: _analyze_constraints_detailed(constraints, c.n_workers, c.accelerator, c.device, enumeration),
+        )
+        if tuned_res is not None:
+            return tuned_res
+        n_workers, accelerator, device = choice.n_workers, choice.accelerator, choice.device
+    backend_state = _resolve_backend(constraints, n_workers, accelerator, device)
 
     wr_all_sys, pts, max_d = cp_to_wrench(constraints)
     wr_all_list: List[NDArray[np.float64]] = [w.as_array() for w in wr_all_sys]
 
     combo = combo_preproc(constraints)
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
-    no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
-    total_cp = no_cp + no_cpin + no_clin + no_cpln
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
 
-    mot_hold: List[NDArray[np.float64]] = []
-    mot_map: dict[tuple[float, ...], int] = {}  # tuple(mot_arr) -> index in mot_hold
-    Rcp_pos_rows: List[NDArray[np.float64]] = []
-    Rcp_neg_rows: List[NDArray[np.float64]] = []
-    Rcpin_rows: List[NDArray[np.float64]] = []
-    Rclin_pos_rows: List[NDArray[np.float64]] = []
-    Rclin_neg_rows: List[NDArray[np.float64]] = []
-    Rcpln_pos_rows: List[NDArray[np.float64]] = []
-    Rcpln_neg_rows: List[NDArray[np.float64]] = []
-    combo_proc_indices: List[int] = []
-    combo_proc_rows_list: List[NDArray[np.int_]] = []
-    combo_dup_idx = np.zeros(combo.shape[0], dtype=np.int_)
+    R: NDArray[np.float64] | None = None
+    combo_idx = np.empty(0, dtype=np.intp)  # full-table index of each rank-5 combo, ascending
+    mot_arr = np.empty((0, 10), dtype=float)  # its rounded motion
+    ids = np.empty(0, dtype=np.intp)
+    is_new = np.empty(0, dtype=bool)
 
     if n_workers is not None and n_workers > 1:
-        n_combo = combo.shape[0]
-        chunk_size = max(1, (n_combo + n_workers - 1) // n_workers)
-        chunks_d: List[Tuple[List[int], NDArray[np.int_]]] = []
-        for s in range(0, n_combo, chunk_size):
-            e = min(s + chunk_size, n_combo)
-            chunks_d.append((list(range(s, e)), combo[s:e]))
-        pool_args_d = [
-            (indices, combo_chunk, wr_all_list, pts, max_d, constraints)
-            for indices, combo_chunk in chunks_d
-        ]
-        with Pool(processes=n_workers) as pool:
-            chunk_results_d = pool.map(_process_combo_chunk, pool_args_d)
-        all_results_d: List[Tuple[int, NDArray[np.float64], NDArray[np.float64]]] = []
-        for lst in chunk_results_d:
-            all_results_d.extend(lst)
-        all_results_d.sort(key=lambda x: x[0])
-        for combo_i, mot_arr, R_two_rows in all_results_d:
-            mot_row = mot_arr.reshape(1, -1)
-            mot_tuple = tuple(mot_arr)
-            if mot_tuple in mot_map:
-                idx_existing = mot_map[mot_tuple]
-                combo_dup_idx[combo_i] = idx_existing + 1
-                continue
-            combo_dup_idx[combo_i] = 0
-            mot_map[mot_tuple] = len(mot_hold)
-            mot_hold.append(mot_row.ravel().copy())
-            combo_proc_rows_list.append(np.concatenate([[combo_i + 1], combo[combo_i]]).astype(np.int_))
-            Rcp_pos_rows.append(R_two_rows[0, :no_cp])
-            Rcp_neg_rows.append(R_two_rows[1, :no_cp])
-            Rcpin_rows.append(R_two_rows[0, no_cp : no_cp + no_cpin])
-            Rclin_pos_rows.append(R_two_rows[0, no_cp + no_cpin : no_cp + no_cpin + no_clin])
-            Rclin_neg_rows.append(R_two_rows[1, no_cp + no_cpin : no_cp + no_cpin + no_clin])
-            Rcpln_pos_rows.append(R_two_rows[0, no_cp + no_cpin + no_clin : total_cp])
-            Rcpln_neg_rows.append(R_two_rows[1, no_cp + no_cpin + no_clin : total_cp])
+        combos = combo_stream(constraints)
+        combo_skipped = combos.n_skipped
+        all_results_d = _parallel_combo_results(constraints, combos, n_workers)
+        if all_results_d:
+            combo_idx = np.array([combo_i for combo_i, _, _ in all_results_d], dtype=np.intp)
+            mot_arr = np.vstack([mot for _, mot, _ in all_results_d])
+            ids, is_new = MotionKeyIndex().insert(mot_arr)
+            R_two = np.stack([R_two_rows for _, _, R_two_rows in all_results_d])[is_new]
+            R = np.vstack([R_two[:, 0], R_two[:, 1]])
     else:
-        for combo_i, combo_row in enumerate(combo):
-            W = form_combo_wrench(wr_all_list, combo_row)
-            if W.size == 0:
-                continue
-            if matlab_rank(W) != 5:
-                continue
+        combo_skipped = combo.shape[0] - viable_combo_indices(combo, constraint_row_counts(constraints)).size
+        analysis = (
+            _torch_analysis(constraints, backend_state)
+            if backend_state is not None and backend_state.kind == "torch"
+            else None
+        )
+        host = analysis.to_host() if analysis is not None else None
+        if backend_state is not None and backend_state.kind == "jax":
+            host = _jax_analysis(constraints, backend_state)
+        if host is not None:
+            combo_idx, mot_arr, ids, is_new, R = host
+        else:
+            combo_idx = _sequential_rank5(constraints, combo, wr_all_list, enumeration)
+            mot_rows = _combo_motions(combo, combo_idx, wr_all_list)
+            mot_arr = np.round(mot_rows * 1e4) / 1e4
+            ids, is_new = MotionKeyIndex().insert(mot_arr)
+            uniq_rows = np.flatnonzero(is_new)
+            if uniq_rows.size:
+                react_wr_5, input_wr = _compose_motion_inputs(
+                    mot_rows[uniq_rows], combo[combo_idx[uniq_rows]], constraints, pts, max_d, backend_state
+                )
+                R = _R_from_blocks(
+                    _rate_motions_all_constraints(
+                        mot_arr[uniq_rows], react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, backend_state
+                    )
+                )
+
+    return _detailed_result(
+        constraints, combo, combo_skipped, wr_all_list, pts, max_d, combo_idx, mot_arr, ids, is_new, R
+    )
 
-            mot = rec_mot(W)
-            mot_arr = mot.as_array().ravel()
-            mot_arr = np.round(mot_arr * 1e4) / 1e4
-            mot_row = mot_arr.reshape(1, -1)
-            mot_tuple = tuple(mot_arr)
 
-            if mot_tuple in mot_map:
-                idx_existing = mot_map[mot_tuple]
-                combo_dup_idx[combo_i] = idx_existing + 1
-                continue
-            combo_dup_idx[combo_i] = 0
-            mot_map[mot_tuple] = len(mot_hold)
+def _detailed_result(
+    constraints: ConstraintSet,
+    combo: NDArray[np.int_],
+    combo_skipped: int,
+    wr_all_list: List[NDArray[np.float64]],
+    pts: NDArray[np.float64],
+    max_d: float,
+    combo_idx: NDArray[np.intp],
+    mot_arr: NDArray[np.float64],
+    ids: NDArray[np.intp],
+    is_new: NDArray[np.bool_],
+    R: NDArray[np.float64] | None,
+) -> DetailedAnalysisResult:
+    """Assemble a :class:`DetailedAnalysisResult` from the rank-5 combos and the unique-motion R.
 
-            input_wr, _ = input_wr_compose(mot, pts, max_d)
-            react_wr_5 = react_wr_5_compose(constraints, combo_row, mot.rho)
-            rcp_pos, rcp_neg, rcpin, rclin_pos, rclin_neg, rcpln_pos, rcpln_neg = _rate_motion_all_constraints(
-                mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, backend_state
-            )
-            Rcp_pos_rows.append(rcp_pos)
-            Rcp_neg_rows.append(rcp_neg)
-            Rcpin_rows.append(rcpin)
-            Rclin_pos_rows.append(rclin_pos)
-            Rclin_neg_rows.append(rclin_neg)
-            Rcpln_pos_rows.append(rcpln_pos)
-            Rcpln_neg_rows.append(rcpln_neg)
-            mot_hold.append(mot_row.ravel().copy())
-            combo_proc_indices.append(combo_i + 1)
-            combo_proc_rows_list.append(combo_row.astype(np.int_))
-
-    if not mot_hold:
-        R = np.full((1, max(1, total_cp)), np.inf, dtype=float)
+    ``combo_idx`` (ascending full-table indices), ``mot_arr`` (their rounded motions) and
+    ``ids`` / ``is_new`` (from ``MotionKeyIndex.insert``) describe every rank-5 combo;
+    ``R`` holds the forward rows over the reverse rows of the ``is_new`` motions.
+    """
+    combo_dup_idx = np.zeros(combo.shape[0], dtype=np.int_)
+    if R is None:
+        R = np.full((1, max(1, constraints.total_cp)), np.inf, dtype=float)
         mot_half = np.empty((0, 10), dtype=float)
         combo_proc = np.empty((0, 6), dtype=np.int_)
         rating_res = aggregate_ratings(R)
@@ -406,38 +745,20 @@ def analyze_constraints_detailed(
             max_d=max_d,
             constraints=constraints,
             combo=combo,
+            combo_skipped=combo_skipped,
         )
 
-    Rcp_pos = np.vstack(Rcp_pos_rows)
-    Rcp_neg = np.vstack(Rcp_neg_rows)
-    Rcpin_half = np.vstack(Rcpin_rows)
-    Rclin_pos = np.vstack(Rclin_pos_rows)
-    Rclin_neg = np.vstack(Rclin_neg_rows)
-    Rcpln_pos = np.vstack(Rcpln_pos_rows)
-    Rcpln_neg = np.vstack(Rcpln_neg_rows)
-    Rcp = np.vstack([Rcp_pos, Rcp_neg])
-    Rcpin = np.vstack([Rcpin_half, Rcpin_half])
-    Rclin = np.vstack([Rclin_pos, Rclin_neg])
-    Rcpln = np.vstack([Rcpln_pos, Rcpln_neg])
-    R = np.hstack([Rcp, Rcpin, Rclin, Rcpln])
-
-    mot_half = np.vstack(mot_hold)
+    # Duplicates point (1-based) at the first combo that produced the same motion.
+    combo_dup_idx[combo_idx[~is_new]] = ids[~is_new] + 1
+    proc_idx = combo_idx[is_new]
+    combo_proc = np.hstack([(proc_idx + 1).reshape(-1, 1), combo[proc_idx]]).astype(np.int_, copy=False)
+    mot_half = mot_arr[is_new]
     mot_half_rev = np.hstack([-mot_half[:, :6], mot_half[:, 6:]])
     mot_all = np.vstack([mot_half, mot_half_rev])
     mot_all = np.round(mot_all * 1e4) / 1e4
-    if combo_proc_rows_list and combo_proc_rows_list[0].shape[0] == combo.shape[1] + 1:
-        # Parallel path stores [combo_index, combo_cols...] rows directly.
-        combo_proc = np.vstack(combo_proc_rows_list).astype(np.int_, copy=False)
-    elif combo_proc_indices:
-        indices_arr = np.array(combo_proc_indices, dtype=np.int_).reshape(-1, 1)
-        combos_arr = np.vstack(combo_proc_rows_list)
-        combo_proc = np.hstack([indices_arr, combos_arr])
-    else:
-        combo_proc = np.empty((0, combo.shape[1] + 1), dtype=np.int_)
 
     # Match MATLAB unique(mot_all_org, 'rows'): first occurrence per unique motion
-    _, uniq_idx = np.unique(mot_all, axis=0, return_index=True)
-    R_uniq = R[uniq_idx, :]
+    R_uniq = R[unique_motion_rows(mot_all), :]
     rating_res = aggregate_ratings(R_uniq)
     Ri_full = np.where(np.isfinite(R) & (R > 0), 1.0 / R, 0.0)
     Ri_full = np.round(Ri_full * 1e4) * 1e-4
@@ -456,9 +777,121 @@ def analyze_constraints_detailed(
         max_d=max_d,
         constraints=constraints,
         combo=combo,
+        combo_skipped=combo_skipped,
+    )
+
+
+AnyConstraint = Union[PointConstraint, PinConstraint, LineConstraint, PlaneConstraint]
+
+
+def _with_constraint(constraints: ConstraintSet, new_constraint: AnyConstraint) -> Tuple[ConstraintSet, int]:
+    """Copy of ``constraints`` with ``new_constraint`` appended to its type list, plus its 1-based index."""
+    lists = {name: list(getattr(constraints, name)) for name in ("points", "pins", "lines", "planes")}
+    for name, kind in (
+        ("points", PointConstraint),
+        ("pins", PinConstraint),
+        ("lines", LineConstraint),
+        ("planes", PlaneConstraint),
+    ):
+        if isinstance(new_constraint, kind):
+            lists[name].append(new_constraint)
+            break
+    else:
+        raise TypeError(f"extend_detailed: unsupported constraint type {type(new_constraint).__name__}")
+    extended = ConstraintSet(**lists)
+    pos = 0
+    for name in ("points", "pins", "lines", "planes"):
+        pos += len(lists[name])
+        if lists[name] and lists[name][-1] is new_constraint:
+            return extended, pos
+    raise AssertionError("unreachable")
+
+
+def extend_detailed(baseline: DetailedAnalysisResult, new_constraint: AnyConstraint) -> DetailedAnalysisResult:
+    """Analysis of ``baseline.constraints`` plus ``new_constraint`` without re-running the old combos.
+
+    The new constraint is appended to its type list (as ``constraint_set_with`` does), so it
+    takes 1-based index ``p`` and later constraints shift by one. Combos without ``p`` keep
+    their rank and motion, so they are read from ``baseline`` (``combo_proc``,
+    ``combo_dup_idx``, ``mot_half``) and only combos containing ``p`` go through the rank-5
+    test and ``rec_mot``. The duplicate-motion race is then replayed over old and new rank-5
+    combos in full-table order, and the winning motions are rated against every constraint:
+    the added contact points can move each motion's input wrench, and the rank-one kernel's
+    rounding depends on the candidate count, so reused rows would not be bit-identical.
+
+    The result equals ``analyze_constraints_detailed`` on the extended set (NumPy path).
+    ``baseline`` must come from that function and is not modified.
+    """
+    constraints, p = _with_constraint(baseline.constraints, new_constraint)
+    wr_all_sys, pts, max_d = cp_to_wrench(constraints)
+    wr_all_list: List[NDArray[np.float64]] = [w.as_array() for w in wr_all_sys]
+    combos = combo_stream(constraints)
+    combo = combo_preproc(constraints)
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
+
+    # Old rank-5 combos (winners and duplicates) with their rounded motions, in new-table indices.
+    dup = np.flatnonzero(baseline.combo_dup_idx)
+    old_idx = np.concatenate([baseline.combo_proc[:, 0] - 1, dup])
+    old_mot = baseline.mot_half[np.concatenate([np.arange(baseline.no_mot_half), baseline.combo_dup_idx[dup] - 1])]
+    old_rows = baseline.combo[old_idx]
+    old_rows = np.where(old_rows >= p, old_rows + 1, old_rows)
+    old_new_idx = combos.index_of(old_rows).astype(np.intp) if old_idx.size else np.empty(0, dtype=np.intp)
+
+    # Combos containing the new constraint: viable row count, then the batched rank-5 test.
+    cand = np.flatnonzero(np.any(combo == p, axis=1))
+    cand = cand[viable_combo_indices(combo[cand], constraint_row_counts(constraints))]
+    added_idx = cand[_rank5_combo_indices(combo[cand], wr_all_list)]
+    added_rows = _combo_motions(combo, added_idx, wr_all_list)
+    added_mot = np.round(added_rows * 1e4) / 1e4
+
+    combo_idx = np.concatenate([old_new_idx, added_idx])
+    order = np.argsort(combo_idx, kind="stable")
+    combo_idx = combo_idx[order]
+    mot_arr = np.vstack([old_mot, added_mot])[order]
+    from_old = (np.arange(order.size) < old_new_idx.size)[order]
+    ids, is_new = MotionKeyIndex().insert(mot_arr)
+    uniq_rows = np.flatnonzero(is_new)
+    if uniq_rows.size == 0:
+        return _detailed_result(
+            constraints, combo, combos.n_skipped, wr_all_list, pts, max_d, combo_idx, mot_arr, ids, is_new, None
+        )
+
+    # Unrounded motions of the winners (rec_mot again only for old winners, one SVD each).
+    win_old = from_old[uniq_rows]
+    mot_rows = np.empty((uniq_rows.size, 10), dtype=float)
+    mot_rows[win_old] = _combo_motions(combo, combo_idx[uniq_rows[win_old]], wr_all_list)
+    mot_rows[~win_old] = added_rows[np.searchsorted(added_idx, combo_idx[uniq_rows[~win_old]])]
+    react_wr_5, input_wr = _compose_motion_inputs(mot_rows, combo[combo_idx[uniq_rows]], constraints, pts, max_d)
+    R = _R_from_blocks(
+        _rate_motions_all_constraints(mot_arr[uniq_rows], react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop)
+    )
+    return _detailed_result(
+        constraints, combo, combos.n_skipped, wr_all_list, pts, max_d, combo_idx, mot_arr, ids, is_new, R
     )
 
 
+def rate_rank5_combos(
+    constraints: ConstraintSet, combo_rows: NDArray[np.int_]
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Rounded motions and R rows of the given rank-5 combos, rated as the sequential pipeline does.
+
+    ``combo_rows`` (M, 5) are 1-based, zero-padded rows of ``combo_preproc(constraints)``
+    already known to have rank 5. Returns ``mot_arr`` (M, 10) and ``R`` (2M, total_cp),
+    forward rows over reverse rows.
+    """
+    combo_rows = np.atleast_2d(np.asarray(combo_rows, dtype=np.int_))
+    wr_all_sys, pts, max_d = cp_to_wrench(constraints)
+    wr_all = [w.as_array() for w in wr_all_sys]
+    mot_rows = _combo_motions(combo_rows, np.arange(combo_rows.shape[0]), wr_all)
+    mot_arr = np.round(mot_rows * 1e4) / 1e4
+    react_wr_5, input_wr = _compose_motion_inputs(mot_rows, combo_rows, constraints, pts, max_d)
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
+    R = _R_from_blocks(
+        _rate_motions_all_constraints(mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop)
+    )
+    return mot_arr, R
+
+
 def run_main_loop(
     combo: NDArray[np.int_],
     wr_all: List[NDArray[np.float64]],
@@ -467,52 +900,16 @@ def run_main_loop(
     max_d: float,
 ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
     """Run main_loop on given combo and wr_all; return mot_half and R (forward+reverse, all constraint types)."""
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
     total_cp = constraints.total_cp
-    mot_hold: List[NDArray[np.float64]] = []
-    Rcp_pos_rows: List[NDArray[np.float64]] = []
-    Rcp_neg_rows: List[NDArray[np.float64]] = []
-    Rcpin_rows: List[NDArray[np.float64]] = []
-    Rclin_pos_rows: List[NDArray[np.float64]] = []
-    Rclin_neg_rows: List[NDArray[np.float64]] = []
-    Rcpln_pos_rows: List[NDArray[np.float64]] = []
-    Rcpln_neg_rows: List[NDArray[np.float64]] = []
-
-    for combo_row in combo:
-        W = form_combo_wrench(wr_all, combo_row)
-        if W.size == 0 or matlab_rank(W) != 5:
-            continue
-        mot = rec_mot(W)
-        mot_arr = mot.as_array().ravel()
-        input_wr, _ = input_wr_compose(mot, pts, max_d)
-        react_wr_5 = react_wr_5_compose(constraints, combo_row, mot.rho)
-        rcp_pos, rcp_neg, rcpin, rclin_pos, rclin_neg, rcpln_pos, rcpln_neg = _rate_motion_all_constraints(
-            mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
-        )
-        mot_hold.append(mot_arr)
-        Rcp_pos_rows.append(rcp_pos)
-        Rcp_neg_rows.append(rcp_neg)
-        Rcpin_rows.append(rcpin)
-        Rclin_pos_rows.append(rclin_pos)
-        Rclin_neg_rows.append(rclin_neg)
-        Rcpln_pos_rows.append(rcpln_pos)
-        Rcpln_neg_rows.append(rcpln_neg)
-
-    if not mot_hold:
+    rank5 = _rank5_combo_indices(combo, wr_all)
+    if rank5.size == 0:
         return np.empty((0, 10), dtype=float), np.empty((0, max(1, total_cp)), dtype=float)
-    mot_half = np.vstack(mot_hold)
-    Rcp_pos = np.vstack(Rcp_pos_rows)
-    Rcp_neg = np.vstack(Rcp_neg_rows)
-    Rcpin_half = np.vstack(Rcpin_rows)
-    Rclin_pos = np.vstack(Rclin_pos_rows)
-    Rclin_neg = np.vstack(Rclin_neg_rows)
-    Rcpln_pos = np.vstack(Rcpln_pos_rows)
-    Rcpln_neg = np.vstack(Rcpln_neg_rows)
-    Rcp = np.vstack([Rcp_pos, Rcp_neg])
-    Rcpin = np.vstack([Rcpin_half, Rcpin_half])
-    Rclin = np.vstack([Rclin_pos, Rclin_neg])
-    Rcpln = np.vstack([Rcpln_pos, Rcpln_neg])
-    R = np.hstack([Rcp, Rcpin, Rclin, Rcpln])
+    mot_half = _combo_motions(combo, rank5, wr_all)
+    react_wr_5, input_wr = _compose_motion_inputs(mot_half, combo[rank5], constraints, pts, max_d)
+    R = _R_from_blocks(
+        _rate_motions_all_constraints(mot_half, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop)
+    )
     return mot_half, R
 
 
@@ -539,46 +936,22 @@ def analyze_specified_motions(
         raise ValueError("specmot must have 7 columns per row: omega(3), rho(3), h(1)")
 
     _, pts, max_d = cp_to_wrench(constraints)
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
-
-    Rcp_pos_rows: List[NDArray[np.float64]] = []
-    Rcp_neg_rows: List[NDArray[np.float64]] = []
-    Rcpin_rows: List[NDArray[np.float64]] = []
-    Rclin_pos_rows: List[NDArray[np.float64]] = []
-    Rclin_neg_rows: List[NDArray[np.float64]] = []
-    Rcpln_pos_rows: List[NDArray[np.float64]] = []
-    Rcpln_neg_rows: List[NDArray[np.float64]] = []
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
 
-    for m in range(specmot.shape[0]):
+    n_mot = specmot.shape[0]
+    mot_arr = np.empty((n_mot, 10), dtype=float)
+    pivot_wr: List[NDArray[np.float64]] = []
+    input_wr = np.empty((n_mot, 6), dtype=float)
+    for m in range(n_mot):
         screw = specmot_row_to_screw(specmot[m, :])
-        mot_arr = screw.as_array().ravel()
+        mot_arr[m] = screw.as_array().ravel()
         rec_mot_mat = np.concatenate([screw.mu, screw.omu]).reshape(1, 6)
         ns = null_space(rec_mot_mat)
-        pivot_wr = ns.T if ns.size else np.empty((0, 6), dtype=float)
-        input_wr, _ = input_wr_compose(screw, pts, max_d)
-        rcp_pos, rcp_neg, rcpin, rclin_pos, rclin_neg, rcpln_pos, rcpln_neg = _rate_motion_all_constraints(
-            mot_arr, pivot_wr, input_wr, cp, cpin, clin, cpln, cpln_prop
-        )
-        Rcp_pos_rows.append(rcp_pos)
-        Rcp_neg_rows.append(rcp_neg)
-        Rcpin_rows.append(rcpin)
-        Rclin_pos_rows.append(rclin_pos)
-        Rclin_neg_rows.append(rclin_neg)
-        Rcpln_pos_rows.append(rcpln_pos)
-        Rcpln_neg_rows.append(rcpln_neg)
-
-    Rcp_pos = np.vstack(Rcp_pos_rows)
-    Rcp_neg = np.vstack(Rcp_neg_rows)
-    Rcpin_half = np.vstack(Rcpin_rows)
-    Rclin_pos = np.vstack(Rclin_pos_rows)
-    Rclin_neg = np.vstack(Rclin_neg_rows)
-    Rcpln_pos = np.vstack(Rcpln_pos_rows)
-    Rcpln_neg = np.vstack(Rcpln_neg_rows)
-    Rcp = np.vstack([Rcp_pos, Rcp_neg])
-    Rcpin = np.vstack([Rcpin_half, Rcpin_half])
-    Rclin = np.vstack([Rclin_pos, Rclin_neg])
-    Rcpln = np.vstack([Rcpln_pos, Rcpln_neg])
-    R = np.hstack([Rcp, Rcpin, Rclin, Rcpln])
+        pivot_wr.append(ns.T if ns.size else np.empty((0, 6), dtype=float))
+        input_wr[m] = input_wr_compose(screw, pts, max_d)[0].reshape(6)
+    R = _R_from_blocks(
+        _rate_motions_all_constraints(mot_arr, pivot_wr, input_wr, cp, cpin, clin, cpln, cpln_prop)
+    )
 
     specmot_rev = np.hstack([-specmot[:, 0:3], specmot[:, 3:7]])
     mot_proc = np.vstack([specmot, specmot_rev])
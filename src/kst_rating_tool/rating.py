@@ -358,7 +358,7 @@ def rate_motset(
     combo_set: (n_mot, 5) constraint indices per motion; mot_half: (n_mot, 10); cp_set: 1-based indices.
     Returns R shape (2*n_mot, len(cp_set)) with Rpos then Rneg.
     """
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
     no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
     n_mot = mot_half.shape[0]
     n_cp_set = cp_set.size
@@ -1,111 +1,540 @@
 """Batched constraint rating (vectorized NumPy / optional PyTorch).
 
-Mirrors ``rating._rate_motion_all_constraints`` outputs for one motion.
+Mirrors ``rating._rate_motion_all_constraints`` outputs, for one motion or for
+a whole (M, 10) motion array at once.
+
+Every candidate wrench ``w`` of a motion is rated by the last coefficient of
+``[react_wr_5; w]' \\ input_wr``. The five pivot rows are shared, so the
+default (rank-one) kernel factors them once: with ``n`` the null vector of
+``react_wr_5``, ``n' [react_wr_5; w]' = [0 0 0 0 0 n.w]`` and therefore
+``x_last = (n . input_wr) / (n . w)``; the rank-6 test becomes ``|n . w| > tol``.
+``parity=True`` keeps the per-candidate MATLAB rank + mldivide path, which
+reproduces ``rating.rate_*`` bit for bit.
 """
 
 from __future__ import annotations
 
+from typing import Callable, Sequence
+
 import numpy as np
 from numpy.typing import NDArray
 
+from .constraints import ConstraintSet
+from .input_wr import input_wr_compose
+from .motion import screw_from_array
 from .numeric_backend import BackendState
-from .utils import matlab_rank_batched
+from .utils import matlab_rank_batched, rowwise_dot
+from .wrench import WrenchTemplates, wrench_templates
 
+# Motions per vectorized block in rate_motions_batched_numpy; bounds the
+# (M, n_candidates, 6) wrench stack (and the parity path's stacked systems).
+RATE_MOTION_CHUNK = 2048
 
-def _rate_cp_batch_numpy(
-    mot: NDArray[np.float64],
+_RatingBlocks = tuple[
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+]
+
+# Signature of _last_coeff_batched: (react_wr_5, input_wr, wr, parity, require_finite_sol) -> (val, ok).
+LastCoeffFn = Callable[..., tuple[NDArray[np.float64], NDArray[np.bool_]]]
+
+
+class PivotFactor:
+    """Null vector of a rank-5 ``react_wr_5`` plus what the rank-6 tolerance needs.
+
+    Built once per motion by :func:`factor_pivot_wrench`; ``proj_input`` is
+    ``n . input_wr``, the numerator shared by every candidate.
+    """
+
+    __slots__ = ("null_vec", "s_max", "s_min", "n_rows", "proj_input")
+
+    def __init__(
+        self,
+        null_vec: NDArray[np.float64],
+        s_max: float,
+        s_min: float,
+        n_rows: int,
+        proj_input: float,
+    ) -> None:
+        self.null_vec = null_vec
+        self.s_max = s_max
+        self.s_min = s_min
+        self.n_rows = n_rows
+        self.proj_input = proj_input
+
+
+def _factor_pivot_batched(
+    R: NDArray[np.float64],
+    b: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], NDArray[np.bool_]]:
+    """Stacked :func:`factor_pivot_wrench` for ``R`` (M, k, 6) and ``b`` (M, 6).
+
+    Returns ``(null_vec, s_max, s_min, proj_input, valid)``; rows with ``valid``
+    False (non-finite input or rank != 5) carry NaN.
+    """
+    M, k = R.shape[0], R.shape[1]
+    null_vec = np.full((M, 6), np.nan)
+    s_max = np.full(M, np.nan)
+    s_min = np.full(M, np.nan)
+    proj = np.full(M, np.nan)
+    valid: NDArray[np.bool_] = np.asarray(np.isfinite(R).all(axis=(1, 2)) & np.isfinite(b).all(axis=1))
+    if k < 5 or not np.any(valid):
+        return null_vec, s_max, s_min, proj, np.zeros(M, dtype=bool)
+    _, s, vh = np.linalg.svd(R[valid], full_matrices=True)
+    tol = max(k, 6) * np.spacing(s[:, 0])
+    rank5 = np.sum(s > tol[:, None], axis=1) == 5
+    idx = np.flatnonzero(valid)[rank5]
+    valid[:] = False
+    valid[idx] = True
+    null_vec[idx] = vh[rank5, 5]
+    s_max[idx] = s[rank5, 0]
+    s_min[idx] = s[rank5, 4]
+    proj[idx] = rowwise_dot(null_vec[idx], b[idx])
+    return null_vec, s_max, s_min, proj, valid
+
+
+def factor_pivot_wrench(
     react_wr_5: NDArray[np.float64],
     input_wr: NDArray[np.float64],
-    cp_rows: NDArray[np.float64],
-) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
-    from .rating import rate_cp
+) -> PivotFactor | None:
+    """Factor the shared pivot rows of one motion; ``None`` if they are not exactly rank 5.
 
-    N = cp_rows.shape[0]
-    if N == 0:
-        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
-    k = int(react_wr_5.shape[0])
-    if k != 5:
-        Rpos = np.full(N, np.inf, dtype=np.float64)
-        Rneg = np.full(N, np.inf, dtype=np.float64)
-        for j in range(N):
-            Rpos[j], Rneg[j] = rate_cp(mot, react_wr_5, input_wr, cp_rows[j, :])
-        return Rpos, Rneg
-    rho = mot[6:9]
-    cp_pos = cp_rows[:, 0:3] - rho
-    n = cp_rows[:, 3:6]
-    wr_pt = np.concatenate([n, np.cross(cp_pos, n, axis=1)], axis=1)
-    rw = react_wr_5[None, :, :]
-    stacked = np.concatenate([np.broadcast_to(rw, (N, 5, 6)), wr_pt[:, None, :]], axis=1)
-    ranks = matlab_rank_batched(stacked)
-    rank_ok = ranks == 6
-    react_wr = np.transpose(stacked, (0, 2, 1))
-    b = np.asarray(input_wr, dtype=np.float64).reshape(6)
-    finite_ok = np.isfinite(react_wr).all(axis=(1, 2)) & np.all(np.isfinite(b))
-    good = rank_ok & finite_ok
-    x = np.full((N, 6), np.nan, dtype=np.float64)
+    ``react_wr_5`` may carry more than five rows (e.g. two planes) as long as its
+    MATLAB rank is 5: the last coefficient of the (underdetermined) system is still
+    unique and equal to ``(n . input_wr) / (n . w)``.
+    """
+    R = np.asarray(react_wr_5, dtype=np.float64)
+    b = np.asarray(input_wr, dtype=np.float64).reshape(-1)
+    if R.ndim != 2 or R.shape[1] != 6 or R.shape[0] < 5 or b.size != 6:
+        return None
+    null_vec, s_max, s_min, proj, valid = _factor_pivot_batched(R[None], b[None])
+    if not valid[0]:
+        return None
+    return PivotFactor(null_vec[0], float(s_max[0]), float(s_min[0]), int(R.shape[0]), float(proj[0]))
+
+
+def _last_coeff_rank1_batched(
+    null_vec: NDArray[np.float64],
+    s_max: NDArray[np.float64],
+    s_min: NDArray[np.float64],
+    n_rows: int,
+    proj_input: NDArray[np.float64],
+    wr: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Last static coefficient and rank-6 flag for candidates ``wr`` (M, C, 6) of M motions.
+
+    The smallest singular value of ``[react_wr_5; w]`` lies between
+    ``|n . w| * s5 / (s5 + |w|)`` and ``|n . w|`` (``s5``: fifth singular value of
+    the pivot rows), so the lower bound is compared against MATLAB's
+    ``max(size) * eps(max(svd))`` with ``max(svd)`` estimated as
+    ``hypot(s_max, |w|)``. Candidates this rejects but MATLAB keeps are near
+    singular, with resistances around 1e13 and above that round to ``Ri = 0``.
+    """
+    denom = (wr @ null_vec[:, :, None])[..., 0]
+    w_norm = np.sqrt(np.einsum("mij,mij->mi", wr, wr))
+    s_max_c, s_min_c = s_max[:, None], s_min[:, None]
+    tol = max(n_rows + 1, 6) * np.spacing(np.hypot(s_max_c, w_norm))
+    s_min_lower = np.abs(denom) * (s_min_c / (s_min_c + w_norm))
+    ok = np.isfinite(denom) & (s_min_lower > tol)
+    val = np.full(denom.shape, np.nan, dtype=np.float64)
+    val[ok] = np.broadcast_to(proj_input[:, None], denom.shape)[ok] / denom[ok]
+    ok &= np.isfinite(val)
+    return val, ok
+
+
+def _last_coeff_rank1(
+    factor: PivotFactor,
+    wr: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Single-motion :func:`_last_coeff_rank1_batched` for candidates ``wr`` (N, 6)."""
+    val, ok = _last_coeff_rank1_batched(
+        factor.null_vec[None],
+        np.array([factor.s_max]),
+        np.array([factor.s_min]),
+        factor.n_rows,
+        np.array([factor.proj_input]),
+        wr[None],
+    )
+    return val[0], ok[0]
+
+
+def _last_coeff_exact_batched(
+    react_wr_5: NDArray[np.float64],
+    input_wr: NDArray[np.float64],
+    wr: NDArray[np.float64],
+    require_finite_sol: bool | NDArray[np.bool_] = True,
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Per-candidate MATLAB ``rank(...)==6`` + ``react_wr \\ input_wr`` (parity path).
+
+    ``react_wr_5`` (M, k, 6), ``input_wr`` (M, 6), ``wr`` (M, C, 6). Same
+    arithmetic as ``rating.rate_cp``: stacked ranks use the values-only SVD,
+    square systems use one batched LU solve (identical to per-matrix
+    ``np.linalg.solve``) and non-square systems go through ``_matlab_mldivide``.
+    ``require_finite_sol`` (scalar or per candidate column) selects ``rate_cp``'s
+    "whole solution finite" check; the pin/line/plane ports only look at the
+    last entry.
+    """
+    from .rating import _matlab_mldivide
+
+    M, C = wr.shape[0], wr.shape[1]
+    k = int(react_wr_5.shape[1])
+    val = np.full(M * C, np.nan, dtype=np.float64)
+    if M * C == 0:
+        return val.reshape(M, C), np.zeros((M, C), dtype=bool)
+    stacked = np.concatenate(
+        [np.broadcast_to(react_wr_5[:, None, :, :], (M, C, k, 6)), wr[:, :, None, :]], axis=2
+    ).reshape(M * C, k + 1, 6)
+    b = np.broadcast_to(np.asarray(input_wr, dtype=np.float64)[:, None, :], (M, C, 6)).reshape(M * C, 6)
+    good = np.isfinite(stacked).all(axis=(1, 2)) & np.isfinite(b).all(axis=1)
+    if k + 1 < 6:
+        good[:] = False
     if np.any(good):
-        for i in np.flatnonzero(good):
+        good[good] = matlab_rank_batched(stacked[good]) == 6
+    idx = np.flatnonzero(good)
+    if idx.size:
+        react_wr = np.transpose(stacked[idx], (0, 2, 1))
+        sol: NDArray[np.float64] | None = None
+        if k + 1 == 6:
             try:
-                x[i] = np.linalg.solve(react_wr[i], b)
+                sol = np.linalg.solve(react_wr, b[idx][..., None])[..., 0]
             except np.linalg.LinAlgError:
-                pass
-    val = x[:, -1]
-    Rpos = np.where(~good, np.inf, np.where(val >= 0, val, np.inf))
-    Rneg = np.where(~good, np.inf, np.where(val < 0, -val, np.inf))
-    return Rpos, Rneg
+                sol = None
+        if sol is None:
+            sol = np.vstack([_matlab_mldivide(A, bi) for A, bi in zip(react_wr, b[idx])])
+        sol_ok = np.isfinite(sol[:, -1])
+        need_all = np.broadcast_to(np.asarray(require_finite_sol, dtype=bool), (M, C)).reshape(-1)[idx]
+        sol_ok &= ~need_all | np.isfinite(sol).all(axis=1)
+        val[idx[sol_ok]] = sol[sol_ok, -1]
+    ok = good & np.isfinite(val)
+    return val.reshape(M, C), ok.reshape(M, C)
 
 
-def _rate_cpin_numpy(
-    mot: NDArray[np.float64],
+def _last_coeff_batched(
     react_wr_5: NDArray[np.float64],
     input_wr: NDArray[np.float64],
-    cpin_row: NDArray[np.float64],
-) -> float:
-    from .rating import rate_cpin
+    wr: NDArray[np.float64],
+    parity: bool = False,
+    require_finite_sol: bool | NDArray[np.bool_] = True,
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """:func:`last_static_coeff` for M motions sharing a pivot row count: ``wr`` (M, C, 6) -> (M, C)."""
+    M = wr.shape[0]
+    val = np.full(wr.shape[:2], np.nan, dtype=np.float64)
+    ok = np.zeros(wr.shape[:2], dtype=bool)
+    exact = np.ones(M, dtype=bool)
+    if not parity:
+        null_vec, s_max, s_min, proj, valid = _factor_pivot_batched(react_wr_5, input_wr)
+        if np.any(valid):
+            val[valid], ok[valid] = _last_coeff_rank1_batched(
+                null_vec[valid], s_max[valid], s_min[valid], react_wr_5.shape[1], proj[valid], wr[valid]
+            )
+        exact = ~valid
+    if np.any(exact):
+        val[exact], ok[exact] = _last_coeff_exact_batched(
+            react_wr_5[exact], input_wr[exact], wr[exact], require_finite_sol
+        )
+    return val, ok
 
-    return rate_cpin(mot, react_wr_5, input_wr, cpin_row)
+
+def _last_coeff_exact(
+    react_wr_5: NDArray[np.float64],
+    input_wr: NDArray[np.float64],
+    wr: NDArray[np.float64],
+    require_finite_sol: bool | NDArray[np.bool_] = True,
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Single-motion :func:`_last_coeff_exact_batched` for candidates ``wr`` (N, 6)."""
+    b = np.asarray(input_wr, dtype=np.float64).reshape(1, 6)
+    val, ok = _last_coeff_exact_batched(react_wr_5[None], b, wr[None], require_finite_sol)
+    return val[0], ok[0]
 
 
-def _rate_cpin_batch_numpy(
-    mot: NDArray[np.float64],
+def last_static_coeff(
     react_wr_5: NDArray[np.float64],
     input_wr: NDArray[np.float64],
-    cpin_rows: NDArray[np.float64],
+    wr: NDArray[np.float64],
+    parity: bool = False,
+    factor: PivotFactor | None = None,
+    require_finite_sol: bool | NDArray[np.bool_] = True,
+) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Last coefficient of ``[react_wr_5; wr[i]]' \\ input_wr`` for every candidate row.
+
+    Returns ``(val, ok)``; ``ok[i]`` is False where MATLAB would skip the candidate
+    (rank != 6 or non-finite solution), and ``val`` is NaN there. The rank-one kernel
+    is used unless ``parity`` is set or the pivot rows are not exactly rank 5.
+    """
+    wr = np.asarray(wr, dtype=np.float64).reshape(-1, 6)
+    if not parity:
+        if factor is None:
+            factor = factor_pivot_wrench(react_wr_5, input_wr)
+        if factor is not None:
+            return _last_coeff_rank1(factor, wr)
+    return _last_coeff_exact(np.asarray(react_wr_5, dtype=np.float64), input_wr, wr, require_finite_sol)
+
+
+def _point_wrenches(points: NDArray[np.float64], normals: NDArray[np.float64], rho: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Unit-force wrench rows ``[n, (p - rho) x n]``; arguments broadcast over leading axes."""
+    arm = points - rho
+    normals = np.broadcast_to(normals, arm.shape)
+    return np.concatenate([normals, np.cross(arm, normals)], axis=-1)
+
+
+def _row_norm(v: NDArray[np.float64]) -> NDArray[np.float64]:
+    """``np.linalg.norm`` over the last axis of 3-vectors (bit-identical to the per-vector call)."""
+    flat = v.reshape(-1, 3)
+    return np.sqrt(rowwise_dot(flat, flat)).reshape(v.shape[:-1])
+
+
+def _cp_wrenches(mot: NDArray[np.float64], cp: NDArray[np.float64]) -> NDArray[np.float64]:
+    """One wrench per point constraint, as in ``rate_cp``. ``mot`` (M, 10) -> (M, n_cp, 6)."""
+    return _point_wrenches(cp[None, :, 0:3], cp[None, :, 3:6], mot[:, None, 6:9])
+
+
+def _cpin_wrenches(mot: NDArray[np.float64], cpin: NDArray[np.float64]) -> tuple[NDArray[np.float64], NDArray[np.bool_]]:
+    """Constraining-direction wrench per pin, as in ``rate_cpin``. ``mot`` (M, 10) -> (M, n_cpin, 6).
+
+    Also returns ``has_dir`` (M, n_cpin); where the rounded constraint direction
+    vanishes (motion along the pin axis) the pin is never rated.
+    """
+    omu, muu, rho, h = mot[:, None, 0:3], mot[:, None, 3:6], mot[:, None, 6:9], mot[:, 9]
+    ctr, normal = cpin[None, :, 0:3], cpin[None, :, 3:6]
+    mom_arm = ctr - rho
+    with np.errstate(invalid="ignore"):
+        line_action = h[:, None, None] * omu + np.cross(omu, mom_arm)
+    line_action[~(_row_norm(mom_arm) > 0)] = 0.0
+    line_action = np.where(np.isfinite(h)[:, None, None], line_action, muu)
+    const_dir = np.cross(normal, np.cross(line_action, normal))
+    const_dir = np.round(const_dir * 1e5) * 1e-5
+    norm = _row_norm(const_dir)
+    has_dir = norm > 0
+    const_dir[has_dir] = const_dir[has_dir] / norm[has_dir][:, None]
+    return _point_wrenches(ctr, const_dir, rho), has_dir
+
+
+def _clin_end_wrenches(mot: NDArray[np.float64], clin: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Wrenches at both line ends, as in ``rate_clin``. ``mot`` (M, 10) -> (M, n_clin, 2, 6)."""
+    ctr = clin[:, 0:3]
+    line_dir = clin[:, 3:6] / _row_norm(clin[:, 3:6])[:, None]
+    offset = (clin[:, 9] / 2.0)[:, None] * line_dir
+    ends = np.stack([ctr + offset, ctr - offset], axis=1)
+    return _point_wrenches(ends[None], clin[None, :, None, 6:9], mot[:, None, None, 6:9])
+
+
+def _cpln1_corner_wrenches(
+    mot: NDArray[np.float64], cpln: NDArray[np.float64], cpln_prop: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Wrenches at the four corners of rectangular planes, as in ``rate_cpln1``. -> (M, n, 4, 6)."""
+    ctr = cpln[:, 0:3]
+    w = (cpln_prop[:, 3] / 2.0)[:, None] * cpln_prop[:, 0:3]
+    hgt = (cpln_prop[:, 7] / 2.0)[:, None] * cpln_prop[:, 4:7]
+    corners = np.stack([ctr + w + hgt, ctr + w - hgt, ctr - w + hgt, ctr - w - hgt], axis=1)
+    return _point_wrenches(corners[None], cpln[None, :, None, 3:6], mot[:, None, None, 6:9])
+
+
+def _cpln2_edge_wrenches(
+    mot: NDArray[np.float64], cpln: NDArray[np.float64], cpln_prop: NDArray[np.float64]
 ) -> NDArray[np.float64]:
-    """One value per pin (same as rate_cpin)."""
-    n = cpin_rows.shape[0]
-    if n == 0:
-        return np.zeros(0, dtype=np.float64)
-    out = np.full(n, np.inf, dtype=np.float64)
-    for j in range(n):
-        out[j] = _rate_cpin_numpy(mot, react_wr_5, input_wr, cpin_rows[j, :])
-    return out
+    """Wrenches at the two rim points of circular planes, as in ``rate_cpln2``. -> (M, n, 2, 6)."""
+    omu, rho, h = mot[:, None, 0:3], mot[:, None, 6:9], mot[:, 9]
+    ctr, normal = cpln[None, :, 0:3], cpln[None, :, 3:6]
+    mom_arm = ctr - rho
+    proj = np.cross(normal, np.cross(mom_arm, normal))
+    no_arm = ~(_row_norm(mom_arm) > 0)
+    proj = np.where(no_arm[..., None], np.cross(omu, normal), proj)
+    norm = _row_norm(proj)
+    has_len = norm > 0
+    proj[has_len] = proj[has_len] / norm[has_len][:, None]
+    offset = proj * cpln_prop[None, :, 0:1]
+    finite_h = np.isfinite(h)[:, None, None]
+    edge1 = np.where(finite_h, ctr + offset, ctr)
+    edge2 = np.where(finite_h, ctr - offset, ctr)
+    edges = np.stack([edge1, edge2], axis=2)
+    return _point_wrenches(edges, normal[:, :, None, :], rho[:, :, None, :])
+
+
+def _combine_endpoint_coeffs(M: NDArray[np.float64], scale: float = 1.0) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Parallel-spring combination of per-endpoint coefficients ``M`` (..., m), as in rate_clin/cpln.
 
+    Coefficients below 1e-4 in magnitude count as zero; ``inf`` marks a skipped
+    endpoint. Returns ``(R_pos, R_neg)`` with ``1 / (scale * sum(1 / M_dir))``.
+    """
+    M = np.where(np.abs(M) < 0.0001, 0.0, M)
+    Mpos = np.where(M > 0, M, np.inf)
+    Mneg = np.where(M < 0, -M, np.inf)
+    out = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for Md in (Mpos, Mneg):
+            inv = 1.0 / Md
+            acc = inv[..., 0]
+            for c in range(1, inv.shape[-1]):
+                acc = acc + inv[..., c]
+            R = 1.0 / (scale * acc) if scale != 1.0 else 1.0 / acc
+            out.append(np.where(np.isfinite(R), R, np.inf))
+    return out[0], out[1]
 
-def _rate_clin_numpy(
+
+def _rate_cp_batch_numpy(
     mot: NDArray[np.float64],
     react_wr_5: NDArray[np.float64],
     input_wr: NDArray[np.float64],
-    clin_row: NDArray[np.float64],
-) -> tuple[float, float]:
-    from .rating import rate_clin
-
-    return rate_clin(mot, react_wr_5, input_wr, clin_row)
+    cp_rows: NDArray[np.float64],
+    parity: bool = False,
+    factor: PivotFactor | None = None,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Rcp_pos, Rcp_neg for every point constraint (same as rate_cp)."""
+    N = cp_rows.shape[0]
+    if N == 0:
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+    wr_pt = _cp_wrenches(np.asarray(mot, dtype=np.float64).reshape(1, -1), cp_rows)[0]
+    val, ok = last_static_coeff(react_wr_5, input_wr, wr_pt, parity=parity, factor=factor)
+    Rpos = np.where(ok & (val >= 0), val, np.inf)
+    Rneg = np.where(ok & (val < 0), -val, np.inf)
+    return Rpos, Rneg
 
 
-def _rate_cpln_numpy(
+def _rate_motion_block(
     mot: NDArray[np.float64],
     react_wr_5: NDArray[np.float64],
     input_wr: NDArray[np.float64],
-    cpln_row: NDArray[np.float64],
-    cpln_prop_row: NDArray[np.float64],
-    ptype: int,
-) -> tuple[float, float]:
-    from .rating import rate_cpln1, rate_cpln2
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    parity: bool,
+    last_coeff: LastCoeffFn = _last_coeff_batched,
+) -> _RatingBlocks:
+    """Rate M motions whose pivot wrenches share a row count: ``react_wr_5`` (M, k, 6).
+
+    ``last_coeff`` rates the candidate stack (:func:`_last_coeff_batched` or a
+    compiled drop-in, see :mod:`kst_rating_tool.numba_kernels`).
+    """
+    M = mot.shape[0]
+    no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
+    ptype = cpln[:, 6].astype(int) if cpln.shape[1] >= 7 else np.ones(no_cpln, dtype=int)
+    rect_idx = np.flatnonzero(ptype != 2)
+    circ_idx = np.flatnonzero(ptype == 2)
+
+    def empty() -> NDArray[np.float64]:
+        return np.zeros((M, 0, 6))
+
+    wr_pin, pin_has_dir = _cpin_wrenches(mot, cpin) if no_cpin else (empty(), np.zeros((M, 0), dtype=bool))
+    blocks = [
+        _cp_wrenches(mot, cp) if no_cp else empty(),
+        wr_pin,
+        _clin_end_wrenches(mot, clin).reshape(M, -1, 6) if no_clin else empty(),
+        _cpln1_corner_wrenches(mot, cpln[rect_idx], cpln_prop[rect_idx]).reshape(M, -1, 6) if rect_idx.size else empty(),
+        _cpln2_edge_wrenches(mot, cpln[circ_idx], cpln_prop[circ_idx]).reshape(M, -1, 6) if circ_idx.size else empty(),
+    ]
+    bounds = np.cumsum([0] + [blk.shape[1] for blk in blocks])
+    wr = np.concatenate(blocks, axis=1)
+    require_finite_sol = np.zeros(wr.shape[1], dtype=bool)
+    require_finite_sol[: bounds[1]] = True  # rate_cp checks the whole solution
+    val, ok = last_coeff(react_wr_5, input_wr, wr, parity=parity, require_finite_sol=require_finite_sol)
+    coeff = np.where(ok, val, np.inf)
+
+    c_cp = coeff[:, bounds[0] : bounds[1]]
+    Rcp_pos = np.where(c_cp >= 0, c_cp, np.inf)
+    Rcp_neg = np.where(c_cp < 0, -c_cp, np.inf)
+    Rcpin = np.where(pin_has_dir, np.abs(coeff[:, bounds[1] : bounds[2]]), np.inf)
+    Rclin_pos, Rclin_neg = _combine_endpoint_coeffs(coeff[:, bounds[2] : bounds[3]].reshape(M, no_clin, 2))
+    Rcpln_pos = np.full((M, no_cpln), np.inf, dtype=float)
+    Rcpln_neg = np.full((M, no_cpln), np.inf, dtype=float)
+    Rcpln_pos[:, rect_idx], Rcpln_neg[:, rect_idx] = _combine_endpoint_coeffs(
+        coeff[:, bounds[3] : bounds[4]].reshape(M, -1, 4)
+    )
+    Rcpln_pos[:, circ_idx], Rcpln_neg[:, circ_idx] = _combine_endpoint_coeffs(
+        coeff[:, bounds[4] : bounds[5]].reshape(M, -1, 2), scale=2.0
+    )
+    return Rcp_pos, Rcp_neg, Rcpin, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg
+
+
+def rate_motions_batched_numpy(
+    mot_arr: NDArray[np.float64],
+    react_wr_5: NDArray[np.float64] | Sequence[NDArray[np.float64]],
+    input_wr: NDArray[np.float64],
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    parity: bool = False,
+    chunk_size: int = RATE_MOTION_CHUNK,
+) -> _RatingBlocks:
+    """Rate every constraint against every motion: the cross-motion form of
+    :func:`rate_motion_all_constraints_batched_numpy`.
+
+    Parameters
+    ----------
+    mot_arr
+        (M, 10) motions (``mot_half`` rows).
+    react_wr_5
+        (M, k, 6) pivot wrench stack, or a length-M sequence of (k_i, 6) arrays
+        when the row count differs between motions (combos with pins, lines or
+        planes); motions are grouped by ``k_i`` internally.
+    input_wr
+        (M, 6) input wrenches.
+    parity
+        Use the per-candidate MATLAB rank + mldivide path (bit-identical to
+        ``rating.rate_*``) instead of the rank-one kernel.
+    chunk_size
+        Motions per vectorized block, bounding the (chunk, candidates, 6) stacks.
+
+    Returns
+    -------
+    Rcp_pos, Rcp_neg, Rcpin, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg, each
+    of shape (M, n_type); row ``i`` equals the single-motion result for motion ``i``.
+    """
+    return _rate_motions_grouped(
+        mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop, parity, chunk_size, _last_coeff_batched
+    )
+
+
+def _rate_motions_grouped(
+    mot_arr: NDArray[np.float64],
+    react_wr_5: NDArray[np.float64] | Sequence[NDArray[np.float64]],
+    input_wr: NDArray[np.float64],
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    parity: bool,
+    chunk_size: int,
+    last_coeff: LastCoeffFn,
+) -> _RatingBlocks:
+    """Body of :func:`rate_motions_batched_numpy`: group motions by pivot row count and rate in chunks."""
+    mot_arr = np.asarray(mot_arr, dtype=np.float64).reshape(-1, 10)
+    input_wr = np.asarray(input_wr, dtype=np.float64).reshape(-1, 6)
+    M = mot_arr.shape[0]
+    widths = (cp.shape[0], cp.shape[0], cpin.shape[0], clin.shape[0], clin.shape[0], cpln.shape[0], cpln.shape[0])
+    out = tuple(np.full((M, w), np.inf, dtype=np.float64) for w in widths)
+    if M == 0:
+        return out  # type: ignore[return-value]
 
-    if ptype == 2:
-        return rate_cpln2(mot, react_wr_5, input_wr, cpln_row, cpln_prop_row)
-    return rate_cpln1(mot, react_wr_5, input_wr, cpln_row, cpln_prop_row)
+    if isinstance(react_wr_5, np.ndarray) and react_wr_5.ndim == 3:
+        groups = [(np.arange(M), np.asarray(react_wr_5, dtype=np.float64))]
+    else:
+        pivots = [np.asarray(r, dtype=np.float64).reshape(-1, 6) for r in react_wr_5]
+        n_rows = np.array([p.shape[0] for p in pivots])
+        groups = []
+        for k in np.unique(n_rows):
+            idx = np.flatnonzero(n_rows == k)
+            groups.append((idx, np.stack([pivots[i] for i in idx]) if idx.size else np.zeros((0, k, 6))))
+
+    step = max(1, int(chunk_size))
+    for idx, R in groups:
+        for s in range(0, idx.size, step):
+            sel = idx[s : s + step]
+            res = _rate_motion_block(
+                mot_arr[sel], R[s : s + step], input_wr[sel], cp, cpin, clin, cpln, cpln_prop, parity, last_coeff
+            )
+            for dst, src in zip(out, res):
+                dst[sel] = src
+    return out  # type: ignore[return-value]
 
 
 def rate_motion_all_constraints_batched_numpy(
@@ -117,34 +546,117 @@ def rate_motion_all_constraints_batched_numpy(
     clin: NDArray[np.float64],
     cpln: NDArray[np.float64],
     cpln_prop: NDArray[np.float64],
-) -> tuple[
-    NDArray[np.float64],
-    NDArray[np.float64],
-    NDArray[np.float64],
-    NDArray[np.float64],
-    NDArray[np.float64],
-    NDArray[np.float64],
-    NDArray[np.float64],
-]:
-    """Same return signature as ``pipeline._rate_motion_all_constraints``."""
-    no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
-    Rcp_pos, Rcp_neg = _rate_cp_batch_numpy(mot_arr, react_wr_5, input_wr, cp) if no_cp else (
-        np.zeros(0),
-        np.zeros(0),
+    parity: bool = False,
+) -> _RatingBlocks:
+    """Same return signature as ``pipeline._rate_motion_all_constraints``.
+
+    Every candidate wrench of the motion (points, pin constraining directions,
+    line ends, rectangle corners, circular rim points) goes into one stack that
+    is rated in a single call; the per-constraint combination rules of
+    ``rating.rate_*`` are then applied on the result. ``parity=True`` uses the
+    per-candidate MATLAB rank + mldivide path instead of the rank-one kernel and
+    reproduces ``rating.rate_*`` bit for bit.
+    """
+    res = rate_motions_batched_numpy(
+        np.asarray(mot_arr, dtype=np.float64).reshape(1, 10),
+        np.asarray(react_wr_5, dtype=np.float64).reshape(1, -1, 6),
+        np.asarray(input_wr, dtype=np.float64).reshape(1, 6),
+        cp, cpin, clin, cpln, cpln_prop,
+        parity=parity,
     )
-    Rcpin_row = _rate_cpin_batch_numpy(mot_arr, react_wr_5, input_wr, cpin) if no_cpin else np.zeros(0)
-    Rclin_pos = np.full(no_clin, np.inf, dtype=float)
-    Rclin_neg = np.full(no_clin, np.inf, dtype=float)
-    for j in range(no_clin):
-        Rclin_pos[j], Rclin_neg[j] = _rate_clin_numpy(mot_arr, react_wr_5, input_wr, clin[j, :])
-    Rcpln_pos = np.full(no_cpln, np.inf, dtype=float)
-    Rcpln_neg = np.full(no_cpln, np.inf, dtype=float)
-    for j in range(no_cpln):
-        ptype = int(cpln[j, 6]) if cpln.shape[1] >= 7 else 1
-        Rcpln_pos[j], Rcpln_neg[j] = _rate_cpln_numpy(
-            mot_arr, react_wr_5, input_wr, cpln[j, :], cpln_prop[j, :], ptype
-        )
-    return Rcp_pos, Rcp_neg, Rcpin_row, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg
+    return tuple(r[0] for r in res)  # type: ignore[return-value]
+
+
+def _motset_pivot_rows(
+    templates: WrenchTemplates, combo: NDArray[np.intp], cp_eval: int
+) -> tuple[NDArray[np.intp], NDArray[np.bool_]]:
+    """Template rows of ``rate_motset``'s pivot for constraint ``cp_eval`` in every combo row.
+
+    The rows of the first slot holding ``cp_eval`` are dropped from the stacked
+    combo rows and the first five that remain are kept. Returns ``(rows, has)``:
+    ``rows`` (n_has, 5) for the combos with ``has`` set (``cp_eval`` present and
+    at least five rows left); the others are never rated.
+    """
+    counts, offsets = templates.counts, templates.offsets
+    M = combo.shape[0]
+    valid = (combo > 0) & (combo <= counts.size)
+    cidx = np.where(valid, combo - 1, 0)
+    per_slot = np.where(valid, counts[cidx], 0)
+    r = np.arange(int(counts.max()), dtype=np.intp)
+    rows_all = (offsets[cidx][:, :, None] + r).reshape(M, -1)
+    hit = combo == cp_eval
+    first = hit & (np.cumsum(hit, axis=1) == 1)
+    keep = ((r < per_slot[:, :, None]) & ~first[:, :, None]).reshape(M, -1)
+    has = hit.any(axis=1) & (keep.sum(axis=1) >= 5)
+    take = keep[has] & (np.cumsum(keep[has], axis=1) <= 5)
+    return rows_all[has][take].reshape(-1, 5), has
+
+
+def rate_motset_batched(
+    combo_set: NDArray[np.int_],
+    mot_half: NDArray[np.float64],
+    cp_set: NDArray[np.int_],
+    constraints: ConstraintSet,
+    pts: NDArray[np.float64],
+    max_d: float,
+    parity: bool = False,
+    chunk_size: int = RATE_MOTION_CHUNK,
+) -> NDArray[np.float64]:
+    """Batched :func:`~kst_rating_tool.rating.rate_motset`: (2 * n_mot, len(cp_set)), Rpos then Rneg.
+
+    For each constraint of ``cp_set`` the pivot rows of every motion are picked
+    from the wrench-template row offsets of its combo (:func:`_motset_pivot_rows`),
+    gathered into one (n_mot, 5, 6) stack, rank-checked with one stacked
+    ``np.linalg.matrix_rank`` call and rated with :func:`_rate_motion_block`
+    against that constraint alone. ``parity=True`` reproduces ``rate_motset``
+    bit for bit; the default rank-one kernel agrees to rounding except on
+    near-singular systems (resistances around 1e-12 and below).
+    """
+    cp, cpin, clin, cpln, cpln_prop = constraints.arrays.as_tuple()
+    mot_half = np.asarray(mot_half, dtype=np.float64).reshape(-1, 10)
+    cp_set = np.asarray(cp_set, dtype=np.intp).reshape(-1)
+    n_mot = mot_half.shape[0]
+    combo = np.asarray(combo_set, dtype=np.intp)
+    combo = np.broadcast_to(combo.reshape(1, -1), (n_mot, combo.size)) if combo.ndim < 2 else combo
+    Rpos = np.full((n_mot, cp_set.size), np.inf, dtype=float)
+    Rneg = np.full((n_mot, cp_set.size), np.inf, dtype=float)
+    templates = wrench_templates(constraints)
+    if n_mot == 0 or not templates.counts.size:
+        return np.vstack([Rpos, Rneg])
+
+    input_wr = np.empty((n_mot, 6), dtype=float)
+    for i, mot_row in enumerate(mot_half):
+        input_wr[i] = input_wr_compose(screw_from_array(mot_row), pts, max_d)[0].reshape(6)
+
+    arrays = (cp, cpin, clin, cpln)
+    bounds = np.cumsum([0] + [a.shape[0] for a in arrays])
+    # Result blocks of _rate_motion_block holding (Rpos, Rneg) per constraint type.
+    type_blocks = ((0, 1), (2, 2), (3, 4), (5, 6))
+    step = max(1, int(chunk_size))
+    for j, cp_eval in enumerate(cp_set.tolist()):
+        if not 0 < cp_eval <= bounds[-1]:
+            continue
+        t = int(np.searchsorted(bounds, cp_eval, side="left")) - 1
+        k = cp_eval - 1 - int(bounds[t])
+        cp_s, cpin_s, clin_s, cpln_s = (a[k : k + 1] if i == t else a[:0] for i, a in enumerate(arrays))
+        cpln_prop_s = cpln_prop[k : k + 1] if t == 3 else cpln_prop[:0]
+        rows, has = _motset_pivot_rows(templates, combo, cp_eval)
+        idx = np.flatnonzero(has)
+        if not idx.size:
+            continue
+        pivots = templates.at(rows, mot_half[idx, 6:9])
+        rank5 = np.linalg.matrix_rank(pivots) == 5
+        idx, pivots = idx[rank5], pivots[rank5]
+        i_pos, i_neg = type_blocks[t]
+        for s in range(0, idx.size, step):
+            sel = idx[s : s + step]
+            res = _rate_motion_block(
+                mot_half[sel], pivots[s : s + step], input_wr[sel],
+                cp_s, cpin_s, clin_s, cpln_s, cpln_prop_s, parity,
+            )
+            Rpos[sel, j] = res[i_pos][:, 0]
+            Rneg[sel, j] = res[i_neg][:, 0]
+    return np.vstack([Rpos, Rneg])
 
 
 def rate_motion_all_constraints_batched_torch(
@@ -166,73 +678,23 @@ def rate_motion_all_constraints_batched_torch(
     NDArray[np.float64],
     NDArray[np.float64],
 ]:
-    """Torch path: batched CP on device; other types delegate to NumPy rating (CPU)."""
-    assert state.kind == "torch" and state.torch_module is not None
-    import torch
-
-    from . import linalg_torch
+    """Torch path: every constraint type rated on ``state.device`` (see ``torch_engine``).
 
-    t = state.torch_module
-    dev = state.device
-    no_cp, no_cpin, no_clin, no_cpln = cp.shape[0], cpin.shape[0], clin.shape[0], cpln.shape[0]
-
-    if no_cp > 0:
-        k_rw = int(react_wr_5.shape[0])
-        if k_rw != 5:
-            return rate_motion_all_constraints_batched_numpy(
-                mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
-            )
-        try:
-            rho = t.as_tensor(mot_arr[6:9], dtype=t.float64, device=dev)
-            cp_rows = t.as_tensor(cp, dtype=t.float64, device=dev)
-            cp_pos = cp_rows[:, 0:3] - rho
-            n = cp_rows[:, 3:6]
-            wr_pt = torch.cat([n, torch.cross(cp_pos, n, dim=1)], dim=1)
-            rw = t.as_tensor(react_wr_5, dtype=t.float64, device=dev).unsqueeze(0).expand(no_cp, -1, -1)
-            stacked = torch.cat([rw, wr_pt.unsqueeze(1)], dim=1)
-            ranks = linalg_torch.matlab_rank_batched_torch(stacked)
-            rank_ok = ranks == 6
-            react_wr = stacked.transpose(1, 2)
-            b = t.as_tensor(input_wr, dtype=t.float64, device=dev).reshape(6)
-            finite_ok = torch.isfinite(react_wr).all(dim=(1, 2)) & torch.isfinite(b).all()
-            good = rank_ok & finite_ok
-            N = no_cp
-            x = torch.full((N, 6), float("nan"), dtype=t.float64, device=dev)
-            if bool(good.any()):
-                idx = torch.nonzero(good, as_tuple=False).squeeze(-1)
-                br = react_wr[idx]
-                bb = b.unsqueeze(0).expand(br.shape[0], -1)
-                x[idx] = torch.linalg.solve(br, bb)
-            val = x[:, -1]
-            inf64 = torch.tensor(float("inf"), dtype=torch.float64, device=dev)
-            Rcp_pos = torch.where(~good, inf64, torch.where(val >= 0, val, inf64))
-            Rcp_neg = torch.where(~good, inf64, torch.where(val < 0, -val, inf64))
-            Rcp_pos = Rcp_pos.detach().cpu().numpy()
-            Rcp_neg = Rcp_neg.detach().cpu().numpy()
-        except RuntimeError:
-            return rate_motion_all_constraints_batched_numpy(
-                mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
-            )
-    else:
-        Rcp_pos = np.zeros(0, dtype=np.float64)
-        Rcp_neg = np.zeros(0, dtype=np.float64)
+    Falls back to the NumPy kernels when the device cannot run the float64 ops.
+    """
+    assert state.kind == "torch" and state.torch_module is not None
+    from .torch_engine import rate_motions_batched_torch
 
-    if no_cpin:
-        Rcpin_row = _rate_cpin_batch_numpy(mot_arr, react_wr_5, input_wr, cpin)
-    else:
-        Rcpin_row = np.zeros(0, dtype=np.float64)
-
-    Rclin_pos = np.full(no_clin, np.inf, dtype=float)
-    Rclin_neg = np.full(no_clin, np.inf, dtype=float)
-    for j in range(no_clin):
-        Rclin_pos[j], Rclin_neg[j] = _rate_clin_numpy(mot_arr, react_wr_5, input_wr, clin[j, :])
-
-    Rcpln_pos = np.full(no_cpln, np.inf, dtype=float)
-    Rcpln_neg = np.full(no_cpln, np.inf, dtype=float)
-    for j in range(no_cpln):
-        ptype = int(cpln[j, 6]) if cpln.shape[1] >= 7 else 1
-        Rcpln_pos[j], Rcpln_neg[j] = _rate_cpln_numpy(
-            mot_arr, react_wr_5, input_wr, cpln[j, :], cpln_prop[j, :], ptype
+    try:
+        res = rate_motions_batched_torch(
+            np.asarray(mot_arr, dtype=np.float64).reshape(1, 10),
+            [np.asarray(react_wr_5, dtype=np.float64).reshape(-1, 6)],
+            np.asarray(input_wr, dtype=np.float64).reshape(1, 6),
+            cp, cpin, clin, cpln, cpln_prop,
+            state,
         )
-
-    return Rcp_pos, Rcp_neg, Rcpin_row, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg
+    except RuntimeError:
+        return rate_motion_all_constraints_batched_numpy(
+            mot_arr, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
+        )
+    return tuple(r[0] for r in res)  # type: ignore[return-value]
@@ -6,7 +6,7 @@ import numpy as np
 from numpy.typing import NDArray
 
 from .constraints import ConstraintSet
-from .utils import matlab_null
+from .wrench import combo_row_indices, wrench_templates
 
 
 def form_combo_wrench(wr_all: List[NDArray[np.float64]], comb: NDArray[np.int_]) -> NDArray[np.float64]:
@@ -32,71 +32,69 @@ def form_combo_wrench(wr_all: List[NDArray[np.float64]], comb: NDArray[np.int_])
     return W
 
 
-def react_wr_5_compose(constraints: ConstraintSet, comb: NDArray[np.int_], rho: NDArray[np.float64]) -> NDArray[np.float64]:
-    """Python port of `react_wr_5_compose.m` for the original (baseline) set.
+def combo_wrench_row_counts(wr_all: List[NDArray[np.float64]], combo: NDArray[np.int_]) -> NDArray[np.int_]:
+    """Number of stacked wrench rows ``form_combo_wrench`` produces for each combo row.
 
-    This function re-computes the five-system constraining wrench matrix
-    referenced to the screw axis position `rho`.
+    combo: (N, 5) 1-based constraint indices, zero padded. Returns shape (N,).
     """
+    combo = np.atleast_2d(np.asarray(combo, dtype=np.intp))
+    if combo.shape[0] == 0 or not wr_all:
+        return np.zeros(combo.shape[0], dtype=np.int_)
+    counts = np.array([np.asarray(w).shape[0] for w in wr_all], dtype=np.int_)
+    valid = combo > 0
+    per_slot = np.where(valid, counts[np.where(valid, combo - 1, 0)], 0)
+    return per_slot.sum(axis=1).astype(np.int_)
 
-    cp, cpin, clin, cpln, _ = constraints.to_matlab_style_arrays()
 
-    no_cp = cp.shape[0]
-    no_cpin = cpin.shape[0]
-    no_clin = clin.shape[0]
-    no_cpln = cpln.shape[0]
+def form_combo_wrench_batched(wr_all: List[NDArray[np.float64]], combo: NDArray[np.int_]) -> NDArray[np.float64]:
+    """Stack pivot wrench matrices for many combos at once.
 
-    rows: List[NDArray[np.float64]] = []
+    Row ``i`` of the result equals ``form_combo_wrench(wr_all, combo[i])``. All
+    combos must produce the same number of rows ``k`` (group them with
+    :func:`combo_wrench_row_counts` first); returns shape (N, k, 6).
+    """
+    combo = np.atleast_2d(np.asarray(combo, dtype=np.intp))
+    n = combo.shape[0]
+    if n == 0 or not wr_all:
+        return np.empty((n, 0, 6), dtype=float)
+    blocks = [np.asarray(w, dtype=float).reshape(-1, 6) for w in wr_all]
+    counts = np.array([b.shape[0] for b in blocks], dtype=np.intp)
+    flat = np.vstack(blocks)
+    return flat[combo_row_indices(counts, combo)]
 
-    for raw_idx in comb:
-        if raw_idx == 0:
-            continue
-        idx = int(raw_idx)
-        if idx <= no_cp:
-            b = idx - 1
-            cp_pos = cp[b, 0:3] - rho
-            n = cp[b, 3:6]
-            mu = np.cross(cp_pos, n)
-            rows.append(np.concatenate([n, mu]))
-        elif idx <= no_cp + no_cpin:
-            b = idx - no_cp - 1
-            cpin_pos = cpin[b, 0:3] - rho
-            axis = cpin[b, 3:6]
-            axes = matlab_null(axis.reshape(1, 3))
-            om1 = axes[:, 0]
-            om2 = axes[:, 1]
-            mu1 = np.cross(cpin_pos, om1)
-            mu2 = np.cross(cpin_pos, om2)
-            rows.append(np.concatenate([om1, mu1]))
-            rows.append(np.concatenate([om2, mu2]))
-        elif idx <= no_cp + no_cpin + no_clin:
-            b = idx - (no_cp + no_cpin) - 1
-            clin_pos = clin[b, 0:3] - rho
-            line_dir = clin[b, 3:6]
-            constraint_dir = clin[b, 6:9]
-            om1 = constraint_dir
-            om2 = np.zeros(3, dtype=float)
-            mu1 = np.cross(clin_pos, om1)
-            mu2 = np.cross(line_dir, constraint_dir)
-            rows.append(np.concatenate([om1, mu1]))
-            rows.append(np.concatenate([om2, mu2]))
-        elif idx <= no_cp + no_cpin + no_clin + no_cpln:
-            b = idx - (no_cp + no_cpin + no_clin) - 1
-            cpln_pos = cpln[b, 0:3] - rho
-            normal = cpln[b, 3:6]
-            axes = matlab_null(normal.reshape(1, 3))
-            om1 = normal
-            om2 = np.zeros(3, dtype=float)
-            om3 = np.zeros(3, dtype=float)
-            mu1 = np.cross(cpln_pos, om1)
-            mu2 = axes[:, 0]
-            mu3 = axes[:, 1]
-            rows.append(np.concatenate([om1, mu1]))
-            rows.append(np.concatenate([om2, mu2]))
-            rows.append(np.concatenate([om3, mu3]))
 
-    if not rows:
+def react_wr_5_compose(constraints: ConstraintSet, comb: NDArray[np.int_], rho: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Python port of `react_wr_5_compose.m` for the original (baseline) set.
+
+    This function re-computes the five-system constraining wrench matrix
+    referenced to the screw axis position `rho`.
+
+    The per-constraint rows come from :func:`wrench_templates` (built once per
+    constraint set); only the moment of rows anchored at a constraint location
+    is recomputed, as ``(pos - rho) x om``.
+    """
+
+    templates = wrench_templates(constraints)
+    rows = combo_row_indices(templates.counts, np.asarray(comb).reshape(1, -1))[0]
+    if rows.size == 0:
         return np.empty((0, 6), dtype=float)
+    return templates.at(rows, np.asarray(rho, dtype=float))
 
-    return np.vstack(rows).astype(float)
 
+def react_wr_5_compose_batched(
+    constraints: ConstraintSet, combos: NDArray[np.int_], rho: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Batched :func:`react_wr_5_compose` over (combo, rho) pairs.
+
+    combos: (N, 5) 1-based constraint indices; rho: (N, 3) screw axis points.
+    Row ``i`` equals ``react_wr_5_compose(constraints, combos[i], rho[i])``. All
+    combos must select the same number of rows ``k``; returns shape (N, k, 6).
+    """
+    combos = np.atleast_2d(np.asarray(combos, dtype=np.intp))
+    rho = np.asarray(rho, dtype=float).reshape(-1, 3)
+    if rho.shape[0] != combos.shape[0]:
+        raise ValueError("react_wr_5_compose_batched: combos and rho differ in length")
+    templates = wrench_templates(constraints)
+    if combos.shape[0] == 0:
+        return np.empty((0, 0, 6), dtype=float)
+    return templates.at(combo_row_indices(templates.counts, combos), rho)
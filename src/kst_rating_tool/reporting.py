@@ -10,6 +10,7 @@ from typing import TextIO
 
 import numpy as np
 
+from .motion import unique_motion_rows
 from .pipeline import DetailedAnalysisResult
 from .rating import RatingResults
 
@@ -145,7 +146,7 @@ def write_report(
 
 def _report_quantities_from_detailed(detailed: DetailedAnalysisResult):
     """From DetailedAnalysisResult compute mot_all_uniq, Ri_uniq, rowsum, best_cp, WTR_idx, cp table. Same logic as write_report."""
-    _, uniq_idx = np.unique(detailed.mot_all, axis=0, return_index=True)
+    uniq_idx = unique_motion_rows(detailed.mot_all)
     mot_all_uniq = detailed.mot_all[uniq_idx, :] if detailed.mot_all.size > 0 else np.empty((0, 10), dtype=float)
     Ri_uniq = detailed.rating.Ri
     total_cp = Ri_uniq.shape[1]
@@ -229,6 +230,7 @@ def write_full_report_txt(detailed: DetailedAnalysisResult, path: Path | str) ->
         f.write("COUNTS\n")
         f.write(f"total_combo\t{combo.shape[0]}\n")
         f.write(f"combo_proc_count\t{combo_proc.shape[0]}\n")
+        f.write(f"combo_skipped\t{detailed.combo_skipped}\n")
         f.write(f"no_mot_half\t{detailed.no_mot_half}\n")
         no_mot_unique = int(mot_all_uniq.shape[0] / 2)
         f.write(f"no_mot_unique\t{no_mot_unique}\n")
@@ -0,0 +1,496 @@
+"""Device-resident PyTorch analysis engine (``accelerator="torch"``).
+
+The NumPy pipeline ranks combos, recovers motions, composes pivot/input wrenches
+and rates every constraint with stacked kernels on the host. :class:`TorchEngine`
+runs the same steps on a torch device: the wrench templates and constraint
+geometry are uploaded once, combo index blocks are gathered into wrench stacks on
+the device, the rank-5 test and reciprocal motion come from one batched SVD, and
+all four constraint types are rated with the rank-one kernel of
+``rating_batched``. Only the final R rows (or, for the detailed analysis, the
+per-combo results) are copied back to the host.
+
+Results agree with the NumPy path to rounding (different LAPACK calls). Where a
+null vector has two entries of equal magnitude and opposite sign, MATLAB's sign
+rule can pick the reversed motion; both directions are rated, so the ratings
+match. The MATLAB-parity mode stays NumPy-only. This module imports ``torch`` at load time,
+so callers import it lazily once a torch accelerator has been resolved.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+import torch
+from numpy.typing import NDArray
+
+from . import linalg_torch
+from .combination import ComboStream
+from .constraints import ConstraintSet
+from .motion import _KEY_NEG_INF, _KEY_POS_INF, MOTION_KEY_SCALE
+from .numeric_backend import BackendState
+from .rating_batched import RATE_MOTION_CHUNK, _row_norm
+from .wrench import cp_to_wrench, wrench_templates
+
+Tensor = Any  # torch.Tensor; kept loose like linalg_torch for builds without torch stubs
+
+_RatingBlocks = Tuple[
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+]
+
+
+def _spacing(x: Tensor) -> Tensor:
+    return linalg_torch._spacing_torch(x)
+
+
+def _cross(a: Tensor, b: Tensor) -> Tensor:
+    return torch.linalg.cross(*torch.broadcast_tensors(a, b), dim=-1)
+
+
+def _norm(v: Tensor) -> Tensor:
+    return torch.sqrt((v * v).sum(dim=-1))
+
+
+def _round(x: Tensor, scale: float = 1e4) -> Tensor:
+    """``np.round(x * scale) / scale`` (torch also rounds half to even)."""
+    return torch.round(x * scale) / scale
+
+
+def _point_wrenches(points: Tensor, normals: Tensor, rho: Tensor) -> Tensor:
+    """Unit-force wrench rows ``[n, (p - rho) x n]``; arguments broadcast over leading axes."""
+    arm = points - rho
+    normals = normals.expand_as(arm)
+    return torch.cat([normals, _cross(arm, normals)], dim=-1)
+
+
+@dataclass(frozen=True)
+class _Geometry:
+    """Constraint data the rating kernels need, as device tensors."""
+
+    cp: Tensor  # (n_cp, 6)
+    cpin: Tensor  # (n_cpin, 6)
+    clin_ends: Tensor  # (n_clin, 2, 3)
+    clin_normal: Tensor  # (n_clin, 3)
+    rect_idx: Tensor  # plane indices rated by rate_cpln1
+    rect_corners: Tensor  # (n_rect, 4, 3)
+    rect_normal: Tensor  # (n_rect, 3)
+    circ_idx: Tensor  # plane indices rated by rate_cpln2
+    circ: Tensor  # (n_circ, 6) centre and normal
+    circ_radius: Tensor  # (n_circ,)
+    n_cpln: int
+
+    @property
+    def widths(self) -> Tuple[int, ...]:
+        n_cp, n_cpin, n_clin = self.cp.shape[0], self.cpin.shape[0], self.clin_ends.shape[0]
+        return (n_cp, n_cp, n_cpin, n_clin, n_clin, self.n_cpln, self.n_cpln)
+
+
+def _build_geometry(
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    device: Any,
+) -> _Geometry:
+    """Static candidate points (line ends, rectangle corners) as in ``rating_batched``."""
+
+    def tensor(a: NDArray[Any], shape: Tuple[int, ...]) -> Tensor:
+        return torch.as_tensor(np.array(a, dtype=np.float64).reshape(shape), device=device)
+
+    n_clin, n_cpln = clin.shape[0], cpln.shape[0]
+    ends = np.zeros((n_clin, 2, 3))
+    if n_clin:
+        line_dir = clin[:, 3:6] / _row_norm(clin[:, 3:6])[:, None]
+        offset = (clin[:, 9] / 2.0)[:, None] * line_dir
+        ends = np.stack([clin[:, 0:3] + offset, clin[:, 0:3] - offset], axis=1)
+    ptype = cpln[:, 6].astype(int) if cpln.shape[1] >= 7 else np.ones(n_cpln, dtype=int)
+    rect_idx, circ_idx = np.flatnonzero(ptype != 2), np.flatnonzero(ptype == 2)
+    corners = np.zeros((rect_idx.size, 4, 3))
+    radius = np.zeros(circ_idx.size)
+    if rect_idx.size:
+        ctr, prop = cpln[rect_idx, 0:3], cpln_prop[rect_idx]
+        w = (prop[:, 3] / 2.0)[:, None] * prop[:, 0:3]
+        hgt = (prop[:, 7] / 2.0)[:, None] * prop[:, 4:7]
+        corners = np.stack([ctr + w + hgt, ctr + w - hgt, ctr - w + hgt, ctr - w - hgt], axis=1)
+    if circ_idx.size:
+        radius = cpln_prop[circ_idx, 0]
+    return _Geometry(
+        cp=tensor(cp, (-1, 6)),
+        cpin=tensor(cpin, (-1, 6)),
+        clin_ends=tensor(ends, (-1, 2, 3)),
+        clin_normal=tensor(clin[:, 6:9] if n_clin else np.zeros((0, 3)), (-1, 3)),
+        rect_idx=torch.as_tensor(rect_idx, dtype=torch.int64, device=device),
+        rect_corners=tensor(corners, (-1, 4, 3)),
+        rect_normal=tensor(cpln[rect_idx, 3:6] if rect_idx.size else np.zeros((0, 3)), (-1, 3)),
+        circ_idx=torch.as_tensor(circ_idx, dtype=torch.int64, device=device),
+        circ=tensor(cpln[circ_idx, 0:6] if circ_idx.size else np.zeros((0, 6)), (-1, 6)),
+        circ_radius=tensor(radius, (-1,)),
+        n_cpln=n_cpln,
+    )
+
+
+def _cpin_wrenches(mot: Tensor, cpin: Tensor) -> Tuple[Tensor, Tensor]:
+    """Torch ``rating_batched._cpin_wrenches``: (M, n_cpin, 6) wrenches and ``has_dir``."""
+    omu, muu, rho, h = mot[:, None, 0:3], mot[:, None, 3:6], mot[:, None, 6:9], mot[:, 9]
+    ctr, normal = cpin[None, :, 0:3], cpin[None, :, 3:6]
+    mom_arm = ctr - rho
+    line_action = h[:, None, None] * omu + _cross(omu, mom_arm)
+    line_action = torch.where((_norm(mom_arm) > 0)[..., None], line_action, 0.0)
+    line_action = torch.where(torch.isfinite(h)[:, None, None], line_action, muu)
+    const_dir = _cross(normal, _cross(line_action, normal))
+    const_dir = torch.round(const_dir * 1e5) * 1e-5
+    norm = _norm(const_dir)
+    has_dir = norm > 0
+    const_dir = torch.where(has_dir[..., None], const_dir / torch.where(has_dir, norm, 1.0)[..., None], const_dir)
+    return _point_wrenches(ctr, const_dir, rho), has_dir
+
+
+def _cpln2_edge_wrenches(mot: Tensor, circ: Tensor, radius: Tensor) -> Tensor:
+    """Torch ``rating_batched._cpln2_edge_wrenches``: (M, n_circ, 2, 6)."""
+    omu, rho, h = mot[:, None, 0:3], mot[:, None, 6:9], mot[:, 9]
+    ctr, normal = circ[None, :, 0:3], circ[None, :, 3:6]
+    mom_arm = ctr - rho
+    proj = _cross(normal, _cross(mom_arm, normal))
+    proj = torch.where((_norm(mom_arm) > 0)[..., None], proj, _cross(omu, normal))
+    norm = _norm(proj)
+    has_len = norm > 0
+    proj = torch.where(has_len[..., None], proj / torch.where(has_len, norm, 1.0)[..., None], proj)
+    offset = proj * radius[None, :, None]
+    finite_h = torch.isfinite(h)[:, None, None]
+    edges = torch.stack([torch.where(finite_h, ctr + offset, ctr), torch.where(finite_h, ctr - offset, ctr)], dim=2)
+    return _point_wrenches(edges, normal[:, :, None, :], rho[:, :, None, :])
+
+
+def _combine_endpoint_coeffs(coeff: Tensor, scale: float = 1.0) -> Tuple[Tensor, Tensor]:
+    """Torch ``rating_batched._combine_endpoint_coeffs``."""
+    coeff = torch.where(coeff.abs() < 0.0001, 0.0, coeff)
+    out = []
+    for Md in (torch.where(coeff > 0, coeff, torch.inf), torch.where(coeff < 0, -coeff, torch.inf)):
+        inv = 1.0 / Md
+        acc = inv[..., 0]
+        for c in range(1, inv.shape[-1]):
+            acc = acc + inv[..., c]
+        R = 1.0 / (scale * acc) if scale != 1.0 else 1.0 / acc
+        out.append(torch.where(torch.isfinite(R), R, torch.inf))
+    return out[0], out[1]
+
+
+def _factor_pivot(R: Tensor, b: Tensor) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]:
+    """Torch ``rating_batched._factor_pivot_batched``: null vector, s_max, s_min, n . b, valid."""
+    M, k = R.shape[0], R.shape[1]
+    valid = torch.isfinite(R).all(dim=2).all(dim=1) & torch.isfinite(b).all(dim=1)
+    if k < 5 or M == 0:
+        nan = torch.full((M,), torch.nan, dtype=R.dtype, device=R.device)
+        return torch.full((M, 6), torch.nan, dtype=R.dtype, device=R.device), nan, nan, nan, valid & False
+    _, s, vh = torch.linalg.svd(torch.where(valid[:, None, None], R, 0.0), full_matrices=True)
+    tol = max(k, 6) * _spacing(s[:, 0])
+    valid = valid & ((s > tol[:, None]).sum(dim=1) == 5)
+    null_vec = vh[:, 5, :]
+    return null_vec, s[:, 0], s[:, 4], (null_vec * b).sum(dim=1), valid
+
+
+def _last_coeff_exact(R: Tensor, b: Tensor, wr: Tensor, require_finite_sol: Tensor) -> Tuple[Tensor, Tensor]:
+    """Per-candidate MATLAB rank + mldivide on the device, for pivots that are not rank 5."""
+    M, C, k = wr.shape[0], wr.shape[1], R.shape[1]
+    val = torch.full((M * C,), torch.nan, dtype=wr.dtype, device=wr.device)
+    stacked = torch.cat([R[:, None].expand(M, C, k, 6), wr[:, :, None, :]], dim=2).reshape(M * C, k + 1, 6)
+    bb = b[:, None, :].expand(M, C, 6).reshape(M * C, 6)
+    good = torch.isfinite(stacked).all(dim=2).all(dim=1) & torch.isfinite(bb).all(dim=1)
+    if k + 1 >= 6 and bool(good.any()):
+        idx = torch.nonzero(good).squeeze(-1)
+        idx = idx[linalg_torch.matlab_rank_batched_torch(stacked[idx]) == 6]
+        if idx.numel():
+            sol = linalg_torch.matlab_mldivide_batched_torch(stacked[idx].transpose(1, 2), bb[idx]).to(wr.dtype)
+            need_all = require_finite_sol.expand(M, C).reshape(-1)[idx]
+            sol_ok = torch.isfinite(sol[:, -1]) & (~need_all | torch.isfinite(sol).all(dim=1))
+            val[idx[sol_ok]] = sol[sol_ok, -1]
+    val = val.reshape(M, C)
+    return val, torch.isfinite(val)
+
+
+def _last_coeff(R: Tensor, b: Tensor, wr: Tensor, require_finite_sol: Tensor) -> Tuple[Tensor, Tensor]:
+    """Rank-one last static coefficient for M motions (pivots ``R`` (M, k, 6), candidates (M, C, 6))."""
+    null_vec, s_max, s_min, proj, valid = _factor_pivot(R, b)
+    denom = (wr @ null_vec[:, :, None])[..., 0]
+    w_norm = _norm(wr)
+    s_min_c = s_min[:, None]
+    tol = max(R.shape[1] + 1, 6) * _spacing(torch.hypot(s_max[:, None], w_norm))
+    ok = torch.isfinite(denom) & (denom.abs() * (s_min_c / (s_min_c + w_norm)) > tol) & valid[:, None]
+    val = torch.where(ok, proj[:, None] / torch.where(ok, denom, 1.0), torch.nan)
+    ok = ok & torch.isfinite(val)
+    if not bool(valid.all()):
+        ex = torch.nonzero(~valid).squeeze(-1)
+        val[ex], ok[ex] = _last_coeff_exact(R[ex], b[ex], wr[ex], require_finite_sol)
+    return val, ok
+
+
+def _rate_block(mot: Tensor, R: Tensor, b: Tensor, geom: _Geometry) -> Tuple[Tensor, ...]:
+    """Torch ``rating_batched._rate_motion_block`` (rank-one kernel) for pivots of one row count."""
+    M = mot.shape[0]
+    rho = mot[:, None, 6:9]
+    wr_pin, pin_has_dir = _cpin_wrenches(mot, geom.cpin)
+    blocks = [
+        _point_wrenches(geom.cp[None, :, 0:3], geom.cp[None, :, 3:6], rho),
+        wr_pin,
+        _point_wrenches(geom.clin_ends[None], geom.clin_normal[None, :, None, :], rho[:, :, None]).reshape(M, -1, 6),
+        _point_wrenches(geom.rect_corners[None], geom.rect_normal[None, :, None, :], rho[:, :, None]).reshape(
+            M, -1, 6
+        ),
+        _cpln2_edge_wrenches(mot, geom.circ, geom.circ_radius).reshape(M, -1, 6),
+    ]
+    bounds = np.cumsum([0] + [blk.shape[1] for blk in blocks]).tolist()
+    wr = torch.cat(blocks, dim=1)
+    require_finite_sol = torch.zeros(wr.shape[1], dtype=torch.bool, device=wr.device)
+    require_finite_sol[: bounds[1]] = True  # rate_cp checks the whole solution
+    val, ok = _last_coeff(R, b, wr, require_finite_sol)
+    coeff = torch.where(ok, val, torch.inf)
+
+    c_cp = coeff[:, bounds[0] : bounds[1]]
+    Rcp_pos = torch.where(c_cp >= 0, c_cp, torch.inf)
+    Rcp_neg = torch.where(c_cp < 0, -c_cp, torch.inf)
+    Rcpin = torch.where(pin_has_dir, coeff[:, bounds[1] : bounds[2]].abs(), torch.inf)
+    Rclin_pos, Rclin_neg = _combine_endpoint_coeffs(coeff[:, bounds[2] : bounds[3]].reshape(M, -1, 2))
+    Rcpln_pos = torch.full((M, geom.n_cpln), torch.inf, dtype=coeff.dtype, device=coeff.device)
+    Rcpln_neg = Rcpln_pos.clone()
+    rect_pos, rect_neg = _combine_endpoint_coeffs(coeff[:, bounds[3] : bounds[4]].reshape(M, -1, 4))
+    circ_pos, circ_neg = _combine_endpoint_coeffs(coeff[:, bounds[4] : bounds[5]].reshape(M, -1, 2), scale=2.0)
+    Rcpln_pos[:, geom.rect_idx], Rcpln_neg[:, geom.rect_idx] = rect_pos, rect_neg
+    Rcpln_pos[:, geom.circ_idx], Rcpln_neg[:, geom.circ_idx] = circ_pos, circ_neg
+    return Rcp_pos, Rcp_neg, Rcpin, Rclin_pos, Rclin_neg, Rcpln_pos, Rcpln_neg
+
+
+def rate_motions_batched_torch(
+    mot_arr: NDArray[np.float64],
+    react_wr_5: NDArray[np.float64] | Sequence[NDArray[np.float64]],
+    input_wr: NDArray[np.float64],
+    cp: NDArray[np.float64],
+    cpin: NDArray[np.float64],
+    clin: NDArray[np.float64],
+    cpln: NDArray[np.float64],
+    cpln_prop: NDArray[np.float64],
+    state: BackendState,
+    chunk_size: int = RATE_MOTION_CHUNK,
+) -> _RatingBlocks:
+    """Torch counterpart of ``rating_batched.rate_motions_batched_numpy`` (host in, host out).
+
+    All candidate wrenches of all four constraint types are built and rated on
+    ``state.device``; the seven (M, n_type) blocks are copied back once.
+    """
+    dev = state.device
+    mot_arr = np.asarray(mot_arr, dtype=np.float64).reshape(-1, 10)
+    input_wr = np.asarray(input_wr, dtype=np.float64).reshape(-1, 6)
+    geom = _build_geometry(cp, cpin, clin, cpln, cpln_prop, dev)
+    M = mot_arr.shape[0]
+    out = tuple(np.full((M, w), np.inf, dtype=np.float64) for w in geom.widths)
+    if M == 0:
+        return out  # type: ignore[return-value]
+    pivots = [np.asarray(r, dtype=np.float64).reshape(-1, 6) for r in react_wr_5]
+    n_rows = np.array([p.shape[0] for p in pivots])
+    step = max(1, int(chunk_size))
+    for k in np.unique(n_rows):
+        idx = np.flatnonzero(n_rows == k)
+        for s in range(0, idx.size, step):
+            sel = idx[s : s + step]
+            res = _rate_block(
+                torch.as_tensor(mot_arr[sel], device=dev),
+                torch.as_tensor(np.stack([pivots[i] for i in sel]), device=dev),
+                torch.as_tensor(input_wr[sel], device=dev),
+                geom,
+            )
+            for dst, src in zip(out, res):
+                dst[sel] = src.cpu().numpy()
+    return out  # type: ignore[return-value]
+
+
+def _rec_mot(x: Tensor) -> Tensor:
+    """Torch ``motion.rec_mot_batched`` tail: null vectors (N, 6) -> rounded motion rows (N, 10)."""
+    rows = torch.arange(x.shape[0], device=x.device)
+    lead = x[rows, x.abs().argmax(dim=1)]
+    x = _round(torch.where((lead < 0)[:, None], -x, x))
+    mu, om = x[:, 0:3], x[:, 3:6]
+    om_sq = (om * om).sum(dim=1)
+    trans = (torch.sqrt(om_sq) == 0.0)[:, None]
+    safe_sq = torch.where(trans[:, 0], 1.0, om_sq)
+    mu_norm = torch.sqrt((mu * mu).sum(dim=1))
+    mot = torch.cat(
+        [
+            torch.where(trans, om, om / torch.sqrt(safe_sq)[:, None]),
+            torch.where(trans, mu / mu_norm[:, None], mu),
+            torch.where(trans, 0.0, _cross(om, mu) / safe_sq[:, None]),
+            torch.where(trans[:, 0], torch.inf, (mu * om).sum(dim=1) / safe_sq)[:, None],
+        ],
+        dim=1,
+    )
+    return _round(mot)
+
+
+def _input_wrenches(mot: Tensor, pts: Tensor, max_d: float) -> Tensor:
+    """Vectorized ``input_wr.input_wr_compose`` (with ``calc_d``) for motion rows (M, 10)."""
+    omu, mu, rho, h = mot[:, 0:3], mot[:, 3:6], mot[:, 6:9], mot[:, 9]
+    finite_h = torch.isfinite(h)
+    if pts.shape[0]:
+        dist = _norm(_cross(omu[:, None, :], pts[None] - rho[:, None, :])).amax(dim=1)
+        d = torch.clamp(dist, max=max_d)
+    else:
+        d = torch.zeros_like(h)
+    d = torch.where(finite_h, d, torch.inf)
+    hw = 1.0 / h
+    rot = (~torch.isfinite(hw) | (hw.abs() >= d))[:, None]
+    finite = finite_h[:, None]
+    fi = torch.where(finite, torch.where(rot, (h * d)[:, None] * omu, omu), mu)
+    ti = torch.where(finite, torch.where(rot, d[:, None] * omu, hw[:, None] * omu), 0.0)
+    return -torch.cat([fi, ti], dim=1)
+
+
+def _motion_keys(mot: Tensor) -> Tensor:
+    """``motion.motion_keys`` on the device; NaN rows get a trailing row-id column so they never match."""
+    q = torch.round(mot * MOTION_KEY_SCALE)
+    has_nan = torch.isnan(q).any(dim=1)
+    keys = torch.nan_to_num(q, nan=0.0, posinf=float(_KEY_POS_INF), neginf=float(_KEY_NEG_INF)).to(torch.int64)
+    row_id = torch.arange(1, mot.shape[0] + 1, device=mot.device)
+    return torch.cat([keys, torch.where(has_nan, row_id, 0)[:, None]], dim=1)
+
+
+def _first_rows(keys: Tensor) -> Tuple[Tensor, Tensor]:
+    """First row of each distinct key (groups in sorted key order) and group id per row."""
+    _, inverse = torch.unique(keys, dim=0, return_inverse=True)
+    n_groups = int(inverse.max()) + 1 if inverse.numel() else 0
+    first = torch.full((n_groups,), keys.shape[0], dtype=torch.int64, device=keys.device)
+    first = first.scatter_reduce(0, inverse, torch.arange(keys.shape[0], device=keys.device), reduce="amin")
+    return first, inverse
+
+
+@dataclass
+class TorchAnalysis:
+    """Device tensors of one torch analysis run.
+
+    ``combo_idx`` (n,) full-table indices of the rank-5 combos (ascending), ``mot``
+    (n, 10) their rounded motions, ``ids`` / ``is_new`` as returned by
+    ``MotionKeyIndex.insert`` and ``R`` (2 U, total_cp) forward rows then reverse
+    rows for the U new motions (``None`` when there are none).
+    """
+
+    combo_idx: Tensor
+    mot: Tensor
+    ids: Tensor
+    is_new: Tensor
+    R: Tensor | None
+
+    def unique_R(self) -> NDArray[np.float64] | None:
+        """R rows of the distinct motions of ``[mot_half; reversed mot_half]`` (main.m ``unique``)."""
+        if self.R is None:
+            return None
+        mot_half = self.mot[self.is_new]
+        mot_all = _round(torch.cat([mot_half, torch.cat([-mot_half[:, :6], mot_half[:, 6:]], dim=1)]))
+        first, _ = _first_rows(_motion_keys(mot_all))
+        return self.R[first].cpu().numpy()
+
+    def to_host(
+        self,
+    ) -> Tuple[NDArray[np.intp], NDArray[np.float64], NDArray[np.intp], NDArray[np.bool_], NDArray[np.float64] | None]:
+        """``(combo_idx, mot, ids, is_new, R)`` as NumPy arrays."""
+        return (
+            self.combo_idx.cpu().numpy().astype(np.intp),
+            self.mot.cpu().numpy(),
+            self.ids.cpu().numpy().astype(np.intp),
+            self.is_new.cpu().numpy(),
+            None if self.R is None else self.R.cpu().numpy(),
+        )
+
+
+class TorchEngine:
+    """Whole-pipeline analysis of one ConstraintSet on a torch device."""
+
+    def __init__(self, constraints: ConstraintSet, state: BackendState) -> None:
+        if state.kind != "torch":
+            raise ValueError("TorchEngine needs a torch BackendState")
+        self.device = dev = state.device
+        tpl = wrench_templates(constraints)
+        _, pts, max_d = cp_to_wrench(constraints)
+        self.max_d = float(max_d)
+
+        def tensor(a: NDArray[Any]) -> Tensor:
+            return torch.as_tensor(np.array(a, dtype=np.float64), device=dev)
+
+        self.om, self.mu, self.anchor, self.pts = tensor(tpl.om), tensor(tpl.mu), tensor(tpl.anchor), tensor(pts)
+        self.anchored = torch.as_tensor(tpl.anchored, device=dev)
+        # Index 0 is combo padding: no rows.
+        self.counts = torch.as_tensor(np.concatenate([[0], tpl.counts]), dtype=torch.int64, device=dev)
+        self.offsets = torch.as_tensor(np.concatenate([[0], tpl.offsets]), dtype=torch.int64, device=dev)
+        self.geometry = _build_geometry(*constraints.arrays.as_tuple(), dev)
+        self.total_cp = constraints.total_cp
+
+    def _row_index(self, combos: Tensor, k: int) -> Tensor:
+        """Flat template rows of combos (N, 5) that stack ``k`` rows each -> (N, k)."""
+        cand = self.offsets[combos][..., None] + torch.arange(3, device=combos.device)
+        mask = torch.arange(3, device=combos.device) < self.counts[combos][..., None]
+        return cand[mask].reshape(combos.shape[0], k)
+
+    def rank5_motions(self, combos: ComboStream) -> Tuple[Tensor, Tensor, Tensor]:
+        """Rank-5 combos of the stream in table order: (full-table index, combo rows, motion rows)."""
+        found: List[Tuple[Tensor, Tensor, Tensor]] = []
+        for rows_np, abs_np in combos.iter_viable():
+            if rows_np.shape[0] == 0:
+                continue
+            rows = torch.as_tensor(rows_np.astype(np.int64), device=self.device)
+            abs_idx = torch.as_tensor(abs_np, device=self.device)
+            n_rows = self.counts[rows].sum(dim=1)
+            for k in torch.unique(n_rows).tolist():
+                sel = torch.nonzero(n_rows == k).squeeze(-1)
+                flat = self._row_index(rows[sel], k)
+                W = torch.cat([self.om[flat], self.mu[flat]], dim=-1)
+                _, s, vh = torch.linalg.svd(W, full_matrices=True)
+                rank5 = (s > max(k, 6) * _spacing(s[:, :1])).sum(dim=1) == 5
+                if bool(rank5.any()):
+                    found.append((abs_idx[sel][rank5], rows[sel][rank5], _rec_mot(vh[rank5, 5, :])))
+        if not found:
+            empty = torch.empty(0, dtype=torch.int64, device=self.device)
+            return empty, empty.reshape(0, 5), torch.empty((0, 10), dtype=torch.float64, device=self.device)
+        idx, rows, mot = (torch.cat(parts) for parts in zip(*found))
+        order = torch.argsort(idx)
+        return idx[order], rows[order], mot[order]
+
+    def rate(self, mot: Tensor, rows: Tensor, chunk_size: int = RATE_MOTION_CHUNK) -> Tensor:
+        """R (2 M, total_cp) for motions ``mot`` of combos ``rows``: forward rows then reverse rows."""
+        M = mot.shape[0]
+        R = torch.full((2 * M, self.total_cp), torch.inf, dtype=torch.float64, device=self.device)
+        if M == 0:
+            return R
+        rho = mot[:, 6:9]
+        input_wr = _input_wrenches(mot, self.pts, self.max_d)
+        mot_r = _round(mot)
+        n_rows = self.counts[rows].sum(dim=1)
+        for k in torch.unique(n_rows).tolist():
+            group = torch.nonzero(n_rows == k).squeeze(-1)
+            for s in range(0, group.numel(), max(1, chunk_size)):
+                sel = group[s : s + chunk_size]
+                flat = self._row_index(rows[sel], k)
+                om = self.om[flat]
+                moment = _cross(self.anchor[flat] - rho[sel][:, None, :], om)
+                pivots = torch.cat([om, torch.where(self.anchored[flat][..., None], moment, self.mu[flat])], dim=-1)
+                cp_p, cp_n, pin, lin_p, lin_n, pln_p, pln_n = _rate_block(mot_r[sel], pivots, input_wr[sel], self.geometry)
+                R[sel] = torch.cat([cp_p, pin, lin_p, pln_p], dim=1)
+                R[M + sel] = torch.cat([cp_n, pin, lin_n, pln_n], dim=1)
+        return R
+
+    def analyze(self, combos: ComboStream) -> TorchAnalysis:
+        """Rank, recover, deduplicate and rate every combo of ``combos`` on the device."""
+        combo_idx, rows, mot = self.rank5_motions(combos)
+        if mot.shape[0] == 0:
+            return TorchAnalysis(combo_idx, mot, combo_idx, combo_idx.to(torch.bool), None)
+        mot = _round(mot)
+        first, group = _first_rows(_motion_keys(mot))
+        is_new = torch.zeros(mot.shape[0], dtype=torch.bool, device=self.device)
+        is_new[first] = True
+        new_id = torch.cumsum(is_new.to(torch.int64), dim=0) - 1
+        ids = new_id[first[group]]
+        R = self.rate(mot[is_new], rows[is_new])
+        return TorchAnalysis(combo_idx, mot, ids, is_new, R)
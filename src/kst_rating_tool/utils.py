@@ -34,7 +34,11 @@ def matlab_rank_batched(A: NDArray[np.float64]) -> NDArray[np.int_]:
     A = np.asarray(A, dtype=np.float64)
     if A.ndim == 2:
         A = A[np.newaxis, ...]
-    _, s, _ = np.linalg.svd(A, full_matrices=False)
+    if A.shape[0] == 0:
+        return np.zeros(0, dtype=np.int_)
+    # Singular values only (same LAPACK path as ``matlab_rank``) so batched and
+    # single-matrix ranks agree bit for bit at the tolerance boundary.
+    s = np.linalg.svd(A, compute_uv=False)
     if s.size == 0:
         return np.zeros(A.shape[0], dtype=np.int_)
     m, n = A.shape[-2], A.shape[-1]
@@ -98,3 +102,15 @@ def matlab_null(A: NDArray[np.float64]) -> NDArray[np.float64]:
         if V[max_idx, col] < 0:
             V[:, col] = -V[:, col]
     return V[:, r:]
+
+
+def rowwise_dot(a: NDArray[np.float64], b: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Row-by-row dot products of two ``(N, n)`` arrays, shape ``(N,)``.
+
+    Evaluated as a stacked ``matmul`` so each value is bit-identical to
+    ``np.dot(a[i], b[i])`` (and ``sqrt`` of it to ``np.linalg.norm``); a plain
+    ``(a * b).sum(axis=1)`` rounds differently from BLAS ``ddot``.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return (a[:, np.newaxis, :] @ b[:, :, np.newaxis])[:, 0, 0]
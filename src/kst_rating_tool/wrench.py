@@ -6,7 +6,7 @@ from typing import List, Tuple
 import numpy as np
 from numpy.typing import NDArray
 
-from .constraints import ConstraintSet
+from .constraints import ConstraintArrays, ConstraintSet
 from .utils import matlab_null
 
 
@@ -23,159 +23,224 @@ class WrenchSystem:
         return self.wrenches
 
 
-def cp_to_wrench(constraints: ConstraintSet) -> Tuple[List[WrenchSystem], NDArray[np.float64], float]:
-    """Port of `cp_to_wrench.m`.
-
-    Parameters
-    ----------
-    constraints:
-        Container of point, pin, line, and plane constraints.
+def combo_row_indices(counts: NDArray[np.int_], combo: NDArray[np.int_]) -> NDArray[np.intp]:
+    """Flat row indices into per-constraint stacked rows for each combo row.
 
-    Returns
-    -------
-    wr_all : list[WrenchSystem]
-        Each entry is a 1×6, 2×6, or 3×6 wrench system.
-    pts : (N, 3) ndarray
-        Discretized constraint locations for moment arm calculation.
-    max_d : float
-        Maximum pairwise distance between points in `pts`.
+    ``counts[c]`` is the number of wrench rows of constraint ``c + 1``; the rows
+    of all constraints are stacked in order. ``combo`` (N, m) holds 1-based
+    constraint indices (0 = padding; indices past the last constraint are
+    skipped too). Returns (N, k), slot by slot as ``np.vstack`` would stack them.
+    Raises ValueError if the combos select different numbers of rows.
+    """
+    combo = np.atleast_2d(np.asarray(combo, dtype=np.intp))
+    counts = np.asarray(counts, dtype=np.intp)
+    n = combo.shape[0]
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.intp)
+    valid = (combo > 0) & (combo <= counts.size)
+    cidx = np.where(valid, combo - 1, 0)
+    per_slot = np.where(valid, counts[cidx] if counts.size else 0, 0)
+    k_all = per_slot.sum(axis=1)
+    k = int(k_all[0]) if n else 0
+    if np.any(k_all != k):
+        raise ValueError("combo_row_indices: combos select different row counts")
+    r = np.arange(int(counts.max()) if counts.size else 0, dtype=np.intp)
+    row_idx = offsets[cidx][:, :, None] + r
+    keep = r < per_slot[:, :, None]
+    return row_idx[keep].reshape(n, k)
+
+
+@dataclass(frozen=True)
+class WrenchTemplates:
+    """Wrench rows of every constraint (as in ``cp_to_wrench``), flattened in constraint order.
+
+    Row ``r`` is ``[om[r], mu[r]]`` referenced to the origin. Rows with
+    ``anchored[r]`` are forces along a line through ``anchor[r]``; referenced to
+    a screw axis point ``rho`` their moment is ``(anchor - rho) x om``. The
+    other rows (a line's second row, a plane's in-plane rows) are pure moments
+    and do not depend on ``rho``. ``counts`` / ``offsets`` locate each
+    constraint's rows.
     """
 
-    cp, cpin, clin, cpln, cpln_prop = constraints.to_matlab_style_arrays()
-
-    wr_all: List[WrenchSystem] = []
+    om: NDArray[np.float64]  # (R, 3)
+    mu: NDArray[np.float64]  # (R, 3)
+    anchor: NDArray[np.float64]  # (R, 3)
+    anchored: NDArray[np.bool_]  # (R,)
+    counts: NDArray[np.intp]  # (n_constraints,)
+    offsets: NDArray[np.intp]  # (n_constraints,)
+
+    def system(self, i: int) -> WrenchArray:
+        """Origin-referenced k×6 wrench system of constraint ``i`` (0-based)."""
+        rows = slice(int(self.offsets[i]), int(self.offsets[i] + self.counts[i]))
+        return np.hstack([self.om[rows], self.mu[rows]])
+
+    def combo_row_counts(self, combo: NDArray[np.int_]) -> NDArray[np.intp]:
+        """Stacked row count of each combo row (N, m) -> (N,)."""
+        combo = np.atleast_2d(np.asarray(combo, dtype=np.intp))
+        valid = (combo > 0) & (combo <= self.counts.size)
+        if not self.counts.size:
+            return np.zeros(combo.shape[0], dtype=np.intp)
+        return np.where(valid, self.counts[np.where(valid, combo - 1, 0)], 0).sum(axis=1)
+
+    def at(self, rows: NDArray[np.intp], rho: NDArray[np.float64]) -> WrenchArray:
+        """Rows ``rows`` (..., k) re-referenced to ``rho`` (..., 3); returns (..., k, 6)."""
+        om = self.om[rows]
+        arm = self.anchor[rows] - np.asarray(rho, dtype=np.float64)[..., None, :]
+        mu = np.where(self.anchored[rows][..., None], np.cross(arm, om), self.mu[rows])
+        return np.concatenate([om, mu], axis=-1)
+
+
+def _build_wrench_templates(arrays: ConstraintArrays) -> WrenchTemplates:
+    cp, cpin, clin, cpln, _ = arrays.as_tuple()
+    om: List[NDArray[np.float64]] = []
+    mu: List[NDArray[np.float64]] = []
+    anchor: List[NDArray[np.float64]] = []
+    anchored: List[bool] = []
+    counts: List[int] = []
+
+    def add(om_r: NDArray[np.float64], mu_r: NDArray[np.float64], at: NDArray[np.float64] | None) -> None:
+        om.append(om_r)
+        mu.append(mu_r)
+        anchor.append(at if at is not None else np.zeros(3))
+        anchored.append(at is not None)
 
     # Point constraints
     for i in range(cp.shape[0]):
         n = cp[i, 3:6]
         p = cp[i, 0:3]
-        mu = np.cross(p, n)
-        wr = np.concatenate((n, mu))[None, :]
-        wr_all.append(WrenchSystem(wr.astype(float)))
+        add(n, np.cross(p, n), p)
+        counts.append(1)
 
     # Pin constraints
     for i in range(cpin.shape[0]):
         center = cpin[i, 0:3]
-        axis = cpin[i, 3:6]
-        axes = matlab_null(axis.reshape(1, 3))  # 3×2
-        om_axis1 = axes[:, 0]
-        om_axis2 = axes[:, 1]
-        mu_axis1 = np.cross(center, om_axis1)
-        mu_axis2 = np.cross(center, om_axis2)
-        wr = np.vstack(
-            [
-                np.concatenate((om_axis1, mu_axis1)),
-                np.concatenate((om_axis2, mu_axis2)),
-            ]
-        )
-        wr_all.append(WrenchSystem(wr.astype(float)))
+        axes = matlab_null(cpin[i, 3:6].reshape(1, 3))  # 3×2
+        add(axes[:, 0], np.cross(center, axes[:, 0]), center)
+        add(axes[:, 1], np.cross(center, axes[:, 1]), center)
+        counts.append(2)
 
     # Line constraints
     for i in range(clin.shape[0]):
         midpoint = clin[i, 0:3]
         line_dir = clin[i, 3:6]
         constraint_dir = clin[i, 6:9]
-
-        om_axis1 = constraint_dir  # zero pitch
-        om_axis2 = np.zeros(3)  # infinite pitch
-        mu_axis1 = np.cross(midpoint, om_axis1)
-        mu_axis2 = np.cross(line_dir, constraint_dir)
-
-        wr = np.vstack(
-            [
-                np.concatenate((om_axis1, mu_axis1)),
-                np.concatenate((om_axis2, mu_axis2)),
-            ]
-        )
-        wr_all.append(WrenchSystem(wr.astype(float)))
+        add(constraint_dir, np.cross(midpoint, constraint_dir), midpoint)  # zero pitch
+        add(np.zeros(3), np.cross(line_dir, constraint_dir), None)  # infinite pitch
+        counts.append(2)
 
     # Plane constraints
     for i in range(cpln.shape[0]):
         midpoint = cpln[i, 0:3]
         normal = cpln[i, 3:6]
-
         axes = matlab_null(normal.reshape(1, 3))  # 3×2
-        om_axis1 = normal  # zero pitch
-        om_axis2 = np.zeros(3)  # infinite pitch
-        om_axis3 = np.zeros(3)  # infinite pitch
-        mu_axis1 = np.cross(midpoint, om_axis1)
-        mu_axis2 = axes[:, 0]
-        mu_axis3 = axes[:, 1]
-
-        wr = np.vstack(
-            [
-                np.concatenate((om_axis1, mu_axis1)),
-                np.concatenate((om_axis2, mu_axis2)),
-                np.concatenate((om_axis3, mu_axis3)),
-            ]
-        )
-        wr_all.append(WrenchSystem(wr.astype(float)))
+        add(normal, np.cross(midpoint, normal), midpoint)  # zero pitch
+        add(np.zeros(3), axes[:, 0], None)  # infinite pitch
+        add(np.zeros(3), axes[:, 1], None)
+        counts.append(3)
 
-    # Discretized points (pts) and max_d, mirroring MATLAB logic
-    pts_list: List[NDArray[np.float64]] = []
+    counts_arr = np.asarray(counts, dtype=np.intp)
+    return WrenchTemplates(
+        om=np.array(om, dtype=float).reshape(-1, 3),
+        mu=np.array(mu, dtype=float).reshape(-1, 3),
+        anchor=np.array(anchor, dtype=float).reshape(-1, 3),
+        anchored=np.asarray(anchored, dtype=bool),
+        counts=counts_arr,
+        offsets=np.concatenate([[0], np.cumsum(counts_arr)[:-1]]).astype(np.intp),
+    )
 
-    if cp.size:
-        pts_list.append(cp[:, 0:3])
 
-    if cpin.size:
-        pts_list.append(cpin[:, 0:3])
+def wrench_templates(constraints: ConstraintSet) -> WrenchTemplates:
+    """Per-constraint wrench templates, built once per ConstraintSet version."""
+    return constraints.arrays.derived("wrench_templates", _build_wrench_templates)
 
-    if clin.size:
-        line_pts = []
-        for i in range(clin.shape[0]):
-            midpoint = clin[i, 0:3]
-            line_dir = clin[i, 3:6]
-            length = clin[i, 9]
-            line_pts.append(midpoint + (length / 2.0) * line_dir)
-            line_pts.append(midpoint - (length / 2.0) * line_dir)
-        pts_list.append(np.vstack(line_pts))
-
-    if cpln.size:
-        plane_pts = []
-        for i in range(cpln.shape[0]):
-            midpoint = cpln[i, 0:3]
-            normal = cpln[i, 3:6]
-            ptype = int(cpln[i, 6])
-            prop = cpln_prop[i]
-            if ptype == 1 and prop.size >= 8:
-                xdir = prop[0:3]
-                xlen = prop[3]
-                ydir = prop[4:7]
-                ylen = prop[7]
-                plane_pts.append(midpoint + xlen / 2.0 * xdir + ylen / 2.0 * ydir)
-                plane_pts.append(midpoint + xlen / 2.0 * xdir - ylen / 2.0 * ydir)
-                plane_pts.append(midpoint - xlen / 2.0 * xdir + ylen / 2.0 * ydir)
-                plane_pts.append(midpoint - xlen / 2.0 * xdir - ylen / 2.0 * ydir)
-            elif ptype == 2 and prop.size >= 1:
-                radius = prop[0]
-                axes = matlab_null(normal.reshape(1, 3))
-                e1 = axes[:, 0]
-                e2 = axes[:, 1]
-                c45 = np.cos(np.deg2rad(45.0))
-                plane_pts.append(midpoint + radius * e1)
-                plane_pts.append(midpoint - radius * e1)
-                plane_pts.append(midpoint + radius * e2)
-                plane_pts.append(midpoint - radius * e2)
-                plane_pts.append(midpoint + c45 * radius * e1 + c45 * radius * e2)
-                plane_pts.append(midpoint + c45 * radius * e1 - c45 * radius * e2)
-                plane_pts.append(midpoint - c45 * radius * e1 + c45 * radius * e2)
-                plane_pts.append(midpoint - c45 * radius * e1 - c45 * radius * e2)
-        if plane_pts:
-            pts_list.append(np.vstack(plane_pts))
-
-    if pts_list:
-        pts = np.vstack(pts_list).astype(float)
-    else:
-        pts = np.empty((0, 3), dtype=float)
 
+def _max_pair_distance(pts: NDArray[np.float64]) -> float:
+    """Largest pairwise distance between rows of ``pts`` (0 for fewer than two points)."""
     if pts.shape[0] >= 2:
         # pairwise distances (brute force, small N expected)
         idx = np.triu_indices(pts.shape[0], k=1)
         diffs = pts[idx[0]] - pts[idx[1]]
         dists = np.linalg.norm(diffs, axis=1)
-        max_d = float(dists.max())
+        return float(dists.max())
+    return 0.0
+
+
+def constraint_points(arrays: ConstraintArrays) -> List[NDArray[np.float64]]:
+    """Discretized points of each constraint (k, 3), in constraint order.
+
+    Stacked, these are ``cp_to_wrench``'s ``pts``: one point per point / pin
+    constraint, the two ends of a line, a rectangular plane's four corners and
+    eight rim points of a circular plane (none if the plane's ``prop`` is short).
+    """
+    cp, cpin, clin, cpln, cpln_prop = arrays.as_tuple()
+    out: List[NDArray[np.float64]] = [cp[i : i + 1, 0:3] for i in range(cp.shape[0])]
+    out.extend(cpin[i : i + 1, 0:3] for i in range(cpin.shape[0]))
+
+    for i in range(clin.shape[0]):
+        midpoint = clin[i, 0:3]
+        line_dir = clin[i, 3:6]
+        length = clin[i, 9]
+        out.append(np.vstack([midpoint + (length / 2.0) * line_dir, midpoint - (length / 2.0) * line_dir]))
+
+    for i in range(cpln.shape[0]):
+        midpoint = cpln[i, 0:3]
+        normal = cpln[i, 3:6]
+        ptype = int(cpln[i, 6])
+        prop = cpln_prop[i]
+        plane_pts = []
+        if ptype == 1 and prop.size >= 8:
+            xdir = prop[0:3]
+            xlen = prop[3]
+            ydir = prop[4:7]
+            ylen = prop[7]
+            plane_pts.append(midpoint + xlen / 2.0 * xdir + ylen / 2.0 * ydir)
+            plane_pts.append(midpoint + xlen / 2.0 * xdir - ylen / 2.0 * ydir)
+            plane_pts.append(midpoint - xlen / 2.0 * xdir + ylen / 2.0 * ydir)
+            plane_pts.append(midpoint - xlen / 2.0 * xdir - ylen / 2.0 * ydir)
+        elif ptype == 2 and prop.size >= 1:
+            radius = prop[0]
+            axes = matlab_null(normal.reshape(1, 3))
+            e1 = axes[:, 0]
+            e2 = axes[:, 1]
+            c45 = np.cos(np.deg2rad(45.0))
+            plane_pts.append(midpoint + radius * e1)
+            plane_pts.append(midpoint - radius * e1)
+            plane_pts.append(midpoint + radius * e2)
+            plane_pts.append(midpoint - radius * e2)
+            plane_pts.append(midpoint + c45 * radius * e1 + c45 * radius * e2)
+            plane_pts.append(midpoint + c45 * radius * e1 - c45 * radius * e2)
+            plane_pts.append(midpoint - c45 * radius * e1 + c45 * radius * e2)
+            plane_pts.append(midpoint - c45 * radius * e1 - c45 * radius * e2)
+        out.append(np.array(plane_pts, dtype=float).reshape(-1, 3))
+    return out
+
+
+def cp_to_wrench(constraints: ConstraintSet) -> Tuple[List[WrenchSystem], NDArray[np.float64], float]:
+    """Port of `cp_to_wrench.m`.
+
+    Parameters
+    ----------
+    constraints:
+        Container of point, pin, line, and plane constraints.
+
+    Returns
+    -------
+    wr_all : list[WrenchSystem]
+        Each entry is a 1×6, 2×6, or 3×6 wrench system.
+    pts : (N, 3) ndarray
+        Discretized constraint locations for moment arm calculation.
+    max_d : float
+        Maximum pairwise distance between points in `pts`.
+    """
+
+    templates = wrench_templates(constraints)
+    wr_all: List[WrenchSystem] = [WrenchSystem(templates.system(i)) for i in range(templates.counts.size)]
+
+    # Discretized points (pts) and max_d, mirroring MATLAB logic
+    per_constraint = [p for p in constraint_points(constraints.arrays) if p.size]
+    if per_constraint:
+        pts = np.vstack(per_constraint).astype(float)
     else:
-        max_d = 0.0
+        pts = np.empty((0, 3), dtype=float)
 
-    return wr_all, pts, max_d
+    return wr_all, pts, _max_pair_distance(pts)
 
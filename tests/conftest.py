@@ -1,8 +1,31 @@
-"""Pytest configuration: ensure src is on path when running tests from repo root."""
+"""Pytest configuration: ensure src is on path when running tests from repo root; shared case loader."""
 from pathlib import Path
 import sys
 
+import pytest
+
 repo_root = Path(__file__).resolve().parent.parent
 src = repo_root / "src"
 if str(src) not in sys.path:
     sys.path.insert(0, str(src))
+
+INPUT_DIR = repo_root / "matlab_script" / "Input_files"
+
+
+@pytest.fixture(scope="session")
+def load_case():
+    """Loader for ``matlab_script/Input_files/<name>.m``; skips the test when the file is missing."""
+    from kst_rating_tool.io_legacy import load_case_m_file
+
+    def load(name: str):
+        path = INPUT_DIR / f"{name}.m"
+        if not path.exists():
+            pytest.skip(f"{path.name} not found")
+        return load_case_m_file(path)
+
+    return load
+
+
+@pytest.fixture
+def cover_case(load_case):
+    return load_case("case3a_cover_leverage")
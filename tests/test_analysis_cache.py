@@ -0,0 +1,121 @@
+"""Opt-in memoization of pipeline results (``with analysis_cache(): ...``)."""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+
+from kst_rating_tool import pipeline
+from kst_rating_tool.analysis_cache import (
+    AnalysisCache,
+    active_analysis_cache,
+    analysis_cache,
+    constraint_key,
+)
+from kst_rating_tool.constraints import ConstraintSet
+from kst_rating_tool.pipeline import analyze_constraints, analyze_constraints_detailed
+
+
+def _clone(cs: ConstraintSet) -> ConstraintSet:
+    return ConstraintSet.from_matlab_style_arrays(*cs.to_matlab_style_arrays())
+
+
+@pytest.fixture
+def count_runs(monkeypatch):
+    runs: list[str] = []
+    real_rating, real_detailed = pipeline._analyze_constraints, pipeline._analyze_constraints_detailed
+
+    def rating(*args):
+        runs.append("rating")
+        return real_rating(*args)
+
+    def detailed(*args):
+        runs.append("detailed")
+        return real_detailed(*args)
+
+    monkeypatch.setattr(pipeline, "_analyze_constraints", rating)
+    monkeypatch.setattr(pipeline, "_analyze_constraints_detailed", detailed)
+    return runs
+
+
+def test_key_is_exact(cover_case, count_runs):
+    assert constraint_key(_clone(cover_case)) == constraint_key(cover_case)
+    near = _clone(cover_case)
+    near.points[0].position[0] += 2e-6  # inside the motion rounding, still another geometry
+    near.invalidate()
+    assert constraint_key(near) != constraint_key(cover_case)
+    near.points[0].position[0] = cover_case.points[0].position[0]
+    near.invalidate()
+    assert constraint_key(near) == constraint_key(cover_case)
+    near.points[0].position[0] += 2e-6
+    near.invalidate()
+    with analysis_cache():
+        analyze_constraints_detailed(cover_case)
+        res = analyze_constraints_detailed(near)
+    assert count_runs == ["detailed", "detailed"]
+    np.testing.assert_array_equal(res.pts, analyze_constraints_detailed(near).pts)
+
+
+def test_active_cache_is_per_thread(cover_case):
+    seen: list[AnalysisCache | None] = []
+    with analysis_cache() as cache:
+        thread = threading.Thread(target=lambda: seen.append(active_analysis_cache()))
+        thread.start()
+        thread.join()
+        assert active_analysis_cache() is cache
+    assert seen == [None]
+
+
+def test_hits_misses_and_settings(cover_case, count_runs):
+    assert active_analysis_cache() is None
+    with analysis_cache() as cache:
+        first = analyze_constraints(cover_case)
+        again = analyze_constraints(_clone(cover_case))
+        analyze_constraints(cover_case, enumeration="dfs")
+        analyze_constraints(cover_case, n_workers=2)  # same result as sequential: hit
+    assert count_runs == ["rating", "rating"]
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.entries) == (2, 2, 2)
+    assert cache.stats.hit_rate == 0.5
+    assert again.WTR == first.WTR and again.R is not first.R
+    analyze_constraints(cover_case)
+    assert count_runs[-1] == "rating" and active_analysis_cache() is None
+
+
+def test_hits_return_private_copies(cover_case):
+    other = _clone(cover_case)
+    with analysis_cache():
+        ref = analyze_constraints_detailed(cover_case)
+        ref.R[:] = 0.0
+        hit = analyze_constraints_detailed(other)
+    assert hit.constraints is other and ref.constraints is cover_case
+    np.testing.assert_array_equal(hit.R, analyze_constraints_detailed(cover_case).R)
+
+
+def test_eviction_by_entries_and_bytes(cover_case, count_runs):
+    cases = [cover_case]
+    for dz in (1e-2, 2e-2):
+        cs = _clone(cover_case)
+        cs.points[0].position[2] += dz
+        cs.invalidate()
+        cases.append(cs)
+    with analysis_cache(max_entries=2) as cache:
+        for cs in cases:
+            analyze_constraints(cs)
+        analyze_constraints(cases[0])  # evicted first
+        analyze_constraints(cases[2])
+    assert count_runs == ["rating"] * 4
+    assert (cache.stats.evictions, cache.stats.entries) == (2, 2)
+
+    res = analyze_constraints(cover_case)
+    size = res.R.nbytes + res.Ri.nbytes
+    small = AnalysisCache(max_bytes=size)
+    with analysis_cache(small), analysis_cache(max_bytes=1) as tiny:
+        analyze_constraints_detailed(cover_case)  # larger than max_bytes: returned, not stored
+        assert active_analysis_cache() is tiny
+    assert len(tiny) == 0 and active_analysis_cache() is None
+    with analysis_cache(small):
+        analyze_constraints(cover_case)
+        analyze_constraints(cases[1])
+    assert len(small) == 1 and small.stats.nbytes <= size
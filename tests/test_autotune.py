@@ -0,0 +1,137 @@
+"""Backend autotuning (``accelerator="tune"``) and its per-user cache."""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from kst_rating_tool import autotune, pipeline
+from kst_rating_tool.autotune import BackendTuner, TuneChoice, problem_bucket
+from kst_rating_tool.constraints import ConstraintSet, PlaneConstraint, PointConstraint
+from kst_rating_tool.pipeline import analyze_constraints, analyze_constraints_detailed
+
+
+@pytest.fixture
+def tuner(tmp_path, monkeypatch):
+    t = BackendTuner(tmp_path / "backend_tune.json")
+    monkeypatch.setattr(autotune, "_DEFAULT_TUNER", t)
+    return t
+
+
+def _points(n: int) -> ConstraintSet:
+    rng = np.random.default_rng(n)
+    return ConstraintSet(
+        points=[PointConstraint(rng.normal(size=3), rng.normal(size=3)) for _ in range(n)]
+    )
+
+
+def test_problem_bucket_groups_sizes_and_type_mix(cover_case):
+    assert problem_bucket(_points(9)) == problem_bucket(_points(12)) == "n12:cp"
+    assert problem_bucket(_points(13)) == "n16:cp"
+    assert problem_bucket(_points(3)) == "n4:cp"
+    cs = _points(5)
+    cs.planes.append(PlaneConstraint(np.zeros(3), np.array([0.0, 0.0, 1.0]), 2, np.array([1.0])))
+    assert problem_bucket(cs) == "n6:cp+cpln+circ"
+    assert problem_bucket(cover_case) == problem_bucket(
+        ConstraintSet.from_matlab_style_arrays(*cover_case.to_matlab_style_arrays())
+    )
+
+
+def test_user_cache_dir_override(monkeypatch, tmp_path):
+    monkeypatch.setenv("KST_CACHE_DIR", str(tmp_path))
+    assert autotune.user_cache_dir() == tmp_path
+    assert BackendTuner().path == tmp_path / autotune.TUNE_CACHE_FILE
+
+
+def test_tune_persists_winner_and_reuses_it(cover_case, tuner, monkeypatch):
+    candidates = [TuneChoice("numpy"), TuneChoice("numpy", None, 2, 4)]
+    monkeypatch.setattr(autotune, "tune_candidates", lambda: candidates)
+    calls: list[TuneChoice] = []
+    real = pipeline._analyze_constraints
+
+    def counting(cs, n_workers, accelerator, device, enumeration):
+        if accelerator != "tune":
+            calls.append(TuneChoice(accelerator, device, n_workers))
+        return real(cs, n_workers, accelerator, device, enumeration)
+
+    monkeypatch.setattr(pipeline, "_analyze_constraints", counting)
+    ref = analyze_constraints(cover_case)
+    calls.clear()
+    first = analyze_constraints(cover_case, accelerator="tune")
+    assert first.WTR == ref.WTR and len(calls) == 4  # two timed runs per candidate
+
+    data = json.loads(tuner.path.read_text(encoding="utf-8"))
+    entry = data["buckets"][problem_bucket(cover_case)]
+    assert set(entry["timings"]) == {"numpy", "workers2x4"}
+    assert entry["sequential"]["n_workers"] == 1
+
+    calls.clear()
+    second = analyze_constraints(cover_case, accelerator="tune")
+    assert second.WTR == ref.WTR and not calls  # cached choice runs in place, no benchmark
+    assert tuner.lookup(problem_bucket(cover_case)) in candidates
+
+
+def test_tune_detailed_matches_numpy(cover_case, tuner, monkeypatch):
+    monkeypatch.setattr(autotune, "tune_candidates", lambda: [TuneChoice("numpy")])
+    ref = analyze_constraints_detailed(cover_case)
+    for _ in range(2):
+        res = analyze_constraints_detailed(cover_case, accelerator="tune")
+        np.testing.assert_array_equal(res.R, ref.R)
+        assert res.rating.WTR == ref.rating.WTR
+
+
+def test_tune_off_main_thread_uses_sequential_winner(cover_case, tuner):
+    seen: list[TuneChoice] = []
+
+    def run(choice: TuneChoice) -> float:
+        seen.append(choice)
+        return 0.0
+
+    candidates = [TuneChoice("numpy"), TuneChoice("numpy", None, 2, 4)]
+    thread = threading.Thread(target=lambda: tuner.tune(cover_case, run, candidates))
+    thread.start()
+    thread.join()
+    assert {c.n_workers for c in seen} == {1}
+    assert tuner.lookup(problem_bucket(cover_case), sequential=True) == TuneChoice("numpy")
+    assert tuner.lookup(problem_bucket(cover_case)) is None  # worker pool not timed yet
+
+    seen.clear()
+    tuner.tune(cover_case, run, candidates)
+    assert seen == [TuneChoice("numpy", None, 2, 4)] * 2  # only the missing label is raced
+    assert tuner.lookup(problem_bucket(cover_case)) in candidates
+
+
+def test_unreadable_or_stale_cache_retunes(cover_case, tuner, monkeypatch):
+    tuner.path.write_text("not json", encoding="utf-8")
+    choice, res = tuner.tune(cover_case, lambda c: 1, [TuneChoice("numpy")])
+    assert choice == TuneChoice("numpy") and res == 1
+    assert tuner.tune(cover_case, lambda c: 2, [TuneChoice("numpy")]) == (choice, None)
+
+    data = json.loads(tuner.path.read_text(encoding="utf-8"))
+    data["buckets"][problem_bucket(cover_case)]["best"]["accelerator"] = "torch"
+    tuner.path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setattr(autotune, "_torch_available", lambda: False)
+    assert tuner.lookup(problem_bucket(cover_case)) is None
+
+
+def test_tune_budget_spreads_race_over_calls(cover_case, tmp_path):
+    tuner = BackendTuner(tmp_path / "backend_tune.json", budget_s=0.0)
+    candidates = [TuneChoice("numpy"), TuneChoice("numpy", None, 2, 4), TuneChoice("numpy", None, 2, 8)]
+    seen: list[TuneChoice] = []
+
+    def run(choice: TuneChoice) -> str:
+        seen.append(choice)
+        return choice.label
+
+    for k, choice in enumerate(candidates):
+        assert tuner.lookup(problem_bucket(cover_case)) is None
+        assert tuner.tune(cover_case, run, candidates) == (choice, choice.label)
+        assert set(seen) == set(candidates[: k + 1])  # one new candidate per call over budget
+    entry = json.loads(tuner.path.read_text(encoding="utf-8"))["buckets"][problem_bucket(cover_case)]
+    assert set(entry["timings"]) == {c.label for c in candidates}
+    assert tuner.lookup(problem_bucket(cover_case)) in candidates
+    seen.clear()
+    assert tuner.tune(cover_case, run, candidates)[1] is None and not seen
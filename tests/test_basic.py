@@ -154,17 +154,26 @@ def test_duplicate_motion_skipped_sequential():
 
     dummy_rating = np.ones(cs.total_cp, dtype=float) * np.inf
     dummy_input_wr = np.zeros((6, 1))
-    dummy_W = np.ones((6, 5))  # non-empty, rank check is patched
 
     with (
-        patch("kst_rating_tool.pipeline.form_combo_wrench", return_value=dummy_W),
-        patch("kst_rating_tool.pipeline.matlab_rank", return_value=5),
-        patch("kst_rating_tool.pipeline.rec_mot", return_value=fixed_mot),
+        patch(
+            "kst_rating_tool.pipeline._rank5_combo_indices",
+            side_effect=lambda combo, wr_all: np.arange(combo.shape[0]),
+        ),
+        patch(
+            "kst_rating_tool.pipeline.rec_mot_batched",
+            side_effect=lambda W: np.tile(fixed_mot.as_array(), (W.shape[0], 1)),
+        ),
         patch("kst_rating_tool.pipeline.input_wr_compose", return_value=(dummy_input_wr, None)),
-        patch("kst_rating_tool.pipeline.react_wr_5_compose", return_value=np.zeros((5, 6))),
         patch(
-            "kst_rating_tool.pipeline._rate_motion_all_constraints",
-            return_value=(dummy_rating, dummy_rating, dummy_rating, dummy_rating, dummy_rating, dummy_rating, dummy_rating),
+            "kst_rating_tool.pipeline.react_wr_5_compose_batched",
+            side_effect=lambda constraints, combos, rho: np.zeros((combos.shape[0], 5, 6)),
+        ),
+        patch(
+            "kst_rating_tool.pipeline._rate_motions_all_constraints",
+            side_effect=lambda mot_arr, *args, **kwargs: tuple(
+                np.tile(dummy_rating, (mot_arr.shape[0], 1)) for _ in range(7)
+            ),
         ),
     ):
         detailed = analyze_constraints_detailed(cs, n_workers=1)
@@ -194,15 +203,11 @@ def test_duplicate_motion_skipped_parallel():
     dummy_rating = np.ones(cs.total_cp, dtype=float) * np.inf
     dummy_R_two = np.full((2, cs.total_cp), np.inf)
 
-    # Build fake chunk results: every combo produces the same motion
-    fake_chunk_results = [[(i, fixed_arr.copy(), dummy_R_two) for i in range(n_combo)]]
-
-    mock_pool = MagicMock()
-    mock_pool.__enter__ = lambda s: s
-    mock_pool.__exit__ = MagicMock(return_value=False)
-    mock_pool.map.return_value = fake_chunk_results
+    # Build fake worker results: every combo produces the same motion
+    mock_executor = MagicMock()
+    mock_executor.run.return_value = [(i, fixed_arr.copy(), dummy_R_two) for i in range(n_combo)]
 
-    with patch("kst_rating_tool.pipeline.Pool", return_value=mock_pool):
+    with patch("kst_rating_tool.pipeline.shared_executor", return_value=mock_executor):
         detailed = analyze_constraints_detailed(cs, n_workers=2)
 
     # Only one unique motion should be stored
@@ -0,0 +1,169 @@
+"""Batched engine stages must match the per-combo MATLAB-port loop exactly."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from kst_rating_tool.combination import combo_preproc, combo_stream
+from kst_rating_tool.constraints import ConstraintSet, PointConstraint
+from kst_rating_tool.pipeline import (
+    _rank5_combo_indices,
+    _rank5_combo_indices_dfs,
+    _rank5_combo_rows_dfs,
+    _stream_rank5,
+    analyze_constraints,
+    analyze_constraints_detailed,
+    extend_detailed,
+)
+from kst_rating_tool.react_wr import (
+    combo_wrench_row_counts,
+    form_combo_wrench,
+    form_combo_wrench_batched,
+    react_wr_5_compose,
+    react_wr_5_compose_batched,
+)
+from kst_rating_tool.utils import matlab_rank, matlab_rank_batched
+from kst_rating_tool.wrench import cp_to_wrench, wrench_templates
+
+
+@pytest.fixture(params=["case3a_cover_leverage", "case4b_endcap_circlinsrch"])
+def mixed_case(request, load_case):
+    cs = load_case(request.param)
+    wr_all_sys, _, _ = cp_to_wrench(cs)
+    wr_all = [w.as_array() for w in wr_all_sys]
+    return cs, wr_all, combo_preproc(cs)
+
+
+def test_matlab_rank_batched_matches_scalar():
+    rng = np.random.default_rng(0)
+    A = rng.standard_normal((40, 6, 6))
+    A[::3, 5] = A[::3, 0] + A[::3, 1]  # rank-deficient rows
+    ranks = matlab_rank_batched(A)
+    assert ranks.tolist() == [matlab_rank(a) for a in A]
+    assert matlab_rank_batched(np.empty((0, 5, 6))).shape == (0,)
+
+
+def test_form_combo_wrench_batched_matches_scalar(mixed_case):
+    _, wr_all, combo = mixed_case
+    n_rows = combo_wrench_row_counts(wr_all, combo)
+    for k in np.unique(n_rows):
+        idx = np.flatnonzero(n_rows == k)[:50]
+        W = form_combo_wrench_batched(wr_all, combo[idx])
+        assert W.shape == (idx.size, k, 6)
+        for i, j in enumerate(idx):
+            assert np.array_equal(W[i], form_combo_wrench(wr_all, combo[j]))
+
+
+def test_form_combo_wrench_batched_rejects_mixed_row_counts(mixed_case):
+    _, wr_all, combo = mixed_case
+    n_rows = combo_wrench_row_counts(wr_all, combo)
+    first_two = [int(np.flatnonzero(n_rows == k)[0]) for k in np.unique(n_rows)[:2]]
+    with pytest.raises(ValueError):
+        form_combo_wrench_batched(wr_all, combo[first_two])
+
+
+def test_rank5_prefilter_matches_per_combo_loop(mixed_case):
+    _, wr_all, combo = mixed_case
+    expected = [
+        i
+        for i, row in enumerate(combo)
+        if (W := form_combo_wrench(wr_all, row)).size and matlab_rank(W) == 5
+    ]
+    got = _rank5_combo_indices(combo, wr_all, chunk_size=37)
+    assert got.tolist() == expected
+
+
+def test_react_wr_5_compose_at_origin_matches_cp_to_wrench(mixed_case):
+    cs, wr_all, _ = mixed_case
+    for i, w in enumerate(wr_all):
+        assert np.array_equal(react_wr_5_compose(cs, np.array([i + 1, 0, 0, 0, 0]), np.zeros(3)), w)
+
+
+def test_react_wr_5_compose_shifts_anchored_rows(mixed_case):
+    cs, wr_all, combo = mixed_case
+    rho = np.array([0.3, -1.2, 2.5])
+    t = wrench_templates(cs)
+    for row in combo[:20]:
+        W0 = form_combo_wrench(wr_all, row)
+        W = react_wr_5_compose(cs, row, rho)
+        np.testing.assert_array_equal(W[:, :3], W0[:, :3])
+        np.testing.assert_allclose(W[:, 3:], W0[:, 3:] - np.cross(rho, W0[:, :3]), atol=1e-12)
+    assert wrench_templates(cs) is t  # cached per constraint set version
+
+
+def test_react_wr_5_compose_batched_matches_scalar(mixed_case):
+    cs, wr_all, combo = mixed_case
+    rng = np.random.default_rng(5)
+    n_rows = combo_wrench_row_counts(wr_all, combo)
+    for k in np.unique(n_rows):
+        idx = np.flatnonzero(n_rows == k)[:40]
+        rho = rng.uniform(-10, 10, (idx.size, 3))
+        W = react_wr_5_compose_batched(cs, combo[idx], rho)
+        assert W.shape == (idx.size, k, 6)
+        for i, j in enumerate(idx):
+            assert np.array_equal(W[i], react_wr_5_compose(cs, combo[j], rho[i]))
+
+
+def test_dfs_enumeration_matches_batched_prefilter(mixed_case):
+    cs, wr_all, combo = mixed_case
+    expected = _rank5_combo_indices(combo, wr_all)
+    assert np.array_equal(_rank5_combo_indices_dfs(combo_stream(cs), wr_all), expected)
+
+
+def test_streamed_rank5_matches_full_table(mixed_case):
+    cs, wr_all, combo = mixed_case
+    expected = _rank5_combo_indices(combo, wr_all)
+    idx, rows = _stream_rank5(combo_stream(cs, chunk_size=7), wr_all)
+    assert np.array_equal(idx, expected)
+    assert np.array_equal(rows, combo[expected])
+    idx, rows = _rank5_combo_rows_dfs(combo_stream(cs), wr_all)
+    assert np.array_equal(idx, expected)
+    assert np.array_equal(rows, combo[expected])
+
+
+def test_dfs_enumeration_prunes_degenerate_prefixes():
+    # Six points with one shared normal span only 3 wrench directions; add three generic points.
+    rng = np.random.default_rng(2)
+    flat = [PointConstraint(np.array([x, y, 0.0]), np.array([0.0, 0.0, 1.0])) for x, y in rng.uniform(-1, 1, (6, 2))]
+    generic = [PointConstraint(p, n / np.linalg.norm(n)) for p, n in rng.standard_normal((3, 2, 3))]
+    cs = ConstraintSet(points=flat + generic)
+    wr_all = [w.as_array() for w in cp_to_wrench(cs)[0]]
+    expected = _rank5_combo_indices(combo_preproc(cs), wr_all)
+    assert 0 < expected.size < len(combo_stream(cs))
+    assert np.array_equal(_rank5_combo_indices_dfs(combo_stream(cs), wr_all), expected)
+
+
+def test_analyze_constraints_rejects_unknown_enumeration():
+    cs = ConstraintSet(points=[PointConstraint(np.zeros(3), np.array([0.0, 0.0, 1.0]))])
+    with pytest.raises(ValueError):
+        analyze_constraints(cs, enumeration="bfs")
+
+
+def _assert_same_detailed(got, ref):
+    for name in ("R", "Ri", "mot_half", "mot_all", "combo_proc", "combo_dup_idx", "pts", "combo"):
+        np.testing.assert_array_equal(getattr(got, name), getattr(ref, name), err_msg=name)
+    assert (got.no_mot_half, got.max_d, got.combo_skipped) == (ref.no_mot_half, ref.max_d, ref.combo_skipped)
+    assert (got.rating.WTR, got.rating.MRR, got.rating.MTR) == (ref.rating.WTR, ref.rating.MRR, ref.rating.MTR)
+
+
+@pytest.mark.parametrize("kind", ["points", "pins", "lines", "planes"])
+def test_extend_detailed_matches_full_analysis(mixed_case, kind):
+    cs, _, _ = mixed_case
+    lists = {k: list(getattr(cs, k)) for k in ("points", "pins", "lines", "planes")}
+    if not lists[kind]:
+        pytest.skip(f"case has no {kind}")
+    new = lists[kind].pop(0)  # re-added at the end of its list, shifting later indices
+    base = analyze_constraints_detailed(ConstraintSet(**lists))
+    ext = extend_detailed(base, new)
+    assert getattr(ext.constraints, kind)[-1] is new and base.constraints.total_cp == cs.total_cp - 1
+    _assert_same_detailed(ext, analyze_constraints_detailed(ext.constraints))
+
+
+def test_extend_detailed_grows_from_empty_set(load_case):
+    cs = load_case("case4_endcap")
+    ext = analyze_constraints_detailed(ConstraintSet())
+    for c in list(cs.pins) + list(cs.points) + list(cs.planes):  # first plane adds 2-subsets
+        ext = extend_detailed(ext, c)
+    _assert_same_detailed(ext, analyze_constraints_detailed(ext.constraints))
+    assert ext.no_mot_half > 0
@@ -0,0 +1,88 @@
+"""Combination enumeration: combo_preproc and its chunked stream."""
+
+from __future__ import annotations
+
+import itertools
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+from kst_rating_tool.combination import (
+    ComboStream,
+    combo_preproc,
+    combo_stream,
+    constraint_row_counts,
+    viable_combo_indices,
+)
+from kst_rating_tool.constraints import (
+    ConstraintSet,
+    PinConstraint,
+    PlaneConstraint,
+    PointConstraint,
+)
+
+
+def _reference(n: int, sizes) -> np.ndarray:
+    rows = [list(c) + [0] * (5 - r) for r in sizes for c in itertools.combinations(range(1, n + 1), r)]
+    return np.asarray(rows, dtype=int).reshape(-1, 5)
+
+
+def _points(n: int) -> list[PointConstraint]:
+    return [PointConstraint(np.array([float(i), 0.0, 0.0]), np.array([0.0, 0.0, 1.0])) for i in range(n)]
+
+
+@pytest.mark.parametrize("n", [0, 4, 5, 9])
+def test_combo_preproc_matches_nchoosek_groups(n):
+    plane = PlaneConstraint(np.zeros(3), np.array([0.0, 0.0, 1.0]), 1, np.array([0.0]))
+    pin = PinConstraint(np.zeros(3), np.array([0.0, 0.0, 1.0]))
+    for cs, sizes in [
+        (ConstraintSet(points=_points(n)), (5,)),
+        (ConstraintSet(points=_points(n), pins=[pin]), (3, 4, 5)),
+        (ConstraintSet(points=_points(n), planes=[plane]), (2, 3, 4, 5)),
+    ]:
+        assert np.array_equal(combo_preproc(cs), _reference(cs.total_cp, sizes))
+
+
+def test_combo_stream_chunks_and_random_access():
+    cs = ConstraintSet(points=_points(11), pins=[PinConstraint(np.zeros(3), np.array([0.0, 1.0, 0.0]))])
+    full = combo_preproc(cs)
+    stream = combo_stream(cs, chunk_size=97)
+    assert len(stream) == full.shape[0]
+    assert stream.dtype == np.uint8
+    blocks = list(stream)
+    assert len(blocks) == stream.n_chunks and all(b.dtype == np.uint8 for b in blocks)
+    assert np.array_equal(np.vstack(blocks), full)
+    assert np.array_equal(stream.chunk(3), full[3 * 97 : 4 * 97])
+    assert np.array_equal(stream.rows(150, 990), full[150:990])  # spans the group boundaries
+    assert np.array_equal(stream.index_of(full[[5, 300, 1200]]), [5, 300, 1200])
+    with pytest.raises(IndexError):
+        stream.chunk(stream.n_chunks)
+    assert pickle.loads(pickle.dumps(stream)) == stream
+
+
+def test_combo_stream_unranks_large_index_ranges():
+    stream = ComboStream(300, (5,))
+    assert stream.dtype == np.uint16
+    n_first = math.comb(299, 4)  # subsets starting with 1
+    rows = stream.rows(n_first - 1, n_first + 1)
+    assert rows.tolist() == [[1, 297, 298, 299, 300], [2, 3, 4, 5, 6]]
+    assert stream.rows(len(stream) - 1, len(stream) + 5).tolist() == [[296, 297, 298, 299, 300]]
+
+
+def test_row_count_pruning_matches_wrench_rows():
+    plane = PlaneConstraint(np.zeros(3), np.array([0.0, 0.0, 1.0]), 1, np.array([0.0]))
+    pin = PinConstraint(np.zeros(3), np.array([0.0, 0.0, 1.0]))
+    cs = ConstraintSet(points=_points(4), pins=[pin, pin], planes=[plane, plane])
+    assert constraint_row_counts(cs) == (1, 1, 1, 1, 2, 2, 3, 3)
+    full = combo_preproc(cs)
+    rows = np.array([sum(constraint_row_counts(cs)[c - 1] for c in r if c) for r in full])
+    expected = np.flatnonzero(rows >= 5)
+    assert np.array_equal(viable_combo_indices(full, constraint_row_counts(cs)), expected)
+
+    stream = combo_stream(cs, chunk_size=40)
+    assert stream.n_skipped == full.shape[0] - expected.size > 0
+    blocks = list(stream.iter_viable())
+    assert np.array_equal(np.concatenate([idx for _, idx in blocks]), expected)
+    assert np.array_equal(np.vstack([b for b, _ in blocks]), full[expected])
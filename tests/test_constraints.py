@@ -1,5 +1,8 @@
 
+import pickle
+
 import numpy as np
+import pytest
 from kst_rating_tool.constraints import (
     ConstraintSet,
     PointConstraint,
@@ -132,3 +135,61 @@ def test_constraint_set_mixed_planes_serialization():
     # Note: roundtrip results in padded array, original was length 1
     assert cs_new.planes[1].prop.shape == (8,)
     assert cs_new.planes[1].prop[0] == 5.0
+
+def _point(z):
+    return PointConstraint(position=np.array([0.0, 0.0, z]), normal=np.array([0.0, 0.0, 1.0]))
+
+def test_constraint_arrays_are_cached_read_only_views():
+    cs = ConstraintSet(points=[_point(0.0), _point(1.0)])
+    first = cs.arrays.as_tuple()
+    second = cs.arrays.as_tuple()
+    assert all(a is b for a, b in zip(first, second))
+    assert cs.arrays.counts == (2, 0, 0, 0)
+    assert first[0].flags.c_contiguous
+    with pytest.raises(ValueError):
+        first[0][0, 2] = 5.0
+
+def test_to_matlab_style_arrays_returns_fresh_writable_copies():
+    cs = ConstraintSet(points=[_point(0.0), _point(1.0)])
+    cp, *_ = cs.to_matlab_style_arrays()
+    assert cp is not cs.arrays.cp
+    cp[0, 2] = 5.0
+    assert cs.arrays.cp[0, 2] == 0.0
+    cs.points[1].position[2] = 7.0  # in-place edit, no invalidate()
+    assert cs.to_matlab_style_arrays()[0][1, 2] == 7.0
+
+def test_constraint_set_mutation_bumps_version_and_rebuilds():
+    cs = ConstraintSet(points=[_point(0.0)])
+    v0 = cs.version
+    cp0 = cs.arrays.cp
+
+    cs.points.append(_point(2.0))
+    assert cs.version > v0
+    assert cs.arrays.cp.shape == (2, 6)
+
+    v1 = cs.version
+    cs.points[0] = _point(3.0)
+    assert cs.version > v1
+    assert cs.arrays.cp[0, 2] == 3.0
+
+    cs.pins = [PinConstraint(center=np.zeros(3), axis=np.array([1.0, 0.0, 0.0]))]
+    assert cs.arrays.cpin.shape == (1, 6)
+    cs.pins.pop()
+    assert cs.arrays.cpin.shape == (0, 6)
+    assert cp0.shape == (1, 6)  # earlier views are not modified
+
+    # In-place edits of a constraint's vectors need an explicit invalidate().
+    cs.points[1].position[2] = 7.0
+    assert cs.arrays.cp[1, 2] == 2.0
+    cs.invalidate()
+    assert cs.arrays.cp[1, 2] == 7.0
+
+def test_constraint_set_pickle_keeps_tracking():
+    cs = ConstraintSet(points=[_point(0.0)])
+    cs.arrays
+    clone = pickle.loads(pickle.dumps(cs))
+    assert clone.total_cp == cs.total_cp
+    np.testing.assert_array_equal(clone.arrays.cp, cs.arrays.cp)
+    clone.points.append(_point(1.0))
+    assert clone.arrays.cp.shape == (2, 6)
+    assert cs.arrays.cp.shape == (1, 6)
@@ -0,0 +1,54 @@
+"""Persistent worker pool used by the parallel analysis path."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from kst_rating_tool.combination import combo_stream
+from kst_rating_tool.executor import AnalysisExecutor, shared_executor
+from kst_rating_tool.pipeline import (
+    _process_combo_chunk,
+    analyze_constraints,
+    analyze_constraints_detailed,
+)
+from kst_rating_tool.wrench import cp_to_wrench
+
+
+def test_executor_reuses_pool_and_published_inputs(cover_case):
+    stream = combo_stream(cover_case)
+    wr_all_sys, pts, max_d = cp_to_wrench(cover_case)
+    expected = _process_combo_chunk(
+        (stream, 0, len(stream), [w.as_array() for w in wr_all_sys], pts, max_d, cover_case)
+    )
+    with AnalysisExecutor(2, chunks_per_worker=4) as ex:
+        first = sorted(ex.run(cover_case, stream), key=lambda x: x[0])
+        pool, handle = ex.pool, ex.publish(cover_case)
+        second = sorted(ex.run(cover_case, stream), key=lambda x: x[0])
+        assert ex.pool is pool and ex.publish(cover_case) is handle
+        cover_case.invalidate()
+        assert ex.publish(cover_case).name != handle.name
+    assert ex._pool is None and ex._shm is None
+    assert [c for c, _, _ in first] == [c for c, _, _ in expected] == [c for c, _, _ in second]
+    for (_, mot, R2), (_, mot_e, R2_e) in zip(first, expected):
+        assert np.array_equal(mot, mot_e)
+        np.testing.assert_allclose(R2, R2_e, rtol=1e-10)
+
+
+def test_parallel_analysis_matches_sequential(cover_case):
+    seq = analyze_constraints_detailed(cover_case)
+    par = analyze_constraints_detailed(cover_case, n_workers=2)
+    assert np.array_equal(par.mot_half, seq.mot_half)
+    assert np.array_equal(par.combo_dup_idx, seq.combo_dup_idx)
+    assert par.combo_skipped == seq.combo_skipped
+    np.testing.assert_allclose(par.R, seq.R, rtol=1e-10)
+    executor = shared_executor(2)
+    assert executor._pool is not None
+    rating = analyze_constraints(cover_case, n_workers=2)
+    assert shared_executor(2) is executor
+    assert rating.WTR == pytest.approx(seq.rating.WTR, rel=1e-10)
+
+
+def test_executor_rejects_bad_worker_count():
+    with pytest.raises(ValueError):
+        AnalysisExecutor(0)
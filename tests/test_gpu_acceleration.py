@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
 import numpy as np
 import pytest
 
 from kst_rating_tool.constraints import ConstraintSet, PointConstraint
-from kst_rating_tool.pipeline import analyze_constraints, analyze_constraints_gpu
+from kst_rating_tool.io_legacy import load_case_m_file
+from kst_rating_tool.pipeline import (
+    analyze_constraints,
+    analyze_constraints_detailed,
+    analyze_constraints_gpu,
+)
 
 
 def _eight_point_cs() -> ConstraintSet:
@@ -88,3 +95,60 @@ def test_directml_device_aliases_and_smoke():
     assert r_np.WTR == pytest.approx(r_dml.WTR, rel=0, abs=1e-4)
     assert r_np.MRR == pytest.approx(r_dml.MRR, rel=0, abs=1e-4)
     assert r_np.MTR == pytest.approx(r_dml.MTR, rel=0, abs=1e-4)
+
+
+INPUT_DIR = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files"
+
+
+@pytest.mark.parametrize("name", ["case3a_cover_leverage", "case4b_endcap_circlinsrch", "case5rev_a_printer_2screws"])
+def test_torch_engine_matches_numpy_pipeline(name):
+    pytest.importorskip("torch")
+    path = INPUT_DIR / f"{name}.m"
+    if not path.exists():
+        pytest.skip(f"{path.name} not found")
+    cs = load_case_m_file(path)
+    ref = analyze_constraints_detailed(cs)
+    got = analyze_constraints_detailed(cs, accelerator="torch", device="cpu")
+    assert np.array_equal(got.mot_half, ref.mot_half)
+    assert np.array_equal(got.combo_dup_idx, ref.combo_dup_idx)
+    assert np.array_equal(got.combo_proc, ref.combo_proc)
+    assert np.array_equal(np.isinf(got.R), np.isinf(ref.R))
+    np.testing.assert_allclose(got.R[np.isfinite(got.R)], ref.R[np.isfinite(ref.R)], rtol=1e-8)
+    rating = analyze_constraints(cs, accelerator="torch", device="cpu")
+    for field in ("WTR", "MRR", "MTR", "TOR"):
+        assert getattr(rating, field) == pytest.approx(getattr(ref.rating, field), rel=1e-8)
+
+
+def _unit(rng, n):
+    v = rng.standard_normal((n, 3))
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("pitch", [0.0, 0.7, np.inf])
+def test_torch_rating_kernel_matches_numpy(pitch):
+    pytest.importorskip("torch")
+    from kst_rating_tool.numeric_backend import resolve_accelerator
+    from kst_rating_tool.rating_batched import rate_motions_batched_numpy
+    from kst_rating_tool.torch_engine import rate_motions_batched_torch
+
+    rng = np.random.default_rng(5)
+    mot_arr = np.hstack([rng.standard_normal((4, 9)), np.full((4, 1), pitch)])
+    input_wr = rng.standard_normal((4, 6))
+    pivots = [rng.standard_normal((5, 6)) for _ in range(4)]
+    pivots[1] = np.vstack([pivots[1], pivots[1][0] + pivots[1][2]])  # six rows, still rank 5
+    pivots[2] = np.vstack([pivots[2][:4], pivots[2][0]])  # rank 4: exact path, nothing rated
+    cp = np.hstack([rng.uniform(-5, 5, (6, 3)), _unit(rng, 6)])
+    cpin = np.hstack([rng.uniform(-5, 5, (4, 3)), _unit(rng, 4)])
+    clin = np.hstack([rng.uniform(-5, 5, (3, 3)), _unit(rng, 3), _unit(rng, 3), rng.uniform(1, 4, (3, 1))])
+    cpln = np.hstack([rng.uniform(-5, 5, (4, 3)), _unit(rng, 4), [[1], [2], [1], [2]]])
+    cpln_prop = np.hstack([_unit(rng, 4), rng.uniform(1, 3, (4, 1)), _unit(rng, 4), rng.uniform(1, 3, (4, 1))])
+    cpln_prop[[1, 3], 0] = rng.uniform(1, 3, 2)  # circle radius
+
+    ref = rate_motions_batched_numpy(mot_arr, pivots, input_wr, cp, cpin, clin, cpln, cpln_prop)
+    got = rate_motions_batched_torch(
+        mot_arr, pivots, input_wr, cp, cpin, clin, cpln, cpln_prop, resolve_accelerator("torch", "cpu")
+    )
+    for g, e in zip(got, ref):
+        assert np.array_equal(np.isinf(g), np.isinf(e))
+        np.testing.assert_allclose(g[np.isfinite(g)], e[np.isfinite(e)], rtol=1e-9)
+    assert np.all(np.isinf(got[0][2]))
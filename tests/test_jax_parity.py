@@ -0,0 +1,85 @@
+"""JAX backend (``accelerator="jax"``) against the NumPy pipeline on the MATLAB input cases.
+
+CPU-only: JAX runs on its ``cpu`` platform. The three cases in ``FAST_CASES``
+cover points, pins, lines and both plane types; the rest are marked slow.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from kst_rating_tool import numeric_backend
+from kst_rating_tool.io_legacy import load_case_m_file
+from kst_rating_tool.numeric_backend import resolve_accelerator
+from kst_rating_tool.pipeline import analyze_constraints, analyze_constraints_detailed
+from kst_rating_tool.rating import _matlab_mldivide
+from kst_rating_tool.utils import matlab_rank_batched
+
+jnp = pytest.importorskip("jax.numpy")
+linalg_jax = pytest.importorskip("kst_rating_tool.linalg_jax")
+pytest.importorskip("kst_rating_tool.jax_engine")  # enables float64
+
+INPUT_DIR = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files"
+FAST_CASES = ("case3a_cover_leverage", "case4b_endcap_circlinsrch", "case5rev_a_printer_2screws")
+CASES = [
+    pytest.param(p.stem, marks=() if p.stem in FAST_CASES else pytest.mark.slow)
+    for p in sorted(INPUT_DIR.glob("case*.m"))
+]
+
+
+def test_resolve_jax_and_fallback(monkeypatch):
+    st = resolve_accelerator("jax")
+    assert st.kind == "jax" and st.device == "cpu"
+    monkeypatch.setattr(numeric_backend, "_jax_available", lambda: False)
+    with pytest.raises(ImportError):
+        resolve_accelerator("jax")
+    path = INPUT_DIR / "case4_endcap.m"
+    if not path.exists():
+        pytest.skip(f"{path.name} not found")
+    cs = load_case_m_file(path)
+    assert analyze_constraints(cs, accelerator="jax").WTR == analyze_constraints(cs).WTR
+
+
+def test_linalg_jax_matches_matlab_helpers():
+    rng = np.random.default_rng(5)
+    A = rng.normal(size=(6, 6, 6))
+    A[1, 5] = A[1, 0] + A[1, 2]  # rank 5
+    A[2, :, 3] = 0.0
+    A[2, 4] = A[2, 1]  # rank 5, singular square system
+    b = rng.normal(size=(6, 6))
+    assert np.array_equal(np.asarray(linalg_jax.matlab_rank_batched_jax(jnp.asarray(A))), matlab_rank_batched(A))
+    sol = np.asarray(linalg_jax.matlab_mldivide_batched_jax(jnp.asarray(A), jnp.asarray(b)))
+    for i in (0, 3, 4, 5):
+        np.testing.assert_allclose(sol[i], _matlab_mldivide(A[i], b[i]), rtol=1e-9)
+    assert np.isfinite(sol[1]).all() and np.isfinite(sol[2]).all()  # least squares instead of inf
+    tall = rng.normal(size=(7, 6))
+    np.testing.assert_allclose(
+        np.asarray(linalg_jax.matlab_mldivide_jax(jnp.asarray(tall), jnp.asarray(b[0].tolist() + [1.0]))),
+        _matlab_mldivide(tall, np.append(b[0], 1.0)),
+        rtol=1e-9,
+    )
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_jax_matches_numpy(name):
+    path = INPUT_DIR / f"{name}.m"
+    cs = load_case_m_file(path)
+    ref = analyze_constraints_detailed(cs)
+    res = analyze_constraints_detailed(cs, accelerator="jax")
+    assert np.array_equal(res.mot_half, ref.mot_half)
+    assert np.array_equal(res.combo_proc, ref.combo_proc)
+    assert np.array_equal(res.combo_dup_idx, ref.combo_dup_idx)
+    # Compare resistances through their reciprocals: near-singular candidates
+    # (R ~ 1e5 and up) move with the last bit of the recovered motion. XLA may
+    # also round differently from NumPy in the last bit, which can flip a pin's
+    # constraining direction across a half-step of the 1e-5 grid (rate_cpin);
+    # allow a handful of such entries.
+    with np.errstate(divide="ignore"):
+        close = np.isclose(1.0 / res.R, 1.0 / ref.R, rtol=1e-7, atol=1e-6)
+    assert np.count_nonzero(~close) <= max(2, close.size // 10000)
+    np.testing.assert_array_equal(res.Ri, ref.Ri)
+    for metric in ("WTR", "MRR", "MTR", "TOR"):
+        assert getattr(res.rating, metric) == pytest.approx(getattr(ref.rating, metric), rel=1e-9)
@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from kst_rating_tool.motion import calc_d
+from kst_rating_tool.motion import MotionKeyIndex, calc_d, motion_keys, unique_motion_rows
 
 def test_calc_d_empty_points():
     omu = np.array([1.0, 0.0, 0.0])
@@ -136,3 +136,75 @@ def test_specmot_row_to_screw_zero_pitch():
     np.testing.assert_allclose(screw.omu, expected_omu, atol=1e-12)
     np.testing.assert_allclose(screw.mu, expected_mu, atol=1e-12)
     assert screw.h == 0.0
+
+
+def test_rec_mot_batched_matches_scalar():
+    from kst_rating_tool.motion import rec_mot, rec_mot_batched
+
+    rng = np.random.default_rng(0)
+    W = rng.standard_normal((50, 5, 6))
+    W[:3, :, 0] = 0.0  # null space [1, 0, 0, 0, 0, 0]: pure translation (om = 0)
+    mot = rec_mot_batched(W)
+    assert mot.shape == (50, 10)
+    expected = np.vstack([rec_mot(w).as_array() for w in W])
+    assert np.array_equal(mot, expected)
+    assert np.all(np.isinf(mot[:3, 9]))
+
+
+def test_rec_mot_batched_tall_stack_and_single_matrix():
+    from kst_rating_tool.motion import rec_mot, rec_mot_batched
+
+    rng = np.random.default_rng(3)
+    base = rng.standard_normal((5, 6))
+    extra = rng.standard_normal((2, 5)) @ base  # dependent rows keep rank 5
+    tall = np.vstack([base, extra])
+    assert np.array_equal(rec_mot_batched(tall)[0], rec_mot(tall).as_array())
+    assert rec_mot_batched(np.empty((0, 5, 6))).shape == (0, 10)
+
+
+def test_rec_mot_batched_rejects_full_rank():
+    from kst_rating_tool.motion import rec_mot_batched
+
+    with pytest.raises(ValueError):
+        rec_mot_batched(np.eye(6)[np.newaxis])
+
+
+def _grid_motions(rng, n):
+    mot = np.round(rng.integers(-2, 3, (n, 10)) * rng.choice([1.0, 0.5, 1e-4], (n, 10)) * 1e4) / 1e4
+    mot[rng.random((n, 10)) < 0.05] = np.inf
+    mot[rng.random((n, 10)) < 0.05] = -0.0
+    return mot
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unique_motion_rows_matches_np_unique(seed):
+    rng = np.random.default_rng(seed)
+    mot = _grid_motions(rng, 80)
+    assert np.array_equal(unique_motion_rows(mot), np.unique(mot, axis=0, return_index=True)[1])
+    off_grid = mot + rng.standard_normal(mot.shape) * 1e-7  # falls back to np.unique
+    assert np.array_equal(unique_motion_rows(off_grid), np.unique(off_grid, axis=0, return_index=True)[1])
+
+
+def test_motion_keys_order_and_infinities():
+    mot = np.array([[0.0, -0.0, 1.2345, -np.inf, np.inf, 0, 0, 0, 0, 0.0001]])
+    keys = motion_keys(mot)
+    assert keys.dtype == np.int64
+    assert keys[0, :3].tolist() == [0, 0, 12345]
+    assert keys[0, 3] < -(10**15) < 10**15 < keys[0, 4]
+
+
+def test_motion_key_index_matches_tuple_dedupe_across_batches():
+    rng = np.random.default_rng(9)
+    mot = _grid_motions(rng, 60)
+    mot[[7, 30]] = np.nan  # NaN rows never match, as with tuple keys
+    seen: dict = {}
+    expected_ids, expected_new = [], []
+    for row in mot:
+        key = tuple(row)
+        expected_new.append(key not in seen)
+        expected_ids.append(seen.setdefault(key, len(seen)))
+    index = MotionKeyIndex()
+    got = [index.insert(mot[s]) for s in (slice(0, 25), slice(25, 26), slice(26, 60))]
+    assert np.concatenate([ids for ids, _ in got]).tolist() == expected_ids
+    assert np.concatenate([new for _, new in got]).tolist() == expected_new
+    assert len(index) == sum(expected_new)
@@ -0,0 +1,80 @@
+"""Optional Numba backend: compiled kernels against the NumPy reference."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from kst_rating_tool import numeric_backend
+from kst_rating_tool.input_wr import input_wr_compose
+from kst_rating_tool.motion import screw_from_array
+from kst_rating_tool.numeric_backend import resolve_accelerator
+from kst_rating_tool.pipeline import analyze_constraints, analyze_constraints_detailed
+from kst_rating_tool.rating_batched import (
+    _last_coeff_batched,
+    _last_coeff_exact_batched,
+)
+from kst_rating_tool.react_wr import react_wr_5_compose_batched
+from kst_rating_tool.wrench import wrench_templates
+
+numba_kernels = pytest.importorskip("kst_rating_tool.numba_kernels")
+
+def test_resolve_numba_and_fallback(monkeypatch, load_case):
+    st = resolve_accelerator("numba")
+    assert st.kind == "numba" and st.device == "cpu"
+    monkeypatch.setattr(numeric_backend, "_numba_available", lambda: False)
+    with pytest.raises(ImportError):
+        resolve_accelerator("numba")
+    cs = load_case("case3a_cover_leverage")
+    assert analyze_constraints(cs, accelerator="numba").WTR == analyze_constraints(cs).WTR
+
+
+def test_input_and_pivot_kernels_match_numpy(load_case):
+    cs = load_case("case4b_endcap_circlinsrch")
+    rng = np.random.default_rng(3)
+    mot = rng.normal(size=(40, 10))
+    mot[0, 9] = np.inf
+    mot[1, 9] = 0.0
+    mot[2, 9] = 1e-3  # translation-dominant: |1/h| < d
+    pts = rng.normal(scale=20.0, size=(7, 3))
+    expected = np.vstack([input_wr_compose(screw_from_array(m), pts, 15.0)[0] for m in mot])
+    assert np.array_equal(numba_kernels.input_wrenches(mot, pts, 15.0), expected)
+    assert np.array_equal(numba_kernels.input_wrenches(mot[:3], np.empty((0, 3)), 15.0)[1], np.zeros(6))
+
+    counts = wrench_templates(cs).counts
+    single = np.flatnonzero(counts == 1)[:5] + 1
+    combos = np.tile(single, (6, 1))
+    rho = rng.normal(size=(6, 3))
+    np.testing.assert_array_equal(
+        numba_kernels.compose_pivot_wrenches(cs, combos, rho), react_wr_5_compose_batched(cs, combos, rho)
+    )
+
+
+def test_last_coeff_kernels_match_numpy():
+    rng = np.random.default_rng(7)
+    react = rng.normal(size=(12, 5, 6))
+    react[3, 4] = react[3, 0]  # rank 4: no candidate reaches rank 6
+    b = rng.normal(size=(12, 6))
+    wr = rng.normal(size=(12, 9, 6))
+    need_all = np.zeros(9, dtype=bool)
+    need_all[:4] = True
+    val, ok = numba_kernels.last_coeff_batched(react, b, wr, require_finite_sol=need_all)
+    val_np, ok_np = _last_coeff_batched(react, b, wr, require_finite_sol=need_all)
+    assert np.array_equal(ok, ok_np) and not ok[3].any()
+    np.testing.assert_allclose(val[ok], val_np[ok_np], rtol=1e-10)
+
+    val6, ok6 = numba_kernels._last_coeff_exact6_kernel(react, b, wr, need_all)
+    val_ex, ok_ex = _last_coeff_exact_batched(react, b, wr, need_all)
+    assert np.array_equal(ok6, ok_ex)
+    np.testing.assert_allclose(val6[ok6], val_ex[ok_ex], rtol=1e-9)
+
+
+@pytest.mark.parametrize("name", ["case1a_chair_height", "case4b_endcap_circlinsrch", "case5rev_a_printer_2screws"])
+def test_numba_pipeline_matches_numpy(name, load_case):
+    cs = load_case(name)
+    ref = analyze_constraints_detailed(cs)
+    res = analyze_constraints_detailed(cs, accelerator="numba")
+    assert np.array_equal(res.mot_half, ref.mot_half)
+    assert np.array_equal(res.combo_proc, ref.combo_proc)
+    np.testing.assert_allclose(res.R, ref.R, rtol=1e-9)
+    assert res.rating.WTR == pytest.approx(ref.rating.WTR, rel=1e-9)
@@ -232,3 +232,19 @@ def test_optimize_addition_mixed_type_pool():
     # Two total candidates (1 point + 1 pin), n_add=1 => 2 combos
     assert len(result.history) == 2
     assert result.best_constraints.total_cp == baseline.total_cp + 1
+
+
+def test_optimize_addition_incremental_ratings_match_full_analysis():
+    """Greedy steps extend the previous analysis; each rating equals a from-scratch run."""
+    baseline = _six_point_baseline()
+    pool = ConstraintSet(
+        points=[PointConstraint(np.array([0.5, 0.0, 0.3]), np.array([1.0, 0.0, 0.0]))],
+        pins=[PinConstraint(np.array([0.0, 0.5, 0.0]), np.array([0.0, 1.0, 0.0]))],
+    )
+    result = optimize_addition(baseline, pool, n_add=2, method="greedy")
+    for indices, rating in result.history:
+        ref = analyze_constraints(constraint_set_with(baseline, pool, indices))
+        assert (rating.WTR, rating.MRR, rating.MTR) == (ref.WTR, ref.MRR, ref.MTR)
+    wtr_all, combos, *_ = optim_main_add(baseline, pool, no_add=2)
+    ref = analyze_constraints(constraint_set_with(baseline, pool, list(combos[0])))
+    assert wtr_all[0] == ref.WTR
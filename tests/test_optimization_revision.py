@@ -1,13 +1,21 @@
 """Tests for optim_main_rev, optim_postproc, rate_specmot, main_specmot_optim, and search_space."""
 from __future__ import annotations
 
+from pathlib import Path
+
 import numpy as np
 import pytest
 
 from kst_rating_tool import ConstraintSet, PointConstraint, analyze_constraints_detailed
+from kst_rating_tool import executor as executor_module
+from kst_rating_tool.executor import shared_executor
+from kst_rating_tool.io_legacy import load_case_m_file
+from kst_rating_tool.wrench import cp_to_wrench, wrench_templates
 from kst_rating_tool.optimization import (
     RevisionConfig,
+    RevisionContext,
     optim_main_rev,
+    optim_main_rev_adaptive,
     optim_postproc,
     optim_postproc_plot,
     rate_specmot,
@@ -100,6 +108,116 @@ def test_optim_main_rev_progress_callback():
     assert calls[-1][0] == calls[-1][1]  # last call: current == total
 
 
+def test_optim_main_rev_parallel_matches_sequential():
+    cs = _six_point_set()
+    baseline = analyze_constraints_detailed(cs)
+    config = RevisionConfig(
+        grp_members=[np.array([1], dtype=np.int_), np.array([3], dtype=np.int_)],
+        grp_rev_type=np.array([2, 5], dtype=np.int_),
+        grp_srch_spc=[
+            np.array([-1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.5], dtype=float),
+            np.array([1.0, 0.0, 0.0, 30.0], dtype=float),
+        ],
+    )
+    calls = []
+
+    sequential = optim_main_rev(baseline, config, no_step=3)
+    parallel = optim_main_rev(
+        baseline, config, no_step=3, n_workers=2, progress_callback=lambda c, t: calls.append((c, t))
+    )
+
+    executor = shared_executor(2)
+    pool, handle = executor.pool, executor._published_obj
+    again = optim_main_rev(baseline, config, no_step=3, n_workers=2)
+
+    assert sequential[0].shape == (4, 4)
+    for seq, par, rep in zip(sequential, parallel, again):
+        np.testing.assert_array_equal(seq, par)
+        np.testing.assert_array_equal(seq, rep)
+    assert calls == [(i, 16) for i in range(1, 17)]
+    assert executor.pool is pool and executor._published_obj is handle
+
+
+def test_revision_context_matches_cp_to_wrench():
+    case = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files" / "case3a_cover_leverage.m"
+    if not case.exists():
+        pytest.skip("case3a_cover_leverage.m not available")
+    cs = load_case_m_file(case)
+    n_cp, n_cpin, n_clin, _ = cs.arrays.counts
+    rev = np.array([1, n_cp + n_cpin + 1, cs.total_cp], dtype=np.int_)  # a point, a line and a plane
+    context = RevisionContext(cs, rev)
+
+    cp, cpin, clin, cpln, cpln_prop = (a.copy() for a in cs.to_matlab_style_arrays())
+    cp[0, :3] += [0.3, -0.2, 0.1]
+    clin[0, :3] += [0.0, 0.5, 0.0]
+    cpln[-1, :3] += [0.2, 0.0, -0.4]
+    cpln_prop[-1, 3] *= 1.5
+    revised, wr_all, pts, max_d = context.revise(cp, cpin, clin, cpln, cpln_prop)
+
+    ref = ConstraintSet.from_matlab_style_arrays(cp, cpin, clin, cpln, cpln_prop)
+    wr_ref, pts_ref, max_d_ref = cp_to_wrench(ref)
+    assert max_d == max_d_ref
+    np.testing.assert_array_equal(pts, pts_ref)
+    for w, w_ref in zip(wr_all, wr_ref):
+        np.testing.assert_array_equal(w, w_ref.as_array())
+    t, t_ref = wrench_templates(revised), wrench_templates(ref)
+    for name in ("om", "mu", "anchor", "anchored"):
+        np.testing.assert_array_equal(getattr(t, name), getattr(t_ref, name))
+
+
+def test_optim_main_rev_adaptive_matches_factorial_grid():
+    cs = _six_point_set()
+    baseline = analyze_constraints_detailed(cs)
+    config = RevisionConfig(
+        grp_members=[np.array([1], dtype=np.int_), np.array([3], dtype=np.int_)],
+        grp_rev_type=np.array([2, 5], dtype=np.int_),
+        grp_srch_spc=[
+            np.array([-1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.5], dtype=float),
+            np.array([1.0, 0.0, 0.0, 30.0], dtype=float),
+        ],
+    )
+    grids = optim_main_rev(baseline, config, no_step=6)[:4]
+
+    result = optim_main_rev_adaptive(baseline, config, no_step=6, budget=1000)
+    assert 9 <= result.n_evaluated < 49
+    for name, grid in zip(("WTR", "MRR", "MTR", "TOR"), grids):
+        np.testing.assert_array_equal(getattr(result, name), grid[tuple(result.indices.T)])
+    sparse = result.postproc()
+    dense = optim_postproc(6, 2, *result.to_grids(), *result.to_grids())
+    for name in ("WTR", "MRR", "MTR", "TOR"):
+        assert sparse[f"{name}_max_idx"] == dense[f"{name}_max_idx"]
+    np.testing.assert_array_equal(sparse["WTR_max_x"], result.x_inc[list(sparse["WTR_max_idx"])])
+
+    capped = optim_main_rev_adaptive(baseline, config, no_step=6, budget=5)
+    assert capped.n_evaluated == 5
+
+
+def test_optim_main_rev_adaptive_parallel_publishes_once(monkeypatch):
+    cs = _six_point_set()
+    baseline = analyze_constraints_detailed(cs)
+    config = RevisionConfig(
+        grp_members=[np.array([1], dtype=np.int_), np.array([3], dtype=np.int_)],
+        grp_rev_type=np.array([2, 5], dtype=np.int_),
+        grp_srch_spc=[
+            np.array([-1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.5], dtype=float),
+            np.array([1.0, 0.0, 0.0, 30.0], dtype=float),
+        ],
+    )
+    sequential = optim_main_rev_adaptive(baseline, config, no_step=6)
+    executor = shared_executor(2)
+    pool = executor.pool
+    pickled = []
+    dumps = executor_module.pickle.dumps
+    monkeypatch.setattr(executor_module.pickle, "dumps", lambda *a, **k: pickled.append(1) or dumps(*a, **k))
+
+    parallel = optim_main_rev_adaptive(baseline, config, no_step=6, n_workers=2)
+    assert len(pickled) == 1
+    assert executor.pool is pool
+    np.testing.assert_array_equal(parallel.indices, sequential.indices)
+    for name in ("WTR", "MRR", "MTR", "TOR"):
+        np.testing.assert_array_equal(getattr(parallel, name), getattr(sequential, name))
+
+
 def test_optim_main_rev_no_rev_type_constant_results():
     """Rev type 1 (none) applies no modification, so all grid points should yield the same rating."""
     cs = _six_point_set()
@@ -7,9 +7,19 @@ import json
 
 import numpy as np
 
-from kst_rating_tool import ConstraintSet, PointConstraint, analyze_constraints_detailed
-from kst_rating_tool.optimization import optim_main_red, sens_analysis_orient, sens_analysis_pos
-from kst_rating_tool.rating import rate_motset
+from kst_rating_tool import ConstraintSet, PointConstraint, analyze_constraints, analyze_constraints_detailed
+from kst_rating_tool.io_legacy import load_case_m_file
+from kst_rating_tool.motion import unique_motion_rows
+from kst_rating_tool.optimization import (
+    RemovalEvaluator,
+    constraint_set_without,
+    optim_main_red,
+    optimize_reduction,
+    search_reduction,
+    sens_analysis_orient,
+    sens_analysis_pos,
+)
+from kst_rating_tool.rating import aggregate_ratings, rate_motset
 
 
 def _small_constraints() -> ConstraintSet:
@@ -40,6 +50,117 @@ def test_optim_main_red_smoke_runs():
     assert tor_chg.shape[0] == wtr_all.shape[0]
 
 
+def _optim_main_red_loop(baseline, no_red):
+    """Per-set loop of optim_main_red.m (the pre-vectorization port), WTR/MRR/MTR per removal set."""
+    import itertools
+
+    out = []
+    M = baseline.no_mot_half
+    for cp_del in itertools.combinations(range(1, baseline.constraints.total_cp + 1), no_red):
+        del_idx = np.flatnonzero(np.isin(baseline.combo, cp_del).any(axis=1))
+        kept = np.setdiff1d(np.arange(baseline.combo.shape[0]), del_idx)
+        dup_idx = np.setdiff1d(np.unique(baseline.combo_dup_idx[kept]), [0])
+        del_all = np.flatnonzero(np.isin(baseline.combo_proc[:, 1:6], cp_del).any(axis=1))
+        remain = np.setdiff1d(np.arange(M), np.setdiff1d(del_all, dup_idx))
+        full = np.concatenate([remain, remain + M])
+        Ri_red = np.delete(baseline.Ri[full, :], np.array(cp_del) - 1, axis=1)
+        uniq = unique_motion_rows(baseline.mot_all[full])
+        res = aggregate_ratings(1.0 / np.maximum(Ri_red[uniq, :], 1e-12))
+        out.append((res.WTR, res.MRR, res.MTR))
+    return np.array(out).reshape(-1, 3)
+
+
+def test_optim_main_red_matches_per_set_loop():
+    cases = [_random_points(8, 3), _small_constraints()]
+    path = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files" / "case4b_endcap_circlinsrch.m"
+    if path.exists():
+        cases.append(load_case_m_file(path))
+    for cs in cases:
+        baseline = analyze_constraints_detailed(cs)
+        for no_red in (1, 2, 3, cs.total_cp):
+            wtr, comb, *_ = optim_main_red(baseline, no_red)
+            ref = _optim_main_red_loop(baseline, no_red)
+            assert comb.shape == (ref.shape[0], no_red)
+            np.testing.assert_array_equal(wtr, ref[:, 0])
+    empty = analyze_constraints_detailed(ConstraintSet(points=_small_constraints().points[:4]))
+    assert empty.no_mot_half == 0
+    np.testing.assert_array_equal(optim_main_red(empty, 2)[0], np.zeros(6))
+
+
+def _random_points(n: int, seed: int) -> ConstraintSet:
+    rng = np.random.default_rng(seed)
+    return ConstraintSet(
+        points=[PointConstraint(p, nrm / np.linalg.norm(nrm)) for p, nrm in rng.standard_normal((n, 2, 3))]
+    )
+
+
+def test_removal_evaluator_matches_reanalysis():
+    # Random contacts: removing hull points moves the moment arm, so some rows are re-rated.
+    sets = [(_random_points(8, 3), [[i] for i in range(8)] + [[0, 5], [2, 7], [1, 3, 6]])]
+    case = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files" / "case3a_cover_leverage.m"
+    if case.exists():
+        cs = load_case_m_file(case)
+        sets.append((cs, [[i] for i in range(cs.total_cp)] + [[0, 8], [6, 7]]))
+    for cs, removals in sets:
+        evaluator = RemovalEvaluator.from_constraints(cs)
+        for removed in removals:
+            got = evaluator.rating(removed)
+            ref = analyze_constraints(constraint_set_without(cs, removed))
+            assert (got.WTR, got.MRR, got.MTR, got.TOR) == (ref.WTR, ref.MRR, ref.MTR, ref.TOR), removed
+        assert evaluator.rating([]) is evaluator.baseline.rating
+
+
+def test_optimize_reduction_history_matches_reanalysis():
+    cs = _random_points(7, 5)
+    for method in ("greedy", "full", "beam"):
+        result = optimize_reduction(cs, n_remove=2, method=method, objective="WTR")
+        assert result.history
+        for removed, rating in result.history:
+            assert rating.WTR == analyze_constraints(constraint_set_without(cs, removed)).WTR
+
+
+def test_search_reduction_exact_matches_enumeration():
+    sets = [_random_points(9, 11)]
+    case = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files" / "case4b_endcap_circlinsrch.m"
+    if case.exists():
+        sets.append(load_case_m_file(case))
+    for cs in sets:
+        evaluator = RemovalEvaluator.from_constraints(cs)
+        for objective in ("WTR", "MRR", "TOR"):
+            full = optimize_reduction(cs, n_remove=3, method="full", objective=objective)
+            values = sorted((getattr(r, objective) for _, r in full.history), reverse=True)
+            found = search_reduction(
+                cs, 3, objective=objective, top_k=3, beam_width=2, exact=True, evaluator=evaluator
+            )
+            assert found.certified and found.n_candidates == len(full.history)
+            assert found.n_prefix_evaluated == 0 and found.n_evaluated <= found.n_candidates
+            assert found.values == values[:3]
+            for removed, rating in found.best:
+                assert getattr(rating, objective) == getattr(evaluator.rating(removed), objective)
+
+
+def test_search_reduction_beam_and_budget():
+    cs = _random_points(9, 11)
+    for exact in (False, True):
+        found = search_reduction(cs, 3, objective="TOR", beam_width=1, exact=exact, max_evals=12)
+        assert not found.certified and len(found.best) <= 1
+        assert found.n_evaluated + found.n_prefix_evaluated == 12  # max_evals covers every rating
+        assert len(found.history) == found.n_evaluated
+    beam = search_reduction(cs, 3, objective="TOR", beam_width=2)
+    assert beam.n_evaluated <= beam.n_candidates and beam.n_prefix_evaluated > 0
+    assert search_reduction(cs, 3, objective="TOR").n_prefix_evaluated == 0  # wide beam: enumerated
+    result = optimize_reduction(cs, n_remove=3, method="beam", objective="TOR", beam_width=2, top_k=2)
+    assert result.indices_removed == beam.best[0][0]
+    assert [r for r, _ in result.history] == [r for r, _ in beam.history]
+    assert result.best_rating.TOR == analyze_constraints(result.best_constraints).TOR
+
+
+def test_search_reduction_exact_prunes_case3a(cover_case):
+    for objective in ("MRR", "TOR"):
+        found = search_reduction(cover_case, 3, objective=objective, exact=True)
+        assert found.certified and found.n_evaluated < found.n_candidates == 84
+
+
 def test_sensitivity_smoke_runs():
     baseline = analyze_constraints_detailed(_small_constraints())
     sap = sens_analysis_pos(baseline, baseline.constraints, pert_dist=0.1, no_step=1)
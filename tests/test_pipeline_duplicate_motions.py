@@ -1,52 +1,47 @@
 
+from types import SimpleNamespace
+
 import pytest
 import numpy as np
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from kst_rating_tool.pipeline import analyze_constraints, analyze_constraints_detailed
 from kst_rating_tool.constraints import ConstraintSet, PointConstraint
 from kst_rating_tool.rating import RatingResults
 
-# Mock helper functions to control the output of `rec_mot`, `form_combo_wrench`, etc.
+# Mock helper functions to control the output of `rec_mot_batched`, the rank-5 prefilter, etc.
 # This allows us to inject specific motions (duplicates, NaNs) without relying on complex geometry.
 
 @pytest.fixture
 def mock_pipeline_dependencies():
-    with patch("kst_rating_tool.pipeline.form_combo_wrench") as mock_form, \
-         patch("kst_rating_tool.pipeline.matlab_rank") as mock_rank, \
-         patch("kst_rating_tool.pipeline.rec_mot") as mock_rec_mot, \
+    with patch("kst_rating_tool.pipeline._rank5_combo_indices") as mock_rank, \
+         patch("kst_rating_tool.pipeline.rec_mot_batched") as mock_rec_mot, \
          patch("kst_rating_tool.pipeline.input_wr_compose") as mock_input, \
-         patch("kst_rating_tool.pipeline.react_wr_5_compose") as mock_react, \
-         patch("kst_rating_tool.pipeline._rate_motion_all_constraints") as mock_rate, \
+         patch("kst_rating_tool.pipeline.react_wr_5_compose_batched") as mock_react, \
+         patch("kst_rating_tool.pipeline._rate_motions_all_constraints") as mock_rate, \
          patch("kst_rating_tool.pipeline.cp_to_wrench") as mock_cp_to_wr, \
          patch("kst_rating_tool.pipeline.combo_preproc") as mock_combo:
 
         # Default behaviors
         mock_cp_to_wr.return_value = ([], np.zeros((3,1)), 1.0)
-        mock_rank.return_value = 5
+        mock_rank.side_effect = lambda combo, wr_all: np.arange(combo.shape[0])
         mock_input.return_value = (np.zeros(6), 0)
-        mock_react.return_value = np.zeros(6)
+        mock_react.side_effect = lambda constraints, combos, rho: np.zeros((combos.shape[0], 5, 6))
 
-        # Mock rating output: 7 arrays
-        mock_rate.return_value = (
-            np.array([1.0]), np.array([1.0]), np.array([1.0]),
-            np.array([1.0]), np.array([1.0]), np.array([1.0]), np.array([1.0])
+        # Mock rating output: 7 blocks of shape (n_motions, 1)
+        mock_rate.side_effect = lambda mot_arr, *args, **kwargs: tuple(
+            np.ones((mot_arr.shape[0], 1)) for _ in range(7)
         )
 
         yield {
-            "form": mock_form,
             "rank": mock_rank,
             "rec_mot": mock_rec_mot,
             "combo": mock_combo,
             "rate": mock_rate
         }
 
-def create_mock_motion(arr_values):
-    """Create a mock object that behaves like a ScrewMotion."""
-    mock_mot = MagicMock()
-    # as_array().ravel() should return the array
-    mock_mot.as_array.return_value.ravel.return_value = np.array(arr_values, dtype=float)
-    mock_mot.rho = np.zeros(3)
-    return mock_mot
+def stack_motions(*motions):
+    """Stack motion rows the way ``rec_mot_batched`` returns them (one row per combo)."""
+    return np.vstack([np.asarray(m, dtype=float) for m in motions])
 
 def test_analyze_constraints_duplicate_detection(mock_pipeline_dependencies):
     """
@@ -56,7 +51,7 @@ def test_analyze_constraints_duplicate_detection(mock_pipeline_dependencies):
     mocks = mock_pipeline_dependencies
 
     # Setup constraints (dummy)
-    cs = ConstraintSet(points=[PointConstraint(np.zeros(3), np.array([0,0,1]))])
+    cs = ConstraintSet(points=[PointConstraint(np.zeros(3), np.array([0,0,1]))] * 5)  # combos [1..5] stack 5 rows
 
     # We want to simulate 4 combos:
     # 1. Motion A
@@ -72,30 +67,28 @@ def test_analyze_constraints_duplicate_detection(mock_pipeline_dependencies):
     mot_c = np.array([np.nan] * 10)
     mot_d = np.array([np.nan] * 10)
 
-    # Setup rec_mot to return these sequentially
-    mocks["rec_mot"].side_effect = [
-        create_mock_motion(mot_a),
-        create_mock_motion(mot_b),
-        create_mock_motion(mot_c),
-        create_mock_motion(mot_d)
-    ]
+    # Setup rec_mot_batched to return these in combo order
+    mocks["rec_mot"].return_value = stack_motions(mot_a, mot_b, mot_c, mot_d)
 
-    # Run analysis
-    results = analyze_constraints(cs)
+    # Run analysis; the rating-only path streams its combos, so feed it the same 4 rows
+    rows = mocks["combo"].return_value
+    stream = SimpleNamespace(iter_viable=lambda: iter([(rows, np.arange(rows.shape[0]))]))
+    with patch("kst_rating_tool.pipeline.combo_stream", return_value=stream):
+        results = analyze_constraints(cs)
 
-    # We expect `analyze_constraints` to call `_rate_motion_all_constraints` for each UNIQUE motion.
+    # We expect `analyze_constraints` to rate each UNIQUE motion, in one batched call.
     # Motion A: Unique -> Processed
     # Motion B: Duplicate of A -> Skipped
     # Motion C: Unique (NaN) -> Processed
     # Motion D: Unique (NaN != NaN) -> Processed
 
     # Total processed: 3
-    assert mocks["rate"].call_count == 3
+    assert mocks["rate"].call_count == 1
+    assert mocks["rate"].call_args.args[0].shape[0] == 3
 
     # Check parallel execution and ensure unordered worker results are merged deterministically.
-    with patch("kst_rating_tool.pipeline.Pool") as mock_pool_cls:
-        mock_pool = mock_pool_cls.return_value
-        mock_pool.__enter__.return_value = mock_pool
+    with patch("kst_rating_tool.pipeline.shared_executor") as mock_executor:
+        mock_run = mock_executor.return_value.run
 
         dummy_R = np.zeros((2, 1))
         r_a = np.round(mot_a * 1e4) / 1e4
@@ -104,12 +97,12 @@ def test_analyze_constraints_duplicate_detection(mock_pipeline_dependencies):
         r_d = np.round(mot_d * 1e4) / 1e4
 
         # Deliberately shuffled by combo_i to validate sort-by-index in the main process.
-        mock_pool.map.return_value = [[
+        mock_run.return_value = [
             (2, r_c, dummy_R),
             (0, r_a, dummy_R),
             (3, r_d, dummy_R),
             (1, r_b, dummy_R),
-        ]]
+        ]
 
         res_par = analyze_constraints_detailed(cs, n_workers=2)
         assert res_par.no_mot_half == 3
@@ -121,7 +114,7 @@ def test_analyze_constraints_detailed_indices(mock_pipeline_dependencies):
     using the dictionary map.
     """
     mocks = mock_pipeline_dependencies
-    cs = ConstraintSet(points=[PointConstraint(np.zeros(3), np.array([0,0,1]))])
+    cs = ConstraintSet(points=[PointConstraint(np.zeros(3), np.array([0,0,1]))] * 5)  # combos [1..5] stack 5 rows
 
     mocks["combo"].return_value = np.array([[1,2,3,4,5]] * 4)
 
@@ -131,12 +124,7 @@ def test_analyze_constraints_detailed_indices(mock_pipeline_dependencies):
     mot_d = mot_a + 1e-8 # Duplicate of A (index 1)
 
     # 1. Test Sequential (n_workers=1)
-    mocks["rec_mot"].side_effect = [
-        create_mock_motion(mot_a),
-        create_mock_motion(mot_b),
-        create_mock_motion(mot_c),
-        create_mock_motion(mot_d)
-    ]
+    mocks["rec_mot"].return_value = stack_motions(mot_a, mot_b, mot_c, mot_d)
 
     res_seq = analyze_constraints_detailed(cs, n_workers=1)
 
@@ -154,10 +142,9 @@ def test_analyze_constraints_detailed_indices(mock_pipeline_dependencies):
     assert res_seq.combo_dup_idx[3] == 1
 
     # 2. Test Parallel (n_workers=2)
-    # We mock Pool again
-    with patch("kst_rating_tool.pipeline.Pool") as mock_pool_cls:
-        mock_pool = mock_pool_cls.return_value
-        mock_pool.__enter__.return_value = mock_pool
+    # We mock the shared executor again
+    with patch("kst_rating_tool.pipeline.shared_executor") as mock_executor:
+        mock_run = mock_executor.return_value.run
 
         dummy_R = np.zeros((2, 10))
         r_a = np.round(mot_a * 1e4) / 1e4
@@ -166,15 +153,12 @@ def test_analyze_constraints_detailed_indices(mock_pipeline_dependencies):
         r_d = np.round(mot_d * 1e4) / 1e4
 
         # Deliberately return out-of-order rows; function should sort by combo index.
-        chunk_data = [
-            [
-                (2, r_c, dummy_R),
-                (0, r_a, dummy_R),
-                (3, r_d, dummy_R),
-                (1, r_b, dummy_R),
-            ]
+        mock_run.return_value = [
+            (2, r_c, dummy_R),
+            (0, r_a, dummy_R),
+            (3, r_d, dummy_R),
+            (1, r_b, dummy_R),
         ]
-        mock_pool.map.return_value = chunk_data
 
         res_par = analyze_constraints_detailed(cs, n_workers=2)
 
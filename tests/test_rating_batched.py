@@ -0,0 +1,180 @@
+"""Batched rating kernels versus the scalar MATLAB ports in ``rating``."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from kst_rating_tool.rating import (
+    rate_clin,
+    rate_cp,
+    rate_cpin,
+    rate_cpln1,
+    rate_cpln2,
+    rate_motset,
+)
+from kst_rating_tool.rating_batched import (
+    _rate_cp_batch_numpy,
+    factor_pivot_wrench,
+    last_static_coeff,
+    rate_motion_all_constraints_batched_numpy,
+    rate_motions_batched_numpy,
+    rate_motset_batched,
+)
+
+
+def _motion_problem(seed: int, n_cp: int = 30):
+    rng = np.random.default_rng(seed)
+    mot = np.concatenate([rng.standard_normal(9), [0.3]])
+    react_wr_5 = rng.standard_normal((5, 6))
+    input_wr = rng.standard_normal(6)
+    cp = np.hstack([rng.uniform(-5, 5, (n_cp, 3)), rng.standard_normal((n_cp, 3))])
+    return mot, react_wr_5, input_wr, cp
+
+
+def _scalar_cp(mot, react_wr_5, input_wr, cp):
+    out = np.array([rate_cp(mot, react_wr_5, input_wr, row) for row in cp])
+    return out[:, 0], out[:, 1]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_cp_parity_mode_is_bit_identical(seed):
+    mot, react_wr_5, input_wr, cp = _motion_problem(seed)
+    pos, neg = _rate_cp_batch_numpy(mot, react_wr_5, input_wr, cp, parity=True)
+    exp_pos, exp_neg = _scalar_cp(mot, react_wr_5, input_wr, cp)
+    assert np.array_equal(pos, exp_pos)
+    assert np.array_equal(neg, exp_neg)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_cp_rank_one_kernel_matches_rate_cp(seed):
+    mot, react_wr_5, input_wr, cp = _motion_problem(seed)
+    pos, neg = _rate_cp_batch_numpy(mot, react_wr_5, input_wr, cp)
+    exp_pos, exp_neg = _scalar_cp(mot, react_wr_5, input_wr, cp)
+    assert np.array_equal(np.isinf(pos), np.isinf(exp_pos))
+    assert np.array_equal(np.isinf(neg), np.isinf(exp_neg))
+    np.testing.assert_allclose(pos[np.isfinite(pos)], exp_pos[np.isfinite(exp_pos)], rtol=1e-10)
+    np.testing.assert_allclose(neg[np.isfinite(neg)], exp_neg[np.isfinite(exp_neg)], rtol=1e-10)
+
+
+def test_rank_one_rejects_candidates_in_pivot_span():
+    rng = np.random.default_rng(7)
+    react_wr_5 = rng.standard_normal((5, 6))
+    input_wr = rng.standard_normal(6)
+    wr = np.vstack([rng.standard_normal((1, 5)) @ react_wr_5, rng.standard_normal((1, 6))])
+    val, ok = last_static_coeff(react_wr_5, input_wr, wr)
+    assert ok.tolist() == [False, True]
+    assert np.isnan(val[0])
+    exact = np.linalg.solve(np.vstack([react_wr_5, wr[1]]).T, input_wr)[-1]
+    assert val[1] == pytest.approx(exact, rel=1e-12)
+
+
+def test_factor_pivot_wrench_requires_rank_five():
+    rng = np.random.default_rng(3)
+    rank4 = rng.standard_normal((4, 6))
+    assert factor_pivot_wrench(np.vstack([rank4, rank4[0]]), np.ones(6)) is None
+    tall = np.vstack([rank4, rng.standard_normal((1, 6)), rank4[1] + rank4[2]])
+    factor = factor_pivot_wrench(tall, np.ones(6))
+    assert factor is not None and factor.n_rows == 6
+    assert np.allclose(tall @ factor.null_vec, 0.0, atol=1e-12)
+
+
+def _unit(rng, n):
+    v = rng.standard_normal((n, 3))
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _mixed_problem(seed: int, pitch: float):
+    rng = np.random.default_rng(seed)
+    mot, react_wr_5, input_wr, cp = _motion_problem(seed, n_cp=6)
+    mot[9] = pitch
+    cpin = np.hstack([rng.uniform(-5, 5, (6, 3)), _unit(rng, 6)])
+    cpin[0, 0:3] = mot[6:9]  # zero moment arm
+    cpin[1, 3:6] = mot[0:3] / np.linalg.norm(mot[0:3])  # pin along the screw axis
+    clin = np.hstack([rng.uniform(-5, 5, (5, 3)), _unit(rng, 5), _unit(rng, 5), rng.uniform(1, 4, (5, 1))])
+    cpln = np.hstack([rng.uniform(-5, 5, (6, 3)), _unit(rng, 6), [[1], [2], [1], [2], [2], [1]]])
+    cpln[4, 0:3] = mot[6:9]
+    cpln_prop = np.hstack([_unit(rng, 6), rng.uniform(1, 3, (6, 1)), _unit(rng, 6), rng.uniform(1, 3, (6, 1))])
+    cpln_prop[[1, 3, 4], 0] = rng.uniform(1, 3, 3)  # circle radius
+    return mot, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop
+
+
+def _scalar_all(mot, react_wr_5, input_wr, cp, cpin, clin, cpln, cpln_prop):
+    cp_out = np.array([rate_cp(mot, react_wr_5, input_wr, r) for r in cp]).reshape(-1, 2)
+    pin = np.array([rate_cpin(mot, react_wr_5, input_wr, r) for r in cpin])
+    lin = np.array([rate_clin(mot, react_wr_5, input_wr, r) for r in clin]).reshape(-1, 2)
+    pln = np.array([
+        (rate_cpln2 if int(r[6]) == 2 else rate_cpln1)(mot, react_wr_5, input_wr, r, p)
+        for r, p in zip(cpln, cpln_prop)
+    ]).reshape(-1, 2)
+    return cp_out[:, 0], cp_out[:, 1], pin, lin[:, 0], lin[:, 1], pln[:, 0], pln[:, 1]
+
+
+@pytest.mark.parametrize("pitch", [0.0, 0.7, np.inf])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_all_constraint_types_parity_mode_is_bit_identical(seed, pitch):
+    args = _mixed_problem(seed, pitch)
+    got = rate_motion_all_constraints_batched_numpy(*args, parity=True)
+    for g, e in zip(got, _scalar_all(*args)):
+        assert np.array_equal(g, e)
+
+
+@pytest.mark.parametrize("pitch", [0.0, 0.7, np.inf])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_all_constraint_types_match_scalar_ports(seed, pitch):
+    args = _mixed_problem(seed, pitch)
+    got = rate_motion_all_constraints_batched_numpy(*args)
+    for g, e in zip(got, _scalar_all(*args)):
+        assert np.array_equal(np.isinf(g), np.isinf(e))
+        np.testing.assert_allclose(g[np.isfinite(g)], e[np.isfinite(e)], rtol=1e-10)
+
+
+@pytest.mark.parametrize("parity", [False, True])
+def test_cross_motion_batch_matches_per_motion(parity):
+    motions = [_mixed_problem(seed, pitch) for seed in range(4) for pitch in (0.0, 0.4, np.inf)]
+    _, _, _, cp, cpin, clin, cpln, cpln_prop = motions[0]
+    rng = np.random.default_rng(11)
+    pivots = []
+    for i, (_, react_wr_5, *_rest) in enumerate(motions):
+        if i % 3 == 1:  # two extra dependent rows, still rank 5
+            react_wr_5 = np.vstack([react_wr_5, rng.standard_normal((2, 5)) @ react_wr_5])
+        pivots.append(react_wr_5)
+    mot_arr = np.vstack([m[0] for m in motions])
+    input_wr = np.vstack([m[2] for m in motions])
+    got = rate_motions_batched_numpy(
+        mot_arr, pivots, input_wr, cp, cpin, clin, cpln, cpln_prop, parity=parity, chunk_size=4
+    )
+    for i in range(len(motions)):
+        single = rate_motion_all_constraints_batched_numpy(
+            mot_arr[i], pivots[i], input_wr[i], cp, cpin, clin, cpln, cpln_prop, parity=parity
+        )
+        for block, expected in zip(got, single):
+            assert np.array_equal(block[i], expected)
+
+
+@pytest.mark.parametrize("case", ["case5_printer", "case5rev3_printer_rot_snap_screw"])
+def test_rate_motset_batched_parity_matches_rate_motset(case):
+    case_path = Path(__file__).resolve().parent.parent / "matlab_script" / "Input_files" / f"{case}.m"
+    if not case_path.is_file():
+        pytest.skip("case file not available")
+    from kst_rating_tool import analyze_constraints_detailed
+    from kst_rating_tool.io_legacy import load_case_m_file
+
+    cs = load_case_m_file(case_path)
+    detailed = analyze_constraints_detailed(cs)
+    n, mot_half = cs.total_cp, detailed.mot_half
+    rng = np.random.default_rng(5)
+    combo_set = np.zeros((mot_half.shape[0], 5), dtype=int)
+    for row in combo_set:  # random combos so that most constraints get rated
+        k = rng.integers(2, 6)
+        row[:k] = rng.choice(np.arange(1, n + 1), k, replace=False)
+    combo_set[: detailed.combo_proc.shape[0] // 2] = detailed.combo_proc[: detailed.combo_proc.shape[0] // 2, 1:6]
+    cp_set = np.arange(1, n + 2)  # includes an index past the last constraint
+    args = (mot_half, cp_set, cs, detailed.pts, detailed.max_d)
+    expected = rate_motset(combo_set, *args)
+    assert np.isfinite(expected).any()
+    assert np.array_equal(rate_motset_batched(combo_set, *args, parity=True, chunk_size=7), expected)
+    single = rate_motset_batched(combo_set[0], *args, parity=True)
+    assert np.array_equal(single, rate_motset(combo_set[0], *args))